@@ -0,0 +1,97 @@
+"""
+FitGenius agent pool
+
+A Strands Agent keeps its conversation on the instance and is not safe to
+call from two threads at once, so concurrent requests must never share
+one. AgentPool leases each request its own agent for a key (the tool
+subset it was built with) and takes it back afterwards, cleared of that
+request's turns. At most max_agents are built per key, normally the
+request executor's max_concurrency, so every worker thread can hold one;
+callers beyond that wait for a lease to be returned.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+
+def clear_messages(agent: Any):
+    """Drop the turns an agent accumulated while leased"""
+    messages = getattr(agent, "messages", None)
+    if isinstance(messages, list):
+        messages.clear()
+
+
+class AgentPool:
+    """Per-key pools of agents, each leased to one caller at a time"""
+
+    def __init__(self, max_agents: int = 16, reset: Optional[Callable[[Any], None]] = clear_messages):
+        if max_agents < 1:
+            raise ValueError("max_agents must be at least 1")
+        self.max_agents = max_agents
+        self.reset = reset
+        self._idle: Dict[Hashable, List[Any]] = {}
+        self._built: Dict[Hashable, int] = {}
+        self._available = threading.Condition()
+
+        self.leases = 0
+        self.created = 0
+        self.waits = 0
+
+    def _acquire(self, key: Hashable) -> Optional[Any]:
+        """An idle agent for key, or None when the caller may build a new one"""
+        with self._available:
+            self.leases += 1
+            waited = False
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop()
+                if self._built.get(key, 0) < self.max_agents:
+                    self._built[key] = self._built.get(key, 0) + 1
+                    self.created += 1
+                    return None
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                self._available.wait()
+
+    def _release(self, key: Hashable, agent: Any):
+        if self.reset is not None:
+            self.reset(agent)
+        with self._available:
+            self._idle.setdefault(key, []).append(agent)
+            self._available.notify()
+
+    def _discard(self, key: Hashable):
+        """Give back the slot of an agent that could not be built"""
+        with self._available:
+            self._built[key] -= 1
+            self.created -= 1
+            self._available.notify()
+
+    @contextmanager
+    def lease(self, key: Hashable, factory: Callable[[], Any]) -> Iterator[Any]:
+        """An agent for key, built with factory() if none is idle, held until the block exits"""
+        agent = self._acquire(key)
+        if agent is None:
+            try:
+                agent = factory()
+            except BaseException:
+                self._discard(key)
+                raise
+        try:
+            yield agent
+        finally:
+            self._release(key, agent)
+
+    def stats(self) -> Dict:
+        """Counters; waits counts leases that found every agent for their key busy"""
+        with self._available:
+            return {
+                "leases": self.leases,
+                "created": self.created,
+                "waits": self.waits,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+                "keys": len(self._built),
+            }
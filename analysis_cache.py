@@ -0,0 +1,215 @@
+"""
+FitGenius body analysis result cache
+
+Content-addressed cache for Claude Vision body analyses. Entries are keyed
+by a hash of the decoded image bytes plus the canonicalized user_info, so
+re-uploads and client retries of the same photo reuse the earlier result
+instead of making another Bedrock call.
+"""
+
+import base64
+import binascii
+import copy
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+def decode_image(image_data: str) -> bytes:
+    """Decode base64 image data, accepting an optional data: URL prefix"""
+    if image_data.startswith("data:") and "," in image_data:
+        image_data = image_data.split(",", 1)[1]
+    try:
+        return base64.b64decode(image_data, validate=False)
+    except (binascii.Error, ValueError) as exc:
+        raise ValueError(f"image_data is not valid base64: {exc}") from exc
+
+
+def canonical_user_info(user_info: Optional[Dict]) -> str:
+    """Stable JSON encoding of user_info, independent of key order"""
+    return json.dumps(user_info or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def cache_key(image_data: str, user_info: Optional[Dict]) -> str:
+    """Content hash of the decoded image and canonical user_info"""
+    digest = hashlib.sha256()
+    digest.update(hashlib.sha256(decode_image(image_data)).digest())
+    digest.update(canonical_user_info(user_info).encode())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier LRU cache for body analysis results
+
+    The in-memory tier holds up to max_entries results. When disk_dir is
+    set, results are also written there as JSON files; disk entries older
+    than ttl_seconds are ignored and the oldest files are evicted once the
+    directory exceeds max_disk_bytes. Both tiers honour ttl_seconds.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600, max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_index()
+
+    # -- statistics -----------------------------------------------------
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict:
+        """Hit/miss counters; every hit is a Bedrock call saved"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bedrock_calls_saved": self.hits,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_sizes),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    # -- public API -----------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached result for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if not self._expired(stored_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+            if self.disk_dir:
+                found = self._read_disk(key, now)
+                if found is not None:
+                    stored_at, value = found
+                    self._remember(key, stored_at, value)
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict):
+        """Store a result in every configured tier"""
+        now = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, now, value)
+            if self.disk_dir:
+                self._write_disk(key, value)
+
+    def get_or_compute(self, image_data: str, user_info: Optional[Dict], compute: Callable[[], Dict],
+                       key: Optional[str] = None) -> Dict:
+        """Return the cached analysis for this image/user_info or compute and store it"""
+        key = key or cache_key(image_data, user_info)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        result = compute()
+        self.put(key, result)
+        return result
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_sizes):
+                self._remove_disk(key)
+
+    # -- internals ------------------------------------------------------
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: Dict):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".json"):
+                stat = os.stat(os.path.join(self.disk_dir, name))
+                entries.append((stat.st_mtime, name[:-5], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_sizes[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict]]:
+        if key not in self._disk_sizes:
+            return None
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at, now):
+                self._remove_disk(key)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self._remove_disk(key)
+            return None
+        self._disk_sizes.move_to_end(key)
+        return stored_at, value
+
+    def _write_disk(self, key: str, value: Dict):
+        data = json.dumps(value, default=str).encode("utf-8")
+        # Write atomically so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        self._disk_bytes += len(data) - self._disk_sizes.pop(key, 0)
+        self._disk_sizes[key] = len(data)
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk_sizes) > 1:
+            oldest = next(iter(self._disk_sizes))
+            self._remove_disk(oldest)
+            self.evictions += 1
+
+    def _remove_disk(self, key: str):
+        self._disk_bytes -= self._disk_sizes.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
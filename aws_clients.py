@@ -0,0 +1,149 @@
+"""
+FitGenius AWS clients
+
+Lazily created boto3 clients shared across FitGeniusAgent instances. All
+clients come from one boto3 Session per configuration and are only built
+the first time a service is used, with connection pool size, keep-alive,
+timeouts and retry mode taken from the aws.client config section.
+"""
+
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_CLIENT_SETTINGS = {
+    "max_pool_connections": 50,
+    "connect_timeout": 5,
+    "read_timeout": 60,
+    "tcp_keepalive": True,
+    "retry_mode": "adaptive",
+    "max_attempts": 5,
+}
+
+
+def client_config(settings: Optional[Dict] = None, service: Optional[str] = None) -> Config:
+    """botocore Config from aws.client settings, with per-service overrides applied"""
+    settings = settings or {}
+    merged = {**DEFAULT_CLIENT_SETTINGS, **{k: v for k, v in settings.items() if k != "services"}}
+    if service:
+        merged.update(settings.get("services", {}).get(service, {}))
+
+    return Config(
+        max_pool_connections=merged["max_pool_connections"],
+        connect_timeout=merged["connect_timeout"],
+        read_timeout=merged["read_timeout"],
+        tcp_keepalive=merged["tcp_keepalive"],
+        retries={"mode": merged["retry_mode"], "max_attempts": merged["max_attempts"]},
+    )
+
+
+class AWSClients:
+    """
+    Lazy, thread-safe holder of boto3 clients and resources
+
+    Clients are created on first access and then reused. boto3 clients are
+    thread-safe; the DynamoDB resource is shared too because the agent only
+    calls stateless Table actions (put_item, query, update_item, ...).
+    """
+
+    def __init__(self, region: Optional[str] = None, settings: Optional[Dict] = None,
+                 session: Optional[boto3.session.Session] = None):
+        self.region = region
+        self.settings = settings or {}
+        self._session = session
+        self._clients: Dict[str, object] = {}
+        self._resources: Dict[str, object] = {}
+        self._hooks: List[Callable] = []
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> boto3.session.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = boto3.session.Session(region_name=self.region)
+        return self._session
+
+    def client(self, service: str):
+        """Shared client for service, created on first use"""
+        client = self._clients.get(service)
+        if client is None:
+            session = self.session
+            with self._lock:
+                client = self._clients.get(service)
+                if client is None:
+                    # Session.client is not thread-safe, hence the lock
+                    client = session.client(service, config=client_config(self.settings, service))
+                    self._apply_hooks(client)
+                    self._clients[service] = client
+        return client
+
+    def resource(self, service: str):
+        """Shared resource for service, created on first use"""
+        resource = self._resources.get(service)
+        if resource is None:
+            session = self.session
+            with self._lock:
+                resource = self._resources.get(service)
+                if resource is None:
+                    resource = session.resource(service, config=client_config(self.settings, service))
+                    self._apply_hooks(resource)
+                    self._resources[service] = resource
+        return resource
+
+    def register(self, service: str, client):
+        """Use a preconfigured client (or stub) for service"""
+        with self._lock:
+            self._apply_hooks(client)
+            self._clients[service] = client
+
+    def add_hook(self, hook: Callable):
+        """Call hook(client) on every client and resource, existing and future (once per hook)"""
+        with self._lock:
+            if hook in self._hooks:
+                return
+            self._hooks.append(hook)
+            for created in list(self._clients.values()) + list(self._resources.values()):
+                hook(created)
+
+    def _apply_hooks(self, client):
+        for hook in self._hooks:
+            hook(client)
+
+    def created(self) -> List[str]:
+        """Services whose client or resource has been built so far"""
+        return sorted(set(self._clients) | set(self._resources))
+
+
+def client_settings(config: Optional[Dict] = None) -> Dict:
+    """
+    aws.client settings from config; while aws.bedrock.limiter is enabled it
+    retries Bedrock calls itself, so bedrock-runtime defaults to one attempt
+    """
+    aws = (config or {}).get("aws", {})
+    settings = aws.get("client", {})
+    if not aws.get("bedrock", {}).get("limiter", {}).get("enabled", False):
+        return settings
+    services = dict(settings.get("services", {}))
+    services["bedrock-runtime"] = {"max_attempts": 1, **services.get("bedrock-runtime", {})}
+    return {**settings, "services": services}
+
+
+_shared: Dict[str, AWSClients] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_clients(config: Optional[Dict] = None) -> AWSClients:
+    """Process-wide AWSClients for the region and client settings in config"""
+    aws = (config or {}).get("aws", {})
+    region = aws.get("region")
+    settings = client_settings(config)
+    key = json.dumps([region, settings], sort_keys=True, default=str)
+    with _shared_lock:
+        clients = _shared.get(key)
+        if clients is None:
+            clients = _shared[key] = AWSClients(region, settings)
+        return clients
@@ -0,0 +1,424 @@
+"""
+FitGenius Bedrock limiter
+
+One process-wide gate in front of Bedrock model calls, with two limits.
+Concurrency follows AIMD: the limit grows by one for every limit's worth
+of successful calls and is multiplied by decrease_factor on a throttle,
+at most once per wave of calls in flight. A token bucket refilled at the
+account's tokens-per-minute quota charges each call its estimated input
+plus max_tokens before it is sent; Bedrock's reported usage replaces the
+estimate once the call finishes. Calls that fail before a response
+(throttled or not) are refunded; throttles, 5xx errors and connection
+failures are retried after a full-jitter exponential backoff instead of
+by botocore, so retries do not pile onto a throttled endpoint.
+LimitedBedrock covers invoke_model for the tools and converse for the
+Strands agent loop.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+
+import context_compaction
+
+# Cut the concurrency limit, then retry
+THROTTLING_ERRORS = frozenset({"ThrottlingException", "TooManyRequestsException"})
+# Retry without cutting the limit
+TRANSIENT_ERRORS = frozenset({"ServiceUnavailableException", "InternalServerException", "ModelNotReadyException"})
+# No response at all (endpoint unreachable, connection closed, read timeout); retry likewise
+TRANSPORT_ERRORS = (BotocoreConnectionError, HTTPClientError)
+
+IMAGE_TOKENS = 1600  # an image at the vision.max_megapixels resize target
+DEFAULT_MAX_TOKENS = 4096  # output tokens reserved when the request does not set max_tokens
+
+SUCCESS = "success"
+THROTTLED = "throttled"
+FAILED = "failed"  # no signal for the concurrency limit
+
+
+def error_code(error: BaseException) -> Optional[str]:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    return None
+
+
+def retryable(error: BaseException) -> bool:
+    """Throttles, transient and other 5xx errors, and transport failures"""
+    if isinstance(error, ClientError):
+        status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode") or 0
+        return error_code(error) in THROTTLING_ERRORS | TRANSIENT_ERRORS or status >= 500
+    return isinstance(error, TRANSPORT_ERRORS)
+
+
+def _content_tokens(value) -> int:
+    if isinstance(value, str):
+        return context_compaction.estimate_tokens(value)
+    if isinstance(value, list):
+        return sum(_content_tokens(item) for item in value)
+    if isinstance(value, dict):
+        # Messages API {"type": "image"} or Converse {"image": {...}} blocks
+        if value.get("type") == "image" or "image" in value:
+            return IMAGE_TOKENS
+        return sum(_content_tokens(item) for item in value.values())
+    return 0
+
+
+def estimate_request_tokens(body) -> int:
+    """Quota a Messages API request body can use: its prompt and images plus max_tokens"""
+    try:
+        request = json.loads(body)
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_TOKENS + context_compaction.estimate_tokens(str(body or ""))
+    prompt = _content_tokens([request.get("system", ""), request.get("messages", [])])
+    return prompt + int(request.get("max_tokens", DEFAULT_MAX_TOKENS))
+
+
+def estimate_converse_tokens(request: Dict) -> int:
+    """Quota a Converse request can use: system, messages and tool schemas plus maxTokens"""
+    prompt = _content_tokens([request.get("system", []), request.get("messages", [])])
+    if request.get("toolConfig"):
+        prompt += context_compaction.estimate_tokens(json.dumps(request["toolConfig"], default=str))
+    return prompt + int(request.get("inferenceConfig", {}).get("maxTokens", DEFAULT_MAX_TOKENS))
+
+
+def response_tokens(response: Dict) -> Optional[int]:
+    """Input plus output tokens from Bedrock's invoke_model response headers"""
+    headers = response.get("ResponseMetadata", {}).get("HTTPHeaders", {})
+    counts = (headers.get("x-amzn-bedrock-input-token-count"), headers.get("x-amzn-bedrock-output-token-count"))
+    if None in counts:
+        return None
+    return int(counts[0]) + int(counts[1])
+
+
+def converse_tokens(response: Dict) -> Optional[int]:
+    """Total tokens from a Converse response's usage"""
+    return response.get("usage", {}).get("totalTokens")
+
+
+def _invoke_stream_usage(event: Dict, usage: Dict):
+    """Collect input_tokens/output_tokens from an invoke_model_with_response_stream event"""
+    chunk = event.get("chunk")
+    if chunk and b'"usage"' in chunk["bytes"]:
+        payload = json.loads(chunk["bytes"])
+        usage.update(payload.get("message", {}).get("usage", {}))
+        usage.update(payload.get("usage", {}))
+
+
+def _converse_stream_usage(event: Dict, usage: Dict):
+    """Collect input_tokens/output_tokens from a converse_stream metadata event"""
+    counts = event.get("metadata", {}).get("usage")
+    if counts:
+        usage.update(input_tokens=counts.get("inputTokens", 0), output_tokens=counts.get("outputTokens", 0))
+
+
+class TokenBucket:
+    """
+    Tokens refilled at tokens_per_minute up to capacity
+
+    reserve() always takes the tokens, letting the balance go negative,
+    and returns how long the caller must wait for the debt to refill, so
+    callers are served in the order they reserved.
+    """
+
+    def __init__(self, tokens_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else tokens_per_minute)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float) -> float:
+        """Take tokens and return the seconds to wait before using them"""
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def refund(self, tokens: float):
+        """Give back tokens (a negative amount charges more)"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class AIMDLimit:
+    """Concurrency limit with additive increase and multiplicative decrease"""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64, decrease_factor: float = 0.5):
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.limit = float(initial)
+        self.in_flight = 0
+        self._queue: Deque[object] = deque()
+        self._issued = 0
+        self._cut_after = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> int:
+        """Wait for a free slot, first come first served; returns a ticket for release()"""
+        with self._cond:
+            me = object()
+            self._queue.append(me)
+            try:
+                while self._queue[0] is not me or self.in_flight >= int(self.limit):
+                    self._cond.wait()
+            except BaseException:
+                self._queue.remove(me)
+                self._cond.notify_all()
+                raise
+            self._queue.popleft()
+            self.in_flight += 1
+            self._issued += 1
+            if self._queue and self.in_flight < int(self.limit):
+                self._cond.notify_all()
+            return self._issued
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def release(self, ticket: int, outcome: str = SUCCESS):
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == SUCCESS:
+                # +1 per limit's worth of successes, roughly once per round trip
+                self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+            elif outcome == THROTTLED and ticket > self._cut_after:
+                # Calls sent before the last cut were sized for the old limit; one cut covers them
+                self.limit = max(float(self.minimum), self.limit * self.decrease_factor)
+                self._cut_after = self._issued
+            if self._queue and self.in_flight < int(self.limit):
+                self._cond.notify_all()
+
+
+class BedrockLimiter:
+    """
+    AIMD concurrency plus a tokens-per-minute bucket around Bedrock calls
+
+    With tokens_per_minute None only the concurrency limit applies.
+    """
+
+    def __init__(self, tokens_per_minute: Optional[float] = None, burst_seconds: float = 10.0,
+                 initial_concurrency: int = 8, min_concurrency: int = 1, max_concurrency: int = 64,
+                 decrease_factor: float = 0.5, max_retries: int = 4, backoff_base: float = 0.5,
+                 backoff_cap: float = 20.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        self.bucket = (TokenBucket(tokens_per_minute, tokens_per_minute * burst_seconds / 60.0, clock=clock)
+                       if tokens_per_minute else None)
+        self.concurrency = AIMDLimit(initial_concurrency, min_concurrency, max_concurrency, decrease_factor)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+        self._stats_lock = threading.Lock()
+        self._waiting_for_tokens = 0
+        self.calls = 0
+        self.throttles = 0
+        self.retries = 0
+        self.failed = 0
+        self.tokens_used = 0
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit"""
+        return int(self.concurrency.limit)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a concurrency slot or for tokens"""
+        return self.concurrency.waiting + self._waiting_for_tokens
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform between 0 and the capped exponential delay"""
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _admit(self, tokens: int) -> int:
+        ticket = self.concurrency.acquire()
+        if self.bucket is not None:
+            delay = self.bucket.reserve(tokens)
+            if delay > 0:
+                with self._stats_lock:
+                    self._waiting_for_tokens += 1
+                try:
+                    self._sleep(delay)
+                finally:
+                    with self._stats_lock:
+                        self._waiting_for_tokens -= 1
+        return ticket
+
+    def _finish(self, ticket: int, tokens: int, outcome: str, used: Optional[int] = None):
+        self.concurrency.release(ticket, outcome)
+        if self.bucket is not None:
+            if outcome == THROTTLED:
+                # Throttled calls do not count against the quota
+                self.bucket.refund(tokens)
+            elif used is not None:
+                self.bucket.refund(tokens - used)
+        with self._stats_lock:
+            if outcome == THROTTLED:
+                self.throttles += 1
+            if used is not None:
+                self.tokens_used += used
+
+    def _send(self, send: Callable[..., Dict], tokens: int, kwargs: Dict) -> Tuple[Dict, int]:
+        """send(**kwargs) with retries; returns the response and the ticket still holding its slot"""
+        for attempt in range(self.max_retries + 1):
+            ticket = self._admit(tokens)
+            with self._stats_lock:
+                self.calls += 1
+            try:
+                return send(**kwargs), ticket
+            except BaseException as error:
+                code = error_code(error)
+                # No response, so nothing counted against the quota
+                self._finish(ticket, tokens, THROTTLED if code in THROTTLING_ERRORS else FAILED, used=0)
+                if not retryable(error) or attempt == self.max_retries:
+                    with self._stats_lock:
+                        self.failed += 1
+                    raise
+            with self._stats_lock:
+                self.retries += 1
+            self._sleep(self.backoff(attempt))
+
+    def call(self, send: Callable[..., Dict], tokens: int,
+             usage: Callable[[Dict], Optional[int]] = response_tokens, **kwargs) -> Dict:
+        """Blocking call (invoke_model, converse) charged tokens up front; usage reads the actual count"""
+        response, ticket = self._send(send, tokens, kwargs)
+        self._finish(ticket, tokens, SUCCESS, usage(response))
+        return response
+
+    def stream(self, send: Callable[..., Dict], tokens: int, stream_key: str = "body",
+               event_usage: Callable[[Dict, Dict], None] = _invoke_stream_usage, **kwargs) -> Dict:
+        """
+        Streaming call (invoke_model_with_response_stream, converse_stream);
+        the slot is held until the event stream in response[stream_key] ends
+        """
+        response, ticket = self._send(send, tokens, kwargs)
+        return {**response, stream_key: self._release_after(response[stream_key], ticket, tokens, event_usage)}
+
+    def _release_after(self, events, ticket: int, tokens: int,
+                       event_usage: Callable[[Dict, Dict], None]) -> Iterator[Dict]:
+        usage: Dict = {}
+        outcome = FAILED  # abandoned or broken streams say nothing about capacity
+        try:
+            for event in events:
+                if "throttlingException" in event:
+                    outcome = THROTTLED
+                else:
+                    event_usage(event, usage)
+                yield event
+            if outcome != THROTTLED:
+                outcome = SUCCESS
+        except BaseException as error:
+            if error_code(error) in THROTTLING_ERRORS:
+                outcome = THROTTLED
+            raise
+        finally:
+            used = None
+            if "input_tokens" in usage and "output_tokens" in usage:
+                used = usage["input_tokens"] + usage["output_tokens"]
+            self._finish(ticket, tokens, outcome, used)
+
+    def wrap(self, client) -> "LimitedBedrock":
+        return LimitedBedrock(client, self)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.concurrency.in_flight,
+                "queue_depth": self.queue_depth,
+                "tokens_available": round(self.bucket.available) if self.bucket is not None else None,
+                "calls": self.calls,
+                "throttles": self.throttles,
+                "retries": self.retries,
+                "failed": self.failed,
+                "tokens_used": self.tokens_used,
+            }
+
+
+class LimitedBedrock:
+    """bedrock-runtime client whose model invocations go through a BedrockLimiter"""
+
+    def __init__(self, client, limiter: BedrockLimiter):
+        self.client = client
+        self.limiter = limiter
+
+    def invoke_model(self, **kwargs) -> Dict:
+        tokens = estimate_request_tokens(kwargs.get("body"))
+        return self.limiter.call(self.client.invoke_model, tokens, **kwargs)
+
+    def invoke_model_with_response_stream(self, **kwargs) -> Dict:
+        tokens = estimate_request_tokens(kwargs.get("body"))
+        return self.limiter.stream(self.client.invoke_model_with_response_stream, tokens, **kwargs)
+
+    def converse(self, **kwargs) -> Dict:
+        return self.limiter.call(self.client.converse, estimate_converse_tokens(kwargs),
+                                 usage=converse_tokens, **kwargs)
+
+    def converse_stream(self, **kwargs) -> Dict:
+        return self.limiter.stream(self.client.converse_stream, estimate_converse_tokens(kwargs),
+                                   stream_key="stream", event_usage=_converse_stream_usage, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def create_limiter(settings: Optional[Dict] = None) -> Optional[BedrockLimiter]:
+    """Limiter from the aws.bedrock.limiter config section (None when disabled)"""
+    settings = settings or {}
+    if not settings.get("enabled", False):
+        return None
+    return BedrockLimiter(
+        tokens_per_minute=settings.get("tokens_per_minute"),
+        burst_seconds=settings.get("burst_seconds", 10.0),
+        initial_concurrency=settings.get("initial_concurrency", 8),
+        min_concurrency=settings.get("min_concurrency", 1),
+        max_concurrency=settings.get("max_concurrency", 64),
+        decrease_factor=settings.get("decrease_factor", 0.5),
+        max_retries=settings.get("max_retries", 4),
+        backoff_base=settings.get("backoff_base_seconds", 0.5),
+        backoff_cap=settings.get("backoff_cap_seconds", 20.0),
+    )
+
+
+_shared: Dict[str, Optional[BedrockLimiter]] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter(config: Optional[Dict] = None) -> Optional[BedrockLimiter]:
+    """Process-wide limiter for the aws.bedrock.limiter settings in config"""
+    settings = (config or {}).get("aws", {}).get("bedrock", {}).get("limiter", {})
+    key = json.dumps(settings, sort_keys=True, default=str)
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = create_limiter(settings)
+        return _shared[key]
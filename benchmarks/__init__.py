@@ -0,0 +1,3 @@
+"""
+FitGenius offline benchmarks
+"""
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: every FitGeniusAgent tool and the request path, offline
+Run with: python benchmarks/bench_agent.py --iterations 200 --output bench_results.json
+
+The agent is built from its real code against moto (DynamoDB, S3) and a
+FakeBedrock with configurable latency; the Strands loop is replaced by
+ScriptedAgent so process_user_request runs two model calls around one real
+tool call. Each case reports p50/p95/p99 latency, throughput and peak
+Python heap. Pass --baseline with an earlier JSON report to flag
+regressions between commits.
+"""
+import argparse
+import base64
+import io
+import itertools
+import os
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aws_clients import AWSClients  # noqa: E402
+from benchmarks.harness import add_report_arguments, format_case, run_case, write_report  # noqa: E402
+from benchmarks.stubs import FakeBedrock, ScriptedAgent  # noqa: E402
+from fitgenius_agent import FitGeniusAgent, load_config  # noqa: E402
+
+REGION = "us-east-1"
+USER_INFO = {"age": 28, "gender": "male", "height_cm": 175, "weight_kg": 85}
+
+WORKOUT_ARGS = {
+    "fitness_level": "intermediate",
+    "goals": ["muscle_gain"],
+    "available_equipment": ["dumbbells", "bench"],
+    "days_per_week": 4,
+    "duration_minutes": 60,
+    "focus_areas": ["chest"],
+}
+DIET_ARGS = {
+    "goal": "weight_loss",
+    "current_weight": 85,
+    "target_weight": 75,
+    "activity_level": "moderate",
+    "dietary_restrictions": [],
+    "meals_per_day": 5,
+}
+
+
+def make_photo(width: int = 3024, height: int = 4032) -> str:
+    """Phone-sized JPEG as base64"""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (gradient, gradient.rotate(90), gradient))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=92)
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def create_resources(config):
+    dynamodb = boto3.client("dynamodb", region_name=REGION)
+    for table in (config["database"]["progress_table"], config["database"]["users_table"]):
+        key_schema = [{"AttributeName": "userId", "KeyType": "HASH"}]
+        attributes = [{"AttributeName": "userId", "AttributeType": "S"}]
+        if table == config["database"]["progress_table"]:
+            key_schema.append({"AttributeName": "date", "KeyType": "RANGE"})
+            attributes.append({"AttributeName": "date", "AttributeType": "S"})
+        dynamodb.create_table(TableName=table, KeySchema=key_schema, AttributeDefinitions=attributes,
+                              BillingMode="PAY_PER_REQUEST")
+    boto3.client("s3", region_name=REGION).create_bucket(Bucket=config["storage"]["bucket_name"])
+
+
+def build_agent(config, bedrock: FakeBedrock) -> FitGeniusAgent:
+    aws = AWSClients(REGION, config.get("aws", {}).get("client"))
+    aws.register("bedrock-runtime", bedrock)
+    agent = FitGeniusAgent(config, aws=aws)
+    routes = [
+        ("bmi", "bmi_calculator", {"weight_kg": 85, "height_cm": 175}),
+        ("workout", "workout_planner", WORKOUT_ARGS),
+        ("diet", "diet_planner", DIET_ARGS),
+        ("search", "fitness_search", {"query": "creatine", "category": "supplements"}),
+    ]
+    # Every pooled agent, routed (agent.tool_routing) or not, is scripted
+    agent.create_agent = lambda tools: ScriptedAgent(bedrock, agent.tool_functions, routes)
+    return agent
+
+
+def progress_calls(agent: FitGeniusAgent):
+    """track_progress for a new day each call, like a daily check-in"""
+    days = itertools.count()
+    start = date(2024, 1, 1)
+    track = agent.tool_functions["progress_tracker"]
+
+    def call():
+        n = next(days)
+        track(
+            user_id=f"bench_user_{n % 50}",
+            date=(start + timedelta(days=n // 50)).isoformat(),
+            weight=85 - (n // 50) * 0.05,
+            body_measurements={"waist": 90 - (n // 50) * 0.02, "chest": 100},
+        )
+    return call
+
+
+def run_suite(args) -> dict:
+    config = load_config()
+    config.setdefault("database", {}).update({"progress_table": "FitGeniusProgress", "users_table": "FitGeniusUsers"})
+    config.setdefault("storage", {})["bucket_name"] = "fitgenius-bench"
+    bedrock = FakeBedrock(first_token_latency=args.first_token, token_latency=args.token_latency)
+
+    with mock_aws():
+        create_resources(config)
+        agent = build_agent(config, bedrock)
+        tools = agent.tool_functions
+        photo = make_photo()
+
+        def body_analysis_uncached():
+            if agent.analysis_cache is not None:
+                agent.analysis_cache.clear()
+            tools["body_analyzer"](image_data=photo, user_info=USER_INFO)
+
+        cases = {
+            "tool.bmi_calculator": lambda: tools["bmi_calculator"](weight_kg=85, height_cm=175),
+            "tool.body_analyzer": body_analysis_uncached,
+            "tool.body_analyzer_cached": lambda: tools["body_analyzer"](image_data=photo, user_info=USER_INFO),
+            "tool.workout_planner": lambda: tools["workout_planner"](**WORKOUT_ARGS),
+            "tool.diet_planner": lambda: tools["diet_planner"](**DIET_ARGS),
+            "tool.progress_tracker": progress_calls(agent),
+            "tool.fitness_search": lambda: tools["fitness_search"](query="creatine", category="supplements"),
+            "process_user_request": lambda: agent.process_user_request(
+                "Create a workout plan for muscle gain", context=USER_INFO),
+        }
+
+        results = {}
+        for name, fn in cases.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            # Model-bound cases sleep in the stub; fewer iterations keep the suite quick
+            slow = name in ("tool.body_analyzer", "process_user_request")
+            iterations = max(1, args.iterations // 10) if slow else args.iterations
+            results[name] = run_case(fn, iterations=iterations, warmup=1 if slow else args.warmup,
+                                     concurrency=args.concurrency)
+            print(format_case(name, results[name]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--first-token", type=float, default=0.05, help="stub model latency before output (s)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="stub latency per output token (s)")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    add_report_arguments(parser, output="bench_results.json")
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+
+    results = run_suite(args)
+    if write_report(args, results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
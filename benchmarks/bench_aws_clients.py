@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: eager per-agent AWS clients vs lazy shared pooled clients
+Run with: python benchmarks/bench_aws_clients.py --agents 50 --threads 64 --requests 4000
+
+Concurrent throughput runs against a local moto server over real HTTP, so
+connection pool limits apply as they would against AWS. Locally the moto
+server is the bottleneck, so the two pool sizes reach similar throughput;
+what the tuned pool removes is connection churn (pool-overflow discards).
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import boto3
+from botocore.config import Config
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import aws_clients  # noqa: E402
+
+REGION = "us-east-1"
+
+
+def eager_construction(n: int) -> float:
+    """What FitGeniusAgent.__init__ used to do per instance"""
+    start = time.perf_counter()
+    for _ in range(n):
+        boto3.client("bedrock-runtime", region_name=REGION)
+        boto3.client("s3", region_name=REGION)
+        boto3.resource("dynamodb", region_name=REGION)
+    return time.perf_counter() - start
+
+
+def lazy_construction(n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        aws_clients.get_shared_clients({"aws": {"region": REGION}})
+    return time.perf_counter() - start
+
+
+def throughput(client, threads: int, requests: int) -> float:
+    def call(i):
+        client.get_item(TableName="FitGeniusProgress", Key={"userId": {"S": f"u{i % 100}"}, "date": {"S": "x"}})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--port", type=int, default=5077)
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    eager_s = eager_construction(args.agents)
+    lazy_s = lazy_construction(args.agents)
+    print(f"agent client setup, eager: {eager_s / args.agents * 1000:8.2f} ms/agent")
+    print(f"agent client setup, lazy:  {lazy_s / args.agents * 1000:8.4f} ms/agent")
+
+    from moto.server import ThreadedMotoServer
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    # The default pool deliberately overflows; don't print a warning per request
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    try:
+        endpoint = f"http://127.0.0.1:{args.port}"
+        setup = boto3.client("dynamodb", region_name=REGION, endpoint_url=endpoint)
+        setup.create_table(
+            TableName="FitGeniusProgress",
+            AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"},
+                                  {"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"},
+                       {"AttributeName": "date", "KeyType": "RANGE"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+
+        default = boto3.client("dynamodb", region_name=REGION, endpoint_url=endpoint, config=Config())
+        tuned = boto3.client("dynamodb", region_name=REGION, endpoint_url=endpoint,
+                             config=aws_clients.client_config({"max_pool_connections": args.threads}))
+        throughput(default, args.threads, 200)  # warm up
+        default_rps = throughput(default, args.threads, args.requests)
+        tuned_rps = throughput(tuned, args.threads, args.requests)
+        print(f"{args.threads} threads, default pool (10):    {default_rps:8.0f} req/s")
+        print(f"{args.threads} threads, tuned pool ({args.threads}):    {tuned_rps:8.0f} req/s")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Bedrock goodput and throttles against a quota-enforcing stub, with and without the limiter
+Run with: python benchmarks/bench_bedrock_limiter.py --workers 64 --seconds 10
+
+Worker threads send invoke_model calls back to back at ThrottlingBedrock,
+which enforces a tokens-per-minute quota. Without the limiter each
+throttle is retried after a fixed short delay, as naive client retries do;
+with it, calls wait for quota and concurrency, and throttles back off with
+jitter. Goodput is tokens served by successful calls as a share of what
+the quota allows over the run.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bedrock_limiter import THROTTLING_ERRORS, BedrockLimiter, error_code  # noqa: E402
+from benchmarks.harness import summarize  # noqa: E402
+from benchmarks.stubs import ThrottlingBedrock  # noqa: E402
+
+
+def naive_retries(bedrock: ThrottlingBedrock, attempts: int = 5, delay: float = 0.05) -> ThrottlingBedrock:
+    """Client without a limiter: retries throttles after a fixed delay"""
+    class Retrying:
+        def invoke_model(self, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return bedrock.invoke_model(**kwargs)
+                except Exception as error:
+                    if error_code(error) not in THROTTLING_ERRORS or attempt == attempts - 1:
+                        raise
+                    time.sleep(delay)
+    return Retrying()
+
+
+def run(client, body: str, workers: int, seconds: float, limiter=None):
+    latencies, failures, peak_queue = [], 0, 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def worker():
+        nonlocal failures
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                client.invoke_model(modelId="stub", body=body)
+            except Exception:
+                with lock:
+                    failures += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        if limiter is not None:
+            peak_queue = max(peak_queue, limiter.queue_depth)
+        time.sleep(0.05)
+    return latencies, failures, peak_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--quota", type=int, default=1_200_000, help="stub tokens-per-minute quota")
+    parser.add_argument("--latency", type=float, default=0.1, help="stub model latency per call (s)")
+    parser.add_argument("--max-tokens", type=int, default=500)
+    args = parser.parse_args()
+
+    body = json.dumps({"max_tokens": args.max_tokens, "messages": [{"role": "user", "content": "x" * 2000}]})
+    cases = [
+        ("no limiter", None),
+        ("AIMD only", dict(tokens_per_minute=None)),
+        ("AIMD + token bucket", dict(tokens_per_minute=args.quota)),
+    ]
+
+    print(f"{'client':<20} {'goodput':>8} {'calls':>7} {'throttled':>9} {'failed':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'limit':>6} {'peak queue':>10}")
+    for name, settings in cases:
+        bedrock = ThrottlingBedrock(args.quota, latency=args.latency)
+        limiter = None
+        if settings is None:
+            client = naive_retries(bedrock)
+        else:
+            limiter = BedrockLimiter(burst_seconds=1.0, initial_concurrency=8, max_concurrency=args.workers,
+                                     backoff_base=0.1, backoff_cap=2.0, **settings)
+            client = limiter.wrap(bedrock)
+
+        start = time.monotonic()
+        latencies, failures, peak_queue = run(client, body, args.workers, args.seconds, limiter)
+        elapsed = time.monotonic() - start
+        # The most the quota allows: its rate over the run plus the stub's 1 s burst
+        goodput = bedrock.tokens_served / (args.quota / 60 * (elapsed + 1.0))
+        stats = summarize(latencies)
+        print(f"{name:<20} {goodput:8.0%} {bedrock.calls:7d} {bedrock.throttled:9d} {failures:6d} "
+              f"{stats['p50_ms']:8.0f} {stats['p99_ms']:8.0f} "
+              f"{limiter.limit if limiter else '-':>6} {peak_queue if limiter else '-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scalar calculate_bmi loop vs vectorized calculate_bmi_batch
+Run with: python benchmarks/bench_bmi.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fitness_metrics import calculate_bmi, calculate_bmi_batch  # noqa: E402
+
+
+def make_cohort(rows: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    weights = rng.uniform(40, 160, rows).round(1)
+    heights = rng.uniform(145, 210, rows).round(1)
+    return weights, heights
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    weights, heights = make_cohort(args.rows)
+
+    start = time.perf_counter()
+    scalar = [calculate_bmi(w, h) for w, h in zip(weights.tolist(), heights.tolist())]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = calculate_bmi_batch(weights, heights)
+    batch_s = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for i, r in enumerate(scalar) if r["category"] != batch["category"][i]
+    )
+
+    print(f"rows:        {args.rows:,}")
+    print(f"scalar loop: {scalar_s:8.3f} s  ({args.rows / scalar_s:,.0f} rows/s)")
+    print(f"vectorized:  {batch_s:8.3f} s  ({args.rows / batch_s:,.0f} rows/s)")
+    print(f"speedup:     {scalar_s / batch_s:8.1f}x")
+    print(f"category mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time-to-first-token of blocking vs streaming body analysis
+Run with: python benchmarks/bench_body_stream.py --first-token 0.8 --token-latency 0.02
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stubs import FakeBedrock  # noqa: E402
+from body_analysis import BodyAnalysisStream, analyze_body_image  # noqa: E402
+
+USER_INFO = {"age": 28, "gender": "male", "height_cm": 175, "weight_kg": 85}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--first-token", type=float, default=0.8, help="stub latency before the first token (s)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="stub latency between tokens (s)")
+    args = parser.parse_args()
+
+    bedrock = FakeBedrock(first_token_latency=args.first_token, token_latency=args.token_latency)
+
+    start = time.perf_counter()
+    blocking = analyze_body_image(bedrock, "aW1hZ2U=", USER_INFO)
+    blocking_s = time.perf_counter() - start
+
+    stream = BodyAnalysisStream(bedrock, "aW1hZ2U=", USER_INFO)
+    chunks = sum(1 for _ in stream)
+
+    assert stream.result["analysis"] == blocking["analysis"]
+    print(f"chunks streamed:          {chunks}")
+    print(f"blocking first text:      {blocking_s * 1000:8.1f} ms")
+    print(f"streaming first token:    {stream.time_to_first_token * 1000:8.1f} ms")
+    print(f"streaming full response:  {stream.total_time * 1000:8.1f} ms")
+    print(f"perceived wait reduction: {blocking_s / stream.time_to_first_token:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
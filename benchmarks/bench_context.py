@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt tokens per request, json.dumps(context) on every turn vs compacted deltas
+Run with: python benchmarks/bench_context.py --users 100 --turns 20
+
+The "full compact" row is what the agent sends outside sessions, where the
+model keeps no history (session=None); deltas need a caller that keeps it.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from context_compaction import ContextCompactor, estimate_tokens  # noqa: E402
+
+
+def profile(user: int) -> dict:
+    """A member context as the app sends it"""
+    return {
+        "user_id": f"user_{user}",
+        "name": "Member Name",
+        "age": 20 + user % 40,
+        "gender": "female" if user % 2 else "male",
+        "height_cm": 160 + user % 30,
+        "weight_kg": 70.0 + user % 25,
+        "goal": "weight_loss",
+        "fitness_level": "intermediate",
+        "available_equipment": ["dumbbells", "bench", "pull_up_bar", "resistance_bands"],
+        "dietary_restrictions": ["lactose_free"],
+        "injuries": [],
+        "schedule": {"days_per_week": 4, "session_minutes": 60, "preferred_time": "morning"},
+        "preferences": {"units": "metric", "language": "en", "coach_tone": "encouraging"},
+        "latest_progress": {"date": "2024-03-01", "waist": 88.5, "chest": 101.0, "body_fat": 21.3},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--budget", type=int, default=400, help="max_context_tokens")
+    parser.add_argument("--change-rate", type=float, default=0.2, help="chance a turn changes weight/progress")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    compactor = ContextCompactor(max_context_tokens=args.budget)
+    baseline = compact = full = 0
+    elapsed = 0.0
+    requests = 0
+    for turn in range(args.turns):
+        for user in range(args.users):
+            context = profile(user)
+            if rng.random() < args.change_rate:
+                context["weight_kg"] = round(context["weight_kg"] - turn * 0.1, 1)
+                context["latest_progress"] = dict(context["latest_progress"], date=f"2024-03-{turn + 2:02d}")
+            user_input = "What should I train today?"
+            baseline += estimate_tokens(f"User Context: {json.dumps(context)}\n\nUser Request: {user_input}")
+            start = time.perf_counter()
+            message, update = compactor.apply(context["user_id"], context, user_input)
+            compactor.commit(update)
+            elapsed += time.perf_counter() - start
+            compact += estimate_tokens(message)
+            full += estimate_tokens(compactor.apply(None, context, user_input)[0])
+            requests += 1
+
+    print(f"requests:           {requests:,} ({args.users} users x {args.turns} turns)")
+    print(f"json.dumps prompt:  {baseline / requests:8.1f} tokens/request")
+    print(f"full compact:       {full / requests:8.1f} tokens/request ({1 - full / baseline:.0%} fewer)")
+    print(f"compacted prompt:   {compact / requests:8.1f} tokens/request")
+    print(f"saved:              {(baseline - compact) / requests:8.1f} tokens/request ({1 - compact / baseline:.0%})")
+    print(f"compaction cost:    {elapsed / requests * 1e6:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request throughput vs concurrency limit with a latency-injecting model stub
+Run with: python benchmarks/bench_executor.py --requests 256 --latency 0.1
+
+Each request makes one FakeBedrock call, like a process_user_request turn
+waiting on the model. Ideal scaling is linear in the concurrency limit.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.stubs import FakeBedrock  # noqa: E402
+from request_executor import RequestExecutor  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--users", type=int, default=128)
+    parser.add_argument("--latency", type=float, default=0.1, help="stub model latency per request (s)")
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    args = parser.parse_args()
+
+    bedrock = FakeBedrock(first_token_latency=args.latency, token_latency=0.0)
+
+    def handle(user_input, context=None):
+        response = bedrock.invoke_model(modelId="stub", body=user_input)
+        return response["body"].read()
+
+    requests = [(f"user{i % args.users}", (f"request {i}",), {}) for i in range(args.requests)]
+    baseline = None
+    print(f"{'limit':>6} {'req/s':>9} {'speedup':>8} {'efficiency':>10}")
+    for limit in args.limits:
+        executor = RequestExecutor(handle, max_concurrency=limit, max_pending=4 * limit)
+        start = time.perf_counter()
+        asyncio.run(executor.run_many(requests))
+        rate = args.requests / (time.perf_counter() - start)
+        executor.shutdown()
+        baseline = baseline or rate
+        print(f"{limit:6d} {rate:9.1f} {rate / baseline:7.1f}x {rate / baseline / limit:9.0%}")
+
+
+if __name__ == "__main__":
+    main()
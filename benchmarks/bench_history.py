@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reading years of progress history, old capped query vs paginated projected iterator
+Run with: python benchmarks/bench_history.py --years 3
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+
+import boto3
+from boto3.dynamodb.conditions import Key
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from progress_store import ProgressStore, to_dynamo  # noqa: E402
+
+
+def measured(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=200)
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with mock_aws():
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName="FitGeniusProgress",
+            AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"},
+                                  {"AttributeName": "date", "AttributeType": "S"}],
+            KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"},
+                       {"AttributeName": "date", "KeyType": "RANGE"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        days = args.years * 365
+        with table.batch_writer() as batch:
+            for i in range(days):
+                batch.put_item(Item=to_dynamo({
+                    "userId": "user_1",
+                    "date": (date(2021, 1, 1) + timedelta(days=i)).isoformat(),
+                    "weight": round(90 - i * 0.01, 2),
+                    "measurements": {"waist": 95.0, "chest": 101.0, "arms": 36.0},
+                    "timestamp": "2021-01-01T07:00:00",
+                    "progress_image": "s3://fitgenius-images/progress/" + "a" * 64 + ".jpg",
+                    "notes": "Felt good today. " * 20,
+                }))
+
+        def old_query():
+            return table.query(KeyConditionExpression=Key("userId").eq("user_1"),
+                               ScanIndexForward=False, Limit=30)["Items"]
+
+        def full_items():
+            items, kwargs = [], {"KeyConditionExpression": Key("userId").eq("user_1")}
+            while True:
+                response = table.query(**kwargs)
+                items.extend(response["Items"])
+                if "LastEvaluatedKey" not in response:
+                    return items
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+        store = ProgressStore(table)
+
+        def streamed():
+            history = store.history("user_1", page_size=args.page_size)
+            count = total = 0
+            for item in history:
+                count += 1
+                total += item["weight"]
+            return count, history.stats()
+
+        old, old_s, old_peak = measured(old_query)
+        full, full_s, full_peak = measured(full_items)
+        (count, stats), stream_s, stream_peak = measured(streamed)
+
+        print(f"history: {days:,} daily entries")
+        print(f"old Limit=30 query:        {len(old):6d} items  {old_s * 1000:8.1f} ms  peak {old_peak / 1024:8.0f} KB")
+        print(f"all pages, full items:     {len(full):6d} items  {full_s * 1000:8.1f} ms  "
+              f"peak {full_peak / 1024:8.0f} KB")
+        print(f"HistoryQuery, projected:   {count:6d} items  {stream_s * 1000:8.1f} ms  "
+              f"peak {stream_peak / 1024:8.0f} KB  ({stats['pages']} pages, "
+              f"{stats['consumed_capacity']} RCU)")
+
+
+if __name__ == "__main__":
+    main()
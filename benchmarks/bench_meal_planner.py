@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-day meal plan latency and macro accuracy from the bundled food table
+Run with: python benchmarks/bench_meal_planner.py --plans 500
+
+Pass --baseline with an earlier --output report to flag regressions.
+"""
+import argparse
+import itertools
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import add_report_arguments, format_case, run_case, write_report  # noqa: E402
+from fitness_metrics import calculate_diet_plan  # noqa: E402
+from food_table import FOODS  # noqa: E402
+from meal_planner import plan_day  # noqa: E402
+
+RESTRICTIONS = [[], [], ["vegetarian"], ["vegan"], ["lactose_free"], ["gluten_free", "nut_free"], ["pescatarian"]]
+
+
+def plan_requests(count: int, seed: int = 7):
+    """plan_day arguments for count members with mixed goals, sizes and restrictions"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        meals = rng.randint(2, 6)
+        targets = calculate_diet_plan(
+            rng.choice(["weight_loss", "muscle_gain", "maintenance"]), rng.uniform(50, 110),
+            rng.choice(["sedentary", "moderate", "active", "very_active"]), meals_per_day=meals,
+            age=rng.randint(18, 70), sex=rng.choice(["male", "female"]), height_cm=rng.uniform(150, 200),
+        )
+        yield ((targets["daily_calories"], targets["protein_g"], targets["carbs_g"], targets["fats_g"]),
+               {"meals_per_day": meals, "restrictions": rng.choice(RESTRICTIONS)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--plans", type=int, default=500)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    days = list(plan_requests(args.plans))
+    cycle = itertools.cycle(days)
+
+    def plan_next():
+        day_args, kwargs = next(cycle)
+        plan_day(*day_args, **kwargs)
+
+    results = {"plan_day": run_case(plan_next, iterations=args.plans, warmup=min(10, args.plans))}
+
+    misses = []
+    on_target = 0
+    for day_args, kwargs in days:
+        plan = plan_day(*day_args, **kwargs)
+        on_target += plan["within_tolerance"]
+        misses.append(max(abs(plan["totals"][k] - plan["target"][k]) / plan["target"][k]
+                          for k in ("protein_g", "carbs_g", "fat_g")))
+
+    print(f"food table:         {len(FOODS)} foods, {FOODS.nbytes} bytes of typed arrays")
+    print(f"plans:              {args.plans:,} (2-6 meals, mixed goals and restrictions)")
+    print(format_case("plan_day", results["plan_day"], width=19))
+    print(f"every meal on target: {on_target / args.plans:6.1%}  (10% per-macro tolerance)")
+    print(f"day macro miss:     {statistics.median(misses):8.1%} median, {max(misses):.1%} worst")
+
+    if write_report(args, results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
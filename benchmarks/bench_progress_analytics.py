@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: trend analytics on multi-year histories, and trend-label stability
+Run with: python benchmarks/bench_progress_analytics.py --years 5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from progress_analytics import ProgressHistory, analyze_history, linear_trend  # noqa: E402
+
+
+def make_history(years: int, seed: int = 11) -> ProgressHistory:
+    """Near-daily logging: a cut, a long plateau, then a slow regain, with water-weight noise"""
+    rng = np.random.default_rng(seed)
+    n = int(years * 365 * 0.85)
+    gaps = rng.choice([1, 1, 1, 1, 2, 3], n)
+    dates = np.datetime64("2019-01-01") + np.cumsum(gaps).astype("timedelta64[D]")
+    days = (dates - dates[0]).astype(float)
+    span = days[-1]
+    trend = np.interp(days, [0, span * 0.3, span * 0.7, span], [92, 82, 82, 85])
+    weight = trend + rng.normal(0, 0.9, n)
+    measurements = {
+        "waist": trend + 8 + rng.normal(0, 0.6, n),
+        "chest": np.where(rng.random(n) < 0.7, 101 + rng.normal(0, 0.5, n), np.nan),
+        "hips": 99 + rng.normal(0, 0.5, n),
+    }
+    return ProgressHistory(dates, weight, measurements)
+
+
+def naive_label(weights: np.ndarray) -> str:
+    """The original track_progress rule: latest minus earliest of the last 30 entries"""
+    change = weights[-1] - weights[0]
+    return "gaining" if change > 0 else "losing" if change < 0 else "maintaining"
+
+
+def flips(labels) -> int:
+    return sum(1 for a, b in zip(labels, labels[1:]) if a != b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    history = make_history(args.years)
+    analyze_history(history)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        analyze_history(history)
+    elapsed = (time.perf_counter() - start) / args.repeat
+
+    print(f"history: {len(history.dates):,} entries over {args.years} years, {len(history.measurements)} measurements")
+    print(f"analyze_history: {elapsed * 1000:.2f} ms")
+
+    # Label the trend after every entry, as track_progress would
+    days = history.days
+    naive, fitted = [], []
+    for i in range(30, len(days)):
+        naive.append(naive_label(history.weight[i - 29:i + 1]))
+        recent = days[:i + 1] >= days[i] - 28
+        fitted.append(linear_trend(days[:i + 1][recent], history.weight[:i + 1][recent]).direction)
+    print(f"trend label changes, naive last-30 rule: {flips(naive):5d}")
+    print(f"trend label changes, 28-day slope CI:    {flips(fitted):5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fitness_search index startup (build vs mmap open) and query latency
+Run with: python benchmarks/bench_search.py --queries 20000
+
+Pass --baseline with an earlier --output report to flag regressions.
+"""
+import argparse
+import itertools
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import add_report_arguments, format_case, run_case, write_report  # noqa: E402
+from fitness_search import SearchIndex, load_or_build, write_index  # noqa: E402
+
+QUERIES = [
+    ("creatine dosage", "supplements"),
+    ("how much protein per day", "nutrition"),
+    ("knee friendly leg exercise", "exercises"),
+    ("training frequency hypertrophy", "research"),
+    ("dumbbell chest press", None),
+    ("lose weight calorie deficit", None),
+    ("pre workout caffeine", "all"),
+    ("bodyweight core exercises", "exercises"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--startups", type=int, default=50, help="timed builds and opens of the index")
+    add_report_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "fitness_search.idx")
+        write_index(path)
+        index = SearchIndex.open(path)
+        queries = itertools.cycle(QUERIES)
+        cases = {
+            "build": SearchIndex.build,
+            "mmap_open": lambda: SearchIndex.open(path).close(),
+            # load_or_build on an up-to-date file: open plus the corpus fingerprint check
+            "load_or_build": lambda: load_or_build(path).close(),
+            "query": lambda: index.search(*next(queries), args.k),
+        }
+        header = index.header
+        print(f"index: {header['documents']} documents, {header['terms']} terms, "
+              f"{header['postings']} postings, {Path(path).name}; {args.queries:,} queries, top {args.k}")
+        results = {}
+        for name, fn in cases.items():
+            iterations = args.queries if name == "query" else args.startups
+            results[name] = run_case(fn, iterations=iterations, warmup=min(10, iterations))
+            print(format_case(name, results[name], width=16))
+        index.close()
+
+    if write_report(args, results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
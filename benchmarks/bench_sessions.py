@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt tokens per turn, client-resent conversation history vs server-side sessions
+Run with: python benchmarks/bench_sessions.py --users 100 --turns 30
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_context import profile  # noqa: E402
+from context_compaction import ContextCompactor, estimate_tokens  # noqa: E402
+from session_store import SessionStore  # noqa: E402
+
+QUESTIONS = [
+    "What should I train today?",
+    "Can you swap the squats for something easier on my knees?",
+    "How much protein should I eat on rest days?",
+    "I only have 30 minutes tomorrow, what do you suggest?",
+]
+ANSWER = ("Here is a plan for today. Start with a 10 minute warm-up, then three rounds of "
+          "goblet squats, push-ups and rows at a moderate pace. Finish with mobility work. ") * 3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--max-turns", type=int, default=3, help="verbatim turns kept per session")
+    args = parser.parse_args()
+
+    store = SessionStore(max_turns=args.max_turns)
+    compactor = ContextCompactor()
+    histories = {user: [] for user in range(args.users)}
+    full = session = 0
+    elapsed = 0.0
+    requests = 0
+    for turn in range(args.turns):
+        for user in range(args.users):
+            context = profile(user)
+            user_input = QUESTIONS[(turn + user) % len(QUESTIONS)]
+            # The client keeps the transcript and resends it with the full context each turn
+            transcript = "\n".join(histories[user])
+            full += estimate_tokens(f"{transcript}\n\nUser Context: {json.dumps(context)}\n\nUser Request: {user_input}")
+            histories[user] += [f"User: {user_input}", f"Assistant: {ANSWER}"]
+
+            start = time.perf_counter()
+            current = store.get(context["user_id"])
+            # After the first turn the client sends only the new message
+            turn_context = context if turn == 0 else None
+            context_text, _ = compactor.snapshot(current.merged_context(turn_context))
+            message = store.build_message(current, user_input, context_text)
+            store.record_turn(current, user_input, ANSWER, turn_context)
+            elapsed += time.perf_counter() - start
+            session += estimate_tokens(message)
+            requests += 1
+
+    print(f"requests:           {requests:,} ({args.users} users x {args.turns} turns)")
+    print(f"resent history:     {full / requests:8.1f} tokens/turn")
+    print(f"session summary:    {session / requests:8.1f} tokens/turn")
+    print(f"saved:              {(full - session) / requests:8.1f} tokens/turn ({1 - session / full:.0%})")
+    print(f"session cost:       {elapsed / requests * 1e6:8.1f} us/turn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Bedrock calls for duplicated in-flight body analyses, with and without coalescing
+Run with: python benchmarks/bench_single_flight.py --photos 8 --duplicates 4 --latency 0.5
+
+Each photo is analyzed by --duplicates parallel requests, as a client on a
+bad network retrying before the first answer arrives. Requests run on
+worker threads and then as asyncio tasks against FakeBedrock.
+"""
+import argparse
+import asyncio
+import base64
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import body_analysis  # noqa: E402
+from analysis_cache import cache_key  # noqa: E402
+from benchmarks.stubs import FakeBedrock  # noqa: E402
+from single_flight import SingleFlight  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--photos", type=int, default=8)
+    parser.add_argument("--duplicates", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub model latency per call (s)")
+    args = parser.parse_args()
+
+    user_info = {"age": 30, "gender": "female", "height_cm": 168, "weight_kg": 64}
+    requests = [base64.b64encode(f"photo {i}".encode() * 1000).decode()
+                for i in range(args.photos) for _ in range(args.duplicates)]
+
+    print(f"{'callers':<8} {'coalescing':<11} {'bedrock calls':>13} {'coalesced':>9} {'wall s':>7}")
+    for callers in ("threads", "asyncio"):
+        for enabled in (False, True):
+            bedrock = FakeBedrock(first_token_latency=args.latency, token_latency=0.0)
+            flights = SingleFlight()
+
+            def analyze(image_data):
+                return body_analysis.analyze_body_image(bedrock, image_data, user_info)
+
+            def call(image_data):
+                if not enabled:
+                    return analyze(image_data)
+                return flights.do(cache_key(image_data, user_info), lambda: analyze(image_data))
+
+            async def acall(image_data):
+                if not enabled:
+                    return await asyncio.to_thread(analyze, image_data)
+                return await flights.ado(cache_key(image_data, user_info), lambda: analyze(image_data))
+
+            async def run_async():
+                return await asyncio.gather(*(acall(image) for image in requests))
+
+            start = time.perf_counter()
+            if callers == "threads":
+                with ThreadPoolExecutor(len(requests)) as pool:
+                    list(pool.map(call, requests))
+            else:
+                asyncio.run(run_async())
+            elapsed = time.perf_counter() - start
+            print(f"{callers:<8} {'on' if enabled else 'off':<11} {bedrock.calls:13d} "
+                  f"{flights.coalesced:9d} {elapsed:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
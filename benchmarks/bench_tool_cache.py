@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pure tool calls with and without the tool result cache
+Run with: python benchmarks/bench_tool_cache.py --calls 100000
+
+Replays Zipf-distributed workout and BMI requests, since real traffic
+repeats a small set of parameter combinations heavily.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitness_metrics  # noqa: E402
+import tool_cache  # noqa: E402
+import workout_catalog  # noqa: E402
+
+LEVELS = ["beginner", "intermediate", "advanced"]
+GOALS = ["muscle_gain", "weight_loss", "strength", "endurance", "flexibility"]
+EQUIPMENT = [[], ["dumbbells"], ["dumbbells", "bench"], ["barbell", "bench", "rack"], ["bodyweight"]]
+FOCUS = [[], ["legs"], ["chest", "arms"], ["core"]]
+
+
+@tool_cache.pure
+def workout_tool(fitness_level, goals, available_equipment, days_per_week, focus_areas):
+    return {"plan": workout_catalog.get_workout_plan(
+        fitness_level, goals[0], available_equipment=available_equipment,
+        focus_areas=focus_areas, days_per_week=days_per_week)}
+
+
+@tool_cache.pure
+def bmi_tool(weight_kg, height_cm):
+    return fitness_metrics.calculate_bmi(weight_kg, height_cm)
+
+
+def make_calls(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    combos = [(level, [goal], equipment, days, focus)
+              for level in LEVELS for goal in GOALS for equipment in EQUIPMENT
+              for days in (3, 4, 5) for focus in FOCUS]
+    ranks = np.minimum(rng.zipf(1.3, n), len(combos)) - 1
+    weights = rng.integers(50, 120, n)
+    heights = rng.integers(155, 200, n)
+    return [combos[r] for r in ranks], list(zip(weights.tolist(), heights.tolist()))
+
+
+def run(workout, bmi, workout_calls, bmi_calls) -> float:
+    start = time.perf_counter()
+    for call in workout_calls:
+        workout(*call)
+    for weight, height in bmi_calls:
+        bmi(weight, height)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--max-entries", type=int, default=1024)
+    args = parser.parse_args()
+
+    workout_calls, bmi_calls = make_calls(args.calls)
+    uncached_s = run(workout_tool, bmi_tool, workout_calls, bmi_calls)
+
+    cache = tool_cache.ToolCache(max_entries=args.max_entries)
+    cached_s = run(cache.wrap("workout_planner", workout_tool), cache.wrap("bmi_calculator", bmi_tool),
+                   workout_calls, bmi_calls)
+    stats = cache.stats()
+
+    total = 2 * args.calls
+    print(f"calls:     {total:,}")
+    print(f"uncached:  {uncached_s:8.3f} s  ({uncached_s / total * 1e6:6.2f} us/call)")
+    print(f"cached:    {cached_s:8.3f} s  ({cached_s / total * 1e6:6.2f} us/call)")
+    for name, counts in stats["tools"].items():
+        print(f"  {name:16s} hit rate {counts['hit_rate']:.1%}  evictions {counts['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tool schema tokens per model call, all tools vs intent-routed subsets
+Run with: python benchmarks/bench_tool_routing.py --repeat 2000
+
+Classifies a labelled set of typical member requests with the agent's
+ToolRouter and reports how many schema tokens each call carries with
+every tool attached versus the routed subset, how often the tool the
+request needs is kept, and the classifier's own latency. The model-side
+latency change is an estimate: tokens saved divided by --prefill-rate.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aws_clients import AWSClients  # noqa: E402
+from benchmarks.harness import summarize  # noqa: E402
+from fitgenius_agent import FitGeniusAgent, load_config  # noqa: E402
+from tool_routing import ToolRouter  # noqa: E402
+
+# (request, tool it needs; None when any answer will do)
+REQUESTS = [
+    ("What's my BMI at 85 kg and 175 cm?", "bmi_calculator"),
+    ("Am I overweight for my height?", "bmi_calculator"),
+    ("Here's a photo from today, what's my body fat?", "body_analyzer"),
+    ("Can you look at my posture in this picture?", "body_analyzer"),
+    ("Create a 4-day workout plan for a beginner with dumbbells", "workout_planner"),
+    ("I only have resistance bands, what exercises can I do for legs?", "workout_planner"),
+    ("How many sets and reps should I do for squats?", "workout_planner"),
+    ("Build me a vegan meal plan with 150 g of protein", "diet_planner"),
+    ("How many calories should I eat to cut?", "diet_planner"),
+    ("What should I have for breakfast before training?", "diet_planner"),
+    ("Log my weight: 82.5 kg today", "progress_tracker"),
+    ("How is my progress over the last month?", "progress_tracker"),
+    ("I weighed in at 80 kg, am I on track?", "progress_tracker"),
+    ("Is creatine safe to take every day?", "fitness_search"),
+    ("What does the research say about protein timing?", "fitness_search"),
+    ("Are there studies on intermittent fasting and muscle?", "fitness_search"),
+    ("I want to lose weight and get fit. Can you assess where I am?", None),
+    ("Thanks, that's great!", None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="classifications timed per request")
+    parser.add_argument("--prefill-rate", type=float, default=2500.0,
+                        help="assumed model prompt processing speed (tokens/s) for the latency estimate")
+    args = parser.parse_args()
+
+    agent = FitGeniusAgent(load_config(), aws=AWSClients("us-east-1"))
+    router = ToolRouter(agent.tools)
+
+    kept, routed, tools_sent, latencies = 0, 0, 0, []
+    routed_tokens = 0
+    for text, needed in REQUESTS:
+        route = router.route(text)
+        routed += len(route.names) < len(agent.tools)
+        tools_sent += len(route.names)
+        routed_tokens += router.full_tokens - route.tokens_saved
+        kept += needed is None or needed in route.names
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            router.route(text)
+            latencies.append(time.perf_counter() - start)
+
+    n = len(REQUESTS)
+    full = router.full_tokens
+    saved = full - routed_tokens / n
+    stats = summarize(latencies)
+    print(f"requests:                {n} ({routed} routed to a subset, {n - routed} kept every tool)")
+    print(f"tools per call:          {len(agent.tools)} -> {tools_sent / n:.1f}")
+    print(f"schema tokens per call:  {full} -> {routed_tokens / n:.0f}  ({saved / full:.0%} fewer)")
+    print(f"needed tool kept:        {kept}/{n}")
+    print(f"classifier latency:      p50 {stats['p50_ms'] * 1000:.1f} us, p99 {stats['p99_ms'] * 1000:.1f} us")
+    print(f"model latency change:    about -{saved / args.prefill_rate * 1000:.0f} ms per call "
+          f"at an assumed {args.prefill_rate:.0f} prompt tokens/s")
+    agent.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tracing overhead on tool calls and DynamoDB writes
+Run with: python benchmarks/bench_tracing.py --calls 2000
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fitness_metrics  # noqa: E402
+import tracing  # noqa: E402
+from progress_store import ProgressStore  # noqa: E402
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def make_table(name: str):
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    return dynamodb, dynamodb.create_table(
+        TableName=name,
+        AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"},
+                              {"AttributeName": "date", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"},
+                   {"AttributeName": "date", "KeyType": "RANGE"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    def bmi(i):
+        return fitness_metrics.calculate_bmi(70 + i % 30, 175)
+
+    disabled = tracing.Tracer()
+    enabled = tracing.Tracer(tracing.MemoryCollector())
+    traced_off, traced_on = disabled.traced("bmi_calculator", bmi), enabled.traced("bmi_calculator", bmi)
+
+    def in_request(tracer, fn):
+        def call(i):
+            with tracer.request():
+                fn(i)
+        return call
+
+    tool_calls = args.calls * 50
+    print(f"tool call ({tool_calls:,} calls)")
+    print(f"  plain function:            {per_call_us(bmi, tool_calls):8.2f} us")
+    print(f"  tracing disabled:          {per_call_us(in_request(disabled, traced_off), tool_calls):8.2f} us")
+    print(f"  enabled, outside request:  {per_call_us(traced_on, tool_calls):8.2f} us")
+    print(f"  enabled, inside request:   {per_call_us(in_request(enabled, traced_on), tool_calls):8.2f} us")
+
+    with mock_aws():
+        def record_into(name: str, instrument: bool):
+            # A fresh table per variant so moto's growing state doesn't skew the order
+            dynamodb, table = make_table(name)
+            if instrument:
+                tracing.instrument_client(dynamodb)
+            store = ProgressStore(table)
+
+            def record(i):
+                store.record_entry({"userId": f"user_{i % 20}", "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+                                    "weight": 80 + i % 10, "measurements": {"waist": 90}})
+            return record
+
+        print(f"\nProgressStore.record_entry on moto ({args.calls:,} calls)")
+        print(f"  not instrumented:          {per_call_us(record_into('plain', False), args.calls):8.1f} us")
+        print(f"  instrumented, no request:  {per_call_us(record_into('hooked', True), args.calls):8.1f} us")
+        print(f"  instrumented, in request:  "
+              f"{per_call_us(in_request(enabled, record_into('traced', True)), args.calls):8.1f} us")
+
+if __name__ == "__main__":
+    main()
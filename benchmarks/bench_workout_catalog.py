@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call template dict construction vs prebuilt workout catalog
+Run with: python benchmarks/bench_workout_catalog.py --iterations 200000
+
+Also times the embedding-based exercise substitution the catalog uses for
+equipment a member lacks, both per query and for a whole catalog rebuild.
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import workout_catalog  # noqa: E402
+
+
+def legacy_plan(fitness_level, goal, days_per_week):
+    """What generate_workout_plan did before the catalog existed"""
+    workout_templates = workout_catalog._raw_templates()
+    plan = workout_templates.get(fitness_level, {}).get(goal, [])
+    return plan[:days_per_week]
+
+
+def legacy_filtered_plan(fitness_level, goal, days_per_week):
+    """Per-call construction plus the equipment/focus filtering the catalog precomputes"""
+    equipment = workout_catalog._normalize_equipment.__wrapped__(("dumbbells", "bench"))
+    focus = frozenset(workout_catalog._normalize_focus_areas.__wrapped__(("upper_body",)))
+    plan = []
+    for day in workout_catalog._raw_templates().get(fitness_level, {}).get(goal, []):
+        exercises = [
+            line for line in day["exercises"]
+            if workout_catalog.is_available(
+                workout_catalog.EXERCISES[workout_catalog.exercise_name(line)], equipment
+            )
+        ]
+        if exercises:
+            muscles = set()
+            for line in exercises:
+                muscles |= workout_catalog.EXERCISES[workout_catalog.exercise_name(line)].muscle_groups
+            plan.append((len(muscles & focus), {"day": day["day"], "focus": day["focus"], "exercises": exercises}))
+    plan.sort(key=lambda item: -item[0])
+    return [day for _, day in plan[:days_per_week]]
+
+
+def catalog_plan(fitness_level, goal, days_per_week):
+    return workout_catalog.get_workout_plan(
+        fitness_level, goal, ["dumbbells", "bench"], ["upper_body"], days_per_week
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    n = args.iterations
+    legacy_s = timeit.timeit(lambda: legacy_plan("intermediate", "muscle_gain", 4), number=n)
+    filtered_s = timeit.timeit(lambda: legacy_filtered_plan("intermediate", "muscle_gain", 4), number=n)
+    catalog_s = timeit.timeit(lambda: catalog_plan("intermediate", "muscle_gain", 4), number=n)
+    lookup_s = timeit.timeit(
+        lambda: workout_catalog.lookup_days("intermediate", "muscle_gain", ["dumbbells", "bench"], ["chest"]),
+        number=n,
+    )
+
+    print(f"iterations:            {n:,}")
+    print(f"legacy dict per call:  {legacy_s / n * 1e6:8.2f} us/call  (ignores equipment + focus)")
+    print(f"legacy + filtering:    {filtered_s / n * 1e6:8.2f} us/call")
+    print(f"catalog plan (dicts):  {catalog_s / n * 1e6:8.2f} us/call  (filters equipment + focus)")
+    print(f"catalog lookup only:   {lookup_s / n * 1e6:8.2f} us/call")
+    print(f"speedup vs filtering:  {filtered_s / catalog_s:8.1f}x")
+    print(f"catalog entries:       {len(workout_catalog.CATALOG):,}")
+
+    embeddings = workout_catalog.EMBEDDINGS
+    home = frozenset({"dumbbells"})
+    missing = ["Barbell Bench Press", "Tricep Pushdowns", "Cable Flyes"]
+    m = max(n // 10, 1)
+    single_s = timeit.timeit(lambda: embeddings.substitutes("Barbell Rows", home, k=3), number=m)
+    day_s = timeit.timeit(lambda: embeddings.best_substitutes(missing, home), number=m)
+    build_s = timeit.timeit(workout_catalog._build_index, number=3) / 3
+    print(f"substitutes (top 3):   {single_s / m * 1e6:8.2f} us/query  "
+          f"({len(embeddings)} exercises x {embeddings.matrix.shape[1]} dims)")
+    print(f"day substitution:      {day_s / m * 1e6:8.2f} us/day  ({len(missing)} missing exercises)")
+    print(f"catalog build:         {build_s * 1e3:8.2f} ms  (substitutes for every equipment subset)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: high-volume progress ingestion, per-entry writes vs write-behind buffer
+Run with: python benchmarks/bench_write_buffer.py --users 50 --entries 40
+
+Simulates wearables syncing several readings per user. Reports the
+latency each caller sees and the number of DynamoDB requests sent; pass
+--baseline with an earlier --output report to flag regressions.
+"""
+import argparse
+import itertools
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import add_report_arguments, format_case, run_case, write_report  # noqa: E402
+from progress_store import ProgressStore  # noqa: E402
+from write_buffer import WriteBehindBuffer  # noqa: E402
+
+
+def create_table(name: str):
+    return boto3.resource("dynamodb", region_name="us-east-1").create_table(
+        TableName=name,
+        AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"},
+                              {"AttributeName": "date", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"},
+                   {"AttributeName": "date", "KeyType": "RANGE"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def count_requests(table) -> dict:
+    counts = {}
+
+    def before_call(model, **kwargs):
+        counts[model.name] = counts.get(model.name, 0) + 1
+
+    table.meta.client.meta.events.register("before-call.dynamodb.*", before_call)
+    return counts
+
+
+def readings(users: int):
+    start = datetime(2024, 1, 1, 6)
+    for i in itertools.count():
+        for u in range(users):
+            yield {
+                "userId": f"user_{u}",
+                # Hourly readings: each is its own sort key
+                "date": (start + timedelta(hours=i)).isoformat(),
+                "weight": round(85 - i * 0.01, 2),
+                "measurements": {"resting_hr": 60 + i % 5, "body_fat": 20.5},
+            }
+
+
+def ingest(write, users: int, iterations: int, finish=None) -> dict:
+    """run_case over one write per reading; adds the DynamoDB requests those writes sent"""
+    sent = []
+    stream = readings(users)
+
+    def call():
+        sent.append(1)
+        write(next(stream))
+
+    stats = run_case(call, iterations=iterations, warmup=0)
+    if finish is not None:
+        finish()
+    return {**stats, "entries": len(sent)}
+
+
+def report(label, stats, counts):
+    requests = sum(counts.values())
+    print(format_case(label, stats, width=18))
+    print(f"{'':18s} {requests} requests ({stats['entries'] / requests:5.1f} entries/request)  "
+          + ", ".join(f"{op} {n}" for op, n in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=40, help="readings per user")
+    parser.add_argument("--flush-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    logging.getLogger("botocore").setLevel(logging.WARNING)
+    total = args.users * args.entries
+
+    results = {}
+    with mock_aws():
+        table = create_table("DirectProgress")
+        counts = count_requests(table)
+        results["record_entry"] = ingest(ProgressStore(table).record_entry, args.users, total)
+        report("record_entry", results["record_entry"], counts)
+
+        table = create_table("BufferedProgress")
+        counts = count_requests(table)
+        buffer = WriteBehindBuffer(ProgressStore(table), flush_size=args.flush_size,
+                                   flush_interval=args.flush_interval)
+        results["write-behind"] = ingest(buffer.add, args.users, total, finish=buffer.close)
+        report("write-behind", results["write-behind"], counts)
+        stats = buffer.stats()
+        print(f"{'':18s} {stats['flushes']} flushes, {stats['batch_requests']} batch writes, "
+              f"{stats['summary_updates']} user summaries folded")
+
+    if write_report(args, results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Measurement helpers shared by the offline benchmarks
+
+run_case times a callable (latency percentiles, throughput) and, in a
+separate pass so tracing does not skew the timings, its peak Python heap
+allocation. Results are plain dicts that save_results writes as JSON and
+compare_results diffs against an earlier run; add_report_arguments and
+write_report give every benchmark the same --output/--baseline handling.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(latencies: List[float]) -> Dict:
+    """Latency statistics in milliseconds"""
+    values = np.asarray(latencies, dtype=float) * 1000
+    stats = {f"p{p}_ms": round(float(np.percentile(values, p)), 4) for p in PERCENTILES}
+    stats.update({
+        "mean_ms": round(float(values.mean()), 4),
+        "min_ms": round(float(values.min()), 4),
+        "max_ms": round(float(values.max()), 4),
+    })
+    return stats
+
+
+def _timed(fn: Callable) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def peak_memory(fn: Callable, iterations: int) -> int:
+    """Peak traced allocation in bytes over iterations calls"""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        for _ in range(iterations):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+def run_case(fn: Callable, iterations: int = 200, warmup: int = 10, concurrency: int = 1,
+             memory_iterations: Optional[int] = None) -> Dict:
+    """Latency percentiles, throughput and peak memory for fn()"""
+    for _ in range(warmup):
+        fn()
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(lambda _: _timed(fn), range(iterations)))
+    else:
+        latencies = [_timed(fn) for _ in range(iterations)]
+    wall = time.perf_counter() - start
+
+    result = summarize(latencies)
+    result.update({
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "throughput_per_s": round(iterations / wall, 2),
+        "peak_memory_kb": round(peak_memory(fn, memory_iterations or min(iterations, 20)) / 1024, 1),
+    })
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(path: str, results: Dict[str, Dict], settings: Dict) -> Dict:
+    """Write results with enough metadata to compare runs across commits"""
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def compare_results(current: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float = 0.10,
+                    metrics=("p50_ms", "p95_ms", "p99_ms", "peak_memory_kb")) -> List[Dict]:
+    """
+    Per-case changes against a baseline run
+
+    A change is flagged as a regression when a metric grows by more than
+    threshold (a fraction) or throughput drops by more than threshold.
+    """
+    changes = []
+    for name, stats in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric in metrics + ("throughput_per_s",):
+            old, new = before.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            delta = (new - old) / old
+            worse = -delta if metric == "throughput_per_s" else delta
+            changes.append({
+                "case": name,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change_pct": round(delta * 100, 1),
+                "regression": worse > threshold,
+            })
+    return changes
+
+
+def format_case(name: str, stats: Dict, width: int = 28) -> str:
+    """One report line: latency percentiles, throughput and peak memory"""
+    return (f"{name:{width}s} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+            f"p99 {stats['p99_ms']:9.3f} ms  {stats['throughput_per_s']:10.1f}/s  "
+            f"peak {stats['peak_memory_kb']:8.1f} KB")
+
+
+def add_report_arguments(parser: argparse.ArgumentParser, output: Optional[str] = None):
+    """--output, --baseline and --threshold"""
+    parser.add_argument("--output", default=output, help="JSON report path")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression threshold (fraction)")
+
+
+def write_report(args: argparse.Namespace, results: Dict[str, Dict]) -> List[Dict]:
+    """
+    Save results to args.output (if set) and print the regressions against
+    args.baseline (if set); returns the regressions
+    """
+    if args.output:
+        settings = {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}
+        save_results(args.output, results, settings)
+        print(f"\nresults written to {args.output}")
+    if not args.baseline:
+        return []
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = [c for c in compare_results(results, baseline["results"], args.threshold) if c["regression"]]
+    print(f"compared with {args.baseline} (commit {baseline.get('commit')}): "
+          f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+    for change in regressions:
+        print(f"  {change['case']:28s} {change['metric']:16s} "
+              f"{change['baseline']} -> {change['current']} ({change['change_pct']:+.1f}%)")
+    return regressions
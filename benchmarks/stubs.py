@@ -0,0 +1,174 @@
+"""
+Local stand-ins for AWS services used by the offline benchmarks
+"""
+import io
+import json
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from botocore.exceptions import ClientError
+
+DEFAULT_ANALYSIS = (
+    "Overall body composition: estimated body fat around 22%. "
+    "Shoulders and arms show moderate development; chest is below average. "
+    "Core strength needs work and there is a slight anterior pelvic tilt. "
+    "Recommended focus: compound lifts, core stability and posture drills. "
+    "Estimated fitness level: beginner to intermediate."
+)
+
+
+class FakeBedrock:
+    """
+    Bedrock runtime stub with configurable latency
+
+    invoke_model sleeps for the whole generation before returning;
+    invoke_model_with_response_stream emits one chunk event per word,
+    with first_token_latency before the first and token_latency between
+    the rest, mirroring Bedrock's event format.
+    """
+
+    def __init__(self, text: str = DEFAULT_ANALYSIS, first_token_latency: float = 0.5,
+                 token_latency: float = 0.01, input_tokens: int = 1600):
+        self.text = text
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.input_tokens = input_tokens
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _tokens(self) -> List[str]:
+        words = self.text.split(" ")
+        return [w + " " for w in words[:-1]] + words[-1:]
+
+    def _count_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        self._count_call()
+        tokens = self._tokens()
+        time.sleep(self.first_token_latency + self.token_latency * (len(tokens) - 1))
+        payload = {
+            "content": [{"type": "text", "text": self.text}],
+            "usage": {"input_tokens": self.input_tokens, "output_tokens": len(tokens)},
+        }
+        return {"body": io.BytesIO(json.dumps(payload).encode())}
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs) -> Dict:
+        self._count_call()
+        return {"body": self._events()}
+
+    def _events(self) -> Iterator[Dict]:
+        def event(payload):
+            return {"chunk": {"bytes": json.dumps(payload).encode()}}
+
+        tokens = self._tokens()
+        time.sleep(self.first_token_latency)
+        yield event({"type": "message_start", "message": {"usage": {"input_tokens": self.input_tokens}}})
+        yield event({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}})
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_latency)
+            yield event({"type": "content_block_delta", "index": 0,
+                         "delta": {"type": "text_delta", "text": token}})
+        yield event({"type": "content_block_stop", "index": 0})
+        yield event({"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                     "usage": {"output_tokens": len(tokens)}})
+        yield event({"type": "message_stop"})
+
+
+class ThrottlingBedrock:
+    """
+    Bedrock runtime stub that enforces a tokens-per-minute quota
+
+    Like Bedrock on-demand quotas, a call is charged its input tokens plus
+    max_tokens when it starts and refunded the unused output when it
+    finishes; a call the bucket (burst_seconds of quota) cannot cover
+    raises ThrottlingException and is not charged. Input tokens are the
+    prompt's characters / 4 and the answer uses output_fraction of
+    max_tokens. Responses carry Bedrock's token-count headers.
+    """
+
+    def __init__(self, tokens_per_minute: float, latency: float = 0.1, output_fraction: float = 0.6,
+                 burst_seconds: float = 1.0):
+        self.rate = tokens_per_minute / 60.0
+        self.capacity = self.rate * burst_seconds
+        self.latency = latency
+        self.output_fraction = output_fraction
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.tokens_served = 0
+
+    def _charge(self, tokens: float) -> bool:
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                self.throttled += 1
+                return False
+            self._tokens -= tokens
+            return True
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        request = json.loads(body)
+        prompt = "".join(m["content"] for m in request["messages"] if isinstance(m["content"], str))
+        input_tokens = len(prompt) // 4
+        max_tokens = request.get("max_tokens", 4096)
+        if not self._charge(input_tokens + max_tokens):
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "Too many tokens"}},
+                              "InvokeModel")
+        time.sleep(self.latency)
+
+        output_tokens = int(max_tokens * self.output_fraction)
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + max_tokens - output_tokens)
+            self.tokens_served += input_tokens + output_tokens
+        payload = {
+            "content": [{"type": "text", "text": "ok"}],
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+        return {
+            "body": io.BytesIO(json.dumps(payload).encode()),
+            "ResponseMetadata": {"HTTPHeaders": {
+                "x-amzn-bedrock-input-token-count": str(input_tokens),
+                "x-amzn-bedrock-output-token-count": str(output_tokens),
+            }},
+        }
+
+
+class ScriptedAgent:
+    """
+    Stand-in for the Strands agent loop
+
+    process() mirrors one tool-using turn: a model call that picks a tool,
+    the tool call itself (through the agent's real tool functions), and a
+    second model call that writes the answer. Tools are picked by keyword
+    from routes, a list of (keyword, tool_name, arguments).
+    """
+
+    def __init__(self, bedrock: FakeBedrock, tool_functions: Dict, routes: List,
+                 model_id: str = "anthropic.claude-3-sonnet-20240229-v1:0"):
+        self.bedrock = bedrock
+        self.tool_functions = tool_functions
+        self.routes = routes
+        self.model_id = model_id
+
+    def _model_call(self, prompt: str) -> str:
+        body = json.dumps({"messages": [{"role": "user", "content": prompt}]})
+        response = self.bedrock.invoke_model(modelId=self.model_id, body=body)
+        return json.loads(response["body"].read())["content"][0]["text"]
+
+    def process(self, user_input: str) -> str:
+        self._model_call(user_input)
+        lowered = user_input.lower()
+        for keyword, tool_name, arguments in self.routes:
+            if keyword in lowered:
+                result = self.tool_functions[tool_name](**arguments)
+                return self._model_call(json.dumps(result, default=str))
+        return self._model_call(user_input)
@@ -0,0 +1,168 @@
+"""
+FitGenius body analysis
+
+Claude Vision request building for the body analyzer tool, in a blocking
+form (invoke_model) and a streaming form (invoke_model_with_response_stream)
+that yields text as it is generated.
+"""
+
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+BODY_ANALYSIS_MODEL_ID = "anthropic.claude-3-sonnet-20240229-v1:0"
+BODY_ANALYSIS_MAX_TOKENS = 2000
+
+
+def build_prompt(user_info: Dict) -> str:
+    """Text prompt sent alongside the body image"""
+    return f"""Analyze this body image and provide a detailed assessment:
+
+            User Info:
+            - Age: {user_info.get('age')}
+            - Gender: {user_info.get('gender')}
+            - Height: {user_info.get('height_cm')}cm
+            - Weight: {user_info.get('weight_kg')}kg
+
+            Please analyze:
+            1. Overall body composition (estimated body fat %)
+            2. Muscle development by body part (shoulders, chest, arms, core, legs)
+            3. Posture assessment
+            4. Areas needing improvement
+            5. Current fitness level estimate (beginner/intermediate/advanced)
+
+            Provide specific, actionable insights."""
+
+
+def build_request_body(image_data: str, user_info: Dict, media_type: str = "image/jpeg",
+                       max_tokens: int = BODY_ANALYSIS_MAX_TOKENS) -> str:
+    """Bedrock Messages API body for a body analysis call"""
+    return json.dumps({
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "messages": [{
+            "role": "user",
+            "content": [
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": media_type,
+                        "data": image_data
+                    }
+                },
+                {
+                    "type": "text",
+                    "text": build_prompt(user_info)
+                }
+            ]
+        }]
+    })
+
+
+def build_result(analysis: str, user_info: Dict) -> Dict:
+    """Final dict returned by the body analyzer tool"""
+    return {
+        "analysis": analysis,
+        "timestamp": datetime.now().isoformat(),
+        "user_info": user_info
+    }
+
+
+def analyze_body_image(bedrock, image_data: str, user_info: Dict, media_type: str = "image/jpeg",
+                       model_id: str = BODY_ANALYSIS_MODEL_ID) -> Dict:
+    """Blocking body analysis: waits for the full completion"""
+    response = bedrock.invoke_model(
+        modelId=model_id,
+        body=build_request_body(image_data, user_info, media_type)
+    )
+
+    result = json.loads(response['body'].read())
+    analysis = result['content'][0]['text']
+
+    return build_result(analysis, user_info)
+
+
+class BodyAnalysisStream:
+    """
+    Streaming body analysis
+
+    Iterate (or async-iterate) to receive text chunks as Bedrock emits
+    them. Once the stream is exhausted, ``result`` holds the same dict the
+    blocking tool returns. ``time_to_first_token`` and ``total_time`` are
+    measured from the moment the request is sent. result_extras are merged
+    into the final dict.
+    """
+
+    def __init__(self, bedrock, image_data: str, user_info: Dict, media_type: str = "image/jpeg",
+                 model_id: str = BODY_ANALYSIS_MODEL_ID, result_extras: Optional[Dict] = None):
+        self.bedrock = bedrock
+        self.image_data = image_data
+        self.user_info = user_info
+        self.media_type = media_type
+        self.model_id = model_id
+        self.result_extras = result_extras or {}
+
+        self.time_to_first_token: Optional[float] = None
+        self.total_time: Optional[float] = None
+        self.usage: Dict = {}
+        self._chunks: List[str] = []
+        self._events: Optional[Iterator[str]] = None
+        self._result: Optional[Dict] = None
+
+    def _text_events(self) -> Iterator[str]:
+        started = time.perf_counter()
+        response = self.bedrock.invoke_model_with_response_stream(
+            modelId=self.model_id,
+            body=build_request_body(self.image_data, self.user_info, self.media_type)
+        )
+
+        for event in response['body']:
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+            payload = json.loads(chunk['bytes'])
+            kind = payload.get('type')
+            if kind == 'content_block_delta' and payload['delta'].get('type') == 'text_delta':
+                text = payload['delta']['text']
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - started
+                self._chunks.append(text)
+                yield text
+            elif kind == 'message_delta':
+                self.usage.update(payload.get('usage', {}))
+            elif kind == 'message_start':
+                self.usage.update(payload.get('message', {}).get('usage', {}))
+
+        self.total_time = time.perf_counter() - started
+        self._result = {**build_result(''.join(self._chunks), self.user_info), **self.result_extras}
+
+    def __iter__(self) -> Iterator[str]:
+        if self._events is None:
+            self._events = self._text_events()
+        return self._events
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        # The botocore event stream is blocking; read it off the event loop
+        events = iter(self)
+        sentinel = object()
+        while True:
+            text = await asyncio.to_thread(next, events, sentinel)
+            if text is sentinel:
+                return
+            yield text
+
+    @property
+    def text(self) -> str:
+        """Text received so far"""
+        return ''.join(self._chunks)
+
+    @property
+    def result(self) -> Dict:
+        """Final analysis dict; consumes any remaining chunks first"""
+        if self._result is None:
+            for _ in self:
+                pass
+        return self._result
@@ -0,0 +1,263 @@
+"""
+FitGenius context compaction
+
+process_user_request used to prefix every message with json.dumps(context),
+resending the whole profile each turn. ContextCompactor instead sends, per
+session, only the fields that changed since the last turn the model saw,
+encoded as flat key=value pairs. It estimates the tokens before sending and
+drops the lowest-priority fields when the block would exceed the budget.
+
+Deltas rely on the model keeping the session's conversation history, so
+the full context is resent every full_every_turns turns and after reset().
+Callers whose model keeps no history pass session=None: those turns always
+carry the full compact context and no state is kept for them.
+prepare() does not change any state; commit() records what was sent once
+the model call succeeds, so the fields of a failed turn are offered again.
+"""
+
+import json
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_CONTEXT_TOKENS = 400
+# Claude averages ~3.5 characters per token on short key=value English text
+DEFAULT_CHARS_PER_TOKEN = 3.5
+DEFAULT_FULL_EVERY_TURNS = 20
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_PRIORITY = 50
+REQUEST_LABEL = "User Request: "
+
+# Higher survives trimming longer. Safety-relevant fields rank above the
+# profile basics; free-text and history fields go first.
+DEFAULT_PRIORITIES = {
+    "user_id": 100,
+    "injuries": 95,
+    "medical_conditions": 95,
+    "dietary_restrictions": 90,
+    "allergies": 90,
+    "goal": 85,
+    "goals": 85,
+    "age": 80,
+    "gender": 80,
+    "sex": 80,
+    "height_cm": 80,
+    "weight_kg": 80,
+    "fitness_level": 75,
+    "target_weight": 70,
+    "available_equipment": 60,
+    "name": 20,
+    "notes": 10,
+    "history": 10,
+}
+
+_MISSING = object()
+
+
+def estimate_tokens(text: str, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """Rough prompt token count from the character length"""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".") if math.isfinite(value) else str(value)
+    if isinstance(value, (list, tuple)) and all(isinstance(v, (str, int, float)) and not isinstance(v, bool)
+                                                and "," not in str(v) for v in value):
+        return ",".join(_format_value(v) for v in value)
+    if isinstance(value, str) and not any(c in value for c in ";=\n"):
+        return value
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def flatten_context(context: Dict, aliases: Optional[Dict[str, str]] = None, prefix: str = "") -> Dict[str, str]:
+    """Flatten nested dicts to dotted keys with compactly encoded values; None values are dropped"""
+    aliases = aliases or {}
+    flat: Dict[str, str] = {}
+    for key, value in context.items():
+        name = prefix + aliases.get(str(key), str(key))
+        if value is None:
+            continue
+        if isinstance(value, dict) and value:
+            flat.update(flatten_context(value, aliases, name + "."))
+        else:
+            flat[name] = _format_value(value)
+    return flat
+
+
+class ContextUpdate(NamedTuple):
+    """What prepare() decided to send for one turn"""
+    session: Hashable
+    text: str  # context block to put before the request ("" when nothing changed)
+    fields: Dict[str, Optional[str]]  # field -> encoded value as sent (removals map to None)
+    full: bool
+    dropped: List[str]  # fields trimmed to fit the budget
+    tokens: int
+    baseline_tokens: int  # the json.dumps(context) prefix it replaces
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.baseline_tokens - self.tokens
+
+    def report(self) -> Dict:
+        return {
+            "context_tokens": self.tokens,
+            "context_baseline_tokens": self.baseline_tokens,
+            "context_tokens_saved": self.tokens_saved,
+            "context_full": self.full,
+            "context_fields_sent": len(self.fields),
+            "context_fields_dropped": len(self.dropped),
+        }
+
+
+class ContextCompactor:
+    """Per-session delta encoding of request context under a token budget"""
+
+    def __init__(self, max_context_tokens: int = DEFAULT_MAX_CONTEXT_TOKENS,
+                 chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+                 full_every_turns: int = DEFAULT_FULL_EVERY_TURNS,
+                 priorities: Optional[Dict[str, int]] = None, aliases: Optional[Dict[str, str]] = None,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.max_context_tokens = max_context_tokens
+        self.chars_per_token = chars_per_token
+        self.full_every_turns = full_every_turns
+        self.priorities = {**DEFAULT_PRIORITIES, **(priorities or {})}
+        self.aliases = aliases or {}
+        self.max_sessions = max_sessions
+
+        # session -> (fields the model has seen, turns since the last full send)
+        self._sessions: "OrderedDict[Hashable, Tuple[Dict[str, str], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+        self.fields_dropped = 0
+
+    def priority(self, field: str) -> int:
+        # Nested fields inherit their top-level key's priority
+        return self.priorities.get(field, self.priorities.get(field.split(".", 1)[0], DEFAULT_PRIORITY))
+
+    def encode(self, fields: Dict[str, Optional[str]], full: bool) -> str:
+        if not fields:
+            return ""
+        parts = [f"{k}={v}" if v is not None else f"-{k}" for k, v in fields.items()]
+        label = "User Context" if full else "User Context update"
+        return f"{label}: " + "; ".join(parts)
+
+    def _fit(self, fields: Dict[str, Optional[str]], full: bool) -> Tuple[str, List[str]]:
+        """Encode fields, dropping from them until the text fits the budget"""
+        # Lowest priority first, larger fields first within a priority
+        dropped: List[str] = []
+        text = self.encode(fields, full)
+        order = sorted(fields, key=lambda k: (self.priority(k), -len(fields[k] or "")))
+        while estimate_tokens(text, self.chars_per_token) > self.max_context_tokens and order:
+            field = order.pop(0)
+            del fields[field]
+            dropped.append(field)
+            text = self.encode(fields, full)
+        return text, dropped
+
+    def snapshot(self, context: Dict) -> Tuple[str, List[str]]:
+        """Full compact context block within the budget, independent of any session; returns (text, dropped)"""
+        return self._fit(dict(flatten_context(context, self.aliases)), True)
+
+    def prepare(self, session: Hashable, context: Dict) -> ContextUpdate:
+        """Work out the context block for this turn without recording it"""
+        baseline = estimate_tokens(f"User Context: {json.dumps(context)}\n\n{REQUEST_LABEL}", self.chars_per_token)
+        current = flatten_context(context, self.aliases)
+
+        seen, turns = None, 0
+        if session is not None:
+            with self._lock:
+                seen, turns = self._sessions.get(session, (None, 0))
+        full = seen is None or turns + 1 >= self.full_every_turns
+        if full:
+            fields: Dict[str, Optional[str]] = dict(current)
+        else:
+            fields = {k: v for k, v in current.items() if seen.get(k, _MISSING) != v}
+            # Tell the model about fields that were removed
+            fields.update({k: None for k in seen if k not in current})
+
+        text, dropped = self._fit(fields, full)
+        return ContextUpdate(
+            session=session,
+            text=text,
+            fields=fields,
+            full=full,
+            dropped=dropped,
+            tokens=estimate_tokens(f"{text}\n\n{REQUEST_LABEL}", self.chars_per_token) if text else 0,
+            baseline_tokens=baseline,
+        )
+
+    def commit(self, update: ContextUpdate):
+        """Record that the model received update"""
+        with self._lock:
+            self.requests += 1
+            self.tokens_sent += update.tokens
+            self.tokens_saved += update.tokens_saved
+            self.fields_dropped += len(update.dropped)
+            if update.session is None:
+                return
+            seen, turns = self._sessions.pop(update.session, ({}, 0))
+            seen = {} if update.full else dict(seen)
+            for field, value in update.fields.items():
+                if value is None:
+                    seen.pop(field, None)
+                else:
+                    seen[field] = value
+            # Dropped fields stay unseen, so they are offered again next turn
+            self._sessions[update.session] = (seen, 0 if update.full else turns + 1)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def apply(self, session: Hashable, context: Optional[Dict],
+              user_input: str) -> Tuple[str, Optional[ContextUpdate]]:
+        """
+        The message to send for user_input, and the update to commit() once
+        it has been sent (None when there is no context: a turn without
+        context leaves the session as it was). session=None always sends
+        the full context.
+        """
+        if not context:
+            return user_input, None
+        update = self.prepare(session, context)
+        if not update.text:
+            return user_input, update
+        return f"{update.text}\n\n{REQUEST_LABEL}{user_input}", update
+
+    def reset(self, session: Optional[Hashable] = None):
+        """Forget a session (or all), so its next turn sends the full context"""
+        with self._lock:
+            if session is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(session, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "requests": self.requests,
+                "tokens_sent": self.tokens_sent,
+                "tokens_saved": self.tokens_saved,
+                "fields_dropped": self.fields_dropped,
+            }
+
+
+def create_compactor(settings: Optional[Dict] = None) -> Optional[ContextCompactor]:
+    """ContextCompactor from the agent.context config section; None when disabled"""
+    settings = settings or {}
+    if not settings.get("enabled", True):
+        return None
+    return ContextCompactor(
+        max_context_tokens=settings.get("max_context_tokens", DEFAULT_MAX_CONTEXT_TOKENS),
+        chars_per_token=settings.get("chars_per_token", DEFAULT_CHARS_PER_TOKEN),
+        full_every_turns=settings.get("full_every_turns", DEFAULT_FULL_EVERY_TURNS),
+        priorities=settings.get("priorities"),
+        aliases=settings.get("aliases"),
+        max_sessions=settings.get("max_sessions", DEFAULT_MAX_SESSIONS),
+    )
@@ -0,0 +1,156 @@
+"""
+FitGenius exercise similarity
+
+Every catalog exercise is embedded once as a fixed-length vector built from
+its attributes: movement pattern, muscle groups, difficulty and equipment.
+Each attribute is a unit-length block scaled by the square root of its
+weight, so the cosine similarity of two exercises is the weighted mean of
+the per-attribute similarities. The rows form one read-only NumPy matrix,
+and a substitution query is a single matrix product with unavailable
+exercises masked out.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+BODYWEIGHT = "bodyweight"
+
+# Share of the similarity each attribute contributes (sums to 1)
+DEFAULT_WEIGHTS = {
+    "movement_pattern": 0.45,
+    "muscle_groups": 0.35,
+    "difficulty": 0.1,
+    "equipment": 0.1,
+}
+
+# Adjacent difficulty levels are half-similar; beginner and advanced share nothing
+DIFFICULTY_LEVELS = {
+    1: (1.0, 0.5, 0.0),
+    2: (0.5, 1.0, 0.5),
+    3: (0.0, 0.5, 1.0),
+}
+
+DEFAULT_MIN_SIMILARITY = 0.6
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _equipment(exercise) -> FrozenSet[str]:
+    # Everything any option uses; bodyweight options count as their own "equipment"
+    return frozenset().union(*(option or {BODYWEIGHT} for option in exercise.equipment_options))
+
+
+class ExerciseEmbeddings:
+    """
+    Attribute embeddings of a catalog of exercises
+
+    exercises maps names to objects with muscle_groups, movement_pattern,
+    equipment_options and difficulty (workout_catalog.Exercise).
+    """
+
+    def __init__(self, exercises: Mapping, weights: Optional[Dict[str, float]] = None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.names: Tuple[str, ...] = tuple(exercises)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self._options = tuple(exercises[name].equipment_options for name in self.names)
+        self._masks: Dict[FrozenSet[str], np.ndarray] = {}
+
+        patterns = sorted({e.movement_pattern for e in exercises.values()})
+        muscles = sorted(set().union(*(e.muscle_groups for e in exercises.values())))
+        equipment = sorted(set().union(*(_equipment(e) for e in exercises.values())))
+        self.dimensions: Tuple[str, ...] = (
+            *(f"pattern:{p}" for p in patterns),
+            *(f"muscle:{m}" for m in muscles),
+            *(f"difficulty:{d}" for d in sorted(DIFFICULTY_LEVELS)),
+            *(f"equipment:{q}" for q in equipment),
+        )
+
+        rows = []
+        for name in self.names:
+            exercise = exercises[name]
+            blocks = {
+                "movement_pattern": np.array([p == exercise.movement_pattern for p in patterns], dtype=np.float64),
+                "muscle_groups": np.array([m in exercise.muscle_groups for m in muscles], dtype=np.float64),
+                "difficulty": np.array(DIFFICULTY_LEVELS[exercise.difficulty], dtype=np.float64),
+                "equipment": np.array([q in _equipment(exercise) for q in equipment], dtype=np.float64),
+            }
+            rows.append(np.concatenate([
+                _unit(blocks[attribute]) * np.sqrt(self.weights[attribute]) for attribute in DEFAULT_WEIGHTS
+            ]))
+        matrix = np.array(rows, dtype=np.float32).reshape(len(self.names), len(self.dimensions))
+        # Rows are unit length whenever the weights sum to 1; normalize anyway for custom weights
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms == 0, 1, norms)
+        self.matrix.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def vector(self, name: str) -> np.ndarray:
+        return self.matrix[self.index[name]]
+
+    def similarity(self, first: str, second: str) -> float:
+        """Cosine similarity of two exercises, 0 (nothing shared) to 1"""
+        return float(self.vector(first) @ self.vector(second))
+
+    def available(self, equipment: Optional[FrozenSet[str]]) -> np.ndarray:
+        """Boolean mask of exercises usable with equipment (None means no restriction)"""
+        if equipment is None:
+            return np.ones(len(self.names), dtype=bool)
+        equipment = frozenset(equipment)
+        mask = self._masks.get(equipment)
+        if mask is None:
+            mask = np.array([any(option <= equipment for option in options) for options in self._options])
+            mask.setflags(write=False)
+            self._masks[equipment] = mask
+        return mask
+
+    def _scores(self, names: Sequence[str], equipment: Optional[FrozenSet[str]],
+                exclude: Iterable[str]) -> np.ndarray:
+        rows = np.array([self.index[name] for name in names], dtype=np.intp)
+        scores = self.matrix[rows] @ self.matrix.T
+        blocked = ~self.available(equipment)
+        for name in exclude:
+            if name in self.index:
+                blocked[self.index[name]] = True
+        scores[:, blocked] = -np.inf
+        # An exercise never substitutes for itself
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return scores
+
+    def substitutes(self, name: str, equipment: Optional[FrozenSet[str]] = None, k: int = 3,
+                    exclude: Iterable[str] = (), min_similarity: float = 0.0) -> List[Tuple[str, float]]:
+        """The k exercises most similar to name that equipment allows, best first"""
+        scores = self._scores((name,), equipment, exclude)[0]
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.names[i], float(scores[i])) for i in top.tolist() if scores[i] >= min_similarity]
+
+    def best_substitutes(self, names: Sequence[str], equipment: Optional[FrozenSet[str]] = None,
+                         exclude: Iterable[str] = (),
+                         min_similarity: float = DEFAULT_MIN_SIMILARITY) -> List[Optional[Tuple[str, float]]]:
+        """
+        One substitute per name (None when nothing reaches min_similarity),
+        all scored in one matrix product; a substitute is used at most once
+        and never duplicates an excluded exercise
+        """
+        if not names:
+            return []
+        scores = self._scores(names, equipment, exclude)
+        chosen: List[Optional[Tuple[str, float]]] = []
+        for row in scores:
+            best = int(np.argmax(row))
+            if row[best] < min_similarity:
+                chosen.append(None)
+                continue
+            chosen.append((self.names[best], float(row[best])))
+            # Later names in the same request pick something else
+            scores[:, best] = -np.inf
+        return chosen
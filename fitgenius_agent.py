@@ -10,24 +10,155 @@ This agent provides:
 - Adaptive fitness coaching
 """
 
+import asyncio
 import json
-import boto3
+from contextlib import AbstractContextManager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from functools import cached_property
+from typing import Callable, Dict, List, Optional
 import base64
+import os
+import threading
+import weakref
+
+import yaml
+
+import agent_pool
+import analysis_cache
+import aws_clients
+import bedrock_limiter
+import body_analysis
+import context_compaction
+import fitness_metrics
+import fitness_search
+import image_preprocessing
+import meal_planner
+import photo_store
+import progress_analytics
+import progress_store
+import request_executor
+import session_store
+import single_flight
+import tool_cache
+import tool_routing
+import tracing
+import workout_catalog
+import write_buffer
 
 # Strands Agent Configuration
 from strands import Agent, Tool, ToolResponse
+from strands.models import BedrockModel
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.yaml")
+
+
+def load_config(path: Optional[str] = None) -> Dict:
+    """Load config.yaml (or FITGENIUS_CONFIG); a missing file yields an empty config"""
+    path = path or os.environ.get("FITGENIUS_CONFIG", DEFAULT_CONFIG_PATH)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+def create_analysis_cache(config: Dict) -> Optional[analysis_cache.AnalysisCache]:
+    """Build the body analysis cache from the cache.body_analysis config section"""
+    settings = config.get("cache", {}).get("body_analysis", {})
+    if not settings.get("enabled", True):
+        return None
+    ttl_hours = settings.get("ttl_hours", 168)
+    return analysis_cache.AnalysisCache(
+        max_entries=settings.get("max_entries", 256),
+        disk_dir=settings.get("disk_dir"),
+        ttl_seconds=ttl_hours * 3600 if ttl_hours is not None else None,
+        max_disk_bytes=int(settings.get("max_disk_mb", 256) * 1024 * 1024)
+    )
+
+
+def create_tool_cache(config: Dict) -> Optional[tool_cache.ToolCache]:
+    """Build the pure-tool result cache from the cache.tools config section"""
+    settings = config.get("cache", {}).get("tools", {})
+    if not settings.get("enabled", False):
+        return None
+    return tool_cache.ToolCache(max_entries=settings.get("max_entries", 1024))
+
+
+class _BedrockSession:
+    """
+    boto3 Session stand-in that hands BedrockModel an already built
+    bedrock-runtime client instead of letting it create its own
+    """
+    
+    def __init__(self, session, bedrock):
+        self._session = session
+        self._bedrock = bedrock
+    
+    def client(self, service_name: str, *args, **kwargs):
+        if service_name == "bedrock-runtime":
+            return self._bedrock
+        return self._session.client(service_name, *args, **kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+# One model per AWSClients holder and aws.bedrock settings, dropped with the holder
+_models: "weakref.WeakKeyDictionary[aws_clients.AWSClients, Dict[str, BedrockModel]]" = weakref.WeakKeyDictionary()
+_models_lock = threading.Lock()
+
+
+def get_shared_model(config: Dict, aws: aws_clients.AWSClients) -> BedrockModel:
+    """
+    Process-wide Strands BedrockModel for the aws.bedrock settings in config,
+    built on first use on aws's bedrock-runtime client, wrapped by the shared
+    Bedrock limiter when enabled so the agent loop's Converse calls share
+    the tools' quota and retries
+    """
+    settings = config.get("aws", {}).get("bedrock", {})
+    key = json.dumps(settings, sort_keys=True, default=str)
+    with _models_lock:
+        models = _models.setdefault(aws, {})
+        model = models.get(key)
+        if model is None:
+            bedrock = aws.client('bedrock-runtime')
+            limiter = bedrock_limiter.get_shared_limiter(config)
+            if limiter is not None:
+                bedrock = limiter.wrap(bedrock)
+            model = models[key] = BedrockModel(
+                model_id=settings.get("model_id", "anthropic.claude-3-sonnet-20240229-v1:0"),
+                max_tokens=settings.get("max_tokens", 4096),
+                temperature=settings.get("temperature", 0.7),
+                boto_session=_BedrockSession(aws.session, bedrock)
+            )
+        return model
+
 
 class FitGeniusAgent:
     """Main Fitness AI Agent using Strands SDK"""
     
-    def __init__(self):
-        self.bedrock = boto3.client('bedrock-runtime')
-        self.s3 = boto3.client('s3')
-        self.dynamodb = boto3.resource('dynamodb')
+    def __init__(self, config: Optional[Dict] = None, aws: Optional[aws_clients.AWSClients] = None):
+        self.config = config if config is not None else load_config()
+        # AWS clients are created on first use and shared across agents
+        self.aws = aws if aws is not None else aws_clients.get_shared_clients(self.config)
+        
+        # Per-request spans for tools and AWS calls; a no-op unless tracing.enabled
+        self.tracer = tracing.create_tracer(self.config.get("tracing"))
+        if self.tracer.enabled:
+            self.aws.add_hook(tracing.instrument_client)
+        
+        # Repeated uploads of the same photo reuse the earlier analysis
+        self.analysis_cache = create_analysis_cache(self.config)
+        # Identical body analyses already in flight are awaited, not sent again
+        coalesce = self.config.get("vision", {}).get("coalesce_in_flight", True)
+        self.analysis_flights = single_flight.SingleFlight() if coalesce else None
+        # Deterministic tools (marked @tool_cache.pure) reuse earlier results
+        self.tool_cache = create_tool_cache(self.config)
+        # Request context is compacted to flat key=value pairs and trimmed
+        # to a token budget; it is sent in full every turn, not delta-encoded
+        self.context_compactor = context_compaction.create_compactor(self.config.get("agent", {}).get("context"))
         
-        # Initialize tools
+        # Initialize tools; tool_functions maps tool name -> callable
+        self.tool_functions: Dict[str, Callable] = {}
         self.tools = [
             self.create_bmi_calculator_tool(),
             self.create_body_analyzer_tool(),
@@ -37,48 +168,119 @@ class FitGeniusAgent:
             self.create_web_search_tool()
         ]
         
-        # Initialize agent
-        self.agent = Agent(
+        # Model calls carry only the tool schemas the request's intent needs
+        self.tool_router = tool_routing.create_router(self.config.get("agent", {}).get("tool_routing"), self.tools)
+        # Agents are not thread-safe: each concurrent request leases its own,
+        # built on first use per tool subset, up to one per worker thread
+        concurrency = self.config.get("agent", {}).get("concurrency", {})
+        self.agent_pool = agent_pool.AgentPool(max_agents=concurrency.get("max_concurrency", 16))
+    
+    def create_agent(self, tools: List[Tool]) -> Agent:
+        return Agent(
             name="FitGenius",
             description="Personal fitness AI agent for body analysis, workout planning, and progress tracking",
-            tools=self.tools,
-            model_id="anthropic.claude-3-sonnet-20240229-v1:0"
+            tools=list(tools),
+            model=self.model
         )
     
+    @property
+    def model(self) -> BedrockModel:
+        # Built on the first request, not in __init__, and shared by every agent
+        return get_shared_model(self.config, self.aws)
+    
+    def agent_for(self, user_input: str, trace: Optional[tracing.Trace] = None) -> AbstractContextManager:
+        """
+        Lease of an agent with the tools user_input needs (every tool without
+        tool routing); use as `with self.agent_for(...) as agent:`
+        """
+        tools = self.tools
+        if self.tool_router is not None:
+            route = self.tool_router.route(user_input)
+            if trace is not None:
+                trace.attributes.update(route.report())
+            tools = route.tools
+        names = tuple(tool.name for tool in tools)
+        return self.agent_pool.lease(names, lambda: self.create_agent(tools))
+    
+    @cached_property
+    def bedrock_limiter(self) -> Optional[bedrock_limiter.BedrockLimiter]:
+        # Shared by every agent in the process, like the quota it enforces
+        return bedrock_limiter.get_shared_limiter(self.config)
+    
+    @property
+    def bedrock(self):
+        client = self.aws.client('bedrock-runtime')
+        if self.bedrock_limiter is None:
+            return client
+        return self.bedrock_limiter.wrap(client)
+    
+    @property
+    def s3(self):
+        return self.aws.client('s3')
+    
+    @property
+    def dynamodb(self):
+        return self.aws.resource('dynamodb')
+    
+    @cached_property
+    def progress_store(self) -> progress_store.ProgressStore:
+        progress_table = self.config.get("database", {}).get("progress_table", "FitGeniusProgress")
+        return progress_store.ProgressStore(self.dynamodb.Table(progress_table))
+    
+    @cached_property
+    def photo_store(self) -> photo_store.PhotoStore:
+        storage = self.config.get("storage", {})
+        return photo_store.PhotoStore(
+            self.s3,
+            storage.get("bucket_name", "fitgenius-images"),
+            prefix=storage.get("image_prefix", photo_store.DEFAULT_PREFIX),
+            multipart_threshold=int(storage.get("multipart_threshold_mb", 8) * 1024 * 1024),
+            part_size=int(storage.get("multipart_part_size_mb", 8) * 1024 * 1024)
+        )
+    
+    @cached_property
+    def search_index(self) -> fitness_search.SearchIndex:
+        """BM25 index behind fitness_search, memory-mapped from search.index_path"""
+        return fitness_search.create_search_index(self.config.get("search", {}))
+    
+    @cached_property
+    def sessions(self) -> Optional[session_store.SessionStore]:
+        """Per-user conversation sessions; None unless agent.sessions is enabled"""
+        settings = self.config.get("agent", {}).get("sessions", {})
+        dynamodb = self.dynamodb if settings.get("backend") == "dynamodb" else None
+        return session_store.create_session_store(settings, dynamodb)
+    
+    @cached_property
+    def progress_buffer(self) -> Optional[write_buffer.WriteBehindBuffer]:
+        """Write-behind buffer for progress entries; None unless progress.write_behind is enabled"""
+        settings = self.config.get("progress", {}).get("write_behind", {})
+        if not settings.get("enabled", False):
+            return None
+        return write_buffer.WriteBehindBuffer(
+            self.progress_store,
+            flush_size=settings.get("flush_size", 500),
+            flush_interval=settings.get("flush_interval_seconds", 1.0),
+            max_buffered=settings.get("max_buffered", 5000)
+        )
+    
+    def register_tool(self, name: str, function):
+        """Record a tool's function by name, memoized if it is pure and the tool cache is on"""
+        if self.tool_cache is not None:
+            function = self.tool_cache.wrap(name, function)
+        function = self.tracer.traced(name, function)
+        self.tool_functions[name] = function
+        return function
+    
     def create_bmi_calculator_tool(self) -> Tool:
         """Tool to calculate BMI and body composition metrics"""
+        @tool_cache.pure
         def calculate_bmi(weight_kg: float, height_cm: float) -> Dict:
-            height_m = height_cm / 100
-            bmi = weight_kg / (height_m ** 2)
-            
-            # BMI categories
-            if bmi < 18.5:
-                category = "Underweight"
-                health_risk = "Low to Moderate"
-            elif 18.5 <= bmi < 25:
-                category = "Normal Weight"
-                health_risk = "Low"
-            elif 25 <= bmi < 30:
-                category = "Overweight"
-                health_risk = "Moderate"
-            else:
-                category = "Obese"
-                health_risk = "High"
-            
-            return {
-                "bmi": round(bmi, 2),
-                "category": category,
-                "health_risk": health_risk,
-                "ideal_weight_range": {
-                    "min": round(18.5 * (height_m ** 2), 1),
-                    "max": round(24.9 * (height_m ** 2), 1)
-                }
-            }
+            return fitness_metrics.calculate_bmi(weight_kg, height_cm)
         
         return Tool(
             name="bmi_calculator",
             description="Calculate BMI and determine health category",
-            function=calculate_bmi,
+            function=self.register_tool("bmi_calculator", calculate_bmi),
             parameters={
                 "weight_kg": {"type": "number", "description": "Weight in kilograms"},
                 "height_cm": {"type": "number", "description": "Height in centimeters"}
@@ -94,62 +296,29 @@ class FitGeniusAgent:
             user_info: dict with age, gender, height, weight
             """
             
-            prompt = f"""Analyze this body image and provide a detailed assessment:
-            
-            User Info:
-            - Age: {user_info.get('age')}
-            - Gender: {user_info.get('gender')}
-            - Height: {user_info.get('height_cm')}cm
-            - Weight: {user_info.get('weight_kg')}kg
-            
-            Please analyze:
-            1. Overall body composition (estimated body fat %)
-            2. Muscle development by body part (shoulders, chest, arms, core, legs)
-            3. Posture assessment
-            4. Areas needing improvement
-            5. Current fitness level estimate (beginner/intermediate/advanced)
-            
-            Provide specific, actionable insights."""
-            
             # Call Bedrock with Claude Vision
-            response = self.bedrock.invoke_model(
-                modelId='anthropic.claude-3-sonnet-20240229-v1:0',
-                body=json.dumps({
-                    "anthropic_version": "bedrock-2023-05-31",
-                    "max_tokens": 2000,
-                    "messages": [{
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "image",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "image/jpeg",
-                                    "data": image_data
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ]
-                    }]
-                })
-            )
+            def analyze() -> Dict:
+                image = self.prepare_image(image_data)
+                result = body_analysis.analyze_body_image(
+                    self.bedrock, image.data, user_info, media_type=image.media_type
+                )
+                result["image_preprocessing"] = image.report()
+                return result
             
-            result = json.loads(response['body'].read())
-            analysis = result['content'][0]['text']
+            def lookup(key: Optional[str] = None) -> Dict:
+                if self.analysis_cache is None:
+                    return analyze()
+                return self.analysis_cache.get_or_compute(image_data, user_info, analyze, key=key)
             
-            return {
-                "analysis": analysis,
-                "timestamp": datetime.now().isoformat(),
-                "user_info": user_info
-            }
+            if self.analysis_flights is None:
+                return lookup()
+            key = analysis_cache.cache_key(image_data, user_info)
+            return self.analysis_flights.do(key, lambda: lookup(key))
         
         return Tool(
             name="body_analyzer",
             description="Analyze body composition from image using AI vision",
-            function=analyze_body_image,
+            function=self.register_tool("body_analyzer", analyze_body_image),
             parameters={
                 "image_data": {"type": "string", "description": "Base64 encoded body image"},
                 "user_info": {"type": "object", "description": "User demographics and measurements"}
@@ -158,6 +327,7 @@ class FitGeniusAgent:
     
     def create_workout_planner_tool(self) -> Tool:
         """Tool to generate personalized workout plans"""
+        @tool_cache.pure
         def generate_workout_plan(
             fitness_level: str,
             goals: List[str],
@@ -172,95 +342,18 @@ class FitGeniusAgent:
             goals: weight_loss, muscle_gain, strength, endurance, flexibility
             """
             
-            workout_templates = {
-                "beginner": {
-                    "weight_loss": [
-                        {"day": "Monday", "focus": "Full Body", "exercises": [
-                            "Bodyweight Squats: 3x12",
-                            "Push-ups (modified): 3x8-10",
-                            "Lunges: 3x10 each leg",
-                            "Plank: 3x30 seconds",
-                            "Jumping Jacks: 3x20"
-                        ]},
-                        {"day": "Wednesday", "focus": "Cardio & Core", "exercises": [
-                            "Brisk Walking: 20 minutes",
-                            "Mountain Climbers: 3x15",
-                            "Bicycle Crunches: 3x15",
-                            "Burpees: 3x8",
-                            "Leg Raises: 3x12"
-                        ]},
-                        {"day": "Friday", "focus": "Full Body", "exercises": [
-                            "Bodyweight Squats: 3x15",
-                            "Incline Push-ups: 3x10",
-                            "Step-ups: 3x12 each leg",
-                            "Side Plank: 3x20s each side",
-                            "High Knees: 3x30 seconds"
-                        ]}
-                    ],
-                    "muscle_gain": [
-                        {"day": "Monday", "focus": "Upper Body", "exercises": [
-                            "Push-ups: 4x8-12",
-                            "Dumbbell Rows: 4x10",
-                            "Shoulder Press: 3x10",
-                            "Bicep Curls: 3x12",
-                            "Tricep Dips: 3x10"
-                        ]},
-                        {"day": "Wednesday", "focus": "Lower Body", "exercises": [
-                            "Goblet Squats: 4x10",
-                            "Romanian Deadlifts: 4x10",
-                            "Lunges: 3x12 each",
-                            "Calf Raises: 4x15",
-                            "Glute Bridges: 3x15"
-                        ]},
-                        {"day": "Friday", "focus": "Full Body", "exercises": [
-                            "Squats: 4x10",
-                            "Push-ups: 4x10",
-                            "Bent Over Rows: 4x10",
-                            "Overhead Press: 3x10",
-                            "Planks: 3x45s"
-                        ]}
-                    ]
-                },
-                "intermediate": {
-                    "muscle_gain": [
-                        {"day": "Monday", "focus": "Chest & Triceps", "exercises": [
-                            "Barbell Bench Press: 4x8-10",
-                            "Incline Dumbbell Press: 3x10",
-                            "Cable Flyes: 3x12",
-                            "Tricep Pushdowns: 4x12",
-                            "Overhead Tricep Extension: 3x12"
-                        ]},
-                        {"day": "Tuesday", "focus": "Back & Biceps", "exercises": [
-                            "Pull-ups: 4x6-8",
-                            "Barbell Rows: 4x8",
-                            "Lat Pulldowns: 3x10",
-                            "Barbell Curls: 4x10",
-                            "Hammer Curls: 3x12"
-                        ]},
-                        {"day": "Thursday", "focus": "Legs", "exercises": [
-                            "Back Squats: 4x8",
-                            "Leg Press: 4x12",
-                            "Romanian Deadlifts: 3x10",
-                            "Leg Curls: 3x12",
-                            "Leg Extensions: 3x15"
-                        ]},
-                        {"day": "Friday", "focus": "Shoulders & Arms", "exercises": [
-                            "Military Press: 4x8",
-                            "Lateral Raises: 4x12",
-                            "Face Pulls: 3x15",
-                            "Barbell Curls: 3x10",
-                            "Close-Grip Bench: 3x10"
-                        ]}
-                    ]
-                }
-            }
-            
-            # Select appropriate template
+            # Select appropriate template from the prebuilt catalog
             primary_goal = goals[0] if goals else "muscle_gain"
-            plan = workout_templates.get(fitness_level, {}).get(primary_goal, [])
+            plan = workout_catalog.get_workout_plan(
+                fitness_level,
+                primary_goal,
+                available_equipment=available_equipment,
+                focus_areas=focus_areas,
+                days_per_week=days_per_week
+            )
             
             return {
-                "plan": plan[:days_per_week],
+                "plan": plan,
                 "duration_per_session": f"{duration_minutes} minutes",
                 "fitness_level": fitness_level,
                 "goals": goals,
@@ -276,7 +369,7 @@ class FitGeniusAgent:
         return Tool(
             name="workout_planner",
             description="Generate personalized workout plans based on goals and fitness level",
-            function=generate_workout_plan,
+            function=self.register_tool("workout_planner", generate_workout_plan),
             parameters={
                 "fitness_level": {"type": "string", "description": "beginner, intermediate, or advanced"},
                 "goals": {"type": "array", "description": "List of fitness goals"},
@@ -289,85 +382,57 @@ class FitGeniusAgent:
     
     def create_diet_planner_tool(self) -> Tool:
         """Tool to create personalized diet plans"""
+        macro_tolerance = self.config.get("nutrition", {}).get("macro_tolerance", meal_planner.DEFAULT_TOLERANCE)
+        
+        @tool_cache.pure
         def generate_diet_plan(
             goal: str,
             current_weight: float,
             target_weight: float,
             activity_level: str,
             dietary_restrictions: List[str],
-            meals_per_day: int
+            meals_per_day: int,
+            age: Optional[int] = None,
+            gender: Optional[str] = None,
+            height_cm: Optional[float] = None
         ) -> Dict:
             """
             Generate personalized diet plan
             goal: weight_loss, muscle_gain, maintenance
             activity_level: sedentary, moderate, active, very_active
             """
+            # Mifflin-St Jeor when age, gender and height are known, otherwise
+            # a weight-only estimate; same formulas as the batch planner
+            plan = fitness_metrics.calculate_diet_plan(
+                goal, current_weight, activity_level, target_weight=target_weight,
+                meals_per_day=meals_per_day, age=age, sex=gender, height_cm=height_cm
+            )
             
-            # Calculate BMR (Basal Metabolic Rate) - simplified
-            # Using Mifflin-St Jeor Equation approximation
-            activity_multipliers = {
-                "sedentary": 1.2,
-                "moderate": 1.55,
-                "active": 1.725,
-                "very_active": 1.9
-            }
-            
-            # Simplified TDEE calculation (you'd need gender, age, height for accuracy)
-            base_calories = current_weight * 22  # Rough estimate
-            tdee = base_calories * activity_multipliers.get(activity_level, 1.55)
-            
-            # Adjust calories based on goal
-            if goal == "weight_loss":
-                target_calories = tdee - 500  # 500 cal deficit
-                protein_multiplier = 2.0  # g per kg bodyweight
-                carb_percentage = 0.30
-                fat_percentage = 0.30
-            elif goal == "muscle_gain":
-                target_calories = tdee + 300  # 300 cal surplus
-                protein_multiplier = 2.2
-                carb_percentage = 0.40
-                fat_percentage = 0.25
-            else:  # maintenance
-                target_calories = tdee
-                protein_multiplier = 1.8
-                carb_percentage = 0.35
-                fat_percentage = 0.30
-            
-            # Calculate macros
-            protein_g = current_weight * protein_multiplier
-            protein_calories = protein_g * 4
-            fat_calories = target_calories * fat_percentage
-            fat_g = fat_calories / 9
-            carb_calories = target_calories - protein_calories - fat_calories
-            carb_g = carb_calories / 4
-            
-            # Sample meal plans
-            meal_examples = {
-                "weight_loss": {
-                    "breakfast": "Oatmeal with berries and protein powder (350 cal)",
-                    "snack1": "Greek yogurt with almonds (200 cal)",
-                    "lunch": "Grilled chicken salad with olive oil dressing (450 cal)",
-                    "snack2": "Apple with peanut butter (180 cal)",
-                    "dinner": "Baked salmon with roasted vegetables (500 cal)"
-                },
-                "muscle_gain": {
-                    "breakfast": "Scrambled eggs with whole grain toast and avocado (550 cal)",
-                    "snack1": "Protein shake with banana (300 cal)",
-                    "lunch": "Chicken breast with brown rice and broccoli (650 cal)",
-                    "snack2": "Trail mix with dried fruits (250 cal)",
-                    "dinner": "Lean beef with sweet potato and green beans (700 cal)",
-                    "snack3": "Cottage cheese with berries (200 cal)"
-                }
-            }
+            # Menus built from the food table to the computed macros
+            meals = meal_planner.plan_day(
+                plan["daily_calories"], plan["protein_g"], plan["carbs_g"], plan["fats_g"],
+                meals_per_day=meals_per_day, restrictions=dietary_restrictions, tolerance=macro_tolerance
+            )
             
             return {
-                "daily_calories": round(target_calories),
+                "daily_calories": plan["daily_calories"],
                 "macros": {
-                    "protein_g": round(protein_g),
-                    "carbs_g": round(carb_g),
-                    "fats_g": round(fat_g)
+                    "protein_g": plan["protein_g"],
+                    "carbs_g": plan["carbs_g"],
+                    "fats_g": plan["fats_g"]
                 },
-                "meal_plan": meal_examples.get(goal, meal_examples["weight_loss"]),
+                "energy": {
+                    "bmr": plan["bmr"],
+                    "tdee": plan["tdee"],
+                    "method": plan["bmr_method"]
+                },
+                "per_meal": {
+                    "calories": plan["calories_per_meal"],
+                    "protein_g": plan["protein_per_meal_g"]
+                },
+                "weeks_to_target": plan["weeks_to_target"],
+                "meal_plan": meals,
+                "warnings": meals["warnings"],
                 "hydration": "Drink at least 3-4 liters of water daily",
                 "tips": [
                     "Eat protein with every meal",
@@ -387,14 +452,17 @@ class FitGeniusAgent:
         return Tool(
             name="diet_planner",
             description="Generate personalized diet and nutrition plans",
-            function=generate_diet_plan,
+            function=self.register_tool("diet_planner", generate_diet_plan),
             parameters={
                 "goal": {"type": "string", "description": "weight_loss, muscle_gain, or maintenance"},
                 "current_weight": {"type": "number", "description": "Current weight in kg"},
                 "target_weight": {"type": "number", "description": "Target weight in kg"},
                 "activity_level": {"type": "string", "description": "Activity level"},
                 "dietary_restrictions": {"type": "array", "description": "Dietary restrictions"},
-                "meals_per_day": {"type": "integer", "description": "Number of meals per day"}
+                "meals_per_day": {"type": "integer", "description": "Number of meals per day"},
+                "age": {"type": "integer", "description": "Optional age in years, for Mifflin-St Jeor"},
+                "gender": {"type": "string", "description": "Optional male or female, for Mifflin-St Jeor"},
+                "height_cm": {"type": "number", "description": "Optional height in cm, for Mifflin-St Jeor"}
             }
         )
     
@@ -405,13 +473,13 @@ class FitGeniusAgent:
             date: str,
             weight: float,
             body_measurements: Dict,
-            progress_image: Optional[str] = None
+            progress_image: Optional[str] = None,
+            include_trend: bool = False
         ) -> Dict:
             """
             Store and analyze progress data
+            include_trend: also read recent history for a trend analysis
             """
-            table = self.dynamodb.Table('FitGeniusProgress')
-            
             progress_entry = {
                 'userId': user_id,
                 'date': date,
@@ -419,105 +487,239 @@ class FitGeniusAgent:
                 'measurements': body_measurements,
                 'timestamp': datetime.now().isoformat()
             }
+            photo_info = None
+            if progress_image:
+                # Uploaded before the item is written, which keeps only the S3 key
+                photo = self.photo_store.put(user_id, progress_image)
+                progress_entry['progress_image'] = photo.key
+                photo_info = {"key": photo.key, "bytes": photo.size, "deduplicated": not photo.uploaded}
             
-            # Store in DynamoDB
-            table.put_item(Item=progress_entry)
-            
-            # Get historical data
-            response = table.query(
-                KeyConditionExpression='userId = :uid',
-                ExpressionAttributeValues={':uid': user_id},
-                ScanIndexForward=False,
-                Limit=30
-            )
-            
-            history = response.get('Items', [])
-            
-            # Calculate progress
-            if len(history) > 1:
-                first_entry = history[-1]
-                weight_change = weight - first_entry['weight']
-                days_elapsed = (datetime.fromisoformat(date) - 
-                               datetime.fromisoformat(first_entry['date'])).days
-                
-                analysis = {
-                    "total_weight_change": round(weight_change, 2),
-                    "days_tracked": days_elapsed,
-                    "avg_weekly_change": round((weight_change / days_elapsed) * 7, 2) if days_elapsed > 0 else 0,
-                    "trend": "gaining" if weight_change > 0 else "losing" if weight_change < 0 else "maintaining",
-                    "entries_count": len(history)
-                }
-            else:
-                analysis = {
-                    "message": "First entry recorded. Keep tracking!",
-                    "entries_count": 1
+            if self.progress_buffer is not None:
+                # Written with the next batch; the summary catches up on flush
+                self.progress_buffer.add(progress_entry)
+                result = {
+                    "current_entry": progress_entry,
+                    "buffered": True,
+                    "message": "Entry recorded; progress analysis updates after the next write"
                 }
+                if photo_info:
+                    result["progress_image"] = photo_info
+                return result
             
-            return {
+            # Store in DynamoDB; the per-user summary is updated in the same pass
+            summary = self.progress_store.record_entry(progress_entry)
+            analysis = progress_store.analyze_summary(summary)
+            entries = int(summary.get('entry_count', 1))
+            
+            result = {
                 "current_entry": progress_entry,
                 "analysis": analysis,
                 "history_summary": {
-                    "total_entries": len(history),
-                    "date_range": f"{history[-1]['date']} to {history[0]['date']}" if len(history) > 1 else date
+                    "total_entries": entries,
+                    "date_range": f"{summary['first_date']} to {summary['latest_date']}" if entries > 1 else date
                 }
             }
+            if photo_info:
+                result["progress_image"] = photo_info
+            # On demand only: it queries up to trend_window_days of history
+            if include_trend and entries > 2:
+                result["trend_analysis"] = self.analyze_recent_progress(user_id, date)
+            return result
         
         return Tool(
             name="progress_tracker",
             description="Track daily progress with measurements and images",
-            function=track_progress,
+            function=self.register_tool("progress_tracker", track_progress),
             parameters={
                 "user_id": {"type": "string", "description": "Unique user identifier"},
                 "date": {"type": "string", "description": "Date of measurement (YYYY-MM-DD)"},
                 "weight": {"type": "number", "description": "Current weight in kg"},
                 "body_measurements": {"type": "object", "description": "Body measurements dict"},
-                "progress_image": {"type": "string", "description": "Optional base64 progress photo"}
+                "progress_image": {"type": "string", "description": "Optional base64 progress photo"},
+                "include_trend": {"type": "boolean",
+                                  "description": "Also analyze the recent trend (reads history; default false)"}
             }
         )
     
+    def analyze_recent_progress(self, user_id: str, as_of: str) -> Dict:
+        """Noise-robust trend over the last progress.trend_window_days of history"""
+        settings = self.config.get("progress", {})
+        window_days = settings.get("trend_window_days", 90)
+        start = (datetime.fromisoformat(as_of[:10]) - timedelta(days=window_days)).date().isoformat()
+        history = self.progress_store.history(
+            user_id, start_date=start, end_date=as_of[:10],
+            page_size=settings.get("history_page_size", progress_store.DEFAULT_PAGE_SIZE)
+        )
+        trend = progress_analytics.analyze_history(progress_analytics.ProgressHistory.from_entries(history))
+        trend["window_days"] = window_days
+        trend["read_capacity"] = history.stats()["consumed_capacity"]
+        return trend
+    
     def create_web_search_tool(self) -> Tool:
         """Tool to search for nutrition info, exercises, etc."""
-        def search_fitness_info(query: str, category: str) -> Dict:
+        max_results = self.config.get("search", {}).get("max_results", fitness_search.DEFAULT_MAX_RESULTS)
+        
+        def search_fitness_info(query: str, category: str = None) -> Dict:
             """
             Search for fitness-related information
-            category: nutrition, exercises, supplements, research
+            category: nutrition, exercises, supplements, research (anything else searches all)
             """
-            # This would integrate with actual search API
-            # For demo purposes, returning structured data
-            
+            results = self.search_index.search(query, category, k=max_results)
             return {
                 "query": query,
-                "category": category,
-                "results": [
-                    {
-                        "title": f"Information about {query}",
-                        "summary": "Detailed information would be retrieved from search API",
-                        "source": "Fitness Database"
-                    }
-                ]
+                "category": fitness_search.normalize_category(category) or "all",
+                "results": [result.to_dict() for result in results]
             }
         
         return Tool(
             name="fitness_search",
-            description="Search for fitness information, exercises, nutrition data",
-            function=search_fitness_info,
+            description="Search the bundled exercise, nutrition, supplement and research library",
+            function=self.register_tool("fitness_search", search_fitness_info),
             parameters={
                 "query": {"type": "string", "description": "Search query"},
-                "category": {"type": "string", "description": "Search category"}
+                "category": {"type": "string",
+                             "description": "nutrition, exercises, supplements, research or all"}
             }
         )
     
-    def process_user_request(self, user_input: str, context: Dict = None) -> str:
-        """Main method to process user requests through the agent"""
+    def prepare_image(self, image_data: str) -> image_preprocessing.PreprocessedImage:
+        """Downsize, strip and re-encode an uploaded photo per the vision config"""
+        vision = self.config.get("vision", {})
+        max_mb = self.config.get("storage", {}).get("max_image_size_mb", 5)
+        with self.tracer.span("prepare_image", "internal"):
+            image = image_preprocessing.preprocess_image(
+                image_data,
+                max_dimension=vision.get("max_dimension", image_preprocessing.DEFAULT_MAX_DIMENSION),
+                max_pixels=int(vision.get("max_megapixels", 1.2) * 1_000_000),
+                quality=vision.get("jpeg_quality", image_preprocessing.DEFAULT_QUALITY),
+                max_bytes=int(max_mb * 1024 * 1024),
+                upload_bytes_per_sec=vision.get("upload_mbps", 10) * 125000
+            )
+        return image
+    
+    def stream_body_analysis(self, image_data: str, user_info: Dict) -> body_analysis.BodyAnalysisStream:
+        """
+        Streaming variant of the body analyzer tool
         
-        # Add context if provided
-        if context:
-            user_input = f"User Context: {json.dumps(context)}\n\nUser Request: {user_input}"
+        Iterate (sync or async) over the returned stream for text chunks as
+        they are generated; stream.result holds the final analysis dict.
+        """
+        image = self.prepare_image(image_data)
+        return body_analysis.BodyAnalysisStream(
+            self.bedrock, image.data, user_info, media_type=image.media_type,
+            result_extras={"image_preprocessing": image.report()}
+        )
+    
+    def process_user_request(self, user_input: str, context: Dict = None,
+                             request_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+        """
+        Main method to process user requests through the agent
         
-        # Process through Strands agent
-        response = self.agent.process(user_input)
+        With sessions enabled, a request with a user_id (or context["user_id"])
+        continues that user's conversation: send only the new turn and any
+        context fields that changed.
+        """
+        if user_id is None and context:
+            user_id = context.get("user_id")
+        with self.tracer.request(request_id, user_id=user_id) as trace:
+            if self.sessions is not None and user_id is not None:
+                return self._process_in_session(user_id, user_input, context, trace)
+            
+            # Routed on the request alone, before the context is prepended
+            lease = self.agent_for(user_input, trace)
+            update = None
+            if self.context_compactor is not None:
+                # Pooled agents keep no per-user history, so every turn
+                # outside a session carries the full compact context
+                user_input, update = self.context_compactor.apply(None, context, user_input)
+            elif context:
+                user_input = f"User Context: {json.dumps(context)}\n\nUser Request: {user_input}"
+            
+            # Process through Strands agent
+            with lease as agent:
+                response = agent.process(user_input)
+            
+            if update is not None:
+                self.context_compactor.commit(update)
+                if trace is not None:
+                    trace.attributes.update(update.report())
         
         return response
+    
+    def _process_in_session(self, user_id: str, user_input: str, context: Optional[Dict],
+                            trace: Optional[tracing.Trace]) -> str:
+        """One turn of a session: summary and recent turns, merged context, then the request"""
+        session = self.sessions.get(user_id)
+        merged = session.merged_context(context)
+        if self.context_compactor is not None:
+            context_text, _ = self.context_compactor.snapshot(merged)
+        else:
+            context_text = f"User Context: {json.dumps(merged)}" if merged else ""
+        message = self.sessions.build_message(session, user_input, context_text)
+        
+        with self.agent_for(user_input, trace) as agent:
+            response = agent.process(message)
+        
+        if trace is not None:
+            prompt_tokens = context_compaction.estimate_tokens(message)
+            trace.attributes.update({
+                "session_turn": session.turn_count + 1,
+                "prompt_tokens": prompt_tokens,
+                # What resending the whole conversation would have cost instead
+                "full_history_tokens": prompt_tokens + round(
+                    session.history_chars / context_compaction.DEFAULT_CHARS_PER_TOKEN
+                ),
+            })
+        self.sessions.record_turn(session, user_input, response, context)
+        return response
+    
+    @cached_property
+    def executor(self) -> request_executor.RequestExecutor:
+        settings = self.config.get("agent", {}).get("concurrency", {})
+        return request_executor.RequestExecutor(
+            self.process_user_request,
+            max_concurrency=settings.get("max_concurrency", 16),
+            max_pending=settings.get("max_pending", 256)
+        )
+    
+    async def aprocess_user_request(self, user_input: str, context: Dict = None,
+                                    user_id: Optional[str] = None, wait: bool = True) -> str:
+        """
+        Async process_user_request
+        
+        Runs alongside other users' requests up to agent.concurrency limits;
+        requests for the same user_id (or context["user_id"]) run in order.
+        With wait=False a full queue raises request_executor.QueueFullError.
+        """
+        if user_id is None and context:
+            user_id = context.get("user_id")
+        # submit() takes user_id itself, so process_user_request's is passed positionally
+        return await self.executor.submit(user_id, user_input, context, None, user_id, wait=wait)
+    
+    def process_many(self, requests: List[Dict], return_exceptions: bool = False) -> List:
+        """
+        Process many requests concurrently; responses come back in input order
+        
+        Each request is a dict with user_input and optional context/user_id.
+        This runs its own event loop (asyncio.run), so it cannot be called
+        from a running one; async callers should await aprocess_user_request.
+        """
+        async def run():
+            return await asyncio.gather(
+                *(self.aprocess_user_request(r["user_input"], r.get("context"), r.get("user_id"))
+                  for r in requests),
+                return_exceptions=return_exceptions
+            )
+        return asyncio.run(run())
+    
+    def close(self):
+        """Flush buffered progress entries, stop the request workers and unmap the search index"""
+        if self.__dict__.get("progress_buffer") is not None:
+            self.progress_buffer.close()
+        if "executor" in self.__dict__:
+            self.executor.shutdown()
+        if "search_index" in self.__dict__:
+            self.search_index.close()
 
 
 # Example usage and testing
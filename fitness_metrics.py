@@ -0,0 +1,267 @@
+"""
+FitGenius fitness metrics
+
+Scalar and vectorized implementations of the body metrics used by the
+agent tools. The scalar functions back the Strands tools; the batch
+functions run the same formulas over whole member cohorts with NumPy.
+"""
+
+import math
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+# BMI category boundaries (upper bound exclusive) and their labels
+BMI_THRESHOLDS = (18.5, 25.0, 30.0)
+BMI_CATEGORIES = ("Underweight", "Normal Weight", "Overweight", "Obese")
+BMI_HEALTH_RISKS = ("Low to Moderate", "Low", "Moderate", "High")
+
+# BMI bounds used for the ideal weight range
+IDEAL_BMI_MIN = 18.5
+IDEAL_BMI_MAX = 24.9
+
+ArrayLike = Union[np.ndarray, list, tuple]
+
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "moderate": 1.55,
+    "active": 1.725,
+    "very_active": 1.9,
+}
+DEFAULT_ACTIVITY_MULTIPLIER = 1.55
+
+# goal -> (calorie adjustment, protein g per kg, fat share of calories);
+# carbs fill the remaining calories. Unrecognised goals plan maintenance.
+DIET_GOALS = {
+    "weight_loss": (-500.0, 2.0, 0.30),
+    "muscle_gain": (300.0, 2.2, 0.25),
+    "maintenance": (0.0, 1.8, 0.30),
+}
+DEFAULT_DIET_GOAL = "maintenance"
+
+# Mifflin-St Jeor sex constants
+MSJ_SEX_OFFSETS = {"male": 5.0, "m": 5.0, "female": -161.0, "f": -161.0}
+# kcal per kg of body weight when age, sex or height is unknown
+ESTIMATED_BMR_PER_KG = 22.0
+# Energy in one kg of body weight change, for the time-to-target estimate
+KCAL_PER_KG = 7700.0
+
+
+def calculate_bmi(weight_kg: float, height_cm: float) -> Dict:
+    """Calculate BMI, health category and ideal weight range for one person"""
+    height_m = height_cm / 100
+    bmi = weight_kg / (height_m ** 2)
+
+    # BMI categories
+    if bmi < 18.5:
+        category = "Underweight"
+        health_risk = "Low to Moderate"
+    elif 18.5 <= bmi < 25:
+        category = "Normal Weight"
+        health_risk = "Low"
+    elif 25 <= bmi < 30:
+        category = "Overweight"
+        health_risk = "Moderate"
+    else:
+        category = "Obese"
+        health_risk = "High"
+
+    return {
+        "bmi": round(bmi, 2),
+        "category": category,
+        "health_risk": health_risk,
+        "ideal_weight_range": {
+            "min": round(IDEAL_BMI_MIN * (height_m ** 2), 1),
+            "max": round(IDEAL_BMI_MAX * (height_m ** 2), 1)
+        }
+    }
+
+
+def calculate_bmi_batch(weight_kg: ArrayLike, height_cm: ArrayLike) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_bmi over a cohort
+
+    Returns a dict of equal-length arrays: bmi, category, health_risk,
+    ideal_weight_min and ideal_weight_max. Values match calculate_bmi
+    element-wise.
+    """
+    weight = np.asarray(weight_kg, dtype=np.float64)
+    height_m = np.asarray(height_cm, dtype=np.float64) / 100
+    if weight.shape != height_m.shape:
+        raise ValueError(
+            f"weight_kg and height_cm must have the same shape, got {weight.shape} and {height_m.shape}"
+        )
+
+    height_sq = height_m * height_m
+    bmi = weight / height_sq
+
+    # Category index 0..3; searchsorted(side="right") puts boundary values
+    # in the upper bucket, matching the `<` comparisons of the scalar tool
+    codes = np.searchsorted(np.asarray(BMI_THRESHOLDS), bmi, side="right")
+
+    return {
+        "bmi": np.round(bmi, 2),
+        "category": np.asarray(BMI_CATEGORIES, dtype=object)[codes],
+        "health_risk": np.asarray(BMI_HEALTH_RISKS, dtype=object)[codes],
+        "ideal_weight_min": np.round(IDEAL_BMI_MIN * height_sq, 1),
+        "ideal_weight_max": np.round(IDEAL_BMI_MAX * height_sq, 1),
+    }
+
+
+def calculate_bmi_frame(df, weight_col: str = "weight_kg", height_col: str = "height_cm"):
+    """
+    Run calculate_bmi_batch over a pandas DataFrame
+
+    Returns a new DataFrame with the BMI result columns, aligned to the
+    input index.
+    """
+    import pandas as pd
+
+    result = calculate_bmi_batch(df[weight_col].to_numpy(), df[height_col].to_numpy())
+    return pd.DataFrame(result, index=df.index)
+
+
+def mifflin_st_jeor(weight_kg: float, age: Optional[float], sex: Optional[str],
+                    height_cm: Optional[float]) -> Optional[float]:
+    """Mifflin-St Jeor BMR; None if age, sex or height is missing (or sex is not male/female)"""
+    offset = MSJ_SEX_OFFSETS.get(str(sex).strip().lower()) if sex is not None else None
+    if offset is None or age is None or height_cm is None or math.isnan(age) or math.isnan(height_cm):
+        return None
+    return 10 * weight_kg + 6.25 * height_cm - 5 * age + offset
+
+
+def calculate_diet_plan(goal: str, current_weight: float, activity_level: str,
+                        target_weight: Optional[float] = None, meals_per_day: Optional[int] = None,
+                        age: Optional[float] = None, sex: Optional[str] = None,
+                        height_cm: Optional[float] = None) -> Dict:
+    """Calorie and macro targets for one person"""
+    bmr = mifflin_st_jeor(current_weight, age, sex, height_cm)
+    method = "mifflin_st_jeor"
+    if bmr is None:
+        bmr, method = current_weight * ESTIMATED_BMR_PER_KG, "estimate"
+    tdee = bmr * ACTIVITY_MULTIPLIERS.get(activity_level, DEFAULT_ACTIVITY_MULTIPLIER)
+    adjustment, protein_per_kg, fat_share = DIET_GOALS.get(goal, DIET_GOALS[DEFAULT_DIET_GOAL])
+
+    calories = tdee + adjustment
+    protein_g = current_weight * protein_per_kg
+    fat_calories = calories * fat_share
+    carb_g = (calories - protein_g * 4 - fat_calories) / 4
+
+    weeks = None
+    if target_weight is not None and adjustment and (target_weight - current_weight) * adjustment > 0:
+        weeks = round(abs(target_weight - current_weight) * KCAL_PER_KG / (abs(adjustment) * 7), 1)
+
+    return {
+        "bmr": round(bmr),
+        "bmr_method": method,
+        "tdee": round(tdee),
+        "daily_calories": round(calories),
+        "protein_g": round(protein_g),
+        "carbs_g": round(carb_g),
+        "fats_g": round(fat_calories / 9),
+        "calories_per_meal": round(calories / meals_per_day) if meals_per_day else None,
+        "protein_per_meal_g": round(protein_g / meals_per_day) if meals_per_day else None,
+        "weeks_to_target": weeks,
+    }
+
+
+def _lookup(labels, table: Dict[str, float], default: float, normalize: bool = False) -> np.ndarray:
+    """Map a column of labels through table by factorizing, so each distinct label is looked up once"""
+    import pandas as pd
+
+    # Series and Categoricals factorize as they are (categoricals reuse their codes)
+    if not isinstance(labels, (pd.Series, pd.Categorical)):
+        labels = np.asarray(labels, dtype=object)
+    codes, uniques = pd.factorize(labels)
+    keys = [str(u).strip().lower() if normalize else u for u in uniques]
+    values = np.array([table.get(k, default) for k in keys] + [default], dtype=np.float64)
+    # factorize marks missing labels with -1, which indexes the trailing default
+    return values[codes]
+
+
+def calculate_diet_plan_batch(goal: ArrayLike, current_weight: ArrayLike, activity_level: ArrayLike,
+                              target_weight: Optional[ArrayLike] = None,
+                              meals_per_day: Optional[ArrayLike] = None, age: Optional[ArrayLike] = None,
+                              sex: Optional[ArrayLike] = None,
+                              height_cm: Optional[ArrayLike] = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_diet_plan over a cohort
+
+    Returns a dict of equal-length arrays. Rows with age, sex and height
+    all present use Mifflin-St Jeor (mifflin_st_jeor is True); the rest
+    use the weight-only estimate. Optional outputs are NaN where they do
+    not apply. Values match calculate_diet_plan element-wise.
+    """
+    weight = np.asarray(current_weight, dtype=np.float64)
+    n = weight.shape[0]
+
+    def column(values, name):
+        if values is None:
+            return np.full(n, np.nan)
+        array = np.asarray(values, dtype=np.float64)
+        if array.shape != weight.shape:
+            raise ValueError(f"{name} must have the same shape as current_weight, got {array.shape}")
+        return array
+
+    target, meals, age_arr, height = (column(target_weight, "target_weight"), column(meals_per_day, "meals_per_day"),
+                                      column(age, "age"), column(height_cm, "height_cm"))
+    sex_offset = np.full(n, np.nan) if sex is None else _lookup(sex, MSJ_SEX_OFFSETS, np.nan, normalize=True)
+
+    mifflin = ~(np.isnan(age_arr) | np.isnan(height) | np.isnan(sex_offset))
+    bmr = np.where(mifflin, 10 * weight + 6.25 * height - 5 * age_arr + sex_offset, weight * ESTIMATED_BMR_PER_KG)
+    tdee = bmr * _lookup(activity_level, ACTIVITY_MULTIPLIERS, DEFAULT_ACTIVITY_MULTIPLIER)
+
+    adjustments, protein_per_kg, fat_shares = (np.array(values) for values in zip(*DIET_GOALS.values()))
+    codes = _lookup(goal, {name: i for i, name in enumerate(DIET_GOALS)},
+                    list(DIET_GOALS).index(DEFAULT_DIET_GOAL)).astype(np.intp)
+    adjustment = adjustments[codes]
+
+    calories = tdee + adjustment
+    protein_g = weight * protein_per_kg[codes]
+    fat_calories = calories * fat_shares[codes]
+    carb_g = (calories - protein_g * 4 - fat_calories) / 4
+
+    change = target - weight
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weeks = np.where(change * adjustment > 0, np.abs(change) * KCAL_PER_KG / (np.abs(adjustment) * 7), np.nan)
+        meals = np.where(meals > 0, meals, np.nan)
+        per_meal = calories / meals
+        protein_per_meal = protein_g / meals
+
+    return {
+        "bmr": np.round(bmr),
+        "mifflin_st_jeor": mifflin,
+        "tdee": np.round(tdee),
+        "daily_calories": np.round(calories),
+        "protein_g": np.round(protein_g),
+        "carbs_g": np.round(carb_g),
+        "fats_g": np.round(fat_calories / 9),
+        "calories_per_meal": np.round(per_meal),
+        "protein_per_meal_g": np.round(protein_per_meal),
+        "weeks_to_target": np.round(weeks, 1),
+    }
+
+
+def calculate_diet_plan_frame(df, goal_col: str = "goal", weight_col: str = "current_weight",
+                              activity_col: str = "activity_level", target_col: str = "target_weight",
+                              meals_col: str = "meals_per_day", age_col: str = "age", sex_col: str = "sex",
+                              height_col: str = "height_cm"):
+    """
+    Run calculate_diet_plan_batch over a pandas DataFrame of members
+
+    goal, current_weight and activity_level columns are required; the
+    others are used when present. Label columns stored as category dtype
+    skip the string hashing. Returns a new DataFrame of plan columns
+    aligned to the input index.
+    """
+    import pandas as pd
+
+    def optional(col):
+        return df[col].to_numpy(dtype=np.float64, na_value=np.nan) if col in df.columns else None
+
+    result = calculate_diet_plan_batch(
+        df[goal_col], df[weight_col].to_numpy(dtype=np.float64), df[activity_col],
+        target_weight=optional(target_col), meals_per_day=optional(meals_col), age=optional(age_col),
+        sex=df[sex_col] if sex_col in df.columns else None, height_cm=optional(height_col),
+    )
+    return pd.DataFrame(result, index=df.index)
@@ -0,0 +1,339 @@
+"""
+FitGenius local search
+
+BM25 search over the bundled corpus (search_corpus.CORPUS) for the
+fitness_search tool, with no network calls. Build time does all the
+scoring work it can: every posting stores its precomputed BM25 impact,
+so a query hashes its terms, binary-searches the sorted term hashes and
+sums the postings of the matched terms with one bincount.
+
+The index is a single file of flat arrays (term hashes, CSR postings,
+document categories and the documents' JSON) behind a small JSON header.
+SearchIndex.open maps it read-only with mmap, so opening is a header read
+and pages are loaded on first touch. load_or_build rebuilds the file when
+the corpus or BM25 parameters no longer match its fingerprint, and falls
+back to an in-memory index when the file cannot be written. Relative
+index paths live under cache_dir(), not the working directory.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import structlog
+
+from search_corpus import CATEGORIES, CORPUS
+
+logger = structlog.get_logger("fitgenius.search")
+
+FORMAT_VERSION = 1
+MAGIC = b"FGSEARCH"
+# magic, format version, header length
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+DEFAULT_MAX_RESULTS = 5
+# Title terms count this many times, so a match in the title outranks one in the summary
+TITLE_WEIGHT = 2
+
+CATEGORY_ALIASES = {
+    "exercise": "exercises",
+    "workout": "exercises",
+    "workouts": "exercises",
+    "training": "exercises",
+    "diet": "nutrition",
+    "food": "nutrition",
+    "supplement": "supplements",
+    "studies": "research",
+    "study": "research",
+    "science": "research",
+    "evidence": "research",
+}
+
+STOPWORDS = frozenset((
+    "a", "about", "an", "and", "are", "as", "at", "be", "best", "by", "can", "do", "does", "for", "from",
+    "good", "how", "i", "if", "in", "into", "is", "it", "its", "me", "my", "of", "on", "or", "should",
+    "than", "that", "the", "their", "this", "to", "under", "what", "when", "which", "while", "who", "why",
+    "with", "without", "you", "your",
+))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    # Plural folding only: "squats" matches "squat", "calories" matches "calorie"
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, plural-folded terms of text without stopwords"""
+    return [_stem(token) for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def term_hash(term: str) -> int:
+    """Stable 64-bit key of a term, as stored in the index"""
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def normalize_category(category: Optional[str]) -> Optional[str]:
+    """One of CATEGORIES, or None (search everything) for blank, "all" and unknown categories"""
+    token = (category or "").strip().lower()
+    token = CATEGORY_ALIASES.get(token, token)
+    return token if token in CATEGORIES else None
+
+
+def document_terms(document: Dict) -> List[str]:
+    return (tokenize(document["title"]) * TITLE_WEIGHT
+            + tokenize(" ".join(document.get("keywords", ())))
+            + tokenize(document["summary"]))
+
+
+def fingerprint(documents: Sequence[Dict], k1: float, b: float) -> str:
+    """Identifies an index build: format, BM25 parameters and corpus content"""
+    payload = json.dumps([FORMAT_VERSION, k1, b, TITLE_WEIGHT, list(documents)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchResult(NamedTuple):
+    """One ranked document"""
+    id: str
+    title: str
+    summary: str
+    source: str
+    category: str
+    score: float
+
+    def to_dict(self) -> Dict:
+        return {"title": self.title, "summary": self.summary, "source": self.source,
+                "category": self.category, "score": round(self.score, 3)}
+
+
+def serialize(documents: Sequence[Dict], k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> bytes:
+    """Build the BM25 index of documents in its on-disk format"""
+    counts = [Counter(document_terms(document)) for document in documents]
+    lengths = np.array([sum(c.values()) for c in counts], dtype=np.float64)
+    avgdl = float(lengths.mean()) if len(lengths) else 0.0
+    n_docs = len(documents)
+
+    postings: Dict[int, List] = {}
+    for doc, terms in enumerate(counts):
+        for term, tf in terms.items():
+            postings.setdefault(term_hash(term), []).append((doc, tf))
+
+    hashes = np.array(sorted(postings), dtype=np.uint64)
+    starts = np.zeros(len(hashes) + 1, dtype=np.int64)
+    docs, impacts = [], []
+    for i, key in enumerate(hashes.tolist()):
+        entries = postings[key]
+        df = len(entries)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        for doc, tf in entries:
+            norm = k1 * (1 - b + b * lengths[doc] / avgdl)
+            docs.append(doc)
+            impacts.append(idf * tf * (k1 + 1) / (tf + norm))
+        starts[i + 1] = len(docs)
+
+    blobs = [json.dumps({k: d[k] for k in ("id", "title", "summary", "source", "category")}).encode("utf-8")
+             for d in documents]
+    arrays = {
+        "term_hashes": hashes,
+        "term_starts": starts,
+        "post_docs": np.array(docs, dtype=np.int32),
+        "post_impacts": np.array(impacts, dtype=np.float32),
+        "doc_categories": np.array([CATEGORIES.index(d["category"]) for d in documents], dtype=np.uint8),
+        "doc_offsets": np.concatenate([[0], np.cumsum([len(blob) for blob in blobs])]).astype(np.int64),
+        "doc_blob": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+    }
+
+    # Array offsets are relative to the data section, which starts after the header
+    layout, offset = {}, 0
+    for name, array in arrays.items():
+        layout[name] = [offset, array.dtype.str, len(array)]
+        offset = _aligned(offset + array.nbytes)
+    header = json.dumps({"fingerprint": fingerprint(documents, k1, b), "documents": n_docs,
+                         "terms": len(hashes), "postings": len(docs), "arrays": layout}).encode("utf-8")
+    data_start = _aligned(_PREAMBLE.size + len(header))
+
+    out = bytearray(data_start + offset)
+    _PREAMBLE.pack_into(out, 0, MAGIC, FORMAT_VERSION, len(header))
+    out[_PREAMBLE.size:_PREAMBLE.size + len(header)] = header
+    for name, array in arrays.items():
+        start = data_start + layout[name][0]
+        out[start:start + array.nbytes] = array.tobytes()
+    return bytes(out)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+class SearchIndex:
+    """A BM25 index over an in-memory or memory-mapped buffer"""
+
+    def __init__(self, buffer, path: Optional[str] = None):
+        magic, version, header_len = _PREAMBLE.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a version {FORMAT_VERSION} FitGenius search index")
+        self.header = json.loads(bytes(buffer[_PREAMBLE.size:_PREAMBLE.size + header_len]))
+        self.path = path
+        self._buffer = buffer
+        data_start = _aligned(_PREAMBLE.size + header_len)
+        arrays = {
+            name: np.frombuffer(buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (offset, dtype, count) in self.header["arrays"].items()
+        }
+        self.term_hashes = arrays["term_hashes"]
+        self.term_starts = arrays["term_starts"]
+        self.post_docs = arrays["post_docs"]
+        self.post_impacts = arrays["post_impacts"]
+        self.doc_categories = arrays["doc_categories"]
+        self.doc_offsets = arrays["doc_offsets"]
+        self.doc_blob = arrays["doc_blob"]
+
+    @classmethod
+    def build(cls, documents: Sequence[Dict] = CORPUS, k1: float = DEFAULT_K1,
+              b: float = DEFAULT_B) -> "SearchIndex":
+        """In-memory index of documents"""
+        return cls(serialize(documents, k1, b))
+
+    @classmethod
+    def open(cls, path: str) -> "SearchIndex":
+        """Memory-map an index file written by write_index"""
+        with open(path, "rb") as f:
+            # The mapping stays valid after the file is closed
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(buffer, path)
+        except (ValueError, KeyError, struct.error):
+            buffer.close()
+            raise
+
+    @property
+    def fingerprint(self) -> str:
+        return self.header["fingerprint"]
+
+    def __len__(self) -> int:
+        return self.header["documents"]
+
+    def document(self, doc: int) -> Dict:
+        start, end = self.doc_offsets[doc], self.doc_offsets[doc + 1]
+        return json.loads(self.doc_blob[start:end].tobytes())
+
+    def scores(self, query: str, category: Optional[str] = None) -> np.ndarray:
+        """BM25 score of every document for query (0 for non-matches and other categories)"""
+        terms = {term_hash(term) for term in tokenize(query)}
+        scores = np.zeros(len(self), dtype=np.float64)
+        if not terms or not len(self.term_hashes):
+            return scores
+        keys = np.fromiter(terms, dtype=np.uint64, count=len(terms))
+        positions = np.searchsorted(self.term_hashes, keys)
+        in_range = positions < len(self.term_hashes)
+        positions, keys = positions[in_range], keys[in_range]
+        found = positions[self.term_hashes[positions] == keys]
+        if not len(found):
+            return scores
+        slices = [slice(self.term_starts[p], self.term_starts[p + 1]) for p in found.tolist()]
+        docs = np.concatenate([self.post_docs[s] for s in slices])
+        impacts = np.concatenate([self.post_impacts[s] for s in slices])
+        scores = np.bincount(docs, weights=impacts, minlength=len(self))
+        category = normalize_category(category)
+        if category is not None:
+            scores[self.doc_categories != CATEGORIES.index(category)] = 0.0
+        return scores
+
+    def search(self, query: str, category: Optional[str] = None,
+               k: int = DEFAULT_MAX_RESULTS) -> List[SearchResult]:
+        """Top-k documents for query, best first; category narrows to one of CATEGORIES"""
+        scores = self.scores(query, category)
+        matches = np.flatnonzero(scores > 0)
+        if k <= 0 or not len(matches):
+            return []
+        if len(matches) > k:
+            matches = matches[np.argpartition(-scores[matches], k - 1)[:k]]
+        # Best score first, corpus order between ties
+        matches = matches[np.lexsort((matches, -scores[matches]))]
+        return [SearchResult(score=float(scores[doc]), **self.document(doc)) for doc in matches.tolist()]
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            # Drop the array views first; an mmap with exported buffers cannot close
+            self.term_hashes = self.term_starts = self.post_docs = self.post_impacts = None
+            self.doc_categories = self.doc_offsets = self.doc_blob = None
+            self._buffer.close()
+
+
+def cache_dir() -> str:
+    """FITGENIUS_CACHE_DIR, else fitgenius under $XDG_CACHE_HOME (default ~/.cache)"""
+    configured = os.environ.get("FITGENIUS_CACHE_DIR")
+    if configured:
+        return os.path.expanduser(configured)
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "fitgenius")
+
+
+def resolve_index_path(path: Optional[str]) -> Optional[str]:
+    """The configured index path, with relative paths placed under cache_dir()"""
+    if not path:
+        return None
+    path = os.path.expanduser(path)
+    return path if os.path.isabs(path) else os.path.join(cache_dir(), path)
+
+
+def write_index(path: str, documents: Sequence[Dict] = CORPUS, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+    """Build the index of documents and write it to path atomically"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(serialize(documents, k1, b))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_or_build(path: Optional[str] = None, documents: Sequence[Dict] = CORPUS,
+                  k1: float = DEFAULT_K1, b: float = DEFAULT_B) -> SearchIndex:
+    """
+    Open the index file at path, (re)building it first when it is missing,
+    unreadable or built from a different corpus; with no path, or when the
+    file cannot be written, build in memory
+    """
+    if path is None:
+        return SearchIndex.build(documents, k1, b)
+    expected = fingerprint(documents, k1, b)
+    try:
+        index = SearchIndex.open(path)
+        if index.fingerprint == expected:
+            return index
+        index.close()
+    except (OSError, ValueError, KeyError, struct.error):
+        pass
+    try:
+        write_index(path, documents, k1, b)
+        return SearchIndex.open(path)
+    except OSError as exc:
+        # A read-only or full filesystem costs the mmap, not the search tool
+        logger.warning("search index file not writable; using an in-memory index", path=path, error=str(exc))
+        return SearchIndex.build(documents, k1, b)
+
+
+def create_search_index(settings: Optional[Dict] = None) -> SearchIndex:
+    """SearchIndex from the search config section"""
+    settings = settings or {}
+    return load_or_build(resolve_index_path(settings.get("index_path")), k1=settings.get("k1", DEFAULT_K1),
+                         b=settings.get("b", DEFAULT_B))
+
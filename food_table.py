@@ -0,0 +1,241 @@
+"""
+FitGenius food table
+
+The bundled foods the meal planner builds menus from, stored column-wise
+as compact typed arrays: one float32 (foods, 3) matrix of protein, carbs
+and fat per serving, float32 calories, and small integer bitmasks for what
+a food contains (MEAT, DAIRY, GLUTEN, ...), which meals it suits and its role in a
+meal. A dietary restriction is a bitmask of contents it rules out, so
+filtering the table is one vectorized AND.
+
+Values are per serving, rounded from USDA FoodData Central entries.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+
+# What a food contains (bit flags)
+MEAT = 1 << 0
+PORK = 1 << 1
+FISH = 1 << 2
+SHELLFISH = 1 << 3
+DAIRY = 1 << 4
+LACTOSE = 1 << 5  # dairy with meaningful lactose (aged cheese and whey isolate have little)
+EGG = 1 << 6
+GLUTEN = 1 << 7
+TREE_NUT = 1 << 8
+PEANUT = 1 << 9
+SOY = 1 << 10
+
+# Meals a food suits (bit flags)
+BREAKFAST = 1 << 0
+MAIN = 1 << 1  # lunch and dinner
+SNACK = 1 << 2
+
+SLOT_FLAGS = {"breakfast": BREAKFAST, "lunch": MAIN, "dinner": MAIN, "snack": SNACK}
+
+ROLES = ("protein", "carb", "fruit", "fat", "veg")
+
+ANIMAL = MEAT | PORK | FISH | SHELLFISH
+# Restriction -> contents it rules out
+RESTRICTIONS = {
+    "vegetarian": ANIMAL,
+    "pescatarian": MEAT | PORK,
+    "vegan": ANIMAL | DAIRY | LACTOSE | EGG,
+    "dairy_free": DAIRY | LACTOSE,
+    "lactose_free": LACTOSE,
+    "gluten_free": GLUTEN,
+    "nut_free": TREE_NUT | PEANUT,
+    "tree_nut_free": TREE_NUT,
+    "peanut_free": PEANUT,
+    "egg_free": EGG,
+    "soy_free": SOY,
+    "fish_free": FISH,
+    "shellfish_free": SHELLFISH,
+    "pork_free": PORK,
+    "halal": PORK,
+    "kosher": PORK | SHELLFISH,
+}
+
+RESTRICTION_ALIASES = {
+    "veggie": "vegetarian",
+    "plant_based": "vegan",
+    "celiac": "gluten_free",
+    "coeliac": "gluten_free",
+}
+
+# Allergen words that name a restriction differently ("milk allergy" -> dairy_free)
+ALLERGEN_SYNONYMS = {
+    "milk": "dairy",
+    "wheat": "gluten",
+    "nuts": "nut",
+    "tree_nuts": "tree_nut",
+}
+
+# "no_dairy", "without_gluten", "dairy_allergy", "gluten_intolerance" and
+# "allergic_to_peanuts" all read as the <allergen>_free restriction
+_RESTRICTION_PREFIXES = ("no_", "without_", "allergic_to_", "allergy_to_", "intolerant_to_")
+_RESTRICTION_SUFFIXES = ("_allergy", "_allergies", "_allergic", "_intolerance", "_intolerant",
+                         "_sensitivity", "_free")
+
+
+class Food(NamedTuple):
+    """One food as written in the literal below; FoodTable stores them column-wise"""
+    name: str
+    grams: float  # serving size
+    calories: float
+    protein_g: float
+    carbs_g: float
+    fat_g: float
+    role: str
+    slots: int
+    contains: int = 0
+
+
+_FOODS: Tuple[Food, ...] = (
+    # Protein sources
+    Food("Chicken breast", 100, 165, 31, 0, 3.6, "protein", MAIN, MEAT),
+    Food("Turkey breast", 100, 135, 30, 0, 1, "protein", MAIN, MEAT),
+    Food("Lean beef", 100, 217, 26, 0, 12, "protein", MAIN, MEAT),
+    Food("Pork tenderloin", 100, 143, 26, 0, 3.5, "protein", MAIN, MEAT | PORK),
+    Food("Salmon", 100, 206, 22, 0, 12, "protein", MAIN, FISH),
+    Food("Cod", 100, 105, 23, 0, 0.9, "protein", MAIN, FISH),
+    Food("Tuna (canned in water)", 100, 116, 26, 0, 1, "protein", MAIN | SNACK, FISH),
+    Food("Shrimp", 100, 99, 24, 0.2, 0.3, "protein", MAIN, SHELLFISH),
+    Food("Eggs", 100, 143, 12.6, 0.7, 9.5, "protein", BREAKFAST | MAIN, EGG),
+    Food("Egg whites", 100, 52, 11, 0.7, 0.2, "protein", BREAKFAST, EGG),
+    Food("Greek yogurt (nonfat)", 170, 100, 17, 6, 0.7, "protein", BREAKFAST | SNACK, DAIRY | LACTOSE),
+    Food("Cottage cheese (1%)", 113, 81, 14, 3, 1.2, "protein", BREAKFAST | SNACK, DAIRY | LACTOSE),
+    Food("Whey protein isolate", 30, 110, 25, 1, 0.5, "protein", BREAKFAST | SNACK, DAIRY),
+    Food("Pea protein", 30, 120, 24, 1, 2, "protein", BREAKFAST | SNACK),
+    Food("Firm tofu", 100, 144, 17.3, 2.8, 8.7, "protein", BREAKFAST | MAIN, SOY),
+    Food("Tempeh", 100, 192, 20, 7.6, 10.8, "protein", MAIN, SOY),
+    Food("Seitan", 100, 120, 21, 4, 2, "protein", MAIN, GLUTEN),
+    Food("Edamame", 155, 188, 18.5, 13.8, 8, "protein", MAIN | SNACK, SOY),
+    # Starches and legumes
+    Food("Rolled oats", 40, 150, 5, 27, 2.5, "carb", BREAKFAST, GLUTEN),
+    Food("Whole grain bread", 64, 160, 8, 28, 2, "carb", BREAKFAST | MAIN | SNACK, GLUTEN),
+    Food("Brown rice", 150, 168, 3.5, 35, 1.2, "carb", MAIN),
+    Food("White rice", 150, 195, 4, 42, 0.4, "carb", MAIN),
+    Food("Quinoa", 150, 180, 6.6, 32, 2.9, "carb", MAIN),
+    Food("Whole wheat pasta", 140, 174, 7.5, 37, 0.8, "carb", MAIN, GLUTEN),
+    Food("Sweet potato", 150, 135, 3, 31, 0.2, "carb", MAIN),
+    Food("Potato", 200, 186, 5, 42, 0.2, "carb", MAIN),
+    Food("Lentils", 150, 174, 13.5, 30, 0.6, "carb", MAIN),
+    Food("Chickpeas", 150, 246, 13, 41, 3.9, "carb", MAIN),
+    Food("Black beans", 150, 198, 13, 36, 0.8, "carb", MAIN),
+    Food("Corn tortillas", 52, 114, 3, 23, 1.5, "carb", BREAKFAST | MAIN),
+    Food("Rice cakes", 18, 70, 1.4, 14.7, 0.5, "carb", SNACK),
+    # Fruit
+    Food("Banana", 118, 105, 1.3, 27, 0.4, "fruit", BREAKFAST | SNACK),
+    Food("Apple", 182, 95, 0.5, 25, 0.3, "fruit", BREAKFAST | SNACK),
+    Food("Blueberries", 148, 84, 1.1, 21, 0.5, "fruit", BREAKFAST | SNACK),
+    Food("Orange", 131, 62, 1.2, 15.4, 0.2, "fruit", SNACK),
+    # Vegetables (one serving with every main meal)
+    Food("Broccoli", 150, 52, 3.6, 10.5, 0.6, "veg", MAIN),
+    Food("Green beans", 125, 44, 2.4, 10, 0.3, "veg", MAIN),
+    Food("Spinach", 100, 23, 2.9, 3.6, 0.4, "veg", MAIN),
+    Food("Mixed salad greens", 100, 20, 1.5, 3.5, 0.2, "veg", MAIN),
+    Food("Roasted peppers and zucchini", 150, 45, 1.8, 9, 0.5, "veg", MAIN),
+    # Fats
+    Food("Olive oil", 13.5, 119, 0, 0, 13.5, "fat", MAIN),
+    Food("Avocado", 68, 109, 1.4, 5.8, 10, "fat", BREAKFAST | MAIN),
+    Food("Almonds", 28, 164, 6, 6, 14, "fat", BREAKFAST | SNACK, TREE_NUT),
+    Food("Walnuts", 28, 185, 4.3, 3.9, 18.5, "fat", BREAKFAST | SNACK, TREE_NUT),
+    Food("Peanut butter", 32, 188, 8, 6, 16, "fat", BREAKFAST | SNACK, PEANUT),
+    Food("Chia seeds", 15, 73, 2.5, 6.3, 4.6, "fat", BREAKFAST | SNACK),
+    Food("Pumpkin seeds", 28, 163, 8.5, 4.2, 13.9, "fat", BREAKFAST | SNACK),
+    Food("Cheddar cheese", 28, 114, 7, 0.4, 9.4, "fat", MAIN | SNACK, DAIRY),
+)
+
+
+def _normalize_restriction(value: str) -> str:
+    token = re.sub(r"[^a-z0-9]+", "_", str(value).strip().lower()).strip("_")
+    token = RESTRICTION_ALIASES.get(token, token)
+    if token in RESTRICTIONS:
+        return token
+    base = token
+    for prefix in _RESTRICTION_PREFIXES:
+        if base.startswith(prefix):
+            base = base[len(prefix):]
+            break
+    else:
+        for suffix in _RESTRICTION_SUFFIXES:
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+                break
+        else:
+            return token
+    for candidate in (base, base.rstrip("s")):
+        candidate = ALLERGEN_SYNONYMS.get(candidate, candidate) + "_free"
+        if candidate in RESTRICTIONS:
+            return candidate
+    return token
+
+
+def restriction_mask(restrictions: Iterable[str]) -> Tuple[int, List[str], List[str]]:
+    """The contents bitmask restrictions rule out, the recognized restriction names and the rest"""
+    mask = 0
+    applied: List[str] = []
+    unknown: List[str] = []
+    for restriction in restrictions or ():
+        token = _normalize_restriction(restriction)
+        if token in RESTRICTIONS:
+            mask |= RESTRICTIONS[token]
+            if token not in applied:
+                applied.append(token)
+        elif token:
+            unknown.append(restriction)
+    return mask, applied, unknown
+
+
+class FoodTable:
+    """Column-wise foods: names plus typed arrays indexed by food"""
+
+    def __init__(self, foods: Iterable[Food]):
+        foods = tuple(foods)
+        self.names: Tuple[str, ...] = tuple(f.name for f in foods)
+        self.grams = np.array([f.grams for f in foods], dtype=np.float32)
+        self.calories = np.array([f.calories for f in foods], dtype=np.float32)
+        # protein, carbs, fat (g per serving)
+        self.macros = np.array([(f.protein_g, f.carbs_g, f.fat_g) for f in foods],
+                               dtype=np.float32).reshape(len(foods), 3)
+        self.contains = np.array([f.contains for f in foods], dtype=np.uint16)
+        self.slots = np.array([f.slots for f in foods], dtype=np.uint8)
+        self.roles = np.array([ROLES.index(f.role) for f in foods], dtype=np.uint8)
+        for array in (self.grams, self.calories, self.macros, self.contains, self.slots, self.roles):
+            array.setflags(write=False)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.grams, self.calories, self.macros, self.contains, self.slots, self.roles))
+
+    def allowed(self, mask: int) -> np.ndarray:
+        """Foods containing nothing in mask"""
+        return (self.contains & np.uint16(mask)) == 0
+
+    def candidates(self, mask: int, slot: str, roles: Iterable[str]) -> np.ndarray:
+        """Indices of allowed foods for a meal slot with one of roles"""
+        role_codes = [ROLES.index(role) for role in roles]
+        selected = (self.allowed(mask) & ((self.slots & np.uint8(SLOT_FLAGS[slot])) != 0)
+                    & np.isin(self.roles, role_codes))
+        return np.flatnonzero(selected)
+
+    def row(self, index: int) -> Dict:
+        return {
+            "name": self.names[index],
+            "grams": float(self.grams[index]),
+            "calories": float(self.calories[index]),
+            "protein_g": float(self.macros[index, 0]),
+            "carbs_g": float(self.macros[index, 1]),
+            "fat_g": float(self.macros[index, 2]),
+            "role": ROLES[self.roles[index]],
+        }
+
+
+FOODS = FoodTable(_FOODS)
@@ -0,0 +1,175 @@
+"""
+FitGenius image preprocessing
+
+Normalizes uploaded photos before they are sent to Claude Vision: the real
+format is sniffed from the bytes, EXIF metadata (including GPS) is
+stripped, the image is downsized to the model's useful resolution and
+re-encoded as JPEG. Each call reports the bytes and estimated latency saved.
+"""
+
+import base64
+import io
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from analysis_cache import decode_image
+
+# Claude downscales anything with a long edge over 1568px or more than
+# ~1600 image tokens (~1.2 megapixels) server-side, after we have paid to
+# upload it. Resizing to the same bounds locally loses nothing.
+DEFAULT_MAX_DIMENSION = 1568
+DEFAULT_MAX_PIXELS = 1_200_000
+DEFAULT_QUALITY = 85
+MIN_QUALITY = 45
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+# Assumed client/server uplink used to estimate upload time saved (10 Mbit/s)
+DEFAULT_UPLOAD_BYTES_PER_SEC = 1.25e6
+
+MEDIA_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+    # Multi-picture JPEG from phone and stereo cameras; re-encoded to its first picture
+    "MPO": "image/jpeg",
+}
+
+
+def fit_dimensions(width: int, height: int, max_dimension: int = DEFAULT_MAX_DIMENSION,
+                   max_pixels: int = DEFAULT_MAX_PIXELS) -> Tuple[int, int]:
+    """Largest size with the same aspect ratio inside both bounds"""
+    scale = min(1.0, max_dimension / max(width, height), (max_pixels / (width * height)) ** 0.5)
+    if scale >= 1.0:
+        return width, height
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Approximate billed Claude image tokens (width * height / 750 after API downscaling)"""
+    width, height = fit_dimensions(width, height)
+    return int(round(width * height / 750))
+
+
+class PreprocessedImage(NamedTuple):
+    """Result of preprocess_image"""
+    data: str  # base64
+    media_type: str
+    original_format: str
+    original_bytes: int
+    final_bytes: int
+    original_size: Tuple[int, int]
+    final_size: Tuple[int, int]
+    processing_seconds: float
+    upload_bytes_per_sec: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.final_bytes
+
+    @property
+    def image_tokens_saved(self) -> int:
+        return estimate_image_tokens(*self.original_size) - estimate_image_tokens(*self.final_size)
+
+    def report(self) -> Dict:
+        """Per-request savings summary"""
+        upload_saved_ms = self.bytes_saved / self.upload_bytes_per_sec * 1000
+        processing_ms = self.processing_seconds * 1000
+        return {
+            "original_format": self.original_format,
+            "original_bytes": self.original_bytes,
+            "final_bytes": self.final_bytes,
+            "bytes_saved": self.bytes_saved,
+            "original_size": list(self.original_size),
+            "final_size": list(self.final_size),
+            "image_tokens_saved": self.image_tokens_saved,
+            "processing_ms": round(processing_ms, 2),
+            "estimated_upload_ms_saved": round(upload_saved_ms, 2),
+            "estimated_latency_saved_ms": round(upload_saved_ms - processing_ms, 2),
+        }
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    if image.mode == "RGB":
+        return image
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        # JPEG has no alpha; flatten onto white rather than black
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def preprocess_image(
+    image_data: str,
+    max_dimension: int = DEFAULT_MAX_DIMENSION,
+    max_pixels: int = DEFAULT_MAX_PIXELS,
+    quality: int = DEFAULT_QUALITY,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    upload_bytes_per_sec: float = DEFAULT_UPLOAD_BYTES_PER_SEC,
+) -> PreprocessedImage:
+    """
+    Sniff, strip, downsize and re-encode a base64 image
+
+    Raises ValueError if the data is not a supported image or cannot be
+    brought under max_bytes.
+    """
+    started = time.perf_counter()
+    raw = decode_image(image_data)
+
+    try:
+        image = Image.open(io.BytesIO(raw))
+        original_format = image.format
+        original_size = image.size
+        if original_format not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported image format: {original_format}")
+        had_exif = bool(image.info.get("exif")) or bool(image.getexif())
+        target_size = fit_dimensions(*original_size, max_dimension, max_pixels)
+        resized = target_size != original_size
+        if resized and original_format in ("JPEG", "MPO"):
+            # Let the decoder skip detail we are about to throw away
+            image.draft("RGB", target_size)
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"image_data is not a readable image: {exc}") from exc
+
+    if resized:
+        image = image.resize(target_size, Image.LANCZOS)
+    # Apply the EXIF orientation before the metadata is dropped
+    image = _to_rgb(ImageOps.exif_transpose(image))
+
+    encoded = _encode_jpeg(image, quality)
+    media_type = "image/jpeg"
+
+    if not resized and not had_exif and original_format != "MPO" and len(raw) <= len(encoded):
+        # Already small and clean: re-encoding would only cost quality
+        encoded, media_type = raw, MEDIA_TYPES[original_format]
+
+    while max_bytes is not None and len(encoded) > max_bytes and quality > MIN_QUALITY:
+        quality = max(quality - 10, MIN_QUALITY)
+        encoded, media_type = _encode_jpeg(image, quality), "image/jpeg"
+    if max_bytes is not None and len(encoded) > max_bytes:
+        raise ValueError(
+            f"Image is {len(encoded) / 1048576:.1f}MB after preprocessing; limit is {max_bytes / 1048576:.1f}MB"
+        )
+
+    final_size = image.size if media_type == "image/jpeg" else original_size
+    return PreprocessedImage(
+        data=base64.b64encode(encoded).decode("ascii"),
+        media_type=media_type,
+        original_format=original_format,
+        original_bytes=len(raw),
+        final_bytes=len(encoded),
+        original_size=original_size,
+        final_size=final_size,
+        processing_seconds=time.perf_counter() - started,
+        upload_bytes_per_sec=upload_bytes_per_sec,
+    )
@@ -0,0 +1,166 @@
+"""
+FitGenius meal planner
+
+Builds a day of meals from food_table.FOODS that hits the diet plan's
+macro targets. Each meal slot has a composition (breakfast: a protein, a
+starch or fruit and a fat; lunch and dinner: a protein, a starch and a fat
+plus a fixed serving of vegetables; snacks: a protein, fruit or a starch
+and a fat); a food whose portion rounds to nothing is dropped, so low-carb
+days are not forced up by a starch. For every combination of allowed foods
+the portion sizes are solved at once as a batched, ridge-regularized
+least-squares fit on the relative macro error, rounded to quarter
+servings, and the combination with the smallest error wins. Foods already
+used that day are penalized so the menu varies.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from food_table import FOODS, FoodTable, restriction_mask
+
+# Share of the day's macros per meal, by meals per day
+MEAL_LAYOUTS = {
+    1: (("dinner", 1.0),),
+    2: (("breakfast", 0.45), ("dinner", 0.55)),
+    3: (("breakfast", 0.3), ("lunch", 0.35), ("dinner", 0.35)),
+    4: (("breakfast", 0.25), ("lunch", 0.3), ("snack", 0.15), ("dinner", 0.3)),
+    5: (("breakfast", 0.22), ("snack", 0.1), ("lunch", 0.28), ("snack", 0.1), ("dinner", 0.3)),
+    6: (("breakfast", 0.2), ("snack", 0.1), ("lunch", 0.25), ("snack", 0.1), ("dinner", 0.25), ("snack", 0.1)),
+}
+DEFAULT_MEALS_PER_DAY = 3
+
+# One food is chosen from each role group
+MEAL_COMPOSITION = {
+    "breakfast": (("protein",), ("carb", "fruit"), ("fat",)),
+    "lunch": (("protein",), ("carb",), ("fat",)),
+    "dinner": (("protein",), ("carb",), ("fat",)),
+    "snack": (("protein",), ("fruit", "carb"), ("fat",)),
+}
+VEGETABLE_SLOTS = ("lunch", "dinner")
+
+MIN_SERVINGS = 0.0  # a food the fit rounds to nothing is left out of the meal
+MAX_SERVINGS = 4.0
+SERVING_STEP = 0.25
+DEFAULT_TOLERANCE = 0.1  # largest relative miss per macro for a meal to count as on target
+REPEAT_PENALTY = 0.02  # squared-error cost per food already used today
+UNRECOGNIZED_WARNING = ("Dietary restriction(s) {} were not recognized and NOT applied: "
+                        "this plan may contain foods they rule out")
+_RIDGE = 1e-3
+
+
+def _combinations(groups: Sequence[np.ndarray]) -> np.ndarray:
+    """Every way to pick one food per group, as a (combinations, groups) index array"""
+    grids = np.meshgrid(*groups, indexing="ij")
+    return np.stack([grid.ravel() for grid in grids], axis=1)
+
+
+def fit_portions(table: FoodTable, combos: np.ndarray, target: np.ndarray,
+                 fixed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Servings of each food in every combination that best reach target
+    (protein, carbs, fat) on top of fixed; returns (servings, achieved, error)
+    where error is the sum of squared relative macro misses
+    """
+    fixed = np.zeros(3) if fixed is None else fixed
+    scale = 1.0 / np.maximum(target, 1.0)
+    foods = table.macros[combos].astype(np.float64)  # (combos, foods, macros)
+    design = foods.transpose(0, 2, 1) * scale[None, :, None]  # (combos, macros, foods)
+    wanted = (target - fixed) * scale
+
+    gram = design.transpose(0, 2, 1) @ design + _RIDGE * np.eye(combos.shape[1])
+    rhs = design.transpose(0, 2, 1) @ wanted
+    servings = np.linalg.solve(gram, rhs[..., None])[..., 0]
+    servings = np.clip(np.round(servings / SERVING_STEP) * SERVING_STEP, MIN_SERVINGS, MAX_SERVINGS)
+
+    achieved = fixed + np.einsum("nf,nfm->nm", servings, foods)
+    error = (((achieved - target) * scale) ** 2).sum(axis=1)
+    return servings, achieved, error
+
+
+def _portion(table: FoodTable, food: int, servings: float) -> Dict:
+    return {
+        "food": table.names[food],
+        "servings": servings,
+        "amount_g": int(round(float(table.grams[food]) * servings)),
+        "calories": int(round(float(table.calories[food]) * servings)),
+        "protein_g": round(float(table.macros[food, 0]) * servings, 1),
+        "carbs_g": round(float(table.macros[food, 1]) * servings, 1),
+        "fat_g": round(float(table.macros[food, 2]) * servings, 1),
+    }
+
+
+def _totals(portions: List[Dict]) -> Dict:
+    return {
+        "calories": sum(p["calories"] for p in portions),
+        "protein_g": round(sum(p["protein_g"] for p in portions), 1),
+        "carbs_g": round(sum(p["carbs_g"] for p in portions), 1),
+        "fat_g": round(sum(p["fat_g"] for p in portions), 1),
+    }
+
+
+def _macros(values: np.ndarray) -> Dict:
+    return {"protein_g": round(float(values[0]), 1), "carbs_g": round(float(values[1]), 1),
+            "fat_g": round(float(values[2]), 1)}
+
+
+def plan_day(calories: float, protein_g: float, carbs_g: float, fat_g: float,
+             meals_per_day: Optional[int] = DEFAULT_MEALS_PER_DAY, restrictions: Iterable[str] = (),
+             tolerance: float = DEFAULT_TOLERANCE, table: FoodTable = FOODS) -> Dict:
+    """
+    A day of meals whose portions match the macro targets, avoiding restricted foods
+
+    Restrictions the food table cannot map are listed in
+    unrecognized_restrictions and named in warnings.
+    """
+    meals_per_day = min(max(int(meals_per_day or DEFAULT_MEALS_PER_DAY), 1), max(MEAL_LAYOUTS))
+    mask, applied, unknown = restriction_mask(restrictions)
+    daily = np.array([protein_g, max(carbs_g, 0.0), fat_g], dtype=np.float64)
+    used = np.zeros(len(table), dtype=np.float64)
+
+    meals = []
+    vegetables_served = 0
+    for slot, share in MEAL_LAYOUTS[meals_per_day]:
+        target = daily * share
+        fixed = np.zeros(3)
+        portions = []
+        if slot in VEGETABLE_SLOTS:
+            vegetables = table.candidates(mask, slot, ("veg",))
+            if len(vegetables):
+                # Rotate so lunch and dinner get different vegetables
+                veg = int(vegetables[vegetables_served % len(vegetables)])
+                vegetables_served += 1
+                fixed = table.macros[veg].astype(np.float64)
+                portions.append(_portion(table, veg, 1.0))
+
+        groups = [table.candidates(mask, slot, roles) for roles in MEAL_COMPOSITION[slot]]
+        groups = [group for group in groups if len(group)]
+        if groups:
+            combos = _combinations(groups)
+            servings, achieved, error = fit_portions(table, combos, target, fixed)
+            best = int(np.argmin(error + REPEAT_PENALTY * used[combos].sum(axis=1)))
+            used[combos[best]] += 1
+            portions = [_portion(table, int(food), float(amount))
+                        for food, amount in zip(combos[best], servings[best]) if amount > 0] + portions
+            miss = np.abs(achieved[best] - target) / np.maximum(target, 1.0)
+        else:
+            miss = np.ones(3)
+
+        meals.append({
+            "meal": slot,
+            "foods": portions,
+            "totals": _totals(portions),
+            "target": _macros(target),
+            "within_tolerance": bool(miss.max() <= tolerance),
+        })
+
+    totals = _totals([p for meal in meals for p in meal["foods"]])
+    return {
+        "meals": meals,
+        "totals": totals,
+        "target": dict(calories=int(round(calories)), **_macros(daily)),
+        "within_tolerance": all(meal["within_tolerance"] for meal in meals),
+        "restrictions": applied,
+        "unrecognized_restrictions": unknown,
+        "warnings": [UNRECOGNIZED_WARNING.format(", ".join(map(repr, unknown)))] if unknown else [],
+    }
@@ -0,0 +1,142 @@
+"""
+FitGenius progress photo storage
+
+Progress photos go to S3 under a content-hash key,
+{image_prefix}{user_id}/{sha256}.{ext}, and only that key is kept on the
+DynamoDB progress item. Re-uploading an identical photo is skipped after a
+HEAD request (or no request at all, for keys this process already wrote).
+Large photos are sent as parallel multipart uploads through boto3's
+managed transfer.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple
+
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from PIL import Image
+
+from analysis_cache import decode_image
+from image_preprocessing import MEDIA_TYPES
+
+DEFAULT_PREFIX = "progress/"
+# S3 parts must be at least 5 MB; below the threshold one PutObject is cheaper
+DEFAULT_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_KNOWN_KEYS = 10_000
+
+# MPO (multi-picture camera JPEG) is stored as-is; it is a JPEG file to any viewer
+EXTENSIONS = {"JPEG": "jpg", "MPO": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+
+class StoredPhoto(NamedTuple):
+    """Where a photo was stored and whether this call uploaded it"""
+    key: str
+    size: int
+    media_type: str
+    uploaded: bool  # False when an identical photo was already stored
+
+
+def sniff_format(raw: bytes) -> str:
+    """Image format from the header bytes; raises ValueError for anything unsupported"""
+    try:
+        image_format = Image.open(io.BytesIO(raw)).format
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"progress_image is not a readable image: {exc}") from exc
+    if image_format not in EXTENSIONS:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return image_format
+
+
+class PhotoStore:
+    """Content-addressed progress photos in one S3 bucket"""
+
+    def __init__(self, s3, bucket: str, prefix: str = DEFAULT_PREFIX,
+                 multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD, part_size: int = DEFAULT_PART_SIZE,
+                 known_keys: int = DEFAULT_KNOWN_KEYS):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.multipart_threshold = multipart_threshold
+        self.transfer_config = TransferConfig(multipart_threshold=multipart_threshold,
+                                              multipart_chunksize=part_size)
+        # Keys known to exist, so repeat uploads skip the HEAD request too
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._known_max = known_keys
+        self._lock = threading.Lock()
+
+        self.uploads = 0
+        self.multipart_uploads = 0
+        self.deduplicated = 0
+        self.bytes_uploaded = 0
+
+    def photo_key(self, user_id: str, digest: str, image_format: str) -> str:
+        return f"{self.prefix}{user_id}/{digest}.{EXTENSIONS[image_format]}"
+
+    def put(self, user_id: str, image_data: str) -> StoredPhoto:
+        """Store a base64 photo for user_id unless an identical one is already there"""
+        raw = decode_image(image_data)
+        image_format = sniff_format(raw)
+        digest = hashlib.sha256(raw).hexdigest()
+        key = self.photo_key(user_id, digest, image_format)
+        media_type = MEDIA_TYPES[image_format]
+
+        if self._is_known(key) or self.exists(key):
+            self._remember(key)
+            with self._lock:
+                self.deduplicated += 1
+            return StoredPhoto(key, len(raw), media_type, uploaded=False)
+
+        self.s3.upload_fileobj(
+            io.BytesIO(raw), self.bucket, key,
+            ExtraArgs={"ContentType": media_type, "Metadata": {"sha256": digest}},
+            Config=self.transfer_config,
+        )
+        self._remember(key)
+        with self._lock:
+            self.uploads += 1
+            self.multipart_uploads += len(raw) >= self.multipart_threshold
+            self.bytes_uploaded += len(raw)
+        return StoredPhoto(key, len(raw), media_type, uploaded=True)
+
+    def exists(self, key: str) -> bool:
+        """HEAD the key (needs s3:ListBucket, or S3 answers 403 instead of 404 for missing keys)"""
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def url(self, key: str, expires_in: int = 3600) -> str:
+        """Presigned GET URL for a stored photo"""
+        return self.s3.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=expires_in
+        )
+
+    def _is_known(self, key: str) -> bool:
+        with self._lock:
+            if key in self._known:
+                self._known.move_to_end(key)
+                return True
+            return False
+
+    def _remember(self, key: str):
+        with self._lock:
+            self._known[key] = None
+            self._known.move_to_end(key)
+            while len(self._known) > self._known_max:
+                self._known.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "uploads": self.uploads,
+                "multipart_uploads": self.multipart_uploads,
+                "deduplicated": self.deduplicated,
+                "bytes_uploaded": self.bytes_uploaded,
+            }
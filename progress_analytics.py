@@ -0,0 +1,292 @@
+"""
+FitGenius progress analytics
+
+Trend analysis over a user's progress history held as columnar NumPy
+arrays: time-windowed rolling means, EWMA, a least-squares weekly slope
+with a 95% confidence band, and per-measurement deltas. Every statistic
+works on actual elapsed days, so skipped days and long gaps are weighted
+correctly. The trend label only changes when the slope's confidence
+interval excludes zero, so day-to-day water-weight noise does not flip it.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+# Two-sided 95% Student t critical values for 1..30 degrees of freedom
+T95 = np.array([
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+])
+Z95 = 1.960
+
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_HALFLIFE_DAYS = 7
+# exp() overflows float64 above ~709; EWMA blocks stay below this exponent
+_MAX_EXPONENT = 600.0
+
+
+def t_critical_95(dof: int) -> float:
+    """Two-sided 95% t critical value (normal approximation above 120 dof)"""
+    if dof < 1:
+        return float("nan")
+    if dof <= len(T95):
+        return float(T95[dof - 1])
+    # Between 30 and 120 dof, t ~ z + (t30 - z) * 30 / dof is within 0.002
+    return Z95 + (T95[-1] - Z95) * len(T95) / dof if dof < 120 else Z95
+
+
+class ProgressHistory(NamedTuple):
+    """Columnar progress history, sorted by date"""
+    dates: np.ndarray  # datetime64[D]
+    weight: np.ndarray  # float, NaN where not recorded
+    measurements: Dict[str, np.ndarray]  # name -> float array, NaN where not recorded
+
+    @property
+    def days(self) -> np.ndarray:
+        """Elapsed days since the first entry"""
+        if not len(self.dates):
+            return np.empty(0)
+        return (self.dates - self.dates[0]).astype(np.float64)
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Dict]) -> "ProgressHistory":
+        """Build from progress items (date, weight, measurements), in any order"""
+        dates: List[str] = []
+        weights: List[float] = []
+        columns: Dict[str, Dict[int, float]] = {}
+        for row, entry in enumerate(entries):
+            dates.append(str(entry["date"])[:10])
+            weight = entry.get("weight")
+            weights.append(np.nan if weight is None else float(weight))
+            for name, value in (entry.get("measurements") or {}).items():
+                if isinstance(value, bool) or value is None:
+                    continue
+                try:
+                    columns.setdefault(name, {})[row] = float(value)
+                except (TypeError, ValueError):
+                    continue
+
+        n = len(dates)
+        measurements = {}
+        for name, values in columns.items():
+            column = np.full(n, np.nan)
+            column[list(values)] = list(values.values())
+            measurements[name] = column
+
+        date_array = np.array(dates, dtype="datetime64[D]")
+        order = np.argsort(date_array, kind="stable")
+        return cls(
+            dates=date_array[order],
+            weight=np.array(weights, dtype=np.float64)[order],
+            measurements={name: column[order] for name, column in measurements.items()},
+        )
+
+
+def rolling_mean(days: np.ndarray, values: np.ndarray, window_days: float = DEFAULT_WINDOW_DAYS) -> np.ndarray:
+    """
+    Mean of the values in the trailing window (t - window_days, t] at each point
+
+    The window is in days, not rows, so sparse logging periods average
+    fewer points instead of reaching further back. NaNs are skipped.
+    """
+    days = np.asarray(days, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    left = np.searchsorted(days, days - window_days, side="right")
+    right = np.arange(1, len(days) + 1)
+    count = counts[right] - counts[left]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, (sums[right] - sums[left]) / count, np.nan)
+
+
+def ewma(days: np.ndarray, values: np.ndarray, halflife_days: float = DEFAULT_HALFLIFE_DAYS) -> np.ndarray:
+    """
+    Time-decayed exponentially weighted mean
+
+    Each earlier value's weight halves every halflife_days of elapsed time
+    (the same definition as pandas ewm(halflife=..., times=...)). Computed
+    with cumulative sums in blocks short enough that exp() cannot overflow.
+    NaNs are skipped.
+    """
+    days = np.asarray(days, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    n = len(days)
+    result = np.full(n, np.nan)
+    if not n:
+        return result
+
+    decay = np.log(2.0) / halflife_days
+    scaled = days * decay
+    present = ~np.isnan(values)
+    x = np.where(present, values, 0.0)
+    w = present.astype(np.float64)
+
+    numerator = denominator = 0.0
+    previous = scaled[0]
+    start = 0
+    while start < n:
+        end = int(np.searchsorted(scaled, scaled[start] + _MAX_EXPONENT, side="right"))
+        base = scaled[start]
+        growth = np.exp(scaled[start:end] - base)
+        shrink = np.exp(-(scaled[start:end] - base))
+        carry = np.exp(-(scaled[start:end] - previous))
+        block_num = carry * numerator + shrink * np.cumsum(growth * x[start:end])
+        block_den = carry * denominator + shrink * np.cumsum(growth * w[start:end])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[start:end] = np.where(block_den > 0, block_num / block_den, np.nan)
+        numerator, denominator, previous = block_num[-1], block_den[-1], scaled[end - 1]
+        start = end
+    return result
+
+
+class TrendFit(NamedTuple):
+    """Least-squares line through a series"""
+    slope_per_week: float
+    ci_low: float  # 95% confidence interval of slope_per_week
+    ci_high: float
+    intercept: float  # value at day 0
+    points: int
+    r_squared: float
+
+    @property
+    def direction(self) -> str:
+        """gaining/losing only when the whole confidence interval agrees"""
+        if self.ci_low > 0:
+            return "gaining"
+        if self.ci_high < 0:
+            return "losing"
+        return "maintaining"
+
+
+def linear_trend(days: np.ndarray, values: np.ndarray) -> Optional[TrendFit]:
+    """Least-squares weekly slope with a 95% confidence interval; None with < 3 points or no time span"""
+    days = np.asarray(days, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    t, y = days[present], values[present]
+    n = len(t)
+    if n < 3:
+        return None
+    t_mean, y_mean = t.mean(), y.mean()
+    dt = t - t_mean
+    sxx = float(dt @ dt)
+    if sxx == 0:
+        return None
+    slope = float(dt @ (y - y_mean)) / sxx
+    intercept = y_mean - slope * t_mean
+    residuals = y - (intercept + slope * t)
+    ssr = float(residuals @ residuals)
+    sst = float((y - y_mean) @ (y - y_mean))
+    stderr = float(np.sqrt(ssr / (n - 2) / sxx))
+    margin = t_critical_95(n - 2) * stderr
+    return TrendFit(
+        slope_per_week=slope * 7,
+        ci_low=(slope - margin) * 7,
+        ci_high=(slope + margin) * 7,
+        intercept=float(intercept),
+        points=n,
+        r_squared=1 - ssr / sst if sst > 0 else 1.0,
+    )
+
+
+def confidence_band(days: np.ndarray, values: np.ndarray, at_days: Optional[np.ndarray] = None) -> Optional[Dict]:
+    """Fitted line and 95% confidence band of the mean at at_days (default: the input days)"""
+    days = np.asarray(days, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    fit = linear_trend(days, values)
+    if fit is None:
+        return None
+    present = ~np.isnan(values)
+    t, y = days[present], values[present]
+    slope = fit.slope_per_week / 7
+    at = days if at_days is None else np.asarray(at_days, dtype=np.float64)
+    fitted = fit.intercept + slope * at
+    residuals = y - (fit.intercept + slope * t)
+    s = np.sqrt(residuals @ residuals / (len(t) - 2))
+    dt = t - t.mean()
+    margin = t_critical_95(len(t) - 2) * s * np.sqrt(1 / len(t) + (at - t.mean()) ** 2 / (dt @ dt))
+    return {"fitted": fitted, "lower": fitted - margin, "upper": fitted + margin}
+
+
+def _last_valid(values: np.ndarray) -> Optional[int]:
+    idx = np.flatnonzero(~np.isnan(values))
+    return int(idx[-1]) if len(idx) else None
+
+
+def _first_valid(values: np.ndarray) -> Optional[int]:
+    idx = np.flatnonzero(~np.isnan(values))
+    return int(idx[0]) if len(idx) else None
+
+
+def series_summary(days: np.ndarray, values: np.ndarray, window_days: float = DEFAULT_WINDOW_DAYS,
+                   halflife_days: float = DEFAULT_HALFLIFE_DAYS) -> Optional[Dict]:
+    """Deltas, smoothed values and trend for one series; None if it has no values"""
+    first, last = _first_valid(values), _last_valid(values)
+    if first is None:
+        return None
+    smoothed = rolling_mean(days, values, window_days)
+    weighted = ewma(days, values, halflife_days)
+    fit = linear_trend(days, values)
+    # Window means at both ends, so a single heavy day doesn't set the delta
+    first_window = ~np.isnan(values) & (days < days[first] + window_days)
+    summary = {
+        "first": round(float(values[first]), 2),
+        "latest": round(float(values[last]), 2),
+        "change": round(float(values[last] - values[first]), 2),
+        # None until the history is longer than one window (both ends would be the same mean)
+        "smoothed_change": (round(float(smoothed[last] - values[first_window].mean()), 2)
+                            if days[last] - days[first] >= window_days else None),
+        "rolling_mean": round(float(smoothed[last]), 2),
+        "ewma": round(float(weighted[last]), 2),
+        "points": int((~np.isnan(values)).sum()),
+    }
+    if fit is not None:
+        summary.update({
+            "weekly_slope": round(fit.slope_per_week, 3),
+            "weekly_slope_ci": [round(fit.ci_low, 3), round(fit.ci_high, 3)],
+            "r_squared": round(fit.r_squared, 3),
+            "trend": fit.direction,
+        })
+    else:
+        summary["trend"] = "insufficient_data"
+    return summary
+
+
+def analyze_history(history: ProgressHistory, window_days: float = DEFAULT_WINDOW_DAYS,
+                    halflife_days: float = DEFAULT_HALFLIFE_DAYS,
+                    recent_days: Optional[float] = None) -> Dict:
+    """
+    Trend analysis of a user's history
+
+    recent_days limits the regression, smoothing and deltas to the latest
+    part of the history (e.g. 28 for "the last four weeks").
+    """
+    if recent_days is not None and len(history.dates):
+        keep = history.dates >= history.dates[-1] - np.timedelta64(int(recent_days), "D")
+        history = ProgressHistory(history.dates[keep], history.weight[keep],
+                                  {name: column[keep] for name, column in history.measurements.items()})
+
+    if not len(history.dates):
+        return {"entries_count": 0, "trend": "insufficient_data"}
+
+    days = history.days
+    weight = series_summary(days, history.weight, window_days, halflife_days)
+    measurements = {}
+    for name, column in history.measurements.items():
+        summary = series_summary(days, column, window_days, halflife_days)
+        if summary is not None:
+            measurements[name] = summary
+
+    return {
+        "entries_count": len(days),
+        "first_date": str(history.dates[0]),
+        "latest_date": str(history.dates[-1]),
+        "days_tracked": int(days[-1]),
+        "trend": weight["trend"] if weight else "insufficient_data",
+        "weight": weight,
+        "measurements": measurements,
+    }
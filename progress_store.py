@@ -0,0 +1,487 @@
+"""
+FitGenius progress store
+
+DynamoDB access for daily progress entries. Alongside the entries, each
+user has one summary item (sort key SUMMARY_DATE) that is updated
+atomically with UpdateItem on every write: first and latest entry, entry
+count, and running sum/count/min/max per metric. Progress analysis reads
+that single item instead of re-querying history, so it costs O(1) reads
+and covers the user's full history. Summaries that drifted, or users whose
+entries predate summaries, are repaired with rebuild_summary(). Trend
+analysis reads history through HistoryQuery, which pages through a date
+range with a projection.
+"""
+
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+# Sort key of the per-user summary item; '#' sorts before any ISO date
+SUMMARY_DATE = "#summary"
+
+WEIGHT_METRIC = "weight"
+MEASUREMENT_PREFIX = "m."
+
+# Sort key bounds covering every ISO date but not SUMMARY_DATE
+MIN_DATE = "0"
+MAX_DATE = "9999-12-31~"
+HISTORY_ATTRIBUTES = ("date", "weight", "measurements")
+DEFAULT_PAGE_SIZE = 200
+
+# BatchWriteItem accepts at most 25 requests, BatchGetItem 100 keys
+BATCH_SIZE = 25
+BATCH_GET_SIZE = 100
+MAX_BATCH_RETRIES = 10
+
+
+def to_dynamo(value):
+    """Convert floats (recursively) to Decimal, as boto3 requires"""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: to_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_dynamo(v) for v in value]
+    return value
+
+
+def from_dynamo(value):
+    """Convert Decimals (recursively) back to int/float"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: from_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_dynamo(v) for v in value]
+    return value
+
+
+def _backoff(attempt: int):
+    time.sleep(min(0.05 * (2 ** attempt), 2.0) * random.uniform(0.5, 1.0))
+
+
+def entry_metrics(entry: Dict) -> Dict[str, Decimal]:
+    """Flatten an entry's weight and numeric measurements into metric -> value"""
+    metrics = {}
+    if entry.get("weight") is not None:
+        metrics[WEIGHT_METRIC] = to_dynamo(entry["weight"])
+    for name, value in (entry.get("measurements") or {}).items():
+        if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+            metrics[MEASUREMENT_PREFIX + name] = to_dynamo(value)
+    return metrics
+
+
+class _Expression:
+    """Accumulates an UpdateExpression with generated placeholders"""
+
+    def __init__(self):
+        self.sets: List[str] = []
+        self.names: Dict[str, str] = {}
+        self.values: Dict[str, object] = {}
+
+    def name(self, attribute: str) -> str:
+        placeholder = f"#n{len(self.names)}"
+        self.names[placeholder] = attribute
+        return placeholder
+
+    def value(self, value) -> str:
+        placeholder = f":v{len(self.values)}"
+        self.values[placeholder] = value
+        return placeholder
+
+    def add(self, attribute: str, delta):
+        n = self.name(attribute)
+        self.values[":zero"] = Decimal(0)
+        self.sets.append(f"{n} = if_not_exists({n}, :zero) + {self.value(delta)}")
+
+    def set_if_missing(self, attribute: str, value):
+        n = self.name(attribute)
+        self.sets.append(f"{n} = if_not_exists({n}, {self.value(value)})")
+
+    def set(self, attribute: str, value):
+        self.sets.append(f"{self.name(attribute)} = {self.value(value)}")
+
+    def kwargs(self) -> Dict:
+        return {
+            "UpdateExpression": "SET " + ", ".join(self.sets),
+            "ExpressionAttributeNames": self.names,
+            "ExpressionAttributeValues": self.values,
+        }
+
+
+class _SummaryDelta:
+    """Changes one or more entries make to a user's summary item"""
+
+    def __init__(self):
+        self.entries = 0
+        self.sums: Dict[str, Decimal] = {}
+        self.counts: Dict[str, int] = {}
+        self.minima: Dict[str, Decimal] = {}
+        self.maxima: Dict[str, Decimal] = {}
+        self.first: Optional[Tuple[str, Dict[str, Decimal]]] = None
+        self.latest: Optional[Tuple[str, Dict[str, Decimal]]] = None
+
+    def add(self, date: str, metrics: Dict[str, Decimal], old_metrics: Optional[Dict[str, Decimal]] = None):
+        """Fold in an entry; old_metrics are those of the item it replaced (None for a new entry)"""
+        self.entries += 1 if old_metrics is None else 0
+        old_metrics = old_metrics or {}
+        for metric in metrics.keys() | old_metrics.keys():
+            new_value, old_value = metrics.get(metric), old_metrics.get(metric)
+            self.sums[metric] = self.sums.get(metric, 0) + (new_value or 0) - (old_value or 0)
+            self.counts[metric] = self.counts.get(metric, 0) + (new_value is not None) - (old_value is not None)
+        for metric, value in metrics.items():
+            self.minima[metric] = min(value, self.minima.get(metric, value))
+            self.maxima[metric] = max(value, self.maxima.get(metric, value))
+        if self.first is None or date < self.first[0]:
+            self.first = (date, metrics)
+        if self.latest is None or date >= self.latest[0]:
+            self.latest = (date, metrics)
+
+
+class ProgressStore:
+    """Progress entries and incrementally maintained per-user summaries"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def record_entry(self, entry: Dict) -> Dict:
+        """
+        Store an entry and fold it into the user's summary
+
+        Returns the updated summary. Re-recording an existing date replaces
+        the old entry's contribution to counts and sums; min/max keep any
+        extreme the replaced entry set.
+
+        The entry (put_item) and the summary (update_item) are separate
+        writes: TransactWriteItems cannot return the replaced item, which
+        the summary delta needs. If the process dies between them the
+        summary misses this entry until rebuild_summary() runs for the user
+        (scripts/load_sample_data.py --backfill-summaries).
+        """
+        item = to_dynamo(entry)
+        response = self.table.put_item(Item=item, ReturnValues="ALL_OLD")
+        old_item = response.get("Attributes")
+
+        delta = _SummaryDelta()
+        delta.add(item["date"], entry_metrics(item), entry_metrics(old_item) if old_item else None)
+        return self.apply_delta(item["userId"], delta)
+
+    def batch_put(self, items: List[Dict]) -> int:
+        """
+        Write up to BATCH_SIZE items with one BatchWriteItem, retrying
+        UnprocessedItems with exponential backoff. Returns the retry rounds
+        needed; raises RuntimeError if items remain after MAX_BATCH_RETRIES.
+        """
+        # The resource's client serializes plain values like Table does
+        request_items = {self.table.name: [{"PutRequest": {"Item": to_dynamo(item)}} for item in items]}
+        client = self.table.meta.client
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            response = client.batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return attempt
+            _backoff(attempt)
+
+        unprocessed = sum(len(v) for v in request_items.values())
+        raise RuntimeError(f"{unprocessed} items still unprocessed after {MAX_BATCH_RETRIES} retries")
+
+    def existing_entries(self, items: List[Dict]) -> Dict[Tuple[str, str], Dict]:
+        """
+        The stored entries items would overwrite, keyed by (userId, date)
+
+        Read with BatchGetItem (BATCH_GET_SIZE keys per request, retrying
+        UnprocessedKeys) before a batch write, since BatchWriteItem cannot
+        return the items it replaces.
+        """
+        keys = list(dict.fromkeys((item["userId"], item["date"]) for item in items))
+        names = {f"#p{i}": name for i, name in enumerate(("userId",) + HISTORY_ATTRIBUTES)}
+        client = self.table.meta.client
+        found: Dict[Tuple[str, str], Dict] = {}
+        for start in range(0, len(keys), BATCH_GET_SIZE):
+            request = {self.table.name: {
+                "Keys": [{"userId": user_id, "date": date} for user_id, date in keys[start:start + BATCH_GET_SIZE]],
+                "ProjectionExpression": ", ".join(names),
+                "ExpressionAttributeNames": names,
+            }}
+            for attempt in range(MAX_BATCH_RETRIES + 1):
+                response = client.batch_get_item(RequestItems=request)
+                for item in response.get("Responses", {}).get(self.table.name, []):
+                    found[(item["userId"], item["date"])] = item
+                request = response.get("UnprocessedKeys") or {}
+                if not request:
+                    break
+                _backoff(attempt)
+            else:
+                unprocessed = sum(len(v["Keys"]) for v in request.values())
+                raise RuntimeError(f"{unprocessed} keys still unprocessed after {MAX_BATCH_RETRIES} retries")
+        return found
+
+    def fold_entries(self, entries: List[Dict],
+                     replaced: Optional[Dict[Tuple[str, str], Dict]] = None) -> Dict[str, Dict]:
+        """
+        Fold already-written entries into their users' summaries, one
+        update per user. replaced maps (userId, date) to the item each
+        entry overwrote (see existing_entries); entries not in it count as
+        new dates.
+        """
+        replaced = replaced or {}
+        deltas: Dict[str, _SummaryDelta] = {}
+        for entry in entries:
+            item = to_dynamo(entry)
+            old_item = replaced.get((item["userId"], item["date"]))
+            deltas.setdefault(item["userId"], _SummaryDelta()).add(
+                item["date"], entry_metrics(item), entry_metrics(old_item) if old_item else None)
+        return {user_id: self.apply_delta(user_id, delta) for user_id, delta in deltas.items()}
+
+    def record_entries(self, entries: List[Dict]) -> Dict[str, Dict]:
+        """Batch-write entries in groups of BATCH_SIZE and fold them into the summaries; returns them by user"""
+        # Last write wins for repeated keys, as it would with put_item
+        items = list({(entry["userId"], entry["date"]): entry for entry in entries}.values())
+        replaced = self.existing_entries(items)
+        for start in range(0, len(items), BATCH_SIZE):
+            self.batch_put(items[start:start + BATCH_SIZE])
+        return self.fold_entries(items, replaced)
+
+    def rebuild_summary(self, user_id: str) -> Optional[Dict]:
+        """
+        Recompute the user's summary item from their full history and
+        overwrite it; returns it (None, with the item deleted, when there is
+        no history). Used to repair a summary that missed writes. A write
+        for the same user while this runs may be lost from the summary.
+        """
+        delta = _SummaryDelta()
+        for entry in self.history(user_id):
+            item = to_dynamo(entry)
+            delta.add(item["date"], entry_metrics(item))
+        key = {"userId": user_id, "date": SUMMARY_DATE}
+        if not delta.entries:
+            self.table.delete_item(Key=key)
+            return None
+
+        summary = dict(key, entry_count=Decimal(delta.entries), updated_at=datetime.now().isoformat())
+        for metric in delta.sums:
+            summary[f"sum:{metric}"] = Decimal(delta.sums[metric])
+            summary[f"count:{metric}"] = Decimal(delta.counts[metric])
+        for metric in delta.minima:
+            summary[f"min:{metric}"] = delta.minima[metric]
+            summary[f"max:{metric}"] = delta.maxima[metric]
+        summary["first_date"], summary["first_values"] = delta.first
+        summary["latest_date"], summary["latest_values"] = delta.latest
+        self.table.put_item(Item=summary)
+        return summary
+
+    def apply_delta(self, user_id: str, delta: _SummaryDelta) -> Dict:
+        """Fold a _SummaryDelta into the user's summary item; returns the updated summary"""
+        key = {"userId": user_id, "date": SUMMARY_DATE}
+        # The common case is entries at or after the latest date, so move
+        # "latest" in the same call and fall back for backfilled dates
+        expression, condition = self._summary_expression(delta, True)
+        try:
+            summary = self.table.update_item(
+                Key=key, ConditionExpression=condition, ReturnValues="ALL_NEW", **expression.kwargs()
+            )["Attributes"]
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                raise
+            expression, _ = self._summary_expression(delta, False)
+            summary = self.table.update_item(Key=key, ReturnValues="ALL_NEW", **expression.kwargs())["Attributes"]
+
+        summary = self._apply_extremes(user_id, delta, summary)
+        return self._backfill_if_incomplete(user_id, summary)
+
+    def _backfill_if_incomplete(self, user_id: str, summary: Dict) -> Dict:
+        """
+        Rebuild a summary that counts fewer entries than the user's history
+        holds: users whose entries predate summary items get one on their
+        next write. Only summaries of at most one entry are checked, with a
+        COUNT query of at most two items.
+        """
+        count = summary.get("entry_count", 0)
+        if count > 1:
+            return summary
+        response = self.table.query(
+            KeyConditionExpression=Key("userId").eq(user_id) & Key("date").between(MIN_DATE, MAX_DATE),
+            Select="COUNT",
+            Limit=2,
+        )
+        if response["Count"] > count:
+            return self.rebuild_summary(user_id)
+        return summary
+
+    @staticmethod
+    def _summary_expression(delta: _SummaryDelta, move_latest: bool) -> Tuple[_Expression, Optional[str]]:
+        expression = _Expression()
+        expression.add("entry_count", Decimal(delta.entries))
+        for metric in delta.sums:
+            expression.add(f"sum:{metric}", delta.sums[metric])
+            expression.add(f"count:{metric}", Decimal(delta.counts[metric]))
+        for metric in delta.minima:
+            expression.set_if_missing(f"min:{metric}", delta.minima[metric])
+            expression.set_if_missing(f"max:{metric}", delta.maxima[metric])
+        first_date, first_metrics = delta.first
+        expression.set_if_missing("first_date", first_date)
+        expression.set_if_missing("first_values", first_metrics)
+        expression.set("updated_at", datetime.now().isoformat())
+
+        if not move_latest:
+            return expression, None
+        latest_date, latest_metrics = delta.latest
+        expression.set("latest_date", latest_date)
+        expression.set("latest_values", latest_metrics)
+        latest = expression.name("latest_date")
+        return expression, f"attribute_not_exists({latest}) OR {latest} <= {expression.value(latest_date)}"
+
+    def _apply_extremes(self, user_id: str, delta: _SummaryDelta, summary: Dict) -> Dict:
+        """Conditionally lower/raise min, max and first_date/first_values where these entries beat or replace them"""
+        updates: List[Tuple[str, str, object, Dict]] = []
+        for metric, value in delta.minima.items():
+            if value < summary[f"min:{metric}"]:
+                updates.append((f"min:{metric}", ">", value, {}))
+        for metric, value in delta.maxima.items():
+            if value > summary[f"max:{metric}"]:
+                updates.append((f"max:{metric}", "<", value, {}))
+        first_date, first_metrics = delta.first
+        # "<=" so re-recording the first date also replaces first_values
+        if first_date < summary["first_date"] or (
+                first_date == summary["first_date"] and first_metrics != summary["first_values"]):
+            updates.append(("first_date", ">=", first_date, {"first_values": first_metrics}))
+
+        for attribute, comparison, value, extra in updates:
+            expression = _Expression()
+            expression.set(attribute, value)
+            for extra_attribute, extra_value in extra.items():
+                expression.set(extra_attribute, extra_value)
+            n = expression.name(attribute)
+            try:
+                # Conditional so a concurrent writer's more extreme value wins
+                summary = self.table.update_item(
+                    Key={"userId": user_id, "date": SUMMARY_DATE},
+                    ConditionExpression=f"{n} {comparison} {expression.value(value)}",
+                    ReturnValues="ALL_NEW",
+                    **expression.kwargs()
+                )["Attributes"]
+            except ClientError as exc:
+                if exc.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    raise
+        return summary
+
+    def get_summary(self, user_id: str) -> Optional[Dict]:
+        """The user's summary item, or None if nothing has been recorded"""
+        return self.table.get_item(Key={"userId": user_id, "date": SUMMARY_DATE}).get("Item")
+
+    def history(self, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                attributes: Optional[Sequence[str]] = HISTORY_ATTRIBUTES, page_size: int = DEFAULT_PAGE_SIZE,
+                newest_first: bool = False) -> "HistoryQuery":
+        """Lazily paginated entries for user_id between start_date and end_date (inclusive)"""
+        return HistoryQuery(self.table, user_id, start_date, end_date, attributes, page_size, newest_first)
+
+
+class HistoryQuery:
+    """
+    Iterable over a user's progress entries, one DynamoDB page at a time
+
+    Follows LastEvaluatedKey across pages, so memory is bounded by
+    page_size regardless of how much history exists. The date range is a
+    sort key condition (the summary item is never read) and only
+    attributes are projected; note DynamoDB still bills read units on full
+    item size, so projection saves transfer and parsing, not RCUs. Read
+    units are totalled in consumed_capacity as pages are fetched.
+    """
+
+    def __init__(self, table, user_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 attributes: Optional[Sequence[str]] = HISTORY_ATTRIBUTES, page_size: int = DEFAULT_PAGE_SIZE,
+                 newest_first: bool = False):
+        self.table = table
+        self.user_id = user_id
+        self.start_date = start_date or MIN_DATE
+        # Dates may carry a time suffix; "~" sorts after any of them
+        self.end_date = f"{end_date}~" if end_date else MAX_DATE
+        self.attributes = attributes
+        self.page_size = page_size
+        self.newest_first = newest_first
+
+        self.pages = 0
+        self.items = 0
+        self.consumed_capacity = 0.0
+
+    def _query_kwargs(self) -> Dict:
+        kwargs = {
+            "KeyConditionExpression": Key("userId").eq(self.user_id) & Key("date").between(
+                self.start_date, self.end_date),
+            "ScanIndexForward": not self.newest_first,
+            "ReturnConsumedCapacity": "TOTAL",
+        }
+        if self.page_size:
+            kwargs["Limit"] = self.page_size
+        if self.attributes:
+            # Placeholders for every name: "date" is a reserved word
+            names = {f"#p{i}": name for i, name in enumerate(self.attributes)}
+            kwargs["ProjectionExpression"] = ", ".join(names)
+            kwargs["ExpressionAttributeNames"] = names
+        return kwargs
+
+    def pages_iter(self) -> Iterator[List[Dict]]:
+        """Yield each page of items as it is read"""
+        kwargs = self._query_kwargs()
+        while True:
+            response = self.table.query(**kwargs)
+            self.pages += 1
+            self.consumed_capacity += float(response.get("ConsumedCapacity", {}).get("CapacityUnits", 0))
+            items = response.get("Items", [])
+            self.items += len(items)
+            yield items
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def __iter__(self) -> Iterator[Dict]:
+        for page in self.pages_iter():
+            for item in page:
+                yield from_dynamo(item)
+
+    def stats(self) -> Dict:
+        """Pages, items and read units used so far"""
+        return {"pages": self.pages, "items": self.items, "consumed_capacity": round(self.consumed_capacity, 2)}
+
+
+def analyze_summary(summary: Dict) -> Dict:
+    """Progress analysis computed from a summary item alone"""
+    summary = from_dynamo(summary)
+    count = summary.get("entry_count", 0)
+    if count <= 1:
+        return {
+            "message": "First entry recorded. Keep tracking!",
+            "entries_count": count
+        }
+
+    first, latest = summary["first_values"], summary.get("latest_values", {})
+    days_elapsed = (datetime.fromisoformat(summary["latest_date"]) -
+                    datetime.fromisoformat(summary["first_date"])).days
+    weight_change = latest.get(WEIGHT_METRIC, 0) - first.get(WEIGHT_METRIC, 0)
+
+    metrics = {}
+    for key in summary:
+        if key.startswith("count:") and summary[key]:
+            metric = key[len("count:"):]
+            name = metric[len(MEASUREMENT_PREFIX):] if metric.startswith(MEASUREMENT_PREFIX) else metric
+            metrics[name] = {
+                "average": round(summary[f"sum:{metric}"] / summary[key], 2),
+                "min": summary[f"min:{metric}"],
+                "max": summary[f"max:{metric}"],
+                "change": round(latest[metric] - first[metric], 2) if metric in latest and metric in first else None
+            }
+
+    return {
+        "total_weight_change": round(weight_change, 2),
+        "days_tracked": days_elapsed,
+        "avg_weekly_change": round((weight_change / days_elapsed) * 7, 2) if days_elapsed > 0 else 0,
+        "trend": "gaining" if weight_change > 0 else "losing" if weight_change < 0 else "maintaining",
+        "entries_count": count,
+        "metrics": metrics
+    }
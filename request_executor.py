@@ -0,0 +1,145 @@
+"""
+FitGenius request executor
+
+Runs many users' requests concurrently around a blocking handler such as
+FitGeniusAgent.process_user_request. Handlers run on a dedicated thread
+pool sized to max_concurrency, so one worker process serves many users
+while each waits on Bedrock. Requests from the same user run one at a
+time in submission order, and at most max_pending requests may be queued
+or running; further submissions wait (or fail with QueueFullError).
+
+asyncio primitives belong to one event loop, so the ordering and
+max_pending state is kept per loop: callers on different loops (e.g.
+process_many's asyncio.run next to a long-lived server loop) each get
+their own, and share only the thread pool.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class QueueFullError(RuntimeError):
+    """Raised by submit(wait=False) when max_pending requests are outstanding"""
+
+
+class _LoopState(NamedTuple):
+    """One event loop's pending-request slots and per-user queue tails"""
+    slots: asyncio.Semaphore
+    tails: Dict[Hashable, asyncio.Future]
+
+
+class RequestExecutor:
+    """Bounded, per-user ordered concurrent executor for a blocking handler"""
+
+    def __init__(self, handler: Callable, max_concurrency: int = 8, max_pending: int = 64):
+        if max_concurrency < 1 or max_pending < 1:
+            raise ValueError("max_concurrency and max_pending must be at least 1")
+        self.handler = handler
+        self.max_concurrency = max_concurrency
+        self.max_pending = max(max_pending, max_concurrency)
+
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fitgenius-request")
+        self._stats_lock = threading.Lock()
+        # Dropped with the loop, so asyncio.run per call does not leak
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = \
+            weakref.WeakKeyDictionary()
+        self._loops_lock = threading.Lock()
+
+        self.pending = 0
+        self.running = 0
+        self.peak_running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _loop_state(self, loop: asyncio.AbstractEventLoop) -> _LoopState:
+        with self._loops_lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = _LoopState(asyncio.Semaphore(self.max_pending), {})
+            return state
+
+    async def submit(self, user_id: Optional[Hashable], *args, wait: bool = True, **kwargs) -> Any:
+        """
+        Run handler(*args, **kwargs) and return its result
+
+        Requests with the same (non-None) user_id on the same event loop
+        run sequentially in the order submit() was started. When
+        max_pending requests are outstanding on this loop this waits for a
+        free slot, or raises QueueFullError if wait is False.
+        """
+        loop = asyncio.get_running_loop()
+        slots, tails = self._loop_state(loop)
+        if not wait and slots.locked():
+            with self._stats_lock:
+                self.rejected += 1
+            raise QueueFullError(f"{self.max_pending} requests already pending")
+
+        # Chain onto the user's previous request before the first await so
+        # ordering follows submission order, not scheduling luck
+        previous, done = None, None
+        if user_id is not None:
+            previous = tails.get(user_id)
+            done = loop.create_future()
+            tails[user_id] = done
+
+        try:
+            async with slots:
+                with self._stats_lock:
+                    self.pending += 1
+                try:
+                    if previous is not None:
+                        await asyncio.shield(previous)
+                    return await self._run(partial(self.handler, *args, **kwargs))
+                finally:
+                    with self._stats_lock:
+                        self.pending -= 1
+        finally:
+            if done is not None:
+                done.set_result(None)
+                if tails.get(user_id) is done:
+                    del tails[user_id]
+
+    async def _run(self, call: Callable) -> Any:
+        with self._stats_lock:
+            self.running += 1
+            self.peak_running = max(self.peak_running, self.running)
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, call)
+        except Exception:
+            with self._stats_lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+        with self._stats_lock:
+            self.completed += 1
+        return result
+
+    async def run_many(self, requests: Iterable[Tuple[Optional[Hashable], Tuple, Dict]],
+                       return_exceptions: bool = False) -> List[Any]:
+        """Submit (user_id, args, kwargs) requests and return results in input order"""
+        tasks = [asyncio.ensure_future(self.submit(user_id, *args, **kwargs)) for user_id, args, kwargs in requests]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "running": self.running,
+                "peak_running": self.peak_running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads"""
+        self._pool.shutdown(wait=wait)
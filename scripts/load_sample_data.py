@@ -1,28 +1,278 @@
 #!/usr/bin/env python3
-"""Load sample data for testing"""
-import boto3
+"""Load sample data for testing
+
+Default: 30 days of progress for demo_user_001.
+Bulk mode seeds synthetic progress for N users x M days in parallel:
+
+    python scripts/load_sample_data.py --bulk --users 100000 --days 100 \
+        --workers 32 --endpoint-url http://localhost:8000 --create-table
+
+Rows are written raw, so bulk loads (and history written before per-user
+summary items existed) need the summaries built afterwards:
+
+    python scripts/load_sample_data.py --backfill-summaries
+    python scripts/load_sample_data.py --backfill-summaries --user-id demo_user_001
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from progress_store import SUMMARY_DATE, ProgressStore  # noqa: E402
+
+# DynamoDB BatchWriteItem accepts at most 25 put requests per call
+BATCH_SIZE = 25
+MAX_RETRIES = 10
+
 
 def load_sample_progress():
     dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
     table = dynamodb.Table('FitGeniusProgress')
-    
+
     base_date = datetime.now() - timedelta(days=30)
-    
+
     for i in range(30):
         date = base_date + timedelta(days=i)
         entry = {
             'userId': 'demo_user_001',
             'date': date.strftime('%Y-%m-%d'),
-            'weight': 85.0 - (i * 0.1),
+            'weight': Decimal(str(round(85.0 - (i * 0.1), 2))),
             'measurements': {
-                'waist': 95 - (i * 0.1),
-                'chest': 100 + (i * 0.05),
-                'arms': 35 + (i * 0.02)
+                'waist': Decimal(str(round(95 - (i * 0.1), 2))),
+                'chest': Decimal(str(round(100 + (i * 0.05), 2))),
+                'arms': Decimal(str(round(35 + (i * 0.02), 2)))
             }
         }
         table.put_item(Item=entry)
         print(f"✓ Loaded: {date.strftime('%Y-%m-%d')}")
+    ProgressStore(table).rebuild_summary('demo_user_001')
+
+
+def generate_progress(user_ids: range, days: int, start_date: datetime, seed: int = 0) -> Iterator[Dict]:
+    """Lazily generate synthetic daily progress entries for a range of users"""
+    for user_index in user_ids:
+        rng = random.Random(seed * 1_000_003 + user_index)
+        weight = rng.uniform(55, 120)
+        waist = weight * rng.uniform(0.95, 1.15)
+        chest = weight * rng.uniform(1.05, 1.3)
+        arms = rng.uniform(28, 42)
+        daily_trend = rng.uniform(-0.12, 0.06)
+
+        for day in range(days):
+            # Trend plus day-to-day water-weight noise
+            weight += daily_trend + rng.gauss(0, 0.3)
+            waist += daily_trend * 0.8 + rng.gauss(0, 0.1)
+            yield {
+                'userId': f"load_user_{user_index:08d}",
+                'date': (start_date + timedelta(days=day)).strftime('%Y-%m-%d'),
+                'weight': Decimal(str(round(weight, 2))),
+                'measurements': {
+                    'waist': Decimal(str(round(waist, 1))),
+                    'chest': Decimal(str(round(chest + rng.gauss(0, 0.2), 1))),
+                    'arms': Decimal(str(round(arms + rng.gauss(0, 0.1), 1)))
+                }
+            }
+
+
+def write_batch(client, table_name: str, items: List[Dict], serializer: TypeSerializer) -> int:
+    """
+    Write up to 25 items with BatchWriteItem, retrying UnprocessedItems
+    with exponential backoff. Returns the number of retry rounds needed.
+    """
+    request_items = {table_name: [
+        {'PutRequest': {'Item': {k: serializer.serialize(v) for k, v in item.items()}}}
+        for item in items
+    ]}
+
+    for attempt in range(MAX_RETRIES + 1):
+        response = client.batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return attempt
+        time.sleep(min(0.05 * (2 ** attempt), 2.0) * random.uniform(0.5, 1.0))
+
+    unprocessed = sum(len(v) for v in request_items.values())
+    raise RuntimeError(f"{unprocessed} items still unprocessed after {MAX_RETRIES} retries")
+
+
+class LoadStats:
+    """Thread-safe counters for the bulk loader"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = 0
+        self.batches = 0
+        self.retries = 0
+        self.started = time.perf_counter()
+
+    def add(self, rows: int, retries: int):
+        with self._lock:
+            self.rows += rows
+            self.batches += 1
+            self.retries += retries
+
+    @property
+    def rows_per_sec(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def _load_users(client, table_name: str, user_ids: range, days: int, start_date: datetime,
+                seed: int, stats: LoadStats):
+    serializer = TypeSerializer()
+    batch: List[Dict] = []
+    for item in generate_progress(user_ids, days, start_date, seed):
+        batch.append(item)
+        if len(batch) == BATCH_SIZE:
+            stats.add(len(batch), write_batch(client, table_name, batch, serializer))
+            batch = []
+    if batch:
+        stats.add(len(batch), write_batch(client, table_name, batch, serializer))
+
+
+def make_client(region: str, endpoint_url: Optional[str], workers: int):
+    """DynamoDB client with a connection pool large enough for every worker"""
+    return boto3.client(
+        'dynamodb',
+        region_name=region,
+        endpoint_url=endpoint_url,
+        config=Config(max_pool_connections=max(workers, 10), retries={'mode': 'adaptive'})
+    )
+
+
+def create_progress_table(client, table_name: str):
+    """Create the progress table (userId/date) if it does not exist"""
+    existing = client.list_tables().get('TableNames', [])
+    if table_name in existing:
+        return
+    client.create_table(
+        TableName=table_name,
+        AttributeDefinitions=[
+            {'AttributeName': 'userId', 'AttributeType': 'S'},
+            {'AttributeName': 'date', 'AttributeType': 'S'}
+        ],
+        KeySchema=[
+            {'AttributeName': 'userId', 'KeyType': 'HASH'},
+            {'AttributeName': 'date', 'KeyType': 'RANGE'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    client.get_waiter('table_exists').wait(TableName=table_name)
+
+
+def bulk_load_progress(
+    users: int,
+    days: int,
+    workers: int = 16,
+    table_name: str = 'FitGeniusProgress',
+    endpoint_url: Optional[str] = None,
+    region: str = 'us-east-1',
+    seed: int = 0,
+    report_every: float = 5.0,
+    client=None
+) -> LoadStats:
+    """
+    Seed users x days synthetic progress rows using a pool of worker
+    threads, each streaming its own slice of users through BatchWriteItem
+    """
+    if client is None:
+        client = make_client(region, endpoint_url, workers)
+
+    start_date = datetime.now() - timedelta(days=days)
+    stats = LoadStats()
+    chunk = max(1, -(-users // workers))
+    slices = [range(lo, min(lo + chunk, users)) for lo in range(0, users, chunk)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_load_users, client, table_name, user_ids, days, start_date, seed, stats)
+            for user_ids in slices
+        ]
+        pending = set(futures)
+        while pending:
+            _, pending = wait(pending, timeout=report_every if report_every > 0 else None)
+            if pending:
+                print(f"… {stats.rows:,} rows ({stats.rows_per_sec:,.0f} rows/s)")
+        for future in futures:
+            future.result()
+
+    print(
+        f"✓ Loaded {stats.rows:,} rows in {stats.batches:,} batches "
+        f"({stats.retries} retry rounds) at {stats.rows_per_sec:,.0f} rows/s"
+    )
+    return stats
+
+
+def backfill_summaries(table, user_ids: Optional[Iterable[str]] = None) -> int:
+    """
+    Build per-user summary items from history (ProgressStore.rebuild_summary)
+
+    Without user_ids, scans the table for users that have entries but no
+    summary; given user_ids are rebuilt even if they have one, to repair
+    drift. Returns the number of summaries written.
+    """
+    if user_ids is None:
+        users, summarized = set(), set()
+        kwargs = {'ProjectionExpression': '#u, #d', 'ExpressionAttributeNames': {'#u': 'userId', '#d': 'date'}}
+        while True:
+            response = table.scan(**kwargs)
+            for item in response['Items']:
+                (summarized if item['date'] == SUMMARY_DATE else users).add(item['userId'])
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+        user_ids = sorted(users - summarized)
+
+    store = ProgressStore(table)
+    written = sum(store.rebuild_summary(user_id) is not None for user_id in user_ids)
+    print(f"✓ Built {written:,} summaries")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load FitGenius sample progress data")
+    parser.add_argument('--bulk', action='store_true', help='seed synthetic data for many users')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--table', default='FitGeniusProgress')
+    parser.add_argument('--endpoint-url', help='e.g. http://localhost:8000 for DynamoDB Local or moto_server')
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--create-table', action='store_true')
+    parser.add_argument('--backfill-summaries', action='store_true',
+                        help='build missing per-user summaries from history, then exit')
+    parser.add_argument('--user-id', action='append', help='with --backfill-summaries: rebuild only these users')
+    args = parser.parse_args()
+
+    if args.backfill_summaries:
+        dynamodb = boto3.resource('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+        backfill_summaries(dynamodb.Table(args.table), args.user_id)
+        return
+
+    if not args.bulk:
+        load_sample_progress()
+        return
+
+    client = make_client(args.region, args.endpoint_url, args.workers)
+    if args.create_table:
+        create_progress_table(client, args.table)
+    bulk_load_progress(
+        args.users, args.days, args.workers, args.table, seed=args.seed, client=client
+    )
+
 
 if __name__ == "__main__":
-    load_sample_progress()
\ No newline at end of file
+    main()
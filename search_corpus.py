@@ -0,0 +1,271 @@
+"""
+FitGenius bundled search corpus
+
+The documents behind the fitness_search tool: one per catalog exercise,
+generated from workout_catalog.EXERCISES and a coaching cue, plus
+hand-written nutrition, supplement and research notes. Every document is
+a dict with id, category, title, summary, source and keywords.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+from workout_catalog import EXERCISES
+
+CATEGORIES = ("exercises", "nutrition", "supplements", "research")
+
+DIFFICULTY = {1: "beginner", 2: "intermediate", 3: "advanced"}
+
+# One coaching cue per catalog exercise ("Planks" is an alias of "Plank")
+EXERCISE_CUES = {
+    "Bodyweight Squats": "Sit the hips back and down until the thighs are parallel, knees tracking over the toes.",
+    "Push-ups (modified)": "Push-ups from the knees or an elevated surface to build pressing strength.",
+    "Lunges": "Step forward and lower the back knee towards the floor, keeping the front heel down.",
+    "Plank": "Hold a straight line from head to heels on the forearms, bracing the abs and glutes.",
+    "Side Plank": "Stack the feet and lift the hips off the floor to work the obliques.",
+    "Jumping Jacks": "Low-impact friendly warm-up and conditioning drill that raises heart rate quickly.",
+    "Brisk Walking": "Steady-state low-intensity cardio; aim for a pace where talking is possible but effortful.",
+    "Mountain Climbers": "Drive the knees to the chest from a high plank at a fast pace for core and conditioning.",
+    "High Knees": "Run on the spot lifting the knees to hip height for a short cardio interval.",
+    "Burpees": "Squat, jump the feet back to a plank, return and jump; a full body conditioning move.",
+    "Bicycle Crunches": "Alternate elbow to opposite knee while extending the other leg, keeping the lower back down.",
+    "Leg Raises": "Lying on the back, raise straight legs without arching the lower back.",
+    "Incline Push-ups": "Hands on a bench or wall make the push-up easier; lower the incline to progress.",
+    "Push-ups": "Hands under the shoulders, body rigid, lower the chest to the floor and press back up.",
+    "Step-ups": "Step onto a box or bench driving through the front heel; a knee-friendly single leg exercise.",
+    "Glute Bridges": "Lying on the back, drive the hips up by squeezing the glutes; gentle on the knees and back.",
+    "Calf Raises": "Rise onto the balls of the feet and lower slowly through a full range of motion.",
+    "Squats": "Any squat pattern; keep the chest up and brace the core through each rep.",
+    "Goblet Squats": "Hold a dumbbell at the chest and squat between the knees; a great squat teaching tool.",
+    "Back Squats": "Barbell on the upper back, brace and squat to depth; the main lower body strength lift.",
+    "Leg Press": "Machine squat alternative that loads the quads and glutes without spinal loading.",
+    "Romanian Deadlifts": "Hinge at the hips with soft knees, keeping the weight close, to train hamstrings and glutes.",
+    "Leg Curls": "Machine hamstring isolation; control the lowering phase.",
+    "Leg Extensions": "Machine quadriceps isolation; useful for knee rehab under guidance.",
+    "Dumbbell Rows": "One hand on a bench, row the dumbbell to the hip keeping the back flat.",
+    "Bent Over Rows": "Hinge forward and row the weight to the lower ribs, squeezing the shoulder blades.",
+    "Barbell Rows": "Heavy horizontal pulling for back thickness; avoid jerking the torso.",
+    "Face Pulls": "Pull a rope attachment towards the face with elbows high for rear delts and shoulder health.",
+    "Pull-ups": "Hang from a bar and pull the chin over it; use bands or negatives to progress.",
+    "Lat Pulldowns": "Cable pull-up alternative; pull the bar to the upper chest without leaning back far.",
+    "Shoulder Press": "Press dumbbells overhead from shoulder height without arching the lower back.",
+    "Overhead Press": "Standing press from the shoulders to lockout overhead, glutes and abs braced.",
+    "Military Press": "Strict standing barbell press with the feet together.",
+    "Lateral Raises": "Raise the arms out to the sides to shoulder height to build the side delts.",
+    "Barbell Bench Press": "Lower the bar to the mid chest and press up, shoulder blades pinned; use a spotter.",
+    "Incline Dumbbell Press": "Press on a 30-45 degree bench to emphasise the upper chest.",
+    "Close-Grip Bench": "Bench press with a shoulder-width grip to shift the work to the triceps.",
+    "Cable Flyes": "Bring the handles together in a hugging arc with a slight elbow bend for chest isolation.",
+    "Bicep Curls": "Curl the weight without swinging, elbows pinned to the sides.",
+    "Barbell Curls": "Two-handed curl allowing heavier loads for the biceps.",
+    "Hammer Curls": "Neutral-grip curl for the brachialis and forearms.",
+    "Tricep Dips": "Hands on a bench behind you, lower until the elbows reach 90 degrees and press up.",
+    "Tricep Pushdowns": "Push a cable attachment down to full elbow extension, elbows at the sides.",
+    "Overhead Tricep Extension": "Lower the weight behind the head and extend to stretch the long head of the triceps.",
+    "Towel Rows": "Loop a towel round a sturdy door handle, lean back and row yourself in; a no-equipment back exercise.",
+    "Superman Holds": "Lying face down, lift the arms and legs off the floor and hold to train the lower back.",
+    "Single-Leg Romanian Deadlifts": "Hinge on one leg, reaching the opposite leg back, for hamstrings and balance.",
+    "Bulgarian Split Squats": "Rear foot on a bench or chair, lower into a split squat; hard single leg work.",
+    "Pike Push-ups": "Hips high in an inverted V, lower the head towards the floor to load the shoulders.",
+    "Diamond Push-ups": "Hands together under the chest so the triceps do most of the pressing.",
+    "Bodyweight Tricep Extensions": "Hands on a bench or wall, bend only the elbows and press back to straight arms.",
+}
+
+
+def _equipment_text(options) -> str:
+    if any(not option for option in options):
+        return "bodyweight, no equipment"
+    return " or ".join(" and ".join(sorted(option)).replace("_", " ") for option in options)
+
+
+def _exercise_documents() -> List[Dict]:
+    documents = []
+    for name, exercise in EXERCISES.items():
+        if name not in EXERCISE_CUES:
+            continue
+        muscles = ", ".join(sorted(exercise.muscle_groups)).replace("_", " ")
+        documents.append({
+            "id": "exercises:" + re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-"),
+            "category": "exercises",
+            "title": name,
+            "summary": (f"{EXERCISE_CUES[name]} Works {muscles}. Equipment: "
+                        f"{_equipment_text(exercise.equipment_options)}. "
+                        f"Level: {DIFFICULTY[exercise.difficulty]}."),
+            "source": "FitGenius Exercise Library",
+            "keywords": [exercise.movement_pattern.replace("_", " "), *sorted(exercise.muscle_groups)],
+        })
+    return documents
+
+
+def _document(category: str, slug: str, title: str, summary: str, source: str, *keywords: str) -> Dict:
+    return {"id": f"{category}:{slug}", "category": category, "title": title, "summary": summary,
+            "source": source, "keywords": list(keywords)}
+
+
+NUTRITION_SOURCE = "FitGenius Nutrition Guide"
+SUPPLEMENT_SOURCE = "FitGenius Supplement Guide"
+
+_NUTRITION: Tuple[Dict, ...] = (
+    _document("nutrition", "protein-intake", "Daily protein intake",
+              "Active adults building or keeping muscle do well on 1.6-2.2 g of protein per kg of body weight "
+              "per day, spread over 3-5 meals of roughly 0.4 g/kg each. Higher intakes help preserve lean mass "
+              "during a calorie deficit.", NUTRITION_SOURCE, "muscle", "macros", "lean mass"),
+    _document("nutrition", "calorie-deficit", "Calorie deficit for fat loss",
+              "A deficit of about 500 kcal per day below maintenance (TDEE) gives roughly 0.5 kg of fat loss "
+              "per week. Larger deficits speed weight loss but cost more muscle, energy and adherence.",
+              NUTRITION_SOURCE, "lose weight", "weight loss", "fat loss", "tdee", "cutting"),
+    _document("nutrition", "calorie-surplus", "Calorie surplus for muscle gain",
+              "A modest surplus of 250-500 kcal per day above maintenance supports muscle gain while limiting "
+              "fat gain. Aim for 0.25-0.5% of body weight gained per week.", NUTRITION_SOURCE,
+              "bulking", "muscle gain", "weight gain", "tdee"),
+    _document("nutrition", "carbohydrates", "Carbohydrates and training performance",
+              "Carbohydrates fuel high-intensity training. Most lifters need 3-5 g/kg per day; endurance "
+              "athletes training over an hour a day may need 6-10 g/kg. Favour whole grains, fruit and legumes.",
+              NUTRITION_SOURCE, "carbs", "glycogen", "energy", "endurance"),
+    _document("nutrition", "dietary-fat", "Dietary fat",
+              "Keep fat at 20-35% of calories, and not below about 0.5 g/kg, to support hormones and absorb "
+              "vitamins A, D, E and K. Prefer olive oil, nuts, seeds, avocado and oily fish.", NUTRITION_SOURCE,
+              "fats", "omega 3", "hormones", "macros"),
+    _document("nutrition", "fiber", "Fiber and satiety",
+              "Adults should eat 25-38 g of fiber per day from vegetables, fruit, legumes and whole grains. "
+              "Fiber improves fullness during a diet and supports digestion.", NUTRITION_SOURCE,
+              "fibre", "vegetables", "hunger", "satiety"),
+    _document("nutrition", "hydration", "Hydration for exercise",
+              "Drink 5-7 ml/kg of water about four hours before exercise and replace sweat losses afterwards "
+              "with about 1.5 L per kg of body weight lost. Pale yellow urine is a practical hydration check.",
+              NUTRITION_SOURCE, "water", "fluids", "sweat", "electrolytes"),
+    _document("nutrition", "pre-workout-meal", "Pre-workout meal",
+              "Eat a meal with carbohydrates and some protein 2-3 hours before training, or a small carb-based "
+              "snack such as a banana 30-60 minutes before. Keep fat and fiber low right before exercise.",
+              NUTRITION_SOURCE, "pre workout", "meal timing", "snack"),
+    _document("nutrition", "post-workout-meal", "Post-workout nutrition",
+              "A meal with 20-40 g of protein and some carbohydrates within a few hours after training supports "
+              "recovery and muscle protein synthesis. Total daily intake matters more than exact timing.",
+              NUTRITION_SOURCE, "recovery", "meal timing", "anabolic window"),
+    _document("nutrition", "plant-protein", "Plant-based protein sources",
+              "Vegetarian and vegan athletes can meet protein needs with tofu, tempeh, seitan, lentils, beans, "
+              "soy milk and pea protein. Combining sources and eating slightly more protein covers essential "
+              "amino acids such as leucine.", NUTRITION_SOURCE, "vegetarian", "vegan", "legumes", "soy"),
+    _document("nutrition", "lactose-free", "Lactose-free protein options",
+              "For lactose intolerance choose lactose-free milk and yogurt, whey protein isolate (very low "
+              "lactose), eggs, meat, fish, tofu or pea protein.", NUTRITION_SOURCE,
+              "lactose intolerance", "dairy free", "dietary restrictions"),
+    _document("nutrition", "micronutrients", "Micronutrients for active people",
+              "Iron, calcium, vitamin D and magnesium are the most common shortfalls in athletes. A varied diet "
+              "with colourful vegetables, dairy or fortified alternatives, and lean red meat or legumes covers "
+              "most needs.", NUTRITION_SOURCE, "vitamins", "minerals", "iron", "calcium"),
+    _document("nutrition", "alcohol", "Alcohol and fitness goals",
+              "Alcohol adds 7 kcal per gram, impairs sleep and can reduce muscle protein synthesis after "
+              "training. Limit intake, especially on training days and during a fat loss phase.",
+              NUTRITION_SOURCE, "drinking", "recovery", "sleep"),
+    _document("nutrition", "meal-frequency", "Meal frequency and intermittent fasting",
+              "Meal frequency has little effect on fat loss when calories and protein are equal. Intermittent "
+              "fasting works for people who find it easier to control calories, but spread protein over the "
+              "eating window.", NUTRITION_SOURCE, "intermittent fasting", "meals per day", "meal timing"),
+    _document("nutrition", "sodium-electrolytes", "Sodium and electrolytes",
+              "Heavy sweaters can lose 1-2 g of sodium per hour. For sessions over 60-90 minutes in heat, add "
+              "sodium and potassium through food or an electrolyte drink to prevent cramps and hyponatremia.",
+              NUTRITION_SOURCE, "salt", "potassium", "cramps", "hydration"),
+)
+
+_SUPPLEMENTS: Tuple[Dict, ...] = (
+    _document("supplements", "creatine", "Creatine monohydrate",
+              "Creatine monohydrate at 3-5 g per day increases strength, power and lean mass gains from "
+              "resistance training. A loading phase is optional. It is one of the most researched and safe "
+              "supplements; expect a small water weight gain.", SUPPLEMENT_SOURCE,
+              "strength", "power", "muscle gain", "ergogenic"),
+    _document("supplements", "whey-protein", "Whey protein",
+              "Whey is a fast-digesting, leucine-rich dairy protein. It is a convenient way to reach daily "
+              "protein targets, but it is not superior to protein from whole foods.", SUPPLEMENT_SOURCE,
+              "protein powder", "shake", "leucine", "dairy"),
+    _document("supplements", "casein", "Casein protein",
+              "Casein digests slowly and is often taken before bed; 30-40 g can support overnight muscle "
+              "protein synthesis.", SUPPLEMENT_SOURCE, "protein powder", "night", "sleep", "dairy"),
+    _document("supplements", "caffeine", "Caffeine",
+              "Caffeine at 3-6 mg/kg taken 30-60 minutes before exercise improves endurance, strength and "
+              "focus. Avoid it within 6 hours of bedtime and keep total intake under about 400 mg per day.",
+              SUPPLEMENT_SOURCE, "pre workout", "coffee", "energy", "performance"),
+    _document("supplements", "beta-alanine", "Beta-alanine",
+              "Beta-alanine at 4-6 g per day for at least 2-4 weeks raises muscle carnosine and helps efforts "
+              "lasting 1-4 minutes. A harmless tingling (paresthesia) is common.", SUPPLEMENT_SOURCE,
+              "endurance", "buffering", "pre workout", "carnosine"),
+    _document("supplements", "vitamin-d", "Vitamin D",
+              "People with little sun exposure are often low in vitamin D. 1000-2000 IU per day is a common "
+              "maintenance dose; check blood levels before taking high doses.", SUPPLEMENT_SOURCE,
+              "vitamins", "bone health", "immune"),
+    _document("supplements", "omega-3", "Omega-3 fish oil",
+              "EPA and DHA from fish oil or algae oil (1-3 g per day) support heart health and may reduce muscle "
+              "soreness. Eating oily fish twice a week is an alternative.", SUPPLEMENT_SOURCE,
+              "fish oil", "epa", "dha", "fats", "inflammation"),
+    _document("supplements", "bcaa", "Branched-chain amino acids (BCAAs)",
+              "BCAAs add little when daily protein intake is adequate; complete protein sources already supply "
+              "them. They are not recommended for most lifters.", SUPPLEMENT_SOURCE,
+              "amino acids", "leucine", "recovery"),
+    _document("supplements", "citrulline", "Citrulline malate",
+              "Citrulline malate at 6-8 g before training may slightly improve high-repetition resistance "
+              "training performance and reduce soreness; evidence is mixed.", SUPPLEMENT_SOURCE,
+              "pre workout", "nitric oxide", "pump"),
+    _document("supplements", "electrolyte-drinks", "Electrolyte and sports drinks",
+              "Sports drinks with 6-8% carbohydrate and sodium help during long or hot sessions. For workouts "
+              "under an hour, water is usually enough.", SUPPLEMENT_SOURCE,
+              "hydration", "sodium", "endurance", "carbs"),
+    _document("supplements", "magnesium", "Magnesium",
+              "Magnesium supports muscle and nerve function. Supplements (200-400 mg) help only if intake is "
+              "low; good food sources are nuts, seeds, whole grains and leafy greens.", SUPPLEMENT_SOURCE,
+              "minerals", "sleep", "cramps"),
+)
+
+_RESEARCH: Tuple[Dict, ...] = (
+    _document("research", "protein-meta-analysis", "Protein supplementation and resistance training",
+              "A meta-analysis of 49 trials found protein supplementation increased strength and muscle gains "
+              "from resistance training, with benefits plateauing around 1.6 g/kg of daily protein intake.",
+              "Morton et al., British Journal of Sports Medicine, 2018", "protein", "muscle gain", "strength"),
+    _document("research", "training-volume", "Weekly training volume and hypertrophy",
+              "A dose-response meta-analysis found more weekly sets per muscle group produced more hypertrophy; "
+              "10 or more sets per muscle per week outperformed fewer than 5.",
+              "Schoenfeld, Ogborn and Krieger, Journal of Sports Sciences, 2017",
+              "sets", "volume", "muscle gain", "hypertrophy"),
+    _document("research", "training-frequency", "Training frequency and hypertrophy",
+              "Training each muscle group at least twice per week produced greater hypertrophy than once per "
+              "week when weekly volume was similar.",
+              "Schoenfeld, Ogborn and Krieger, Sports Medicine, 2016",
+              "frequency", "split", "muscle gain", "hypertrophy"),
+    _document("research", "creatine-position-stand", "ISSN position stand: creatine",
+              "Creatine monohydrate is the most effective ergogenic supplement for high-intensity exercise "
+              "capacity and lean mass, and is safe for healthy people at recommended doses.",
+              "Kreider et al., Journal of the International Society of Sports Nutrition, 2017",
+              "creatine", "supplements", "safety", "strength"),
+    _document("research", "caffeine-position-stand", "ISSN position stand: caffeine",
+              "Caffeine at 3-6 mg/kg consistently improves exercise performance across endurance, strength "
+              "and team sports, with large individual variation.",
+              "Guest et al., Journal of the International Society of Sports Nutrition, 2021",
+              "caffeine", "supplements", "performance"),
+    _document("research", "contest-prep", "Nutrition for natural bodybuilding contest preparation",
+              "Recommends 2.3-3.1 g/kg of lean body mass protein, weight loss of 0.5-1% of body weight per "
+              "week, and 15-30% of calories from fat during contest preparation.",
+              "Helms, Aragon and Fitschen, Journal of the International Society of Sports Nutrition, 2014",
+              "cutting", "fat loss", "protein", "bodybuilding"),
+    _document("research", "mifflin-st-jeor", "Predicting resting energy expenditure",
+              "The Mifflin-St Jeor equation estimates resting metabolic rate from weight, height, age and sex "
+              "and is the most accurate common formula for healthy adults.",
+              "Mifflin et al., American Journal of Clinical Nutrition, 1990",
+              "bmr", "metabolism", "calories", "tdee"),
+    _document("research", "energy-imbalance", "Energy imbalance and body weight",
+              "Modelling showed weight change slows over time during a sustained calorie deficit, so the old "
+              "3500 kcal per pound rule overestimates long-term weight loss.",
+              "Hall et al., The Lancet, 2011", "weight loss", "calorie deficit", "metabolism", "plateau"),
+    _document("research", "activity-guidelines", "Physical activity guidelines for adults",
+              "Adults should do 150-300 minutes of moderate or 75-150 minutes of vigorous aerobic activity per "
+              "week, plus muscle-strengthening activities on 2 or more days.",
+              "Physical Activity Guidelines for Americans, 2nd edition, 2018",
+              "cardio", "aerobic", "health", "strength training"),
+    _document("research", "hiit-vo2max", "HIIT versus continuous training for VO2max",
+              "High-intensity interval training and moderate continuous endurance training both improve "
+              "VO2max, with HIIT giving slightly larger gains in less training time.",
+              "Milanovic, Sporis and Weston, Sports Medicine, 2015",
+              "hiit", "interval training", "cardio", "endurance"),
+)
+
+
+# Every bundled document, exercises first
+CORPUS: Tuple[Dict, ...] = (*_exercise_documents(), *_NUTRITION, *_SUPPLEMENTS, *_RESEARCH)
@@ -0,0 +1,313 @@
+"""
+FitGenius conversation sessions
+
+Per-user conversation state for process_user_request, so clients send only
+the new turn. A Session keeps the user's merged context, the last
+max_turns exchanges verbatim (truncated to max_turn_chars) and a bounded
+extractive summary of older turns; each model message is built from that
+summary plus the new request.
+
+SessionStore holds sessions in an in-memory LRU (max_sessions) with an
+idle TTL, optionally backed by a directory of JSON files or a DynamoDB
+table so conversations survive restarts and move between workers.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from decimal import Decimal
+from typing import Deque, Dict, Optional, Tuple
+
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_MAX_TURNS = 3
+DEFAULT_MAX_TURN_CHARS = 600
+DEFAULT_SUMMARY_MAX_LINES = 20
+DEFAULT_TTL_SECONDS = 3600.0
+# Each summary line keeps about one sentence of each side
+SUMMARY_USER_CHARS = 120
+SUMMARY_ASSISTANT_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+def first_sentence(text: str, limit: int) -> str:
+    """The first sentence of text, clipped to limit characters"""
+    text = " ".join(str(text).split())
+    return _clip(_SENTENCE_END.split(text, 1)[0], limit)
+
+
+class Session:
+    """One user's rolling conversation state"""
+
+    def __init__(self, user_id: str, max_turns: int = DEFAULT_MAX_TURNS,
+                 summary_max_lines: int = DEFAULT_SUMMARY_MAX_LINES):
+        self.user_id = user_id
+        self.turns: Deque[Tuple[str, str]] = deque(maxlen=max_turns)
+        self.summary: Deque[str] = deque(maxlen=summary_max_lines)
+        self.context: Dict = {}
+        self.turn_count = 0
+        # Characters of every exchange so far: what a client would resend without a session
+        self.history_chars = 0
+        self.created_at = self.updated_at = time.time()
+
+    def merged_context(self, context: Optional[Dict]) -> Dict:
+        """The session context updated with this turn's fields (None removes a field)"""
+        merged = dict(self.context)
+        for key, value in (context or {}).items():
+            if value is None:
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        return merged
+
+    def add_turn(self, user_input: str, response: str, max_turn_chars: int = DEFAULT_MAX_TURN_CHARS):
+        if len(self.turns) == self.turns.maxlen:
+            oldest_user, oldest_assistant = self.turns[0]
+            self.summary.append(f"{first_sentence(oldest_user, SUMMARY_USER_CHARS)} -> "
+                                f"{first_sentence(oldest_assistant, SUMMARY_ASSISTANT_CHARS)}")
+        self.turns.append((_clip(user_input, max_turn_chars), _clip(response, max_turn_chars)))
+        self.turn_count += 1
+        self.history_chars += len(user_input) + len(response)
+        self.updated_at = time.time()
+
+    def history_text(self) -> str:
+        """Summary and recent turns as they are sent to the model ("" for a new session)"""
+        parts = []
+        if self.summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(f"- {line}" for line in self.summary))
+        if self.turns:
+            parts.append("Recent turns:\n" + "\n".join(f"User: {u}\nAssistant: {a}" for u, a in self.turns))
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "user_id": self.user_id,
+            "turns": [list(turn) for turn in self.turns],
+            "summary": list(self.summary),
+            "context": self.context,
+            "turn_count": self.turn_count,
+            "history_chars": self.history_chars,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, max_turns: int = DEFAULT_MAX_TURNS,
+                  summary_max_lines: int = DEFAULT_SUMMARY_MAX_LINES) -> "Session":
+        session = cls(data["user_id"], max_turns, summary_max_lines)
+        session.turns.extend(tuple(turn) for turn in data.get("turns", []))
+        session.summary.extend(data.get("summary", []))
+        session.context = data.get("context", {})
+        session.turn_count = int(data.get("turn_count", 0))
+        session.history_chars = int(data.get("history_chars", 0))
+        session.created_at = float(data.get("created_at", time.time()))
+        session.updated_at = float(data.get("updated_at", session.created_at))
+        return session
+
+
+# -- backing tiers ---------------------------------------------------------
+
+class DiskSessionBackend:
+    """One JSON file per session in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, user_id: str) -> str:
+        # User IDs become file names; keep them to a safe character set
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_.-]", "_", user_id) + ".json")
+
+    def load(self, user_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(user_id), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get("user_id") == user_id else None
+
+    def save(self, user_id: str, data: Dict, expires_at: Optional[float]):
+        payload = json.dumps(dict(data, expires_at=expires_at), default=str).encode("utf-8")
+        # Atomic replace so a concurrent reader never sees a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._path(user_id))
+
+    def delete(self, user_id: str):
+        try:
+            os.remove(self._path(user_id))
+        except FileNotFoundError:
+            pass
+
+
+class DynamoSessionBackend:
+    """
+    Sessions as items in a DynamoDB table keyed by userId
+
+    The session is stored as one JSON string attribute; expiresAt (epoch
+    seconds) can be enabled as the table's TTL attribute so DynamoDB
+    deletes idle sessions itself.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def load(self, user_id: str) -> Optional[Dict]:
+        item = self.table.get_item(Key={"userId": user_id}).get("Item")
+        if item is None:
+            return None
+        data = json.loads(item["session"])
+        data["expires_at"] = float(item["expiresAt"]) if "expiresAt" in item else None
+        return data
+
+    def save(self, user_id: str, data: Dict, expires_at: Optional[float]):
+        item = {"userId": user_id, "session": json.dumps(data, default=str)}
+        if expires_at is not None:
+            item["expiresAt"] = Decimal(int(expires_at))
+        self.table.put_item(Item=item)
+
+    def delete(self, user_id: str):
+        self.table.delete_item(Key={"userId": user_id})
+
+
+# -- store -----------------------------------------------------------------
+
+class SessionStore:
+    """LRU + idle-TTL store of Sessions with an optional backing tier"""
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS, max_turns: int = DEFAULT_MAX_TURNS,
+                 max_turn_chars: int = DEFAULT_MAX_TURN_CHARS,
+                 summary_max_lines: int = DEFAULT_SUMMARY_MAX_LINES,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS, backend=None):
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.max_turn_chars = max_turn_chars
+        self.summary_max_lines = summary_max_lines
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.backend_hits = 0
+        self.created = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def _expired(self, updated_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - updated_at > self.ttl_seconds
+
+    def get(self, user_id: str) -> Session:
+        """The user's live session, restored from the backing tier or started afresh"""
+        now = time.time()
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                if not self._expired(session.updated_at, now):
+                    self._sessions.move_to_end(user_id)
+                    self.memory_hits += 1
+                    return session
+                del self._sessions[user_id]
+                self.expired += 1
+
+        data = self.backend.load(user_id) if self.backend is not None else None
+        hit = data is not None and not self._expired(float(data.get("updated_at", 0)), now)
+        if hit:
+            session = Session.from_dict(data, self.max_turns, self.summary_max_lines)
+        else:
+            if data is not None:
+                self.backend.delete(user_id)
+            session = Session(user_id, self.max_turns, self.summary_max_lines)
+
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep that one
+            existing = self._sessions.get(user_id)
+            if existing is not None:
+                return existing
+            if hit:
+                self.backend_hits += 1
+            else:
+                self.created += 1
+                self.expired += data is not None
+            self._remember(session)
+        return session
+
+    def _remember(self, session: Session):
+        self._sessions[session.user_id] = session
+        self._sessions.move_to_end(session.user_id)
+        while len(self._sessions) > self.max_sessions:
+            # Evicted sessions live on in the backing tier, if there is one
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def record_turn(self, session: Session, user_input: str, response: str, context: Optional[Dict] = None):
+        """Add a completed exchange (and the turn's context) to the session and persist it"""
+        with self._lock:
+            session.context = session.merged_context(context)
+            session.add_turn(user_input, str(response), self.max_turn_chars)
+            data = session.to_dict()
+        if self.backend is not None:
+            expires_at = session.updated_at + self.ttl_seconds if self.ttl_seconds is not None else None
+            self.backend.save(session.user_id, data, expires_at)
+
+    def end(self, user_id: str):
+        """Drop a session from every tier"""
+        with self._lock:
+            self._sessions.pop(user_id, None)
+        if self.backend is not None:
+            self.backend.delete(user_id)
+
+    def build_message(self, session: Session, user_input: str, context_text: str = "") -> str:
+        """The model message for a new turn: session history, context block and request"""
+        parts = [part for part in (session.history_text(), context_text) if part]
+        parts.append(f"User Request: {user_input}" if parts else user_input)
+        return "\n\n".join(parts)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_hits": self.memory_hits,
+                "backend_hits": self.backend_hits,
+                "created": self.created,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+
+def create_session_store(settings: Optional[Dict] = None, dynamodb=None) -> Optional[SessionStore]:
+    """SessionStore from the agent.sessions config section; None when disabled"""
+    settings = settings or {}
+    if not settings.get("enabled", True):
+        return None
+    kind = settings.get("backend", "memory")
+    if kind == "memory":
+        backend = None
+    elif kind == "disk":
+        if not settings.get("disk_dir"):
+            raise ValueError("agent.sessions.backend 'disk' needs disk_dir")
+        backend = DiskSessionBackend(settings["disk_dir"])
+    elif kind == "dynamodb":
+        backend = DynamoSessionBackend(dynamodb.Table(settings.get("table", "FitGeniusSessions")))
+    else:
+        raise ValueError(f"Unknown session backend {kind!r}; expected memory, disk or dynamodb")
+    ttl_minutes = settings.get("ttl_minutes", DEFAULT_TTL_SECONDS / 60)
+    return SessionStore(
+        max_sessions=settings.get("max_sessions", DEFAULT_MAX_SESSIONS),
+        max_turns=settings.get("max_turns", DEFAULT_MAX_TURNS),
+        max_turn_chars=settings.get("max_turn_chars", DEFAULT_MAX_TURN_CHARS),
+        summary_max_lines=settings.get("summary_max_lines", DEFAULT_SUMMARY_MAX_LINES),
+        ttl_seconds=ttl_minutes * 60 if ttl_minutes is not None else None,
+        backend=backend,
+    )
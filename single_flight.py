@@ -0,0 +1,100 @@
+"""
+FitGenius in-flight request coalescing
+
+SingleFlight runs at most one call per key at a time. The first caller
+for a key (the leader) runs the function; callers arriving while it is in
+flight wait on the same concurrent.futures.Future and get its result or
+exception. Threads use do() and coroutines use ado(); both share one
+table of flights, so a retry arriving on the event loop joins a call a
+worker thread already started. Nothing is kept once a call finishes;
+caching finished results is analysis_cache's job.
+"""
+
+import asyncio
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key
+
+    Waiting callers receive deep copies of the leader's result so no two
+    callers share a mutable dict (copy_results=False hands out the object
+    itself).
+    """
+
+    def __init__(self, copy_results: bool = True):
+        self.copy_results = copy_results
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        """The flight for key and whether this caller leads it"""
+        with self._lock:
+            self.calls += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            # Running futures cannot be cancelled, so one impatient waiter
+            # cannot cancel the flight for everyone else
+            future.set_running_or_notify_cancel()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def _lead(self, key: Hashable, future: Future, fn: Callable[[], Any]) -> Any:
+        try:
+            result = fn()
+        except BaseException as exc:
+            with self._lock:
+                self.failures += 1
+                del self._flights[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._flights[key]
+        future.set_result(result)
+        return result
+
+    def _share(self, result: Any) -> Any:
+        return copy.deepcopy(result) if self.copy_results else result
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() for the first caller with key; callers meanwhile wait for its result"""
+        future, leader = self._join(key)
+        if leader:
+            return self._lead(key, future, fn)
+        return self._share(future.result())
+
+    async def ado(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Async do(): a leading coroutine runs the blocking fn in a worker thread"""
+        future, leader = self._join(key)
+        if leader:
+            # The thread finishes the flight even if this coroutine is cancelled
+            return await asyncio.to_thread(self._lead, key, future, fn)
+        return self._share(await asyncio.wrap_future(future))
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def stats(self) -> Dict:
+        """Counters; every coalesced call is a backend call saved"""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "failures": self.failures,
+                "in_flight": len(self._flights),
+            }
@@ -0,0 +1,39 @@
+"""
+Shared fixtures for the FitGenius test suite
+"""
+
+import boto3
+import pytest
+from moto import mock_aws
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    """Dummy credentials so clients can be built offline"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture
+def mocked_aws(aws_credentials):
+    """Moto-backed AWS for the duration of the test"""
+    with mock_aws():
+        yield
+
+
+@pytest.fixture
+def progress_table(mocked_aws):
+    """Moto-backed FitGeniusProgress table"""
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    return dynamodb.create_table(
+        TableName="FitGeniusProgress",
+        AttributeDefinitions=[
+            {"AttributeName": "userId", "AttributeType": "S"},
+            {"AttributeName": "date", "AttributeType": "S"},
+        ],
+        KeySchema=[
+            {"AttributeName": "userId", "KeyType": "HASH"},
+            {"AttributeName": "date", "KeyType": "RANGE"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
@@ -0,0 +1,137 @@
+"""
+Unit tests for the per-request agent pool
+Run with: pytest tests/test_agent_pool.py -v
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent_pool import AgentPool
+from request_executor import RequestExecutor
+
+
+class FakeAgent:
+    """Fails if two threads are ever inside process() at once, like a Strands Agent's shared history"""
+
+    def __init__(self, tools=()):
+        self.tools = list(tools)
+        self.messages = []
+        self._busy = threading.Lock()
+
+    def process(self, message):
+        assert self._busy.acquire(blocking=False), "agent used by two requests at once"
+        try:
+            self.messages.append(message)
+            time.sleep(0.01)
+            return f"reply to {message}"
+        finally:
+            self._busy.release()
+
+
+class TestAgentPool:
+    """Tests for leasing agents"""
+
+    def test_idle_agent_is_reused(self):
+        """Test that sequential leases for a key share one agent"""
+        pool = AgentPool(max_agents=4)
+        with pool.lease("all", FakeAgent) as first:
+            pass
+        with pool.lease("all", FakeAgent) as second:
+            pass
+
+        assert first is second
+        assert pool.stats() == {"leases": 2, "created": 1, "waits": 0, "idle": 1, "keys": 1}
+
+    def test_keys_get_separate_agents(self):
+        """Test that each tool subset has its own agents"""
+        pool = AgentPool(max_agents=4)
+        with pool.lease(("bmi",), FakeAgent) as bmi, pool.lease(("diet",), FakeAgent) as diet:
+            assert bmi is not diet
+
+    def test_released_agent_is_cleared(self):
+        """Test that a returned agent does not carry the previous request's turns"""
+        pool = AgentPool(max_agents=1)
+        with pool.lease("all", FakeAgent) as agent:
+            agent.process("user-1 weighs 80 kg")
+        assert agent.messages == []
+
+    def test_callers_wait_beyond_max_agents(self):
+        """Test that at most max_agents are built per key and further callers wait"""
+        pool = AgentPool(max_agents=2)
+
+        def use(_):
+            with pool.lease("all", FakeAgent) as agent:
+                return agent.process("hi")
+
+        with ThreadPoolExecutor(6) as threads:
+            assert len(list(threads.map(use, range(6)))) == 6
+
+        stats = pool.stats()
+        assert stats["created"] == 2
+        assert stats["waits"] >= 1
+
+    def test_failed_build_frees_the_slot(self):
+        """Test that a factory error does not use up one of max_agents"""
+        pool = AgentPool(max_agents=1)
+
+        def broken():
+            raise RuntimeError("no credentials")
+
+        with pytest.raises(RuntimeError):
+            with pool.lease("all", broken):
+                pass
+        with pool.lease("all", FakeAgent) as agent:
+            assert isinstance(agent, FakeAgent)
+        assert pool.stats()["created"] == 1
+
+    def test_invalid_size_rejected(self):
+        """Test that an empty pool is a configuration error"""
+        with pytest.raises(ValueError):
+            AgentPool(max_agents=0)
+
+
+class TestAgentPoolUnderExecutor:
+    """Tests for concurrent requests through the request executor"""
+
+    def test_concurrent_requests_never_share_an_agent(self):
+        """Test that process calls on one agent never overlap when requests run concurrently"""
+        pool = AgentPool(max_agents=4)
+
+        def handle(user_input):
+            with pool.lease("all", FakeAgent) as agent:
+                return agent.process(user_input)
+
+        executor = RequestExecutor(handle, max_concurrency=4, max_pending=64)
+
+        async def run():
+            return await asyncio.gather(*(executor.submit(f"user-{i}", f"request {i}") for i in range(32)))
+
+        try:
+            responses = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert responses == [f"reply to request {i}" for i in range(32)]
+        assert executor.stats()["peak_running"] > 1
+        assert pool.stats()["created"] <= 4
+
+    def test_process_many_never_shares_an_agent(self):
+        """Test that FitGeniusAgent.process_many leases one agent per concurrent request"""
+        pytest.importorskip("strands")
+        from aws_clients import AWSClients
+        from fitgenius_agent import FitGeniusAgent
+
+        agent = FitGeniusAgent({"agent": {"concurrency": {"max_concurrency": 4}}}, aws=AWSClients("us-east-1"))
+        agent.create_agent = FakeAgent
+        try:
+            responses = agent.process_many([{"user_input": f"request {i}"} for i in range(16)])
+        finally:
+            agent.close()
+
+        assert responses == [f"reply to request {i}" for i in range(16)]
+        assert agent.executor.stats()["peak_running"] > 1
+        assert agent.agent_pool.stats()["created"] <= 4
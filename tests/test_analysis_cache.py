@@ -0,0 +1,115 @@
+"""
+Unit tests for the body analysis result cache
+Run with: pytest tests/test_analysis_cache.py -v
+"""
+
+import base64
+import os
+
+import pytest
+
+from analysis_cache import AnalysisCache, cache_key
+
+IMAGE = base64.b64encode(b"\xff\xd8\xff fake jpeg bytes").decode()
+USER_INFO = {"age": 28, "gender": "male", "height_cm": 175, "weight_kg": 85}
+
+
+class TestCacheKey:
+    """Tests for content-addressed cache keys"""
+
+    def test_key_ignores_user_info_order(self):
+        """Test that user_info key order does not change the key"""
+        reordered = dict(reversed(list(USER_INFO.items())))
+
+        assert cache_key(IMAGE, USER_INFO) == cache_key(IMAGE, reordered)
+
+    def test_key_uses_decoded_bytes(self):
+        """Test that data URLs and plain base64 of the same image match"""
+        assert cache_key(f"data:image/jpeg;base64,{IMAGE}", USER_INFO) == cache_key(IMAGE, USER_INFO)
+
+    def test_key_changes_with_inputs(self):
+        """Test that different images or user info produce different keys"""
+        other_image = base64.b64encode(b"another image").decode()
+
+        assert cache_key(IMAGE, USER_INFO) != cache_key(other_image, USER_INFO)
+        assert cache_key(IMAGE, USER_INFO) != cache_key(IMAGE, {**USER_INFO, "weight_kg": 84})
+
+    def test_invalid_base64(self):
+        """Test that undecodable image data is rejected"""
+        with pytest.raises(ValueError):
+            cache_key("not base64!", USER_INFO)
+
+
+class TestAnalysisCache:
+    """Tests for the two-tier cache"""
+
+    def test_get_or_compute_counts_hits(self):
+        """Test that repeated uploads only compute once"""
+        cache = AnalysisCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"analysis": "lean", "user_info": USER_INFO}
+
+        first = cache.get_or_compute(IMAGE, USER_INFO, compute)
+        second = cache.get_or_compute(IMAGE, USER_INFO, compute)
+
+        assert first == second
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        assert cache.stats()["bedrock_calls_saved"] == 1
+
+    def test_results_are_copies(self):
+        """Test that callers cannot mutate cached results"""
+        cache = AnalysisCache()
+        cache.put("k", {"analysis": "lean"})
+
+        cache.get("k")["analysis"] = "changed"
+
+        assert cache.get("k") == {"analysis": "lean"}
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", {"v": 1})
+        cache.put("b", {"v": 2})
+        cache.get("a")
+        cache.put("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self, monkeypatch):
+        """Test that entries older than the TTL are misses"""
+        now = [1000.0]
+        monkeypatch.setattr("analysis_cache.time.time", lambda: now[0])
+        cache = AnalysisCache(ttl_seconds=60)
+        cache.put("k", {"v": 1})
+
+        now[0] += 61
+
+        assert cache.get("k") is None
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a new cache instance reads results from disk"""
+        AnalysisCache(disk_dir=str(tmp_path)).put("k", {"analysis": "lean"})
+
+        cache = AnalysisCache(disk_dir=str(tmp_path))
+
+        assert cache.get("k") == {"analysis": "lean"}
+        assert cache.stats()["disk_hits"] == 1
+        assert cache.get("k") == {"analysis": "lean"}
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_disk_size_cap(self, tmp_path):
+        """Test that the oldest disk entries are evicted over the size cap"""
+        cache = AnalysisCache(max_entries=1, disk_dir=str(tmp_path), max_disk_bytes=250)
+        for i in range(5):
+            cache.put(f"key{i}", {"analysis": "x" * 80, "i": i})
+
+        assert cache.stats()["disk_bytes"] <= 250
+        assert not os.path.exists(tmp_path / "key0.json")
+        assert os.path.exists(tmp_path / "key4.json")
@@ -0,0 +1,117 @@
+"""
+Unit tests for lazily created, shared AWS clients
+Run with: pytest tests/test_aws_clients.py -v
+"""
+
+import pytest
+
+import aws_clients
+from aws_clients import AWSClients, client_config, client_settings, get_shared_clients
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(aws_credentials, monkeypatch):
+    """Dummy credentials and no shared holders left over from other tests"""
+    monkeypatch.setattr(aws_clients, "_shared", {})
+
+
+class TestClientConfig:
+    """Tests for botocore Config construction"""
+
+    def test_defaults(self):
+        """Test that defaults enable a large pool and adaptive retries"""
+        config = client_config()
+
+        assert config.max_pool_connections == 50
+        assert config.tcp_keepalive is True
+        assert config.retries == {"mode": "adaptive", "max_attempts": 5}
+
+    def test_service_override(self):
+        """Test that per-service settings override the shared ones"""
+        settings = {"read_timeout": 60, "services": {"bedrock-runtime": {"read_timeout": 300}}}
+
+        assert client_config(settings, "bedrock-runtime").read_timeout == 300
+        assert client_config(settings, "s3").read_timeout == 60
+
+
+class TestAWSClients:
+    """Tests for the lazy client holder"""
+
+    def test_nothing_created_up_front(self):
+        """Test that no client exists until a service is used"""
+        clients = AWSClients("us-east-1")
+
+        assert clients.created() == []
+
+        clients.client("s3")
+        assert clients.created() == ["s3"]
+
+    def test_clients_are_reused(self):
+        """Test that repeated access returns the same client"""
+        clients = AWSClients("us-east-1")
+
+        assert clients.client("s3") is clients.client("s3")
+        assert clients.resource("dynamodb") is clients.resource("dynamodb")
+
+    def test_register_stub(self):
+        """Test that a registered client replaces the real one"""
+        clients = AWSClients("us-east-1")
+        stub = object()
+        clients.register("bedrock-runtime", stub)
+
+        assert clients.client("bedrock-runtime") is stub
+
+    def test_hooks_applied_to_existing_and_new_clients(self):
+        """Test that add_hook runs once per client, including later ones"""
+        clients = AWSClients("us-east-1")
+        seen = []
+        clients.client("s3")
+
+        clients.add_hook(seen.append)
+        clients.add_hook(seen.append)
+        clients.resource("dynamodb")
+
+        assert len(seen) == 2
+        assert seen[0] is clients.client("s3")
+
+    def test_region_and_config_applied(self):
+        """Test that clients use the configured region and pool size"""
+        clients = AWSClients("eu-west-1", {"max_pool_connections": 20})
+        s3 = clients.client("s3")
+
+        assert s3.meta.region_name == "eu-west-1"
+        assert s3.meta.config.max_pool_connections == 20
+
+
+class TestSharedClients:
+    """Tests for the process-wide client registry"""
+
+    def test_same_config_shares_clients(self):
+        """Test that agents with the same AWS config share one holder"""
+        config = {"aws": {"region": "us-east-1", "client": {"max_pool_connections": 50}}}
+
+        assert get_shared_clients(config) is get_shared_clients(dict(config))
+
+    def test_different_config_is_separate(self):
+        """Test that a different region or client settings get their own holder"""
+        base = get_shared_clients({"aws": {"region": "us-east-1"}})
+
+        assert get_shared_clients({"aws": {"region": "us-west-2"}}) is not base
+        assert get_shared_clients({"aws": {"region": "us-east-1", "client": {"read_timeout": 10}}}) is not base
+
+    def test_limiter_takes_over_bedrock_retries(self):
+        """Test that bedrock-runtime makes one attempt only while the Bedrock limiter retries"""
+        limited = {"aws": {"bedrock": {"limiter": {"enabled": True}}}}
+        unlimited = {"aws": {"bedrock": {"limiter": {"enabled": False}}}}
+
+        assert client_config(client_settings(limited), "bedrock-runtime").retries["max_attempts"] == 1
+        assert client_config(client_settings(limited), "s3").retries["max_attempts"] == 5
+        assert client_config(client_settings(unlimited), "bedrock-runtime").retries["max_attempts"] == 5
+        assert get_shared_clients(limited).settings["services"]["bedrock-runtime"] == {"max_attempts": 1}
+
+    def test_explicit_bedrock_attempts_kept(self):
+        """Test that a configured bedrock-runtime max_attempts wins over the limiter default"""
+        config = {"aws": {"client": {"services": {"bedrock-runtime": {"max_attempts": 3, "read_timeout": 300}}},
+                          "bedrock": {"limiter": {"enabled": True}}}}
+
+        assert client_settings(config)["services"]["bedrock-runtime"] == {"max_attempts": 3, "read_timeout": 300}
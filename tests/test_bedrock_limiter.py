@@ -0,0 +1,339 @@
+"""
+Unit tests for the Bedrock concurrency and token limiter
+Run with: pytest tests/test_bedrock_limiter.py -v
+"""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+import bedrock_limiter
+from bedrock_limiter import (IMAGE_TOKENS, AIMDLimit, BedrockLimiter, TokenBucket, estimate_converse_tokens,
+                             estimate_request_tokens, get_shared_limiter)
+from benchmarks.stubs import FakeBedrock
+
+
+def throttle():
+    return ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow down"}}, "InvokeModel")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FlakyBedrock:
+    """Throttles the first `throttles` calls, then answers with token-count headers"""
+
+    def __init__(self, throttles=0, error=None):
+        self.throttles = throttles
+        self.error = error
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        if self.calls <= self.throttles:
+            raise throttle()
+        return {
+            "body": io.BytesIO(b'{"content": [{"text": "ok"}]}'),
+            "ResponseMetadata": {"HTTPHeaders": {
+                "x-amzn-bedrock-input-token-count": "100", "x-amzn-bedrock-output-token-count": "50",
+            }},
+        }
+
+
+class ConverseBedrock:
+    """Converse API stub, as the Strands BedrockModel calls it"""
+
+    usage = {"inputTokens": 100, "outputTokens": 50, "totalTokens": 150}
+
+    def __init__(self, throttles=0):
+        self.throttles = throttles
+        self.calls = 0
+
+    def converse(self, **kwargs):
+        self.calls += 1
+        if self.calls <= self.throttles:
+            raise throttle()
+        return {"output": {"message": {"role": "assistant", "content": [{"text": "ok"}]}}, "usage": self.usage}
+
+    def converse_stream(self, **kwargs):
+        self.calls += 1
+        return {"stream": iter([{"messageStart": {"role": "assistant"}},
+                                {"contentBlockDelta": {"delta": {"text": "ok"}}},
+                                {"metadata": {"usage": self.usage}}])}
+
+
+def body(max_tokens=200, content="x" * 35):
+    return json.dumps({"max_tokens": max_tokens, "messages": [{"role": "user", "content": content}]})
+
+
+class TestTokenBucket:
+    """Tests for the tokens-per-minute bucket"""
+
+    def test_reserve_waits_for_debt(self):
+        """Test that reservations beyond the balance wait for the refill"""
+        clock = FakeClock()
+        bucket = TokenBucket(6000, capacity=100, clock=clock)
+
+        assert bucket.reserve(100) == 0
+        assert bucket.reserve(50) == pytest.approx(0.5)
+        clock.now = 1.0
+        assert bucket.available == pytest.approx(50)
+
+    def test_refund_is_capped(self):
+        """Test that refunds never exceed capacity"""
+        bucket = TokenBucket(6000, capacity=100, clock=FakeClock())
+        bucket.reserve(30)
+        bucket.refund(500)
+
+        assert bucket.available == 100
+
+
+class TestAIMDLimit:
+    """Tests for the additive-increase, multiplicative-decrease limit"""
+
+    def test_additive_increase(self):
+        """Test that a limit's worth of successes raises the limit by about one"""
+        limit = AIMDLimit(initial=4, maximum=10)
+        for _ in range(4):
+            limit.release(limit.acquire())
+
+        assert limit.limit == pytest.approx(4.9, abs=0.05)
+
+    def test_one_cut_per_wave(self):
+        """Test that throttles from calls sent before a cut do not cut again"""
+        limit = AIMDLimit(initial=8)
+        tickets = [limit.acquire() for _ in range(4)]
+        for ticket in tickets:
+            limit.release(ticket, bedrock_limiter.THROTTLED)
+        assert limit.limit == 4
+
+        limit.release(limit.acquire(), bedrock_limiter.THROTTLED)
+        assert limit.limit == 2
+
+    def test_in_flight_never_exceeds_limit(self):
+        """Test that concurrent callers wait for a slot"""
+        limit = AIMDLimit(initial=3, maximum=3)
+        peak, lock = [0], threading.Lock()
+
+        def work():
+            ticket = limit.acquire()
+            with lock:
+                peak[0] = max(peak[0], limit.in_flight)
+            time.sleep(0.01)
+            limit.release(ticket)
+
+        threads = [threading.Thread(target=work) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert peak[0] == 3
+        assert limit.in_flight == 0 and limit.waiting == 0
+
+
+class TestEstimate:
+    """Tests for request token estimates"""
+
+    def test_text_and_max_tokens(self):
+        """Test that the estimate is the prompt plus max_tokens"""
+        assert estimate_request_tokens(body(200, "x" * 35)) == 200 + 10 + 2  # "user" is counted too
+
+    def test_images(self):
+        """Test that image blocks count as a resized vision image"""
+        request = json.dumps({"max_tokens": 100, "messages": [{"role": "user", "content": [
+            {"type": "image", "source": {"data": "A" * 100000}}]}]})
+
+        assert estimate_request_tokens(request) == 100 + 2 + IMAGE_TOKENS
+
+    def test_converse(self):
+        """Test that Converse requests count system, messages, images, tools and maxTokens"""
+        request = {
+            "system": [{"text": "x" * 35}],
+            "messages": [{"role": "user", "content": [{"text": "x" * 35}, {"image": {"source": {"bytes": b""}}}]}],
+            "toolConfig": {"tools": [{"toolSpec": {"name": "t"}}]},
+            "inferenceConfig": {"maxTokens": 300},
+        }
+
+        assert estimate_converse_tokens(request) == 10 + 2 + 10 + IMAGE_TOKENS + 12 + 300  # "user" and the tool JSON too
+
+
+class TestBedrockLimiter:
+    """Tests for retries, refunds and stats"""
+
+    def make(self, **kwargs):
+        clock = FakeClock()
+        settings = dict(tokens_per_minute=60000, burst_seconds=1, clock=clock, sleep=clock.sleep)
+        settings.update(kwargs)
+        return BedrockLimiter(**settings), clock
+
+    def test_throttles_retry_with_backoff(self):
+        """Test that throttled calls are retried, cut the limit and are refunded"""
+        limiter, _ = self.make(backoff_base=0)
+        client = FlakyBedrock(throttles=2)
+
+        response = limiter.wrap(client).invoke_model(modelId="m", body=body())
+
+        assert response["body"].read()
+        assert client.calls == 3
+        stats = limiter.stats()
+        assert stats["throttles"] == 2 and stats["retries"] == 2 and stats["failed"] == 0
+        # Each retry was sent after the previous cut, so both throttles cut: 8 -> 4 -> 2
+        assert stats["limit"] == 2
+        # Only the successful call's reported usage was charged
+        assert stats["tokens_available"] == 1000 - 150
+        assert stats["tokens_used"] == 150
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the throttle is raised once retries run out"""
+        limiter, _ = self.make(max_retries=2)
+        client = FlakyBedrock(throttles=10)
+
+        with pytest.raises(ClientError):
+            limiter.wrap(client).invoke_model(modelId="m", body=body())
+        assert client.calls == 3
+        assert limiter.stats()["failed"] == 1
+        assert limiter.concurrency.in_flight == 0
+
+    def test_other_errors_are_not_retried(self):
+        """Test that validation errors fail immediately without changing the limit"""
+        limiter, _ = self.make()
+        error = ClientError({"Error": {"Code": "ValidationException", "Message": "bad"}}, "InvokeModel")
+        client = FlakyBedrock(error=error)
+
+        with pytest.raises(ClientError):
+            limiter.wrap(client).invoke_model(modelId="m", body=body())
+        assert client.calls == 1
+        assert limiter.limit == 8
+
+    @pytest.mark.parametrize("error", [
+        EndpointConnectionError(endpoint_url="https://bedrock-runtime.us-east-1.amazonaws.com"),
+        ReadTimeoutError(endpoint_url="https://bedrock-runtime.us-east-1.amazonaws.com"),
+        ClientError({"Error": {"Code": "BadGateway", "Message": "upstream"},
+                     "ResponseMetadata": {"HTTPStatusCode": 502}}, "InvokeModel"),
+    ])
+    def test_transport_and_5xx_errors_are_retried(self, error):
+        """Test that connection failures, timeouts and unlisted 5xx codes are retried, since botocore no longer does"""
+        limiter, _ = self.make(max_retries=2, backoff_base=0)
+        client = FlakyBedrock(error=error)
+
+        with pytest.raises(type(error)):
+            limiter.wrap(client).invoke_model(modelId="m", body=body())
+        assert client.calls == 3
+        assert limiter.stats()["retries"] == 2
+        assert limiter.limit == 8
+
+    def test_failed_attempts_are_refunded(self):
+        """Test that transient and other failures do not keep their token charge"""
+        limiter, _ = self.make(max_retries=1, backoff_base=0)
+        unavailable = ClientError({"Error": {"Code": "ServiceUnavailableException", "Message": "busy"}}, "Invoke")
+
+        with pytest.raises(ClientError):
+            limiter.wrap(FlakyBedrock(error=unavailable)).invoke_model(modelId="m", body=body())
+
+        stats = limiter.stats()
+        assert stats["retries"] == 1 and stats["failed"] == 1
+        assert stats["tokens_available"] == 1000
+        assert limiter.limit == 8
+
+    def test_converse_is_limited(self):
+        """Test that the Strands agent loop's Converse calls are retried and charged their usage"""
+        limiter, _ = self.make(backoff_base=0)
+        client = ConverseBedrock(throttles=1)
+
+        limiter.wrap(client).converse(modelId="m", messages=[{"role": "user", "content": [{"text": "hi"}]}],
+                                      inferenceConfig={"maxTokens": 200})
+
+        stats = limiter.stats()
+        assert client.calls == 2 and stats["throttles"] == 1
+        assert stats["tokens_used"] == 150 and stats["tokens_available"] == 1000 - 150
+
+    def test_converse_stream_holds_slot_until_exhausted(self):
+        """Test that converse_stream keeps its slot and charges the metadata usage"""
+        limiter, _ = self.make()
+
+        response = limiter.wrap(ConverseBedrock()).converse_stream(modelId="m", messages=[],
+                                                                   inferenceConfig={"maxTokens": 200})
+        assert limiter.stats()["in_flight"] == 1
+        events = list(response["stream"])
+
+        assert len(events) == 3
+        assert limiter.stats()["in_flight"] == 0 and limiter.stats()["tokens_used"] == 150
+
+    def test_waits_for_tokens(self):
+        """Test that calls beyond the bucket sleep until the quota refills"""
+        limiter, clock = self.make()
+        client = limiter.wrap(FlakyBedrock())
+        for _ in range(3):
+            client.invoke_model(modelId="m", body=body(max_tokens=488))
+
+        # Each call reserved 500 and was refunded down to the 150 it used, leaving 550
+        assert clock.now == 0
+        client.invoke_model(modelId="m", body=body(max_tokens=988))
+        assert clock.now > 0
+
+    def test_stream_holds_slot_until_exhausted(self):
+        """Test that a streaming call keeps its slot and charges the streamed usage"""
+        limiter, _ = self.make()
+        bedrock = FakeBedrock(first_token_latency=0, token_latency=0, input_tokens=300)
+
+        response = limiter.wrap(bedrock).invoke_model_with_response_stream(modelId="m", body=body())
+        assert limiter.stats()["in_flight"] == 1
+        events = list(response["body"])
+
+        assert events
+        stats = limiter.stats()
+        assert stats["in_flight"] == 0
+        assert stats["tokens_used"] == 300 + len(bedrock._tokens())
+
+    def test_unwrapped_methods_pass_through(self):
+        """Test that other client attributes come from the wrapped client"""
+        limiter, _ = self.make()
+        client = FlakyBedrock()
+
+        assert limiter.wrap(client).calls == 0
+
+
+class TestSharedLimiter:
+    """Tests for the process-wide limiter"""
+
+    def test_shared_per_settings(self, monkeypatch):
+        """Test that agents with the same settings share one limiter, and disabled gives None"""
+        monkeypatch.setattr(bedrock_limiter, "_shared", {})
+        config = {"aws": {"bedrock": {"limiter": {"enabled": True, "tokens_per_minute": 1000}}}}
+
+        assert get_shared_limiter(config) is get_shared_limiter(json.loads(json.dumps(config)))
+        assert get_shared_limiter({}) is None
+
+    def test_agent_model_uses_shared_limited_client(self, aws_credentials, monkeypatch):
+        """Test that the Strands model is built on first use, once, around the limited client"""
+        pytest.importorskip("strands")
+        import fitgenius_agent
+        from aws_clients import AWSClients
+
+        monkeypatch.setattr(bedrock_limiter, "_shared", {})
+        config = {"aws": {"bedrock": {"limiter": {"enabled": True}}}}
+        aws = AWSClients("us-east-1")
+        aws.register("bedrock-runtime", ConverseBedrock())
+
+        first = fitgenius_agent.FitGeniusAgent(config, aws=aws)
+        second = fitgenius_agent.FitGeniusAgent(config, aws=aws)
+
+        assert aws not in fitgenius_agent._models
+        assert first.model is second.model
+        assert isinstance(first.model.client, bedrock_limiter.LimitedBedrock)
+        assert first.model.client.limiter is get_shared_limiter(config)
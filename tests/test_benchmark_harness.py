@@ -0,0 +1,104 @@
+"""
+Unit tests for the benchmark measurement helpers
+Run with: pytest tests/test_benchmark_harness.py -v
+"""
+
+import argparse
+import json
+
+from benchmarks.harness import (add_report_arguments, compare_results, format_case, run_case, save_results,
+                                summarize, write_report)
+
+
+class TestSummarize:
+    """Tests for latency percentiles"""
+
+    def test_percentiles_in_ms(self):
+        """Test that percentiles are reported in milliseconds"""
+        stats = summarize([i / 1000 for i in range(1, 101)])
+
+        assert stats["p50_ms"] == 50.5
+        assert stats["p99_ms"] > stats["p95_ms"] > stats["p50_ms"]
+        assert stats["min_ms"] == 1.0
+        assert stats["max_ms"] == 100.0
+
+
+class TestRunCase:
+    """Tests for timing a callable"""
+
+    def test_reports_all_metrics(self):
+        """Test that latency, throughput and memory are measured"""
+        calls = []
+        stats = run_case(lambda: calls.append(bytearray(100_000)), iterations=20, warmup=2, memory_iterations=5)
+
+        assert len(calls) == 2 + 20 + 5
+        assert stats["iterations"] == 20
+        assert stats["throughput_per_s"] > 0
+        assert stats["peak_memory_kb"] >= 97
+
+    def test_concurrent_run(self):
+        """Test that concurrent runs time every iteration"""
+        stats = run_case(lambda: None, iterations=50, warmup=0, concurrency=4)
+
+        assert stats["concurrency"] == 4
+        assert stats["iterations"] == 50
+
+
+class TestCompareResults:
+    """Tests for regression detection between runs"""
+
+    def test_flags_slower_and_less_throughput(self):
+        """Test that latency growth and throughput drops beyond the threshold are regressions"""
+        baseline = {"case": {"p50_ms": 10.0, "throughput_per_s": 100.0}}
+        current = {"case": {"p50_ms": 12.0, "throughput_per_s": 95.0}}
+
+        changes = {c["metric"]: c for c in compare_results(current, baseline, threshold=0.1)}
+
+        assert changes["p50_ms"]["regression"]
+        assert changes["p50_ms"]["change_pct"] == 20.0
+        assert not changes["throughput_per_s"]["regression"]
+
+    def test_new_cases_ignored(self):
+        """Test that cases missing from the baseline are skipped"""
+        assert compare_results({"new": {"p50_ms": 1.0}}, {}) == []
+
+    def test_save_results(self, tmp_path):
+        """Test that reports are written with metadata"""
+        path = tmp_path / "results.json"
+        save_results(str(path), {"case": {"p50_ms": 1.0}}, {"iterations": 10})
+
+        report = json.loads(path.read_text())
+        assert report["results"]["case"]["p50_ms"] == 1.0
+        assert report["settings"]["iterations"] == 10
+        assert "commit" in report and "python" in report
+
+
+class TestReport:
+    """Tests for the shared --output/--baseline handling"""
+
+    def parse(self, *argv):
+        parser = argparse.ArgumentParser()
+        add_report_arguments(parser)
+        return parser.parse_args(list(argv))
+
+    def test_baseline_regressions_returned(self, tmp_path):
+        """Test that a saved run is the baseline for the next and regressions are reported"""
+        path = str(tmp_path / "baseline.json")
+        assert write_report(self.parse("--output", path), {"query": {"p50_ms": 1.0}}) == []
+
+        regressions = write_report(self.parse("--baseline", path), {"query": {"p50_ms": 2.0}})
+
+        assert [(c["case"], c["metric"]) for c in regressions] == [("query", "p50_ms")]
+
+    def test_nothing_written_without_output(self, tmp_path, monkeypatch):
+        """Test that no report file is written unless --output is given"""
+        monkeypatch.chdir(tmp_path)
+        write_report(self.parse(), {"query": {"p50_ms": 1.0}})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_format_case(self):
+        """Test that the report line carries every percentile"""
+        line = format_case("query", run_case(lambda: None, iterations=10, warmup=0))
+
+        assert line.startswith("query ") and all(f"p{p} " in line for p in (50, 95, 99))
@@ -0,0 +1,77 @@
+"""
+Unit tests for FitGenius body analysis
+Run with: pytest tests/test_body_analysis.py -v
+"""
+
+import asyncio
+import json
+
+from benchmarks.stubs import FakeBedrock
+from body_analysis import BodyAnalysisStream, analyze_body_image, build_request_body
+
+USER_INFO = {"age": 28, "gender": "male", "height_cm": 175, "weight_kg": 85}
+
+
+class TestRequestBody:
+    """Tests for the Bedrock request body"""
+
+    def test_image_and_prompt_blocks(self):
+        """Test that the body carries the image and the user info prompt"""
+        body = json.loads(build_request_body("aW1hZ2U=", USER_INFO, media_type="image/png"))
+        content = body["messages"][0]["content"]
+
+        assert body["max_tokens"] == 2000
+        assert content[0]["source"] == {"type": "base64", "media_type": "image/png", "data": "aW1hZ2U="}
+        assert "Height: 175cm" in content[1]["text"]
+
+
+class TestBodyAnalysisStream:
+    """Tests for streaming body analysis"""
+
+    def test_stream_matches_blocking_result(self):
+        """Test that streamed chunks join into the blocking analysis"""
+        bedrock = FakeBedrock(first_token_latency=0, token_latency=0)
+
+        blocking = analyze_body_image(bedrock, "aW1hZ2U=", USER_INFO)
+        stream = BodyAnalysisStream(bedrock, "aW1hZ2U=", USER_INFO)
+        chunks = list(stream)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == blocking["analysis"]
+        assert stream.result["analysis"] == blocking["analysis"]
+        assert stream.result["user_info"] == USER_INFO
+        assert stream.usage["output_tokens"] == len(chunks)
+
+    def test_time_to_first_token(self):
+        """Test that the first token arrives before the full generation"""
+        bedrock = FakeBedrock(first_token_latency=0.05, token_latency=0.005)
+        stream = BodyAnalysisStream(bedrock, "aW1hZ2U=", USER_INFO)
+
+        for _ in stream:
+            pass
+
+        assert 0.05 <= stream.time_to_first_token < stream.total_time
+
+    def test_result_consumes_remaining_chunks(self):
+        """Test that reading result after a partial read finishes the stream"""
+        bedrock = FakeBedrock(first_token_latency=0, token_latency=0)
+        stream = BodyAnalysisStream(bedrock, "aW1hZ2U=", USER_INFO)
+
+        first = next(iter(stream))
+
+        assert stream.result["analysis"].startswith(first)
+        assert stream.result["analysis"] == bedrock.text
+        assert bedrock.calls == 1
+
+    def test_async_iteration(self):
+        """Test that the stream can be consumed with async for"""
+        bedrock = FakeBedrock(first_token_latency=0, token_latency=0)
+        stream = BodyAnalysisStream(bedrock, "aW1hZ2U=", USER_INFO)
+
+        async def consume():
+            return [chunk async for chunk in stream]
+
+        chunks = asyncio.run(consume())
+
+        assert "".join(chunks) == bedrock.text
+        assert stream.result["analysis"] == bedrock.text
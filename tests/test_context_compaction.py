@@ -0,0 +1,179 @@
+"""
+Unit tests for FitGenius context compaction
+Run with: pytest tests/test_context_compaction.py -v
+"""
+
+import json
+
+from context_compaction import ContextCompactor, create_compactor, estimate_tokens, flatten_context
+
+PROFILE = {
+    "user_id": "user_1",
+    "name": "John",
+    "age": 28,
+    "gender": "male",
+    "height_cm": 175,
+    "weight_kg": 85.0,
+    "goal": "weight_loss",
+    "available_equipment": ["dumbbells", "bench"],
+    "schedule": {"days": 4, "time": "morning"},
+}
+
+
+def turn(compactor, context, user_input="hi", session="user_1"):
+    message, update = compactor.apply(session, context, user_input)
+    if update is not None:
+        compactor.commit(update)
+    return message, update
+
+
+class TestEncoding:
+    """Tests for the compact key=value encoding"""
+
+    def test_flatten_context(self):
+        """Test dotted nested keys, joined lists, trimmed floats and dropped None"""
+        flat = flatten_context({"a": 1.50, "b": ["x", "y"], "c": {"d": True}, "e": None, "f": "p;q"})
+
+        assert flat == {"a": "1.5", "b": "x,y", "c.d": "true", "f": '"p;q"'}
+
+    def test_aliases(self):
+        """Test that aliases shorten keys"""
+        assert flatten_context({"available_equipment": ["bench"]}, {"available_equipment": "equip"}) == \
+            {"equip": "bench"}
+
+    def test_first_turn_is_smaller_than_json(self):
+        """Test that the full encoding beats the old json.dumps prefix"""
+        message, update = turn(ContextCompactor(), PROFILE)
+
+        assert message.startswith("User Context: user_id=user_1; name=John")
+        assert message.endswith("User Request: hi")
+        assert update.full
+        assert update.tokens < update.baseline_tokens
+
+
+class TestDeltas:
+    """Tests for sending only changed fields"""
+
+    def test_unchanged_context_is_not_resent(self):
+        """Test that a repeated context adds nothing to the message"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+
+        message, update = turn(compactor, PROFILE)
+
+        assert message == "hi"
+        assert update.tokens == 0
+        assert update.tokens_saved == update.baseline_tokens
+
+    def test_only_changed_and_removed_fields_are_sent(self):
+        """Test that a delta lists changed values and removed keys"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+        context = dict(PROFILE, weight_kg=84.2)
+        del context["name"]
+
+        message, update = turn(compactor, context)
+
+        assert message.startswith("User Context update: weight_kg=84.2; -name\n\n")
+        assert not update.full
+
+    def test_sessions_are_independent(self):
+        """Test that another user's first turn is sent in full"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+
+        _, update = turn(compactor, dict(PROFILE, user_id="user_2"), session="user_2")
+
+        assert update.full
+
+    def test_uncommitted_turn_is_offered_again(self):
+        """Test that a failed turn does not mark its fields as seen"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+        changed = dict(PROFILE, weight_kg=84.0)
+        compactor.apply("user_1", changed, "hi")  # the model call failed; no commit
+
+        message, _ = turn(compactor, changed)
+
+        assert "weight_kg=84" in message
+
+    def test_periodic_full_resend(self):
+        """Test that every full_every_turns turn sends the whole context"""
+        compactor = ContextCompactor(full_every_turns=3)
+        fulls = [turn(compactor, PROFILE)[1].full for _ in range(7)]
+
+        assert fulls == [True, False, False, True, False, False, True]
+
+    def test_turn_without_context_keeps_session(self):
+        """Test that context=None sends the bare request and changes nothing"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+
+        assert turn(compactor, None) == ("hi", None)
+        assert turn(compactor, PROFILE)[0] == "hi"
+
+    def test_anonymous_callers_get_full_context(self):
+        """Test that session=None keeps no state and always sends the whole context"""
+        compactor = ContextCompactor()
+        other = dict(PROFILE, user_id=None, gender="female", weight_kg=60)
+        first, _ = turn(compactor, PROFILE, session=None)
+
+        second, update = turn(compactor, other, session=None)
+        repeat, _ = turn(compactor, PROFILE, session=None)
+
+        assert update.full
+        assert second.startswith("User Context: ") and "gender=female" in second and "name=John" in second
+        assert repeat == first
+        assert compactor.stats()["sessions"] == 0
+        assert compactor.stats()["requests"] == 3
+
+    def test_reset_forces_full_context(self):
+        """Test that reset() makes the next turn full"""
+        compactor = ContextCompactor()
+        turn(compactor, PROFILE)
+        compactor.reset("user_1")
+
+        assert turn(compactor, PROFILE)[1].full
+
+
+class TestBudget:
+    """Tests for trimming to the token budget"""
+
+    def test_low_priority_fields_are_dropped_first(self):
+        """Test that notes and name go before safety and profile fields"""
+        context = dict(PROFILE, injuries=["left knee"], notes="x" * 400)
+        compactor = ContextCompactor(max_context_tokens=45)
+
+        message, update = turn(compactor, context)
+
+        assert update.dropped[:2] == ["notes", "name"]
+        assert "injuries=left knee" in message and "user_id=user_1" in message
+        assert estimate_tokens(update.text) <= 45
+
+    def test_dropped_fields_are_offered_again(self):
+        """Test that trimmed fields are not recorded as seen"""
+        compactor = ContextCompactor(max_context_tokens=60)
+        context = dict(PROFILE, notes="x" * 400)
+        turn(compactor, context)
+        compactor.max_context_tokens = 1000
+
+        message, _ = turn(compactor, context)
+
+        assert "notes=" in message
+
+    def test_stats_report_savings(self):
+        """Test that saved tokens accumulate across requests"""
+        compactor = ContextCompactor()
+        for weight in (85.0, 84.5, 84.5, 84.0):
+            turn(compactor, dict(PROFILE, weight_kg=weight))
+        baseline = estimate_tokens(f"User Context: {json.dumps(PROFILE)}\n\nUser Request: ")
+
+        stats = compactor.stats()
+
+        assert stats["requests"] == 4
+        assert stats["tokens_saved"] > 2 * baseline
+
+    def test_disabled_by_config(self):
+        """Test that enabled: false gives no compactor"""
+        assert create_compactor({"enabled": False}) is None
+        assert create_compactor({}).max_context_tokens == 400
@@ -0,0 +1,69 @@
+"""
+Unit tests for FitGenius exercise similarity
+Run with: pytest tests/test_exercise_similarity.py -v
+"""
+
+import numpy as np
+import pytest
+
+from exercise_similarity import ExerciseEmbeddings
+from workout_catalog import EMBEDDINGS, EXERCISES, _exercise
+
+BODYWEIGHT = frozenset()
+
+
+class TestEmbeddings:
+    """Tests for the attribute embedding matrix"""
+
+    def test_matrix_shape_and_norms(self):
+        """Test one unit-length, read-only row per catalog exercise"""
+        assert EMBEDDINGS.matrix.shape == (len(EXERCISES), len(EMBEDDINGS.dimensions))
+        assert np.allclose(np.linalg.norm(EMBEDDINGS.matrix, axis=1), 1.0)
+        with pytest.raises(ValueError):
+            EMBEDDINGS.matrix[0, 0] = 1.0
+
+    def test_similarity_is_weighted_attribute_overlap(self):
+        """Test cosine similarity against the per-attribute weights"""
+        exercises = {
+            "A": _exercise("A", ("legs",), "squat", (("barbell",),), 1),
+            "B": _exercise("B", ("legs",), "squat", (("dumbbells",),), 1),
+            "C": _exercise("C", ("chest",), "horizontal_push", (("barbell",),), 3),
+        }
+        embeddings = ExerciseEmbeddings(exercises)
+
+        # Same pattern, muscles and difficulty; different equipment
+        assert embeddings.similarity("A", "B") == pytest.approx(0.9)
+        # Shared equipment, plus beginner vs advanced overlapping by 0.2
+        assert embeddings.similarity("A", "C") == pytest.approx(0.1 + 0.1 * 0.2)
+        assert embeddings.similarity("A", "A") == pytest.approx(1.0)
+
+
+class TestSubstitutes:
+    """Tests for equipment-aware substitution queries"""
+
+    def test_respects_equipment(self):
+        """Test that substitutes are usable with the given equipment"""
+        results = EMBEDDINGS.substitutes("Barbell Rows", frozenset({"dumbbells"}), k=3)
+
+        assert results[0][0] in ("Dumbbell Rows", "Bent Over Rows")
+        assert all(EMBEDDINGS.available(frozenset({"dumbbells"}))[EMBEDDINGS.index[n]] for n, _ in results)
+        assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+    def test_never_returns_itself_or_excluded(self):
+        """Test that the query exercise and exclusions are skipped"""
+        names = [n for n, _ in EMBEDDINGS.substitutes("Push-ups", None, k=10, exclude=["Incline Push-ups"])]
+
+        assert "Push-ups" not in names
+        assert "Incline Push-ups" not in names
+
+    def test_min_similarity(self):
+        """Test that weak matches are filtered out"""
+        assert EMBEDDINGS.substitutes("Pull-ups", BODYWEIGHT, k=3, min_similarity=0.6) == []
+
+    def test_best_substitutes_are_distinct(self):
+        """Test that one batch never uses the same substitute twice"""
+        chosen = EMBEDDINGS.best_substitutes(["Barbell Rows", "Dumbbell Rows", "Pull-ups"], BODYWEIGHT)
+
+        assert chosen[0][0] == "Towel Rows"
+        assert chosen[1] is None or chosen[1][0] != "Towel Rows"
+        assert chosen[2] is None
@@ -0,0 +1,151 @@
+"""
+Unit tests for FitGenius fitness metrics
+Run with: pytest tests/test_fitness_metrics.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fitness_metrics import (
+    ACTIVITY_MULTIPLIERS,
+    calculate_bmi,
+    calculate_bmi_batch,
+    calculate_bmi_frame,
+    calculate_diet_plan,
+    calculate_diet_plan_batch,
+    calculate_diet_plan_frame,
+)
+
+
+class TestBMIBatch:
+    """Tests for vectorized BMI calculation"""
+
+    def test_matches_scalar_tool(self):
+        """Test that every batch row equals the scalar result"""
+        rng = np.random.default_rng(7)
+        weights = rng.uniform(40, 160, 2000).round(1)
+        heights = rng.uniform(145, 210, 2000).round(1)
+
+        batch = calculate_bmi_batch(weights, heights)
+
+        for i, (w, h) in enumerate(zip(weights.tolist(), heights.tolist())):
+            expected = calculate_bmi(w, h)
+            assert batch["category"][i] == expected["category"]
+            assert batch["health_risk"][i] == expected["health_risk"]
+            assert batch["bmi"][i] == pytest.approx(expected["bmi"], abs=0.01)
+            assert batch["ideal_weight_min"][i] == pytest.approx(expected["ideal_weight_range"]["min"], abs=0.1)
+            assert batch["ideal_weight_max"][i] == pytest.approx(expected["ideal_weight_range"]["max"], abs=0.1)
+
+    def test_category_boundaries(self):
+        """Test that boundary BMIs fall in the upper category like the scalar tool"""
+        # height 100cm makes BMI equal to weight
+        batch = calculate_bmi_batch([18.5, 25.0, 30.0, 18.49], [100, 100, 100, 100])
+
+        assert list(batch["category"]) == ["Normal Weight", "Overweight", "Obese", "Underweight"]
+        assert list(batch["health_risk"]) == ["Low", "Moderate", "High", "Low to Moderate"]
+
+    def test_shape_mismatch(self):
+        """Test that mismatched inputs are rejected"""
+        with pytest.raises(ValueError):
+            calculate_bmi_batch([70, 80], [175])
+
+    def test_dataframe_input(self):
+        """Test DataFrame entry point keeps the input index"""
+        df = pd.DataFrame(
+            {"weight_kg": [70, 95], "height_cm": [175, 170]},
+            index=["member_a", "member_b"]
+        )
+
+        result = calculate_bmi_frame(df)
+
+        assert list(result.index) == ["member_a", "member_b"]
+        assert result.loc["member_a", "bmi"] == 22.86
+        assert result.loc["member_b", "category"] == "Obese"
+
+
+def member_frame(rows, seed=11):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "goal": rng.choice(["weight_loss", "muscle_gain", "maintenance", "bulk"], rows),
+        "current_weight": rng.uniform(50, 130, rows).round(1),
+        "activity_level": rng.choice(list(ACTIVITY_MULTIPLIERS) + ["unknown"], rows),
+        "target_weight": rng.uniform(50, 130, rows).round(1),
+        "meals_per_day": rng.integers(3, 7, rows),
+        "age": np.where(rng.random(rows) < 0.1, np.nan, rng.integers(18, 80, rows)),
+        "sex": rng.choice(["male", "Female", "F", None, "other"], rows),
+        "height_cm": rng.uniform(145, 205, rows).round(1),
+    })
+
+
+class TestDietPlanBatch:
+    """Tests for vectorized diet planning"""
+
+    def test_mifflin_st_jeor(self):
+        """Test the BMR formula for a known male and female"""
+        male = calculate_diet_plan("maintenance", 80, "sedentary", age=30, sex="male", height_cm=180)
+        female = calculate_diet_plan("maintenance", 60, "sedentary", age=30, sex="female", height_cm=165)
+
+        assert male["bmr"] == 1780  # 800 + 1125 - 150 + 5
+        assert female["bmr"] == 1320  # 600 + 1031.25 - 150 - 161
+        assert male["bmr_method"] == "mifflin_st_jeor"
+
+    def test_falls_back_without_demographics(self):
+        """Test that the weight-only estimate is used when height is missing"""
+        plan = calculate_diet_plan("weight_loss", 85, "moderate", age=30, sex="male")
+
+        assert plan["bmr_method"] == "estimate"
+        assert plan["daily_calories"] == round(85 * 22 * 1.55 - 500)
+
+    def test_uses_target_weight_and_meals(self):
+        """Test time-to-target and per-meal targets"""
+        plan = calculate_diet_plan("weight_loss", 85, "moderate", target_weight=80, meals_per_day=4)
+
+        assert plan["weeks_to_target"] == 11.0  # 5kg * 7700 kcal / 3500 kcal per week
+        assert plan["calories_per_meal"] == round(plan["daily_calories"] / 4)
+        # A target in the wrong direction for the goal has no estimate
+        assert calculate_diet_plan("weight_loss", 85, "moderate", target_weight=90)["weeks_to_target"] is None
+
+    def test_matches_scalar_plan(self):
+        """Test that every batch row equals the scalar result"""
+        df = member_frame(3000)
+
+        result = calculate_diet_plan_frame(df)
+
+        for row, plan in zip(df.itertuples(), result.itertuples()):
+            sex = row.sex if isinstance(row.sex, str) else None
+            age = None if np.isnan(row.age) else row.age
+            expected = calculate_diet_plan(row.goal, row.current_weight, row.activity_level, row.target_weight,
+                                           row.meals_per_day, age=age, sex=sex, height_cm=row.height_cm)
+            assert plan.mifflin_st_jeor == (expected["bmr_method"] == "mifflin_st_jeor")
+            for key in ("bmr", "tdee", "daily_calories", "protein_g", "carbs_g", "fats_g",
+                        "calories_per_meal", "protein_per_meal_g"):
+                assert getattr(plan, key) == expected[key], key
+            if expected["weeks_to_target"] is None:
+                assert np.isnan(plan.weeks_to_target)
+            else:
+                assert plan.weeks_to_target == pytest.approx(expected["weeks_to_target"])
+
+    def test_categorical_columns(self):
+        """Test that category dtype labels give the same plans as strings"""
+        df = member_frame(500)
+        categorical = df.astype({"goal": "category", "activity_level": "category", "sex": "category"})
+
+        pd.testing.assert_frame_equal(calculate_diet_plan_frame(categorical), calculate_diet_plan_frame(df))
+
+    def test_optional_columns_absent(self):
+        """Test a frame with only the required columns"""
+        df = pd.DataFrame({"goal": ["muscle_gain"], "current_weight": [70.0], "activity_level": ["active"]},
+                          index=["member_a"])
+
+        result = calculate_diet_plan_frame(df)
+
+        assert list(result.index) == ["member_a"]
+        assert result.loc["member_a", "daily_calories"] == round(70 * 22 * 1.725 + 300)
+        assert not result.loc["member_a", "mifflin_st_jeor"]
+        assert np.isnan(result.loc["member_a", "calories_per_meal"])
+
+    def test_shape_mismatch(self):
+        """Test that mismatched inputs are rejected"""
+        with pytest.raises(ValueError):
+            calculate_diet_plan_batch(["maintenance"] * 2, [70, 80], ["moderate"] * 2, age=[30])
@@ -0,0 +1,166 @@
+"""
+Unit tests for FitGenius local search
+Run with: pytest tests/test_fitness_search.py -v
+"""
+
+import math
+
+import pytest
+
+from fitness_search import (
+    SearchIndex,
+    create_search_index,
+    load_or_build,
+    normalize_category,
+    tokenize,
+    write_index,
+)
+
+DOCS = [
+    {"id": "a", "category": "supplements", "title": "Creatine", "summary": "Creatine builds strength.",
+     "source": "Guide", "keywords": []},
+    {"id": "b", "category": "nutrition", "title": "Protein", "summary": "Protein builds muscle and strength.",
+     "source": "Guide", "keywords": ["macros"]},
+    {"id": "c", "category": "exercises", "title": "Squats", "summary": "Squats build leg strength.",
+     "source": "Library", "keywords": []},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex.build()
+
+
+class TestTokenizer:
+    """Tests for query and document terms"""
+
+    def test_stopwords_and_plurals(self):
+        """Test that stopwords are dropped and plurals fold to the singular"""
+        assert tokenize("What are the best Squats for calories?") == ["squat", "calory"]
+
+    def test_category_aliases(self):
+        """Test category normalization"""
+        assert normalize_category(" Supplement ") == "supplements"
+        assert normalize_category("workouts") == "exercises"
+        assert normalize_category("all") is None
+        assert normalize_category("astrology") is None
+
+
+class TestBundledIndex:
+    """Tests for ranking over the bundled corpus"""
+
+    def test_creatine_query(self, index):
+        """Test that the creatine supplement document ranks first within supplements"""
+        results = index.search("creatine dosage", "supplements")
+
+        assert results[0].title == "Creatine monohydrate"
+        assert all(r.category == "supplements" for r in results)
+
+    def test_category_filter(self, index):
+        """Test that category narrows results and unknown categories search everything"""
+        everything = {r.category for r in index.search("protein", None, k=50)}
+
+        assert {"nutrition", "supplements", "research"} <= everything
+        assert {r.category for r in index.search("protein", "research", k=50)} == {"research"}
+        assert index.search("protein", "unknown", k=50) == index.search("protein", None, k=50)
+
+    def test_results_are_sorted_and_limited(self, index):
+        """Test top-k ordering by score"""
+        results = index.search("dumbbell chest press", k=3)
+        scores = [r.score for r in results]
+
+        assert len(results) == 3
+        assert scores == sorted(scores, reverse=True)
+
+    def test_no_matches(self, index):
+        """Test that unknown terms and empty queries return nothing"""
+        assert index.search("xyzzy") == []
+        assert index.search("   ") == []
+        assert index.search("the and of") == []
+
+
+class TestScoring:
+    """Tests for the BM25 arithmetic"""
+
+    def test_matches_reference_bm25(self):
+        """Test a precomputed impact against the textbook formula"""
+        k1, b = 1.2, 0.75
+        index = SearchIndex.build(DOCS, k1, b)
+        # Titles count twice: doc a is creatine x3, builds, strength; "strength" is in every document
+        lengths = [5, 7, 6]
+        avgdl = sum(lengths) / 3
+
+        def bm25(tf, df, dl):
+            idf = math.log(1 + (3 - df + 0.5) / (df + 0.5))
+            return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+
+        scores = index.scores("creatine strength")
+
+        assert scores[0] == pytest.approx(bm25(3, 1, 5) + bm25(1, 3, 5), rel=1e-5)
+        assert scores[1] == pytest.approx(bm25(1, 3, 7), rel=1e-5)
+
+
+class TestPersistence:
+    """Tests for the memory-mapped index file"""
+
+    def test_round_trip(self, tmp_path, index):
+        """Test that the mapped file answers exactly like the in-memory index"""
+        path = str(tmp_path / "search.idx")
+        write_index(path)
+        mapped = SearchIndex.open(path)
+
+        for query in ("creatine", "knee friendly leg exercise", "protein per day"):
+            assert mapped.search(query) == index.search(query)
+        mapped.close()
+
+    def test_rebuilds_when_corpus_changes(self, tmp_path):
+        """Test that a stale fingerprint triggers a rebuild"""
+        path = str(tmp_path / "search.idx")
+        load_or_build(path, DOCS).close()
+        changed = DOCS + [dict(DOCS[0], id="d", title="Caffeine", summary="Caffeine boosts focus.")]
+
+        rebuilt = load_or_build(path, changed)
+
+        assert len(rebuilt) == 4
+        assert rebuilt.search("caffeine")[0].id == "d"
+        rebuilt.close()
+
+    def test_rebuilds_corrupt_file(self, tmp_path):
+        """Test that an unreadable index file is replaced"""
+        path = tmp_path / "search.idx"
+        path.write_bytes(b"not an index")
+
+        index = load_or_build(str(path), DOCS)
+
+        assert index.search("squats")[0].id == "c"
+        index.close()
+
+    def test_config(self, tmp_path):
+        """Test building the index from the search config section"""
+        path = tmp_path / "nested" / "search.idx"
+
+        index = create_search_index({"index_path": str(path), "k1": 1.5, "b": 0.5})
+
+        assert path.exists()
+        assert index.path == str(path)
+        assert create_search_index({"index_path": None}).path is None
+        index.close()
+
+    def test_relative_path_is_under_cache_dir(self, tmp_path, monkeypatch):
+        """Test that a relative index_path does not depend on the working directory"""
+        monkeypatch.setenv("FITGENIUS_CACHE_DIR", str(tmp_path / "cache"))
+
+        index = create_search_index({"index_path": "search.idx"})
+
+        assert index.path == str(tmp_path / "cache" / "search.idx")
+        index.close()
+
+    def test_unwritable_path_falls_back_to_memory(self, tmp_path):
+        """Test that a failed index write still yields a working index"""
+        blocker = tmp_path / "not_a_directory"
+        blocker.write_bytes(b"")
+
+        index = load_or_build(str(blocker / "search.idx"), DOCS)
+
+        assert index.path is None
+        assert index.search("squats")[0].id == "c"
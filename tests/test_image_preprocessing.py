@@ -0,0 +1,114 @@
+"""
+Unit tests for FitGenius image preprocessing
+Run with: pytest tests/test_image_preprocessing.py -v
+"""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from image_preprocessing import estimate_image_tokens, preprocess_image
+
+
+def encode(image: Image.Image, fmt: str, **kwargs) -> str:
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **kwargs)
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def phone_photo(size=(4032, 3024)) -> Image.Image:
+    """Colour gradient standing in for a camera photo"""
+    red = Image.linear_gradient("L").resize(size)
+    green = Image.radial_gradient("L").resize(size)
+    blue = red.transpose(Image.Transpose.ROTATE_90).resize(size)
+    return Image.merge("RGB", (red, green, blue))
+
+
+class TestPreprocessImage:
+    """Tests for the pre-vision image stage"""
+
+    def test_large_photo_is_downsized(self):
+        """Test that 12MP photos are resized to the model resolution"""
+        result = preprocess_image(encode(phone_photo(), "JPEG", quality=95))
+
+        width, height = result.final_size
+        assert result.media_type == "image/jpeg"
+        assert width * height <= 1_200_000
+        assert width / height == pytest.approx(4 / 3, rel=0.01)
+        assert result.bytes_saved > 0
+        assert result.report()["estimated_upload_ms_saved"] > 0
+
+    def test_real_format_is_sniffed(self):
+        """Test that PNG data is detected regardless of the client label"""
+        result = preprocess_image(encode(phone_photo((2000, 1000)), "PNG"))
+
+        assert result.original_format == "PNG"
+        assert result.media_type == "image/jpeg"
+        assert result.final_size == (1549, 774)
+
+    def test_exif_is_stripped(self):
+        """Test that EXIF metadata never reaches the model"""
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"  # Make
+        data = encode(phone_photo((400, 300)), "JPEG", exif=exif.tobytes())
+
+        result = preprocess_image(data)
+        output = Image.open(io.BytesIO(base64.b64decode(result.data)))
+
+        assert not output.getexif()
+
+    def test_exif_orientation_is_applied(self):
+        """Test that rotated photos are uprighted before EXIF is dropped"""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotate 90 degrees clockwise
+        small = preprocess_image(encode(phone_photo((400, 300)), "JPEG", exif=exif.tobytes()))
+        large = preprocess_image(encode(phone_photo((2000, 1500)), "JPEG", exif=exif.tobytes()))
+
+        assert small.final_size == (300, 400)
+        assert large.final_size[0] < large.final_size[1]
+
+    def test_small_clean_image_is_passed_through(self):
+        """Test that an already-small image without EXIF is not re-encoded"""
+        data = encode(Image.new("RGB", (64, 64), (200, 100, 50)), "PNG")
+
+        result = preprocess_image(data)
+
+        assert result.data == data
+        assert result.media_type == "image/png"
+        assert result.bytes_saved == 0
+
+    def test_mpo_is_reencoded_as_jpeg(self):
+        """Test that multi-picture camera JPEGs are accepted and reduced to one JPEG"""
+        first, second = phone_photo((64, 48)), Image.new("RGB", (64, 48), "blue")
+        result = preprocess_image(encode(first, "MPO", save_all=True, append_images=[second]))
+        decoded = Image.open(io.BytesIO(base64.b64decode(result.data)))
+
+        assert result.original_format == "MPO"
+        assert result.media_type == "image/jpeg"
+        assert decoded.format == "JPEG" and decoded.size == (64, 48)
+
+    def test_alpha_is_flattened(self):
+        """Test that transparent images are converted for JPEG"""
+        image = phone_photo((2000, 2000)).convert("RGBA")
+
+        result = preprocess_image(encode(image, "PNG"))
+
+        assert Image.open(io.BytesIO(base64.b64decode(result.data))).mode == "RGB"
+
+    def test_max_bytes_is_enforced(self):
+        """Test that images that cannot fit the size limit are rejected"""
+        with pytest.raises(ValueError):
+            preprocess_image(encode(phone_photo((1500, 1500)), "JPEG"), max_bytes=500)
+
+    def test_rejects_non_images(self):
+        """Test that arbitrary bytes are rejected"""
+        with pytest.raises(ValueError):
+            preprocess_image(base64.b64encode(b"definitely not an image").decode())
+
+
+def test_image_token_estimate():
+    """Test the width * height / 750 token approximation and its API cap"""
+    assert estimate_image_tokens(1092, 1092) == 1590
+    assert estimate_image_tokens(4032, 3024) == estimate_image_tokens(1264, 948)
@@ -0,0 +1,104 @@
+"""
+Tests for the sample data bulk loader
+Run with: pytest tests/test_load_sample_data.py -v
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock
+
+import boto3
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import load_sample_data  # noqa: E402
+
+
+@pytest.fixture
+def dynamodb_client(mocked_aws):
+    """Moto-backed DynamoDB client with the progress table created"""
+    client = load_sample_data.make_client("us-east-1", None, workers=4)
+    load_sample_data.create_progress_table(client, "FitGeniusProgress")
+    return client
+
+
+class TestSyntheticData:
+    """Tests for synthetic progress generation"""
+
+    def test_rows_per_user_and_day(self):
+        """Test that N users x M days rows are generated"""
+        items = list(load_sample_data.generate_progress(range(3), 7, datetime(2024, 1, 1)))
+
+        assert len(items) == 21
+        assert {item["userId"] for item in items} == {
+            "load_user_00000000", "load_user_00000001", "load_user_00000002"
+        }
+        assert items[0]["date"] == "2024-01-01"
+        assert items[6]["date"] == "2024-01-07"
+
+    def test_generation_is_deterministic(self):
+        """Test that the same seed produces the same data"""
+        first = list(load_sample_data.generate_progress(range(2), 5, datetime(2024, 1, 1), seed=3))
+        second = list(load_sample_data.generate_progress(range(2), 5, datetime(2024, 1, 1), seed=3))
+
+        assert first == second
+
+
+class TestBulkLoader:
+    """Tests for the parallel BatchWriteItem loader"""
+
+    def test_loads_every_row(self, dynamodb_client):
+        """Test that all rows land in the table"""
+        stats = load_sample_data.bulk_load_progress(
+            users=13, days=11, workers=4, client=dynamodb_client, report_every=0
+        )
+
+        table = boto3.resource("dynamodb", region_name="us-east-1").Table("FitGeniusProgress")
+        assert stats.rows == 143
+        assert table.scan(Select="COUNT")["Count"] == 143
+
+    def test_unprocessed_items_are_retried(self, monkeypatch):
+        """Test that UnprocessedItems are resubmitted until written"""
+        monkeypatch.setattr(load_sample_data.time, "sleep", lambda _: None)
+        client = Mock()
+        leftover = {"FitGeniusProgress": [{"PutRequest": {"Item": {}}}]}
+        client.batch_write_item.side_effect = [
+            {"UnprocessedItems": leftover},
+            {"UnprocessedItems": leftover},
+            {"UnprocessedItems": {}},
+        ]
+        items = list(load_sample_data.generate_progress(range(1), 25, datetime(2024, 1, 1)))
+
+        retries = load_sample_data.write_batch(client, "FitGeniusProgress", items, TypeSerializer())
+
+        assert retries == 2
+        assert client.batch_write_item.call_count == 3
+        assert client.batch_write_item.call_args.kwargs["RequestItems"] == leftover
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        """Test that persistent UnprocessedItems raise instead of looping forever"""
+        monkeypatch.setattr(load_sample_data.time, "sleep", lambda _: None)
+        client = Mock()
+        client.batch_write_item.return_value = {
+            "UnprocessedItems": {"FitGeniusProgress": [{"PutRequest": {"Item": {}}}]}
+        }
+
+        with pytest.raises(RuntimeError):
+            load_sample_data.write_batch(client, "FitGeniusProgress", [], TypeSerializer())
+
+
+class TestBackfillSummaries:
+    """Tests for building summaries over raw-loaded history"""
+
+    def test_builds_missing_summaries(self, dynamodb_client):
+        """Test that every loaded user gets a summary covering their rows"""
+        load_sample_data.bulk_load_progress(users=3, days=5, workers=2, client=dynamodb_client, report_every=0)
+        table = boto3.resource("dynamodb", region_name="us-east-1").Table("FitGeniusProgress")
+
+        assert load_sample_data.backfill_summaries(table) == 3
+        assert load_sample_data.backfill_summaries(table) == 0
+        store = load_sample_data.ProgressStore(table)
+        assert store.get_summary("load_user_00000001")["entry_count"] == 5
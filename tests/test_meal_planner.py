@@ -0,0 +1,145 @@
+"""
+Unit tests for the FitGenius food table and meal planner
+Run with: pytest tests/test_meal_planner.py -v
+"""
+
+import numpy as np
+import pytest
+
+import food_table
+from food_table import FOODS, restriction_mask
+from meal_planner import MEAL_LAYOUTS, plan_day
+
+TARGETS = {"calories": 2300, "protein_g": 170, "carbs_g": 240, "fat_g": 75}
+
+
+def foods_in(plan):
+    return [food["food"] for meal in plan["meals"] for food in meal["foods"]]
+
+
+class TestFoodTable:
+    """Tests for the typed-array food table"""
+
+    def test_compact_columns(self):
+        """Test column dtypes and that the arrays are read-only"""
+        assert FOODS.macros.dtype == np.float32 and FOODS.macros.shape == (len(FOODS), 3)
+        assert FOODS.contains.dtype == np.uint16
+        with pytest.raises(ValueError):
+            FOODS.calories[0] = 0
+
+    def test_calories_match_macros(self):
+        """Test that label calories agree with 4/4/9 kcal per gram within 15%"""
+        estimated = FOODS.macros @ np.array([4, 4, 9], dtype=np.float32)
+
+        assert np.all(np.abs(estimated - FOODS.calories) <= 0.15 * FOODS.calories + 5)
+
+    def test_restriction_mask(self):
+        """Test restriction names, aliases and unknown entries"""
+        mask, applied, unknown = restriction_mask(["Vegan", "gluten-free", "no nuts", "keto"])
+
+        assert applied == ["vegan", "gluten_free", "nut_free"]
+        assert unknown == ["keto"]
+        assert mask & food_table.EGG and mask & food_table.GLUTEN and mask & food_table.PEANUT
+        assert not mask & food_table.SOY
+
+    @pytest.mark.parametrize("phrase, restriction", [
+        ("dairy allergy", "dairy_free"),
+        ("milk allergy", "dairy_free"),
+        ("Milk-free", "dairy_free"),
+        ("wheat allergy", "gluten_free"),
+        ("gluten intolerance", "gluten_free"),
+        ("lactose intolerant", "lactose_free"),
+        ("tree nut allergy", "tree_nut_free"),
+        ("allergic to peanuts", "peanut_free"),
+        ("no eggs", "egg_free"),
+    ])
+    def test_allergy_phrasings(self, phrase, restriction):
+        """Test that allergy, intolerance and -free phrasings map to the _free restriction"""
+        _, applied, unknown = restriction_mask([phrase])
+
+        assert applied == [restriction] and unknown == []
+
+    def test_allowed_filters_by_bitmask(self):
+        """Test that allowed() excludes every food with a forbidden content flag"""
+        mask, _, _ = restriction_mask(["vegetarian"])
+        allowed = {FOODS.names[i] for i in np.flatnonzero(FOODS.allowed(mask))}
+
+        assert "Firm tofu" in allowed
+        assert not allowed & {"Chicken breast", "Salmon", "Shrimp", "Pork tenderloin"}
+
+
+class TestPlanDay:
+    """Tests for the macro-targeting optimizer"""
+
+    def test_day_hits_macros(self):
+        """Test that every meal lands within tolerance of its share of the targets"""
+        plan = plan_day(**TARGETS, meals_per_day=3)
+
+        assert plan["within_tolerance"]
+        for key in ("protein_g", "carbs_g", "fat_g"):
+            assert plan["totals"][key] == pytest.approx(TARGETS[key], rel=0.05)
+
+    @pytest.mark.parametrize("meals_per_day", sorted(MEAL_LAYOUTS))
+    def test_meals_per_day(self, meals_per_day):
+        """Test that the day has the requested number of meals"""
+        plan = plan_day(**TARGETS, meals_per_day=meals_per_day)
+
+        assert len(plan["meals"]) == meals_per_day
+        assert sum(meal["target"]["protein_g"] for meal in plan["meals"]) == pytest.approx(170, abs=0.5)
+
+    def test_meals_per_day_is_clamped(self):
+        """Test out-of-range meal counts"""
+        assert len(plan_day(**TARGETS, meals_per_day=12)["meals"]) == max(MEAL_LAYOUTS)
+        assert len(plan_day(**TARGETS, meals_per_day=None)["meals"]) == 3
+
+    def test_restrictions_are_respected(self):
+        """Test that no restricted food appears in the plan"""
+        plan = plan_day(**TARGETS, meals_per_day=5, restrictions=["vegan", "gluten_free"])
+        mask, _, _ = restriction_mask(["vegan", "gluten_free"])
+        index = {name: i for i, name in enumerate(FOODS.names)}
+
+        assert plan["restrictions"] == ["vegan", "gluten_free"]
+        assert all(FOODS.contains[index[name]] & mask == 0 for name in foods_in(plan))
+
+    def test_allergy_phrasings_exclude_foods(self):
+        """Test that foods behind common allergy phrasings are left out of the plan"""
+        plan = plan_day(**TARGETS, meals_per_day=6,
+                        restrictions=["dairy allergy", "wheat allergy", "tree nut allergy"])
+        foods = set(foods_in(plan))
+
+        assert plan["restrictions"] == ["dairy_free", "gluten_free", "tree_nut_free"]
+        assert not foods & {"Whey protein isolate", "Cheddar cheese", "Whole grain bread", "Seitan", "Almonds"}
+        assert plan["warnings"] == []
+
+    def test_unrecognized_restrictions_are_warned(self):
+        """Test that a restriction the table cannot apply is named in the plan's warnings"""
+        plan = plan_day(**TARGETS, restrictions=["vegan", "sesame allergy"])
+
+        assert plan["unrecognized_restrictions"] == ["sesame allergy"]
+        assert len(plan["warnings"]) == 1 and "'sesame allergy'" in plan["warnings"][0]
+        assert "NOT applied" in plan["warnings"][0]
+
+    def test_portions_are_quarter_servings(self):
+        """Test that portions are rounded and bounded"""
+        plan = plan_day(**TARGETS, meals_per_day=4)
+        servings = [food["servings"] for meal in plan["meals"] for food in meal["foods"]]
+
+        assert all(0 < s <= 4 and (s * 4).is_integer() for s in servings)
+
+    def test_low_carb_day_drops_starch(self):
+        """Test that a food the fit rounds to nothing is left out instead of overshooting"""
+        plan = plan_day(calories=1300, protein_g=200, carbs_g=20, fat_g=45, meals_per_day=3)
+
+        assert plan["totals"]["carbs_g"] < 35
+
+    def test_menu_varies(self):
+        """Test that lunch and dinner use different foods"""
+        lunch, dinner = plan_day(**TARGETS, meals_per_day=3)["meals"][1:]
+
+        assert {f["food"] for f in lunch["foods"]}.isdisjoint(f["food"] for f in dinner["foods"])
+
+    def test_unreachable_targets_are_flagged(self):
+        """Test that a plan with too few allowed foods reports it is off target"""
+        plan = plan_day(**TARGETS, restrictions=["vegan", "soy_free", "gluten_free", "nut_free"])
+
+        assert not plan["within_tolerance"]
@@ -0,0 +1,129 @@
+"""
+Unit tests for FitGenius progress photo storage
+Run with: pytest tests/test_photo_store.py -v
+"""
+
+import base64
+import hashlib
+import io
+import os
+
+import boto3
+import pytest
+from PIL import Image
+
+from photo_store import PhotoStore
+
+BUCKET = "fitgenius-test-images"
+
+
+@pytest.fixture
+def s3(mocked_aws):
+    """Moto-backed S3 client with an empty bucket"""
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+
+def count_calls(client) -> dict:
+    counts = {}
+
+    def before_call(model, **kwargs):
+        counts[model.name] = counts.get(model.name, 0) + 1
+
+    client.meta.events.register("before-call.s3.*", before_call)
+    return counts
+
+
+def photo(width=64, height=64, color=(200, 120, 80), image_format="JPEG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def noise_png(width, height) -> bytes:
+    """Incompressible PNG, for photos above the multipart threshold"""
+    buffer = io.BytesIO()
+    Image.frombytes("RGB", (width, height), os.urandom(width * height * 3)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii")
+
+
+class TestPhotoStore:
+    """Tests for content-addressed progress photos"""
+
+    def test_key_is_content_hash_under_prefix(self, s3):
+        """Test that the key is prefix/user/sha256.ext and the object holds the bytes"""
+        raw = photo()
+        stored = PhotoStore(s3, BUCKET, prefix="progress/").put("user_1", b64(raw))
+
+        assert stored.key == f"progress/user_1/{hashlib.sha256(raw).hexdigest()}.jpg"
+        assert stored.uploaded
+        obj = s3.get_object(Bucket=BUCKET, Key=stored.key)
+        assert obj["Body"].read() == raw
+        assert obj["ContentType"] == "image/jpeg"
+
+    def test_identical_photo_is_not_uploaded_again(self, s3):
+        """Test that a repeat upload is skipped without any S3 request"""
+        store = PhotoStore(s3, BUCKET)
+        first = store.put("user_1", b64(photo()))
+        calls = count_calls(s3)
+
+        second = store.put("user_1", b64(photo()))
+
+        assert second.key == first.key
+        assert not second.uploaded
+        assert calls == {}
+        assert store.stats()["deduplicated"] == 1
+
+    def test_photo_stored_by_another_process_is_detected(self, s3):
+        """Test that a fresh store finds the existing object with one HEAD"""
+        PhotoStore(s3, BUCKET).put("user_1", b64(photo()))
+        calls = count_calls(s3)
+
+        stored = PhotoStore(s3, BUCKET).put("user_1", b64(photo()))
+
+        assert not stored.uploaded
+        assert calls == {"HeadObject": 1}
+
+    def test_different_photos_get_different_keys(self, s3):
+        """Test that changed pixels produce a new object"""
+        store = PhotoStore(s3, BUCKET)
+        first = store.put("user_1", b64(photo(color=(10, 10, 10))))
+        second = store.put("user_1", b64(photo(color=(250, 250, 250))))
+
+        assert first.key != second.key
+        assert store.stats()["uploads"] == 2
+
+    def test_large_photo_uses_multipart_upload(self, s3):
+        """Test that photos above the threshold are uploaded in parts"""
+        raw = noise_png(1400, 1400)
+        store = PhotoStore(s3, BUCKET, multipart_threshold=5 * 1024 * 1024, part_size=5 * 1024 * 1024)
+        calls = count_calls(s3)
+
+        stored = store.put("user_1", b64(raw))
+
+        assert stored.key.endswith(".png")
+        assert calls["CreateMultipartUpload"] == 1
+        assert calls["UploadPart"] == -(-len(raw) // (5 * 1024 * 1024))
+        assert s3.get_object(Bucket=BUCKET, Key=stored.key)["Body"].read() == raw
+        assert store.stats()["multipart_uploads"] == 1
+
+    def test_mpo_is_stored_as_jpeg(self, s3):
+        """Test that multi-picture camera JPEGs are accepted under a .jpg key"""
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 48), "red").save(buffer, format="MPO", save_all=True,
+                                               append_images=[Image.new("RGB", (64, 48), "blue")])
+        stored = PhotoStore(s3, BUCKET).put("user_1", b64(buffer.getvalue()))
+
+        assert stored.key.endswith(".jpg")
+        assert stored.media_type == "image/jpeg"
+        assert s3.get_object(Bucket=BUCKET, Key=stored.key)["ContentType"] == "image/jpeg"
+
+    def test_rejects_non_images(self, s3):
+        """Test that data which is not an image raises ValueError"""
+        with pytest.raises(ValueError):
+            PhotoStore(s3, BUCKET).put("user_1", b64(b"not an image at all"))
@@ -0,0 +1,137 @@
+"""
+Unit tests for progress trend analytics
+Run with: pytest tests/test_progress_analytics.py -v
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from progress_analytics import (
+    ProgressHistory, analyze_history, confidence_band, ewma, linear_trend, rolling_mean, t_critical_95,
+)
+
+
+def irregular_history(n=400, slope_per_day=-0.05, noise=0.8, seed=0):
+    rng = np.random.default_rng(seed)
+    gaps = rng.choice([1, 1, 1, 2, 3, 7], n)
+    dates = np.datetime64("2022-01-01") + np.cumsum(gaps).astype("timedelta64[D]")
+    days = (dates - dates[0]).astype(float)
+    weight = 90 + slope_per_day * days + rng.normal(0, noise, n)
+    return dates, days, weight
+
+
+class TestSmoothing:
+    """Tests for time-windowed rolling mean and EWMA"""
+
+    def test_rolling_mean_matches_pandas_time_window(self):
+        """Test that the rolling mean uses a window in days, not rows"""
+        dates, days, weight = irregular_history()
+        weight[::11] = np.nan
+        expected = pd.Series(weight, index=pd.DatetimeIndex(dates)).rolling("7D").mean().values
+
+        np.testing.assert_allclose(rolling_mean(days, weight, 7), expected, rtol=1e-9)
+
+    def test_ewma_matches_pandas_halflife(self):
+        """Test that EWMA decays by elapsed time across gaps and NaNs"""
+        dates, days, weight = irregular_history()
+        weight[::13] = np.nan
+        series = pd.Series(weight, index=pd.DatetimeIndex(dates))
+        expected = series.ewm(halflife="7D", times=series.index).mean().values
+
+        np.testing.assert_allclose(ewma(days, weight, 7), expected, rtol=1e-9)
+
+    def test_ewma_multi_year_does_not_overflow(self):
+        """Test that long histories with short half-lives stay finite"""
+        days = np.arange(0, 3650, dtype=float)
+        values = np.full(len(days), 80.0)
+
+        result = ewma(days, values, halflife_days=1)
+
+        assert np.isfinite(result).all()
+        np.testing.assert_allclose(result, 80.0)
+
+
+class TestLinearTrend:
+    """Tests for the least-squares weekly slope"""
+
+    def test_recovers_slope_with_confidence(self):
+        """Test that the weekly slope CI contains the true slope"""
+        _, days, weight = irregular_history(slope_per_day=-0.05)
+
+        fit = linear_trend(days, weight)
+
+        assert fit.ci_low < -0.35 < fit.ci_high
+        assert fit.direction == "losing"
+
+    def test_noise_only_is_maintaining(self):
+        """Test that water-weight noise around a flat line is not called a trend"""
+        rng = np.random.default_rng(3)
+        days = np.arange(14, dtype=float)
+        weight = 80 + rng.normal(0, 1.0, 14)
+
+        assert linear_trend(days, weight).direction == "maintaining"
+
+    def test_too_few_points(self):
+        """Test that fewer than three points give no fit"""
+        assert linear_trend(np.array([0.0, 1.0]), np.array([80.0, 79.0])) is None
+
+    def test_confidence_band_contains_fit(self):
+        """Test that the band brackets the fitted line and widens at the ends"""
+        _, days, weight = irregular_history(n=60)
+
+        band = confidence_band(days, weight)
+        width = band["upper"] - band["lower"]
+
+        assert (band["lower"] < band["fitted"]).all() and (band["fitted"] < band["upper"]).all()
+        assert width[0] > width[len(width) // 2] < width[-1]
+
+    def test_t_critical(self):
+        """Test t critical values at small and large dof"""
+        assert t_critical_95(1) == 12.706
+        assert t_critical_95(60) == pytest.approx(2.000, abs=0.005)
+        assert t_critical_95(1000) == 1.96
+
+
+class TestAnalyzeHistory:
+    """Tests for full history analysis"""
+
+    def entries(self):
+        return [
+            {"date": "2024-01-01", "weight": 85.0, "measurements": {"waist": 92, "chest": 101}},
+            {"date": "2024-01-08", "weight": 84.2, "measurements": {"waist": 91.5}},
+            {"date": "2024-01-03", "weight": 85.4, "measurements": {"waist": 92.2, "chest": 101}},
+            {"date": "2024-01-20", "weight": 83.1, "measurements": {"waist": 90.4, "chest": 100.5}},
+            {"date": "2024-02-01", "weight": 82.4, "measurements": {"waist": 89.8, "notes": "felt good"}},
+        ]
+
+    def test_from_entries_sorts_and_aligns(self):
+        """Test that entries become date-sorted columns with NaN gaps"""
+        history = ProgressHistory.from_entries(self.entries())
+
+        assert str(history.dates[1]) == "2024-01-03"
+        assert history.weight[1] == 85.4
+        assert np.isnan(history.measurements["chest"][2])
+        assert "notes" not in history.measurements
+
+    def test_analysis(self):
+        """Test weight and per-measurement deltas and trend"""
+        result = analyze_history(ProgressHistory.from_entries(self.entries()))
+
+        assert result["entries_count"] == 5
+        assert result["days_tracked"] == 31
+        assert result["trend"] == "losing"
+        assert result["weight"]["change"] == -2.6
+        assert result["measurements"]["waist"]["change"] == -2.2
+        assert result["measurements"]["chest"]["points"] == 3
+
+    def test_recent_days(self):
+        """Test that recent_days restricts the analysis window"""
+        result = analyze_history(ProgressHistory.from_entries(self.entries()), recent_days=14)
+
+        assert result["entries_count"] == 2
+        assert result["weight"]["trend"] == "insufficient_data"
+
+    def test_empty(self):
+        """Test that an empty history is reported as such"""
+        assert analyze_history(ProgressHistory.from_entries([]))["entries_count"] == 0
@@ -0,0 +1,189 @@
+"""
+Unit tests for the FitGenius progress store
+Run with: pytest tests/test_progress_store.py -v
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from progress_store import SUMMARY_DATE, ProgressStore, analyze_summary, to_dynamo
+
+
+def entry(date, weight, **measurements):
+    return {"userId": "user_1", "date": date, "weight": weight, "measurements": measurements}
+
+
+class TestSummaryUpdates:
+    """Tests for the incrementally maintained summary item"""
+
+    def test_first_entry(self, progress_table):
+        """Test that the first entry creates the summary"""
+        summary = ProgressStore(progress_table).record_entry(entry("2024-01-01", 85.0, waist=95))
+
+        assert summary["entry_count"] == 1
+        assert summary["first_date"] == summary["latest_date"] == "2024-01-01"
+        assert analyze_summary(summary)["message"] == "First entry recorded. Keep tracking!"
+
+    def test_analysis_covers_full_history(self, progress_table):
+        """Test that analysis spans more than the old 30-entry window"""
+        store = ProgressStore(progress_table)
+        start = datetime(2024, 1, 1)
+        for day in range(60):
+            date = (start + timedelta(days=day)).strftime("%Y-%m-%d")
+            summary = store.record_entry(entry(date, round(85.0 - day * 0.1, 2), waist=round(95 - day * 0.05, 2)))
+
+        analysis = analyze_summary(summary)
+
+        assert analysis["entries_count"] == 60
+        assert analysis["days_tracked"] == 59
+        assert analysis["total_weight_change"] == pytest.approx(-5.9)
+        assert analysis["trend"] == "losing"
+        assert analysis["metrics"]["weight"]["min"] == pytest.approx(79.1)
+        assert analysis["metrics"]["weight"]["max"] == 85.0
+        assert analysis["metrics"]["waist"]["average"] == pytest.approx(95 - 29.5 * 0.05, abs=0.01)
+        assert analysis["metrics"]["waist"]["change"] == pytest.approx(-2.95)
+
+    def test_backfilled_entry_moves_first_not_latest(self, progress_table):
+        """Test that an earlier date updates first_* and keeps latest_*"""
+        store = ProgressStore(progress_table)
+        store.record_entry(entry("2024-02-01", 80.0))
+        store.record_entry(entry("2024-03-01", 78.0))
+
+        summary = store.record_entry(entry("2024-01-01", 84.0))
+
+        assert summary["first_date"] == "2024-01-01"
+        assert summary["latest_date"] == "2024-03-01"
+        assert summary["max:weight"] == 84
+        assert analyze_summary(summary)["total_weight_change"] == -6.0
+
+    def test_rerecording_a_date_replaces_its_contribution(self, progress_table):
+        """Test that writing the same date twice is not double counted"""
+        store = ProgressStore(progress_table)
+        store.record_entry(entry("2024-01-01", 80.0))
+        store.record_entry(entry("2024-01-02", 81.0))
+
+        summary = store.record_entry(entry("2024-01-02", 79.0))
+
+        assert summary["entry_count"] == 2
+        assert float(summary["sum:weight"]) == 159.0
+        assert summary["latest_values"]["weight"] == 79
+
+    def test_rerecording_the_first_date_replaces_first_values(self, progress_table):
+        """Test that a corrected first entry is the baseline for later changes"""
+        store = ProgressStore(progress_table)
+        store.record_entry(entry("2024-01-01", 85.0))
+        store.record_entry(entry("2024-01-01", 80.0))
+
+        summary = store.record_entry(entry("2024-01-08", 80.0))
+
+        assert summary["first_values"]["weight"] == 80
+        assert analyze_summary(summary)["trend"] == "maintaining"
+
+    def test_history_without_summary_is_backfilled(self, progress_table):
+        """Test that entries written before summaries existed are counted on the next write"""
+        for day in range(1, 6):
+            progress_table.put_item(Item=to_dynamo(entry(f"2024-01-0{day}", 86.0 - day)))
+
+        summary = ProgressStore(progress_table).record_entry(entry("2024-01-06", 80.0))
+        analysis = analyze_summary(summary)
+
+        assert summary["entry_count"] == 6
+        assert analysis["total_weight_change"] == -5.0
+        assert "message" not in analysis
+
+    def test_record_entries_replaces_existing_dates(self, progress_table):
+        """Test that a batch re-writing stored dates folds only the new ones as new"""
+        store = ProgressStore(progress_table)
+        store.record_entries([entry("2024-01-01", 85.0), entry("2024-01-02", 84.0)])
+
+        summary = store.record_entries([entry("2024-01-02", 83.0), entry("2024-01-03", 82.0)])["user_1"]
+
+        assert summary["entry_count"] == 3
+        assert float(summary["sum:weight"]) == 250.0
+
+    def test_rebuild_summary_matches_incremental(self, progress_table):
+        """Test that a summary rebuilt from history equals the incrementally kept one"""
+        store = ProgressStore(progress_table)
+        for day, weight in enumerate((85.0, 84.2, 84.6, 83.9)):
+            store.record_entry(entry(f"2024-01-0{day + 1}", weight, waist=95 - day))
+        incremental = store.get_summary("user_1")
+
+        rebuilt = store.rebuild_summary("user_1")
+
+        ignored = {"updated_at"}
+        assert {k: v for k, v in rebuilt.items() if k not in ignored} == \
+            {k: v for k, v in incremental.items() if k not in ignored}
+        assert store.rebuild_summary("nobody") is None
+
+    def test_summary_is_separate_from_entries(self, progress_table):
+        """Test that entries and the summary item live under distinct sort keys"""
+        store = ProgressStore(progress_table)
+        store.record_entry(entry("2024-01-01", 80.0))
+
+        items = progress_table.scan()["Items"]
+
+        assert sorted(item["date"] for item in items) == [SUMMARY_DATE, "2024-01-01"]
+        assert store.get_summary("user_1")["entry_count"] == 1
+        assert store.get_summary("nobody") is None
+
+
+class TestHistoryQuery:
+    """Tests for paginated, projected history reads"""
+
+    def fill(self, store, days=10):
+        start = datetime(2024, 1, 1)
+        for i in range(days):
+            date = (start + timedelta(days=i)).strftime("%Y-%m-%d")
+            store.record_entry({**entry(date, 85 - i * 0.1, waist=90), "timestamp": "t", "notes": "x" * 100})
+
+    def test_follows_pages(self, progress_table):
+        """Test that every entry is read across pages, in date order"""
+        store = ProgressStore(progress_table)
+        self.fill(store)
+
+        history = store.history("user_1", page_size=3)
+        dates = [item["date"] for item in history]
+
+        assert dates == sorted(dates) and len(dates) == 10
+        assert history.pages == 4
+        assert history.consumed_capacity > 0
+
+    def test_lazy(self, progress_table):
+        """Test that pages are only read as the iterator advances"""
+        store = ProgressStore(progress_table)
+        self.fill(store)
+
+        history = store.history("user_1", page_size=3)
+        next(iter(history))
+
+        assert history.stats()["pages"] == 1
+
+    def test_excludes_summary_and_projects(self, progress_table):
+        """Test that the summary item is skipped and only projected attributes are returned"""
+        store = ProgressStore(progress_table)
+        self.fill(store, days=3)
+
+        items = list(store.history("user_1"))
+
+        assert SUMMARY_DATE not in [item["date"] for item in items]
+        assert set(items[0]) == {"date", "weight", "measurements"}
+        assert items[0]["weight"] == 85
+
+    def test_date_range(self, progress_table):
+        """Test that start and end dates are inclusive sort key bounds"""
+        store = ProgressStore(progress_table)
+        self.fill(store)
+
+        dates = [item["date"] for item in store.history("user_1", "2024-01-03", "2024-01-05")]
+
+        assert dates == ["2024-01-03", "2024-01-04", "2024-01-05"]
+
+    def test_newest_first(self, progress_table):
+        """Test reverse chronological reads"""
+        store = ProgressStore(progress_table)
+        self.fill(store, days=4)
+
+        dates = [item["date"] for item in store.history("user_1", newest_first=True, attributes=["date"])]
+
+        assert dates == ["2024-01-04", "2024-01-03", "2024-01-02", "2024-01-01"]
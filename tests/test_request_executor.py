@@ -0,0 +1,155 @@
+"""
+Unit tests for the concurrent request executor
+Run with: pytest tests/test_request_executor.py -v
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from request_executor import QueueFullError, RequestExecutor
+
+
+class SlowHandler:
+    """Blocking handler that records call order and peak concurrency"""
+
+    def __init__(self, latency: float = 0.02):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, user_input, context=None):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.calls.append(user_input)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        if user_input == "fail":
+            raise ValueError("handler failed")
+        return f"response to {user_input}"
+
+
+class TestRequestExecutor:
+    """Tests for RequestExecutor"""
+
+    def test_results_in_input_order(self):
+        """Test that run_many returns each request's own response in order"""
+        executor = RequestExecutor(SlowHandler(), max_concurrency=4)
+        requests = [(f"user{i}", (f"req{i}",), {}) for i in range(10)]
+
+        results = asyncio.run(executor.run_many(requests))
+
+        assert results == [f"response to req{i}" for i in range(10)]
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_concurrency handlers run at once"""
+        handler = SlowHandler()
+        executor = RequestExecutor(handler, max_concurrency=3)
+        requests = [(f"user{i}", (f"req{i}",), {}) for i in range(12)]
+
+        asyncio.run(executor.run_many(requests))
+
+        assert handler.peak == 3
+        assert executor.stats()["completed"] == 12
+
+    def test_runs_concurrently(self):
+        """Test that different users' requests overlap"""
+        handler = SlowHandler(latency=0.1)
+        executor = RequestExecutor(handler, max_concurrency=8)
+        requests = [(f"user{i}", (f"req{i}",), {}) for i in range(8)]
+
+        start = time.perf_counter()
+        asyncio.run(executor.run_many(requests))
+
+        assert time.perf_counter() - start < 0.4
+
+    def test_same_user_in_order(self):
+        """Test that one user's requests run one at a time, in submission order"""
+        handler = SlowHandler(latency=0.005)
+        executor = RequestExecutor(handler, max_concurrency=8)
+        requests = [("alice", (f"alice{i}",), {}) for i in range(6)]
+        requests += [("bob", (f"bob{i}",), {}) for i in range(6)]
+
+        asyncio.run(executor.run_many(requests))
+
+        assert [c for c in handler.calls if c.startswith("alice")] == [f"alice{i}" for i in range(6)]
+        assert [c for c in handler.calls if c.startswith("bob")] == [f"bob{i}" for i in range(6)]
+        assert handler.peak <= 2
+
+    def test_backpressure_rejects_without_wait(self):
+        """Test that a full queue raises QueueFullError for wait=False"""
+        executor = RequestExecutor(SlowHandler(latency=0.1), max_concurrency=2, max_pending=2)
+
+        async def scenario():
+            running = [asyncio.ensure_future(executor.submit(f"user{i}", f"req{i}")) for i in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(QueueFullError):
+                await executor.submit("user9", "req9", wait=False)
+            await asyncio.gather(*running)
+            return await executor.submit("user9", "req9", wait=False)
+
+        assert asyncio.run(scenario()) == "response to req9"
+        assert executor.stats()["rejected"] == 1
+
+    def test_backpressure_waits(self):
+        """Test that submitters wait for a free slot by default"""
+        handler = SlowHandler(latency=0.02)
+        executor = RequestExecutor(handler, max_concurrency=1, max_pending=1)
+        requests = [(f"user{i}", (f"req{i}",), {}) for i in range(4)]
+
+        assert len(asyncio.run(executor.run_many(requests))) == 4
+        assert handler.peak == 1
+
+    def test_errors_propagate(self):
+        """Test that a failing request does not block the user's later requests"""
+        executor = RequestExecutor(SlowHandler(latency=0.001), max_concurrency=2)
+        requests = [("alice", ("fail",), {}), ("alice", ("next",), {})]
+
+        results = asyncio.run(executor.run_many(requests, return_exceptions=True))
+
+        assert isinstance(results[0], ValueError)
+        assert results[1] == "response to next"
+        assert executor.stats()["failed"] == 1
+
+    def test_reusable_across_event_loops(self):
+        """Test that the executor works across separate asyncio.run calls"""
+        executor = RequestExecutor(SlowHandler(latency=0.001), max_concurrency=2)
+
+        for _ in range(2):
+            assert asyncio.run(executor.run_many([("u", ("x",), {})])) == ["response to x"]
+
+    def test_loops_keep_separate_state(self):
+        """Test that a request on a second event loop does not reset another loop's per-user ordering"""
+        handler = SlowHandler(latency=0.05)
+        executor = RequestExecutor(handler, max_concurrency=4)
+        alice_submitted, other_submitted = threading.Event(), threading.Event()
+        results = []
+
+        async def server():
+            alice = [asyncio.ensure_future(executor.submit("alice", f"alice{i}")) for i in range(2)]
+            await asyncio.sleep(0.01)
+            alice_submitted.set()
+            await asyncio.to_thread(other_submitted.wait)
+            alice.append(asyncio.ensure_future(executor.submit("alice", "alice2")))
+            results.extend(await asyncio.gather(*alice))
+
+        async def other():
+            await asyncio.to_thread(alice_submitted.wait)
+            task = asyncio.ensure_future(executor.submit("bob", "bob0"))
+            await asyncio.sleep(0)
+            other_submitted.set()
+            return await task
+
+        thread = threading.Thread(target=asyncio.run, args=(server(),))
+        thread.start()
+        assert asyncio.run(other()) == "response to bob0"
+        thread.join()
+
+        assert results == [f"response to alice{i}" for i in range(3)]
+        assert [c for c in handler.calls if c.startswith("alice")] == ["alice0", "alice1", "alice2"]
@@ -0,0 +1,162 @@
+"""
+Unit tests for FitGenius conversation sessions
+Run with: pytest tests/test_session_store.py -v
+"""
+
+import boto3
+import pytest
+
+from session_store import (
+    DiskSessionBackend,
+    DynamoSessionBackend,
+    SessionStore,
+    create_session_store,
+)
+
+
+def chat(store, user_id, turns, context=None):
+    for i in range(turns):
+        session = store.get(user_id)
+        store.record_turn(session, f"Question {i}. More detail here.", f"Answer {i}. Longer explanation.", context)
+    return store.get(user_id)
+
+
+@pytest.fixture
+def sessions_table(mocked_aws):
+    """Moto-backed FitGeniusSessions table"""
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    return dynamodb.create_table(
+        TableName="FitGeniusSessions",
+        AttributeDefinitions=[{"AttributeName": "userId", "AttributeType": "S"}],
+        KeySchema=[{"AttributeName": "userId", "KeyType": "HASH"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+class TestSession:
+    """Tests for rolling conversation state"""
+
+    def test_new_session_sends_bare_request(self):
+        """Test that a first turn without context is just the request"""
+        store = SessionStore()
+
+        assert store.build_message(store.get("user_1"), "hello") == "hello"
+
+    def test_recent_turns_are_quoted(self):
+        """Test that completed turns appear before the new request"""
+        store = SessionStore()
+        session = chat(store, "user_1", 2)
+
+        message = store.build_message(session, "next", "User Context: age=30")
+
+        assert message.startswith("Recent turns:\nUser: Question 0. More detail here.\nAssistant: Answer 0.")
+        assert message.endswith("User Context: age=30\n\nUser Request: next")
+
+    def test_old_turns_fold_into_bounded_summary(self):
+        """Test that turns beyond max_turns become one summary line each, capped"""
+        store = SessionStore(max_turns=2, summary_max_lines=3)
+        session = chat(store, "user_1", 10)
+
+        assert len(session.turns) == 2
+        assert list(session.summary) == [f"Question {i}. -> Answer {i}." for i in (5, 6, 7)]
+        assert session.turn_count == 10
+
+    def test_long_turns_are_clipped(self):
+        """Test that quoted turns respect max_turn_chars"""
+        store = SessionStore(max_turn_chars=50)
+        session = store.get("user_1")
+        store.record_turn(session, "x" * 500, "y" * 500)
+
+        user, assistant = session.turns[0]
+        assert len(user) == len(assistant) == 50
+        assert session.history_chars == 1000
+
+    def test_context_merges_across_turns(self):
+        """Test that context fields persist and None removes them"""
+        store = SessionStore()
+        session = chat(store, "user_1", 1, {"age": 30, "injuries": ["knee"]})
+        chat(store, "user_1", 1, {"weight_kg": 80, "injuries": None})
+
+        assert session.context == {"age": 30, "weight_kg": 80}
+
+
+class TestStoreBounds:
+    """Tests for LRU eviction and TTL expiry"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used session is evicted"""
+        store = SessionStore(max_sessions=2)
+        chat(store, "a", 1)
+        chat(store, "b", 1)
+        store.get("a")
+        chat(store, "c", 1)
+
+        assert store.get("a").turn_count == 1
+        assert store.get("b").turn_count == 0
+        assert store.stats()["evictions"] >= 1
+
+    def test_idle_sessions_expire(self):
+        """Test that a session idle past the TTL starts over"""
+        store = SessionStore(ttl_seconds=60)
+        session = chat(store, "user_1", 2)
+        session.updated_at -= 61
+
+        assert store.get("user_1").turn_count == 0
+        assert store.stats()["expired"] == 1
+
+
+class TestBackends:
+    """Tests for the disk and DynamoDB tiers"""
+
+    def test_disk_backend_survives_restart(self, tmp_path):
+        """Test that a new store restores the session from disk"""
+        chat(SessionStore(backend=DiskSessionBackend(str(tmp_path))), "user/1", 4, {"age": 30})
+
+        store = SessionStore(backend=DiskSessionBackend(str(tmp_path)))
+        session = store.get("user/1")
+
+        assert session.turn_count == 4
+        assert session.context == {"age": 30}
+        assert list(session.summary) == ["Question 0. -> Answer 0."]
+        assert store.stats()["backend_hits"] == 1
+
+    def test_expired_backend_session_is_deleted(self, tmp_path):
+        """Test that stale persisted sessions are dropped on load"""
+        backend = DiskSessionBackend(str(tmp_path))
+        session = chat(SessionStore(backend=backend), "user_1", 1)
+        backend.save("user_1", dict(session.to_dict(), updated_at=session.updated_at - 7200), None)
+
+        assert SessionStore(ttl_seconds=3600, backend=backend).get("user_1").turn_count == 0
+        assert backend.load("user_1") is None
+
+    def test_dynamodb_backend(self, sessions_table):
+        """Test that sessions round-trip through DynamoDB with a TTL attribute"""
+        chat(SessionStore(backend=DynamoSessionBackend(sessions_table)), "user_1", 3, {"goal": "weight_loss"})
+
+        item = sessions_table.get_item(Key={"userId": "user_1"})["Item"]
+        session = SessionStore(backend=DynamoSessionBackend(sessions_table)).get("user_1")
+
+        assert "expiresAt" in item
+        assert session.turn_count == 3
+        assert session.context == {"goal": "weight_loss"}
+
+    def test_end_removes_every_tier(self, sessions_table):
+        """Test that end() deletes the persisted session"""
+        store = SessionStore(backend=DynamoSessionBackend(sessions_table))
+        chat(store, "user_1", 1)
+
+        store.end("user_1")
+
+        assert "Item" not in sessions_table.get_item(Key={"userId": "user_1"})
+        assert store.get("user_1").turn_count == 0
+
+    def test_config(self, tmp_path):
+        """Test building stores from the agent.sessions section"""
+        assert create_session_store({"enabled": False}) is None
+        assert create_session_store({}).backend is None
+        assert isinstance(create_session_store({"backend": "disk", "disk_dir": str(tmp_path)}).backend,
+                          DiskSessionBackend)
+        with pytest.raises(ValueError):
+            create_session_store({"backend": "disk"})
+        with pytest.raises(ValueError):
+            create_session_store({"backend": "redis"})
@@ -0,0 +1,137 @@
+"""
+Unit tests for in-flight request coalescing
+Run with: pytest tests/test_single_flight.py -v
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def slow(result, delay=0.05, counter=None):
+    def fn():
+        if counter is not None:
+            counter.append(1)
+        time.sleep(delay)
+        return result
+    return fn
+
+
+class TestSingleFlightThreads:
+    """Tests for thread callers"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that identical concurrent calls run the function once"""
+        flights, executed = SingleFlight(), []
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: flights.do("photo", slow({"fat": 22}, counter=executed)), range(8)))
+
+        assert len(executed) == 1
+        assert all(r == {"fat": 22} for r in results)
+        assert flights.stats() == {"calls": 8, "executions": 1, "coalesced": 7, "failures": 0, "in_flight": 0}
+
+    def test_waiters_get_copies(self):
+        """Test that callers never share a mutable result"""
+        flights = SingleFlight()
+        with ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: flights.do("photo", slow({"tags": []})), range(4)))
+
+        assert len({id(r) for r in results}) == 4
+
+    def test_different_keys_run_separately(self):
+        """Test that only identical keys are coalesced"""
+        flights, executed = SingleFlight(), []
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda i: flights.do(i % 2, slow(i, counter=executed)), range(4)))
+
+        assert len(executed) == 2
+
+    def test_finished_calls_are_not_reused(self):
+        """Test that a call after the flight lands runs again"""
+        flights, executed = SingleFlight(), []
+        flights.do("photo", slow(1, 0, executed))
+        flights.do("photo", slow(1, 0, executed))
+
+        assert len(executed) == 2
+        assert flights.coalesced == 0
+
+    def test_exceptions_reach_every_waiter(self):
+        """Test that a failure is raised to all callers and clears the flight"""
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise RuntimeError("throttled")
+
+        errors = []
+
+        def call():
+            try:
+                flights.do("photo", fail)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 4
+        assert flights.failures == 1 and flights.in_flight() == 0
+        assert flights.do("photo", lambda: "retried") == "retried"
+
+
+class TestSingleFlightAsync:
+    """Tests for asyncio callers"""
+
+    def test_coroutines_share_one_execution(self):
+        """Test that concurrent coroutines coalesce"""
+        flights, executed = SingleFlight(), []
+
+        async def run():
+            return await asyncio.gather(*(flights.ado("photo", slow("ok", counter=executed)) for _ in range(6)))
+
+        assert asyncio.run(run()) == ["ok"] * 6
+        assert len(executed) == 1 and flights.coalesced == 5
+
+    def test_threads_and_coroutines_share_flights(self):
+        """Test that a coroutine joins a call a thread started"""
+        flights, executed = SingleFlight(), []
+        started = threading.Event()
+
+        def fn():
+            executed.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "ok"
+
+        with ThreadPoolExecutor(1) as pool:
+            thread_result = pool.submit(flights.do, "photo", fn)
+            started.wait()
+            assert asyncio.run(flights.ado("photo", fn)) == "ok"
+            assert thread_result.result() == "ok"
+
+        assert len(executed) == 1
+
+    def test_cancelled_waiter_does_not_cancel_flight(self):
+        """Test that one cancelled coroutine leaves the others their result"""
+        flights = SingleFlight()
+
+        async def run():
+            leader = asyncio.ensure_future(flights.ado("photo", slow("ok", 0.1)))
+            await asyncio.sleep(0.01)
+            impatient = asyncio.ensure_future(flights.ado("photo", slow("never")))
+            patient = asyncio.ensure_future(flights.ado("photo", slow("never")))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await impatient
+            return await leader, await patient
+
+        assert asyncio.run(run()) == ("ok", "ok")
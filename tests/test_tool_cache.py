@@ -0,0 +1,112 @@
+"""
+Unit tests for the pure tool result cache
+Run with: pytest tests/test_tool_cache.py -v
+"""
+
+from tool_cache import ToolCache, is_pure, pure
+
+
+def make_counting_tool():
+    calls = []
+
+    @pure
+    def plan(level, goals, days=3):
+        calls.append((level, goals, days))
+        return {"level": level, "goals": list(goals), "days": days}
+
+    return plan, calls
+
+
+class TestToolCache:
+    """Tests for memoizing pure tools"""
+
+    def test_repeat_call_is_cached(self):
+        """Test that the same arguments only run the tool once"""
+        cache = ToolCache()
+        plan, calls = make_counting_tool()
+        cached = cache.wrap("planner", plan)
+
+        first = cached("beginner", ["strength"])
+        second = cached("beginner", ["strength"])
+
+        assert first == second
+        assert len(calls) == 1
+        assert cache.stats("planner")["hits"] == 1
+
+    def test_equivalent_calls_share_entry(self):
+        """Test that keyword, default and int/float spellings of a call match"""
+        cache = ToolCache()
+        plan, calls = make_counting_tool()
+        cached = cache.wrap("planner", plan)
+
+        cached("beginner", ["strength"])
+        cached(goals=["strength"], level="beginner", days=3)
+        cached("beginner", ["strength"], 3.0)
+
+        assert len(calls) == 1
+
+    def test_different_arguments_miss(self):
+        """Test that argument order inside lists and bools are significant"""
+        cache = ToolCache()
+        plan, calls = make_counting_tool()
+        cached = cache.wrap("planner", plan)
+
+        cached("beginner", ["strength", "endurance"])
+        cached("beginner", ["endurance", "strength"])
+        cached("beginner", ["strength", "endurance"], True)
+        cached("beginner", ["strength", "endurance"], 1)
+
+        assert len(calls) == 4
+
+    def test_results_are_copies(self):
+        """Test that mutating a returned result does not corrupt the cache"""
+        cache = ToolCache()
+        plan, _ = make_counting_tool()
+        cached = cache.wrap("planner", plan)
+
+        cached("beginner", ["strength"])["goals"].append("mutated")
+
+        assert cached("beginner", ["strength"])["goals"] == ["strength"]
+
+    def test_unmarked_tools_not_wrapped(self):
+        """Test that side-effecting tools are returned unchanged"""
+        cache = ToolCache()
+
+        def track_progress(user_id):
+            return {"stored": user_id}
+
+        assert not is_pure(track_progress)
+        assert cache.wrap("progress_tracker", track_progress) is track_progress
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ToolCache(max_entries=2)
+        plan, calls = make_counting_tool()
+        cached = cache.wrap("planner", plan)
+
+        cached("a", [])
+        cached("b", [])
+        cached("a", [])
+        cached("c", [])  # evicts "b"
+        cached("a", [])
+        cached("b", [])
+
+        assert [call[0] for call in calls] == ["a", "b", "c", "b"]
+        assert cache.stats()["tools"]["planner"]["evictions"] == 2
+
+    def test_stats_per_tool(self):
+        """Test that totals and per-tool counters are reported"""
+        cache = ToolCache()
+        plan, _ = make_counting_tool()
+        other, _ = make_counting_tool()
+        cached, cached_other = cache.wrap("planner", plan), cache.wrap("other", other)
+
+        cached("a", [])
+        cached("a", [])
+        cached_other("a", [])
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["tools"]["planner"]["hit_rate"] == 0.5
+        assert stats["tools"]["other"]["hit_rate"] == 0.0
@@ -0,0 +1,104 @@
+"""
+Unit tests for intent-based tool routing
+Run with: pytest tests/test_tool_routing.py -v
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from tool_routing import ToolRouter, create_router
+
+NAMES = ("bmi_calculator", "body_analyzer", "workout_planner", "diet_planner", "progress_tracker", "fitness_search")
+
+
+@pytest.fixture
+def tools():
+    return [SimpleNamespace(name=name, description=f"{name} tool " * 5,
+                            parameters={"value": {"type": "number", "description": "A value"}})
+            for name in NAMES]
+
+
+class TestClassify:
+    """Tests for the keyword intent classifier"""
+
+    @pytest.mark.parametrize("text, intents", [
+        ("Build me a vegan meal plan", {"diet"}),
+        ("Create a 3-day workout split", {"workout"}),
+        ("What's my BMI?", {"bmi"}),
+        ("Log today's weigh-in", {"progress"}),
+        ("Is creatine backed by research?", {"research"}),
+        ("Check the posture in this photo", {"body_analysis"}),
+        ("Thanks!", set()),
+    ])
+    def test_intents(self, tools, text, intents):
+        """Test that typical requests map to their intents"""
+        assert ToolRouter(tools).classify(text) == intents
+
+    def test_word_boundaries(self, tools):
+        """Test that keywords inside other words do not match"""
+        assert ToolRouter(tools).classify("my weight and a subset of abstract ideas") == frozenset()
+
+
+class TestRoute:
+    """Tests for tool subsets"""
+
+    def test_diet_request_gets_diet_tool(self, tools):
+        """Test that a diet-only request carries only the diet planner"""
+        route = ToolRouter(tools).route("How many calories should I eat?")
+
+        assert route.names == ("diet_planner",)
+        assert route.tokens_saved > 0
+
+    def test_subsets_follow_tool_order(self, tools):
+        """Test that combined intents keep the agent's tool order"""
+        route = ToolRouter(tools).route("Is creatine useful for my workout?")
+
+        assert route.names == ("workout_planner", "fitness_search")
+
+    def test_unmatched_and_general_keep_every_tool(self, tools):
+        """Test that unclassified or overall requests fall back to the full set"""
+        router = ToolRouter(tools)
+
+        assert router.route("Thanks!").names == NAMES
+        assert router.route("Assess my diet and training overall").names == NAMES
+        assert router.stats()["full_tool_set"] == 2
+
+    def test_always_tools(self, tools):
+        """Test that always-on tools join every subset"""
+        route = ToolRouter(tools, always=["fitness_search"]).route("Plan my meals")
+
+        assert route.names == ("diet_planner", "fitness_search")
+
+    def test_subsets_are_cached_per_intent(self, tools):
+        """Test that requests with the same intents reuse one route"""
+        router = ToolRouter(tools)
+
+        assert router.route("plan my meals") is router.route("count my calories")
+
+    def test_missing_tools_fall_back(self, tools):
+        """Test that an intent whose tools are absent keeps the full set"""
+        router = ToolRouter([t for t in tools if t.name != "fitness_search"])
+
+        assert len(router.route("any studies on creatine?").names) == 5
+
+    def test_stats(self, tools):
+        """Test that saved schema tokens are counted under concurrency"""
+        router = ToolRouter(tools)
+        saved = router.route("plan my meals").tokens_saved
+        threads = [threading.Thread(target=router.route, args=("plan my meals",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = router.stats()
+        assert stats["routed"] == 9
+        assert stats["schema_tokens_saved"] == 9 * saved
+        assert stats["intents"] == {"diet": 9}
+
+    def test_create_router(self, tools):
+        """Test that routing is off unless enabled"""
+        assert create_router(None, tools) is None
+        assert create_router({"enabled": True, "always": ["bmi_calculator"]}, tools).always == {"bmi_calculator"}
@@ -0,0 +1,131 @@
+"""
+Unit tests for per-request tracing
+Run with: pytest tests/test_tracing.py -v
+"""
+
+import io
+import json
+
+import pytest
+
+import tracing
+from progress_store import ProgressStore
+from tracing import JSONCollector, MemoryCollector, Tracer, create_tracer
+
+
+@pytest.fixture
+def progress_table(progress_table):
+    """The shared progress table, with its client instrumented"""
+    tracing.instrument_client(progress_table)
+    return progress_table
+
+
+class TestTracer:
+    """Tests for request traces and tool spans"""
+
+    def test_tool_spans_attached_to_request(self):
+        """Test that traced tools record spans under the request ID"""
+        collector = MemoryCollector()
+        tracer = Tracer(collector)
+        tool = tracer.traced("bmi_calculator", lambda weight_kg: {"bmi": weight_kg / 3})
+
+        with tracer.request("req-1", user_id="user_1"):
+            tool(weight_kg=90)
+            tool(weight_kg=60)
+
+        trace = collector.traces[-1]
+        assert trace.request_id == "req-1"
+        assert trace.attributes == {"user_id": "user_1"}
+        assert [span.name for span in trace.spans] == ["bmi_calculator", "bmi_calculator"]
+        assert trace.summary()["tool"]["count"] == 2
+
+    def test_nested_spans_and_errors(self):
+        """Test that spans record their parent and any exception"""
+        collector = MemoryCollector()
+        tracer = Tracer(collector)
+
+        def failing():
+            raise ValueError("bad input")
+
+        tool = tracer.traced("planner", failing)
+        with tracer.request():
+            with tracer.span("prepare", "internal"):
+                with pytest.raises(ValueError):
+                    tool()
+
+        outer, inner = collector.traces[-1].spans
+        assert inner.parent_id == outer.span_id
+        assert inner.error == "ValueError: bad input"
+        assert outer.error is None
+
+    def test_nested_request_joins_outer(self):
+        """Test that a request opened inside another adds to the outer trace"""
+        collector = MemoryCollector()
+        tracer = Tracer(collector)
+
+        with tracer.request("outer"):
+            with tracer.request("inner"):
+                with tracer.span("work"):
+                    pass
+
+        assert len(collector.traces) == 1
+        assert collector.traces[0].spans[0].name == "work"
+
+    def test_disabled_is_noop(self):
+        """Test that a tracer without a collector leaves functions untouched"""
+        tracer = create_tracer({"enabled": False})
+
+        def tool():
+            return 1
+
+        assert not tracer.enabled
+        assert tracer.traced("tool", tool) is tool
+        with tracer.request("req"):
+            with tracer.span("work") as span:
+                assert span is None
+
+    def test_unknown_collector(self):
+        """Test that an unknown collector name is rejected"""
+        with pytest.raises(ValueError):
+            create_tracer({"enabled": True, "collector": "prometheus"})
+
+    def test_json_collector(self):
+        """Test that traces are written as one JSON object per line"""
+        stream = io.StringIO()
+        tracer = Tracer(JSONCollector(stream=stream))
+
+        with tracer.request("req-json"):
+            with tracer.span("work", "internal", items=3):
+                pass
+
+        record = json.loads(stream.getvalue().strip())
+        assert record["request_id"] == "req-json"
+        assert record["spans"][0]["attributes"] == {"items": 3}
+        assert record["summary"]["internal"]["count"] == 1
+
+
+class TestBotocoreInstrumentation:
+    """Tests for DynamoDB spans through botocore hooks"""
+
+    def test_dynamodb_spans_with_capacity(self, progress_table):
+        """Test that each DynamoDB call is a span reporting consumed capacity"""
+        collector = MemoryCollector()
+        tracer = Tracer(collector)
+        store = ProgressStore(progress_table)
+
+        with tracer.request("req-db"):
+            store.record_entry({"userId": "user_1", "date": "2024-01-01", "weight": 85.0, "measurements": {}})
+
+        spans = collector.traces[-1].spans
+        assert [span.name for span in spans][:2] == ["dynamodb.PutItem", "dynamodb.UpdateItem"]
+        assert all(span.kind == "dynamodb" for span in spans)
+        assert spans[0].attributes["tableName"] == "FitGeniusProgress"
+        assert spans[0].attributes["status"] == 200
+        assert spans[0].attributes["consumed_capacity"] > 0
+        assert collector.traces[-1].summary()["dynamodb"]["consumed_capacity"] > 0
+
+    def test_no_trace_no_capacity_request(self, progress_table):
+        """Test that calls outside a trace are left unchanged"""
+        response = progress_table.put_item(Item={"userId": "user_1", "date": "2024-01-01"})
+
+        assert "ConsumedCapacity" not in response
@@ -0,0 +1,102 @@
+"""
+Unit tests for the FitGenius workout template catalog
+Run with: pytest tests/test_workout_catalog.py -v
+"""
+
+import pytest
+
+import workout_catalog
+from workout_catalog import CATALOG, EXERCISES, get_workout_plan, lookup_days
+
+
+class TestCatalogConstruction:
+    """Tests for the prebuilt catalog"""
+
+    def test_every_template_exercise_has_attributes(self):
+        """Test that all template lines resolve to a known exercise"""
+        for goals in workout_catalog._raw_templates().values():
+            for days in goals.values():
+                for day in days:
+                    for line in day["exercises"]:
+                        assert workout_catalog.exercise_name(line) in EXERCISES
+
+    def test_catalog_is_read_only(self):
+        """Test that the catalog cannot be mutated"""
+        with pytest.raises(TypeError):
+            CATALOG[("beginner", "weight_loss", frozenset(), None)] = ()
+        with pytest.raises(TypeError):
+            EXERCISES["Plank"] = None
+
+    def test_full_gym_matches_original_templates(self):
+        """Test that an unrestricted lookup returns the original template"""
+        raw = workout_catalog._raw_templates()["intermediate"]["muscle_gain"]
+
+        plan = get_workout_plan("intermediate", "muscle_gain", [], [], 4)
+
+        assert plan == raw
+
+
+class TestEquipmentFiltering:
+    """Tests for equipment-aware planning"""
+
+    def test_bodyweight_only_drops_equipment_exercises(self):
+        """Test that bodyweight users get no loaded exercises"""
+        plan = get_workout_plan("beginner", "muscle_gain", ["bodyweight"], [], 3)
+        lines = [line for day in plan for line in day["exercises"]]
+
+        assert "Push-ups: 4x8-12" in lines
+        assert not any(line.startswith("Dumbbell Rows") for line in lines)
+        assert not any(line.startswith("Goblet Squats") for line in lines)
+
+    def test_unavailable_exercises_are_substituted(self):
+        """Test that a missing-equipment exercise is swapped for a similar one"""
+        plan = get_workout_plan("beginner", "muscle_gain", ["bodyweight"], [], 3)
+        monday = plan[0]["exercises"]
+
+        assert "Towel Rows: 4x10 (instead of Dumbbell Rows)" in monday
+        assert len(monday) == len(set(workout_catalog.exercise_name(line) for line in monday))
+
+    def test_equipment_aliases(self):
+        """Test that free-form equipment names are normalized"""
+        assert workout_catalog.normalize_equipment(["Dumbbell", "Pull-up Bar"]) == frozenset(
+            {"dumbbells", "pull_up_bar"}
+        )
+        assert workout_catalog.normalize_equipment([]) == workout_catalog.FULL_GYM
+
+    def test_exercise_with_alternative_equipment(self):
+        """Test that any one equipment option makes an exercise available"""
+        rdl = EXERCISES["Romanian Deadlifts"]
+
+        assert workout_catalog.is_available(rdl, frozenset({"dumbbells"}))
+        assert workout_catalog.is_available(rdl, frozenset({"barbell"}))
+        assert not workout_catalog.is_available(rdl, frozenset({"cable"}))
+
+
+class TestFocusAreas:
+    """Tests for focus-area ranking"""
+
+    def test_focus_selects_matching_days(self):
+        """Test that a legs focus keeps the legs day when days are limited"""
+        plan = get_workout_plan("intermediate", "muscle_gain", [], ["legs"], 1)
+
+        assert [day["focus"] for day in plan] == ["Legs"]
+
+    def test_plan_keeps_weekday_order(self):
+        """Test that ranked days are returned in template order"""
+        # Thursday ranks first (legs + core), Monday fills the second slot
+        plan = get_workout_plan("intermediate", "muscle_gain", [], ["legs", "core"], 2)
+
+        assert [day["day"] for day in plan] == ["Monday", "Thursday"]
+
+    def test_unknown_template_is_empty(self):
+        """Test that unknown level/goal combinations return no days"""
+        assert lookup_days("advanced", "strength") == ()
+        assert get_workout_plan("advanced", "strength", [], [], 3) == []
+
+    def test_plan_results_are_independent_copies(self):
+        """Test that mutating a returned plan does not touch the catalog"""
+        plan = get_workout_plan("beginner", "weight_loss", [], [], 3)
+        plan[0]["exercises"].append("Extra")
+
+        again = get_workout_plan("beginner", "weight_loss", [], [], 3)
+        assert "Extra" not in again[0]["exercises"]
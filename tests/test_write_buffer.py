@@ -0,0 +1,188 @@
+"""
+Unit tests for the FitGenius write-behind buffer
+Run with: pytest tests/test_write_buffer.py -v
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import boto3
+import pytest
+
+from progress_store import SUMMARY_DATE, ProgressStore
+from write_buffer import WriteBehindBuffer
+
+
+def entries(count, users=1, start=datetime(2024, 1, 1)):
+    return [
+        {
+            "userId": f"user_{n % users}",
+            "date": (start + timedelta(days=n // users)).strftime("%Y-%m-%d"),
+            "weight": round(85.0 - (n // users) * 0.1, 2),
+            "measurements": {"waist": round(95 - (n // users) * 0.05, 2)},
+        }
+        for n in range(count)
+    ]
+
+
+def stored(table, user_id):
+    response = table.query(KeyConditionExpression=boto3.dynamodb.conditions.Key("userId").eq(user_id))
+    return [item for item in response["Items"] if item["date"] != SUMMARY_DATE]
+
+
+class TestWriteBehindBuffer:
+    """Tests for buffered progress ingestion"""
+
+    def test_flush_writes_batches_of_25(self, progress_table):
+        """Test that 60 entries go out as three BatchWriteItem requests"""
+        buffer = WriteBehindBuffer(ProgressStore(progress_table), flush_interval=60)
+        for item in entries(60):
+            buffer.add(item)
+
+        assert buffer.flush() == 60
+        stats = buffer.stats()
+
+        assert stats["batch_requests"] == 3
+        assert stats["summary_updates"] == 1
+        assert stats["pending"] == 0
+        assert len(stored(progress_table, "user_0")) == 60
+        buffer.close()
+
+    def test_summary_matches_record_entry(self, progress_table):
+        """Test that buffered writes build the same summary as per-entry writes"""
+        store = ProgressStore(progress_table)
+        buffer = WriteBehindBuffer(store, flush_interval=60)
+        for item in entries(40):
+            buffer.add(item)
+        buffer.close()
+        for item in entries(40):
+            store.record_entry(dict(item, userId="direct"))
+
+        buffered = store.get_summary("user_0")
+        direct = store.get_summary("direct")
+
+        ignored = {"userId", "updated_at"}
+        assert {k: v for k, v in buffered.items() if k not in ignored} == \
+            {k: v for k, v in direct.items() if k not in ignored}
+
+    def test_repeated_key_is_coalesced(self, progress_table):
+        """Test that a re-sent day replaces the buffered entry"""
+        buffer = WriteBehindBuffer(ProgressStore(progress_table), flush_interval=60)
+        buffer.add({"userId": "user_0", "date": "2024-01-01", "weight": 85.0, "measurements": {}})
+        buffer.add({"userId": "user_0", "date": "2024-01-01", "weight": 84.0, "measurements": {}})
+        buffer.close()
+
+        items = stored(progress_table, "user_0")
+
+        assert buffer.stats()["coalesced"] == 1
+        assert len(items) == 1
+        assert items[0]["weight"] == 84
+
+    def test_background_flush_on_interval(self, progress_table):
+        """Test that the writer thread flushes without an explicit call"""
+        buffer = WriteBehindBuffer(ProgressStore(progress_table), flush_interval=0.05)
+        for item in entries(5):
+            buffer.add(item)
+
+        deadline = time.monotonic() + 5
+        while buffer.stats()["entries_written"] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert buffer.stats()["entries_written"] == 5
+        buffer.close()
+
+    def test_close_flushes_and_rejects_new_entries(self, progress_table):
+        """Test that close() writes pending entries and further adds fail"""
+        with WriteBehindBuffer(ProgressStore(progress_table), flush_interval=60) as buffer:
+            for item in entries(10, users=2):
+                buffer.add(item)
+
+        assert len(stored(progress_table, "user_0")) == 5
+        assert len(stored(progress_table, "user_1")) == 5
+        with pytest.raises(RuntimeError):
+            buffer.add(entries(1)[0])
+
+    def test_unprocessed_items_are_retried(self, progress_table, monkeypatch):
+        """Test that UnprocessedItems are sent again"""
+        client = progress_table.meta.client
+        real = client.batch_write_item
+        calls = []
+
+        def throttled(RequestItems):
+            calls.append(sum(len(v) for v in RequestItems.values()))
+            if len(calls) == 1:
+                requests = RequestItems["FitGeniusProgress"]
+                real(RequestItems={"FitGeniusProgress": requests[:10]})
+                return {"UnprocessedItems": {"FitGeniusProgress": requests[10:]}}
+            return real(RequestItems=RequestItems)
+
+        monkeypatch.setattr(client, "batch_write_item", throttled)
+        buffer = WriteBehindBuffer(ProgressStore(progress_table), flush_interval=60)
+        for item in entries(25):
+            buffer.add(item)
+        buffer.close()
+
+        assert calls == [25, 15]
+        assert buffer.stats()["batch_retries"] == 1
+        assert len(stored(progress_table, "user_0")) == 25
+
+    def test_failed_flush_requeues_entries(self, progress_table):
+        """Test that entries from a failed batch stay buffered for the next flush"""
+        store = ProgressStore(progress_table)
+        buffer = WriteBehindBuffer(store, flush_interval=60)
+        for item in entries(30):
+            buffer.add(item)
+
+        def failing(items):
+            raise RuntimeError("throttled")
+
+        store.batch_put = failing
+        with pytest.raises(RuntimeError):
+            buffer.flush()
+        assert buffer.pending == 30
+
+        del store.batch_put
+        buffer.close()
+        assert buffer.stats()["entries_written"] == 30
+
+    def test_reflushed_dates_replace_their_contribution(self, progress_table):
+        """Test that a date written again in a later flush is not counted twice"""
+        store = ProgressStore(progress_table)
+        buffer = WriteBehindBuffer(store, flush_interval=60)
+        for weight in (85.0, 84.0, 83.0, 82.0, 81.0):
+            buffer.add({"userId": "user_0", "date": "2024-01-01", "weight": weight, "measurements": {}})
+            buffer.flush()
+        buffer.add({"userId": "user_0", "date": "2024-01-02", "weight": 80.0, "measurements": {}})
+        buffer.close()
+
+        summary = store.get_summary("user_0")
+
+        assert len(stored(progress_table, "user_0")) == 2
+        assert summary["entry_count"] == 2
+        assert summary["count:weight"] == 2
+        assert summary["sum:weight"] == 161
+        assert buffer.stats()["batch_gets"] == 6
+
+    def test_failed_fold_is_logged_and_repaired(self, progress_table):
+        """Test that a summary that missed a flush is rebuilt from history at the next one"""
+        store = ProgressStore(progress_table)
+        buffer = WriteBehindBuffer(store, flush_interval=60)
+        for item in entries(10):
+            buffer.add(item)
+
+        def failing(entries, replaced=None):
+            raise RuntimeError("throttled")
+
+        store.fold_entries = failing
+        assert buffer.flush() == 10
+        stats = buffer.stats()
+        assert stats["summary_failures"] == 1 and stats["repairs_pending"] == 1
+        assert store.get_summary("user_0") is None
+
+        del store.fold_entries
+        buffer.close()
+
+        summary = store.get_summary("user_0")
+        assert buffer.stats()["summary_repairs"] == 1
+        assert summary["entry_count"] == 10
+        assert summary["first_date"] == "2024-01-01" and summary["latest_date"] == "2024-01-10"
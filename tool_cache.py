@@ -0,0 +1,174 @@
+"""
+FitGenius tool result cache
+
+Memoization for deterministic agent tools. A tool opts in by being marked
+with the ``pure`` decorator; ToolCache.wrap then caches its results in a
+bounded LRU keyed by tool name plus the canonicalized call arguments.
+Unmarked tools (anything with side effects, such as track_progress) are
+returned unwrapped and always run.
+"""
+
+import copy
+import inspect
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+PURE_ATTRIBUTE = "__fitgenius_pure__"
+
+
+def pure(function: Callable) -> Callable:
+    """Mark a tool function as a pure function of its arguments"""
+    setattr(function, PURE_ATTRIBUTE, True)
+    return function
+
+
+def is_pure(function: Callable) -> bool:
+    return getattr(function, PURE_ATTRIBUTE, False)
+
+
+_ATOMS = (str, int, type(None))
+
+
+def _canonical_value(value):
+    if type(value) in _ATOMS:
+        return value
+    if isinstance(value, bool):
+        # Keep True distinct from 1
+        return ("bool", value)
+    if isinstance(value, (float, Decimal)):
+        # 85 and 85.0 kg are the same request
+        value = float(value)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return ("dict",) + tuple(sorted((str(k), _canonical_value(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        # Order is kept: e.g. the first goal is the primary one
+        return ("list",) + tuple(_canonical_value(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return ("set",) + tuple(sorted((_canonical_value(v) for v in value), key=repr))
+    try:
+        hash(value)
+    except TypeError:
+        return ("repr", repr(value))
+    return value
+
+
+class _ArgumentKey:
+    """
+    Builds hashable keys for one function's calls
+
+    Positional and keyword forms of the same call, omitted defaults, dict
+    key order and int/float spellings of one number all give the same key.
+    inspect.Signature.bind is only used for unusual signatures, since it
+    costs more than most of our tools do.
+    """
+
+    def __init__(self, function: Callable):
+        try:
+            parameters = list(inspect.signature(function).parameters.values())
+        except (TypeError, ValueError):
+            parameters = None
+        simple = parameters is not None and all(
+            p.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD for p in parameters
+        )
+        self.names = tuple(p.name for p in parameters) if simple else None
+        self.defaults = {p.name: p.default for p in parameters or ()
+                         if p.default is not inspect.Parameter.empty} if simple else {}
+
+    def __call__(self, args: Tuple, kwargs: Dict) -> Tuple:
+        names = self.names
+        if names is not None and len(args) <= len(names):
+            values = dict(self.defaults)
+            values.update(zip(names, args))
+            values.update(kwargs)
+            if len(values) == len(names):
+                try:
+                    return tuple(_canonical_value(values[name]) for name in names)
+                except KeyError:
+                    pass  # unknown keyword; the call itself will raise
+        return ("call", _canonical_value(list(args)), _canonical_value(kwargs))
+
+
+def _copy_result(value):
+    """Copy of a JSON-like result; much cheaper than copy.deepcopy"""
+    kind = type(value)
+    if kind is dict:
+        return {k: _copy_result(v) for k, v in value.items()}
+    if kind is list:
+        return [_copy_result(v) for v in value]
+    if kind in (str, int, float, bool, type(None)):
+        return value
+    return copy.deepcopy(value)
+
+
+class ToolCache:
+    """Bounded LRU of tool results shared by every wrapped pure tool"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Tuple], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _tool_stats(self, name: str) -> Dict[str, int]:
+        return self._stats.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0})
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        """Return a memoized version of function if it is marked pure, else function itself"""
+        if not is_pure(function):
+            return function
+        argument_key = _ArgumentKey(function)
+
+        @wraps(function)
+        def memoized(*args, **kwargs):
+            key = (name, argument_key(args, kwargs))
+            with self._lock:
+                result = self._entries.get(key)
+                if result is not None:
+                    self._entries.move_to_end(key)
+                    self._tool_stats(name)["hits"] += 1
+                    return _copy_result(result)
+                self._tool_stats(name)["misses"] += 1
+
+            result = function(*args, **kwargs)
+            with self._lock:
+                self._entries[key] = _copy_result(result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    (evicted_name, _), _ = self._entries.popitem(last=False)
+                    self._tool_stats(evicted_name)["evictions"] += 1
+            return result
+
+        memoized.cache = self
+        return memoized
+
+    def stats(self, name: Optional[str] = None) -> Dict:
+        """Hit/miss counters for one tool, or totals plus a per-tool breakdown"""
+        with self._lock:
+            if name is not None:
+                counts = dict(self._tool_stats(name))
+                lookups = counts["hits"] + counts["misses"]
+                counts["hit_rate"] = round(counts["hits"] / lookups, 4) if lookups else 0.0
+                return counts
+
+            tools = {}
+            for tool, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                tools[tool] = {**counts, "hit_rate": round(counts["hits"] / lookups, 4) if lookups else 0.0}
+            hits = sum(counts["hits"] for counts in self._stats.values())
+            misses = sum(counts["misses"] for counts in self._stats.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "entries": len(self._entries),
+                "tools": tools,
+            }
+
+    def clear(self):
+        """Drop every cached result (stats are kept)"""
+        with self._lock:
+            self._entries.clear()
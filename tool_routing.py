@@ -0,0 +1,149 @@
+"""
+FitGenius tool routing
+
+Every tool schema attached to a model call is paid for in input tokens on
+every turn. ToolRouter classifies a request by keyword patterns (one
+compiled regex per intent, so classification costs microseconds) and
+picks the tools those intents need; requests that match nothing, or that
+ask for an overall assessment, keep the full tool set. Subsets are built
+once per intent combination and reused.
+"""
+
+import json
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import context_compaction
+
+GENERAL = "general"  # intent that needs every tool
+
+# Intent -> tools it needs
+INTENT_TOOLS: Dict[str, Tuple[str, ...]] = {
+    "bmi": ("bmi_calculator",),
+    "body_analysis": ("body_analyzer", "bmi_calculator"),
+    "workout": ("workout_planner",),
+    "diet": ("diet_planner",),
+    "progress": ("progress_tracker",),
+    "research": ("fitness_search",),
+}
+
+# Intent -> word patterns (matched case-insensitively on word boundaries)
+INTENT_PATTERNS: Dict[str, Tuple[str, ...]] = {
+    "bmi": (r"bmi", r"body mass", r"(?:over|under)weight", r"healthy weight", r"obes\w*"),
+    "body_analysis": (r"photos?", r"pic(?:ture)?s?", r"images?", r"selfies?", r"physique", r"posture",
+                      r"body (?:fat|comp\w*|shape|type)", r"analy[sz]e my body", r"how do i look"),
+    "workout": (r"work ?outs?", r"exercis\w*", r"train\w*", r"routines?", r"gym", r"lift\w*", r"reps?",
+                r"sets?", r"squat\w*", r"deadlift\w*", r"bench", r"push[- ]?ups?", r"pull[- ]?ups?",
+                r"cardio", r"run(?:s|ning)?", r"strength", r"muscles?", r"abs", r"stretch\w*", r"mobility",
+                r"dumbbells?", r"barbells?", r"kettlebells?", r"bands?", r"split", r"lose weight",
+                r"weight loss", r"fat loss", r"bulk\w*"),
+    "diet": (r"diet\w*", r"meals?", r"calor\w*", r"macros?", r"protein", r"carb\w*", r"fats?",
+             r"nutrition\w*", r"eat\w*", r"ate", r"foods?", r"breakfast", r"lunch", r"dinner", r"snacks?",
+             r"vegan", r"vegetarian", r"keto", r"recipes?", r"hydrat\w*", r"water", r"fasting",
+             r"lose weight", r"weight loss", r"fat loss", r"bulk\w*", r"cut(?:ting)?"),
+    "progress": (r"progress", r"track\w*", r"log\w*", r"weigh(?:ed|s|-?ins?)?", r"check[- ]?ins?",
+                 r"trends?", r"history", r"measurements?", r"plateau\w*", r"lost", r"gained"),
+    "research": (r"research", r"stud(?:y|ies)", r"evidence", r"science", r"scientific", r"supplements?",
+                 r"creatine", r"caffeine", r"whey", r"look up", r"search", r"is it true", r"safe"),
+    GENERAL: (r"assess\w*", r"evaluat\w*", r"overall", r"full plan", r"get (?:fit|in shape)",
+              r"where do i start", r"everything"),
+}
+
+
+def schema_tokens(tool) -> int:
+    """Estimated input tokens a tool's schema adds to every model call"""
+    schema = {"name": tool.name, "description": tool.description, "parameters": getattr(tool, "parameters", {})}
+    return context_compaction.estimate_tokens(json.dumps(schema, separators=(",", ":")))
+
+
+class Route(NamedTuple):
+    intents: FrozenSet[str]
+    names: Tuple[str, ...]  # tool names in agent order; the cache key for routed agents
+    tools: Tuple
+    tokens_saved: int
+
+    def report(self) -> Dict:
+        return {"intents": sorted(self.intents), "tools": list(self.names), "schema_tokens_saved": self.tokens_saved}
+
+
+class ToolRouter:
+    """
+    Keyword intent classifier that picks a tool subset per request
+
+    tools are objects with name and description (strands Tool). Tools in
+    always are attached to every call; intents naming tools that are not
+    in tools ignore them.
+    """
+
+    def __init__(self, tools: Sequence, always: Iterable[str] = (),
+                 intent_tools: Optional[Dict[str, Sequence[str]]] = None,
+                 intent_patterns: Optional[Dict[str, Sequence[str]]] = None):
+        self.tools = tuple(tools)
+        self.names = tuple(tool.name for tool in self.tools)
+        self.always = frozenset(always)
+        self.intent_tools = dict(intent_tools or INTENT_TOOLS)
+        self._patterns = {
+            intent: re.compile(r"\b(?:" + "|".join(patterns) + r")\b", re.IGNORECASE)
+            for intent, patterns in (intent_patterns or INTENT_PATTERNS).items()
+        }
+        self.schema_tokens = {tool.name: schema_tokens(tool) for tool in self.tools}
+        self.full_tokens = sum(self.schema_tokens.values())
+        self._full = Route(frozenset(), self.names, self.tools, 0)
+        self._routes: Dict[FrozenSet[str], Route] = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.routed = 0
+        self.tokens_saved = 0
+        self.intent_counts: Dict[str, int] = {}
+
+    def classify(self, text: str) -> FrozenSet[str]:
+        """Intents whose patterns appear in text"""
+        return frozenset(intent for intent, pattern in self._patterns.items() if pattern.search(text or ""))
+
+    def _route(self, intents: FrozenSet[str]) -> Route:
+        route = self._routes.get(intents)
+        if route is None:
+            wanted = set(self.always)
+            for intent in intents:
+                wanted.update(self.intent_tools.get(intent, ()))
+            selected = [tool for tool in self.tools if tool.name in wanted]
+            names = tuple(tool.name for tool in selected)
+            saved = self.full_tokens - sum(self.schema_tokens[name] for name in names)
+            route = self._routes.setdefault(intents, Route(intents, names, tuple(selected), saved))
+        return route
+
+    def route(self, text: str) -> Route:
+        """The tools for text; the full set when no intent (or the general one) matches"""
+        intents = self.classify(text)
+        route = self._full if not intents or GENERAL in intents else self._route(intents)
+        if not route.tools:
+            route = self._full
+        with self._lock:
+            self.requests += 1
+            for intent in intents:
+                self.intent_counts[intent] = self.intent_counts.get(intent, 0) + 1
+            if route is not self._full:
+                self.routed += 1
+                self.tokens_saved += route.tokens_saved
+        return route._replace(intents=intents) if route is self._full else route
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "routed": self.routed,
+                "full_tool_set": self.requests - self.routed,
+                "schema_tokens_saved": self.tokens_saved,
+                "full_schema_tokens": self.full_tokens,
+                "intents": dict(self.intent_counts),
+            }
+
+
+def create_router(settings: Optional[Dict], tools: List) -> Optional[ToolRouter]:
+    """Router from the agent.tool_routing config section (None when disabled)"""
+    settings = settings or {}
+    if not settings.get("enabled", False):
+        return None
+    return ToolRouter(tools, always=settings.get("always") or ())
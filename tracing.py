@@ -0,0 +1,337 @@
+"""
+FitGenius request tracing
+
+Per-request spans for tool invocations and AWS calls (Bedrock, DynamoDB,
+S3). Tracer.request() opens a trace under a request ID; while it is open,
+traced tools and instrumented boto3 clients add spans to it, and DynamoDB
+calls ask for ReturnConsumedCapacity so each span carries the capacity it
+used. Finished traces go to a pluggable collector (structlog, JSON lines
+or in-memory).
+
+When tracing is disabled nothing is wrapped or registered; when it is
+enabled but no trace is open, each hook costs one ContextVar lookup.
+"""
+
+import contextvars
+import itertools
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, TextIO
+
+import structlog
+
+# DynamoDB operations that accept ReturnConsumedCapacity
+CAPACITY_OPERATIONS = frozenset({
+    "GetItem", "PutItem", "UpdateItem", "DeleteItem", "Query", "Scan",
+    "BatchGetItem", "BatchWriteItem", "TransactGetItems", "TransactWriteItems",
+})
+
+SERVICE_KINDS = {"bedrock-runtime": "bedrock", "dynamodb": "dynamodb", "s3": "s3"}
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("fitgenius_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("fitgenius_span", default=None)
+
+
+class Span:
+    """One timed operation within a request"""
+
+    __slots__ = ("span_id", "parent_id", "name", "kind", "start", "duration_ms", "attributes", "error")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, kind: str, attributes: Dict):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.duration_ms = round((time.perf_counter() - self.start) * 1000, 3)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self, trace_start: float) -> Dict:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "offset_ms": round((self.start - trace_start) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    def __init__(self, request_id: str, attributes: Optional[Dict] = None):
+        self.request_id = request_id
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str, attributes: Dict) -> Span:
+        with self._lock:
+            span = Span(next(self._ids), _current_span.get(), name, kind, attributes)
+            self.spans.append(span)
+        return span
+
+    def summary(self) -> Dict:
+        """Time, call count and DynamoDB capacity per span kind"""
+        kinds: Dict[str, Dict] = {}
+        for span in self.spans:
+            totals = kinds.setdefault(span.kind, {"count": 0, "total_ms": 0.0})
+            totals["count"] += 1
+            totals["total_ms"] = round(totals["total_ms"] + (span.duration_ms or 0), 3)
+            capacity = span.attributes.get("consumed_capacity")
+            if capacity is not None:
+                totals["consumed_capacity"] = round(totals.get("consumed_capacity", 0) + capacity, 3)
+        return kinds
+
+    def to_dict(self) -> Dict:
+        return {
+            "request_id": self.request_id,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "summary": self.summary(),
+            "spans": [span.to_dict(self.start) for span in self.spans],
+        }
+
+
+# -- collectors ----------------------------------------------------------
+
+class MemoryCollector:
+    """Keeps the most recent traces in memory"""
+
+    def __init__(self, max_traces: int = 100):
+        self.traces: "deque[Trace]" = deque(maxlen=max_traces)
+
+    def collect(self, trace: Trace):
+        self.traces.append(trace)
+
+
+class JSONCollector:
+    """Writes each finished trace as one JSON line to a file or stream"""
+
+    def __init__(self, path: Optional[str] = None, stream: Optional[TextIO] = None):
+        self.path = path
+        self.stream = stream if stream is not None else (None if path else sys.stdout)
+        self._lock = threading.Lock()
+
+    def collect(self, trace: Trace):
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock:
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+            else:
+                self.stream.write(line + "\n")
+                self.stream.flush()
+
+
+class StructlogCollector:
+    """Logs every span, then a per-request summary, through structlog"""
+
+    def __init__(self, logger=None):
+        self.logger = logger or structlog.get_logger("fitgenius.tracing")
+
+    def collect(self, trace: Trace):
+        for span in trace.spans:
+            self.logger.info(
+                "span", request_id=trace.request_id, span=span.name, kind=span.kind,
+                duration_ms=span.duration_ms, parent_id=span.parent_id, error=span.error, **span.attributes
+            )
+        self.logger.info("request", request_id=trace.request_id, duration_ms=trace.duration_ms,
+                         summary=trace.summary(), **trace.attributes)
+
+
+COLLECTORS = {"memory": MemoryCollector, "json": JSONCollector, "structlog": StructlogCollector}
+
+
+# -- tracer --------------------------------------------------------------
+
+class _NullContext:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class Tracer:
+    """
+    Records request traces into a collector
+
+    A Tracer without a collector is disabled: request() and span() return
+    a shared no-op context and traced() returns functions unchanged.
+    """
+
+    def __init__(self, collector=None):
+        self.collector = collector
+
+    @property
+    def enabled(self) -> bool:
+        return self.collector is not None
+
+    @contextmanager
+    def _request(self, request_id: Optional[str], attributes: Dict) -> Iterator[Trace]:
+        trace = Trace(request_id or uuid.uuid4().hex, attributes)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            yield trace
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            trace.duration_ms = round((time.perf_counter() - trace.start) * 1000, 3)
+            self.collector.collect(trace)
+
+    def request(self, request_id: Optional[str] = None, **attributes):
+        """Open a trace for one request; nested calls join the outer trace"""
+        if self.collector is None or _current_trace.get() is not None:
+            return _NULL_CONTEXT
+        return self._request(request_id, attributes)
+
+    def span(self, name: str, kind: str = "internal", **attributes):
+        """Time a block as a span of the current trace"""
+        if self.collector is None or _current_trace.get() is None:
+            return _NULL_CONTEXT
+        return _span(name, kind, attributes)
+
+    def traced(self, name: str, function: Callable, kind: str = "tool") -> Callable:
+        """Wrap function so each call inside a trace records a span"""
+        if self.collector is None:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return function(*args, **kwargs)
+            with _span(name, kind, {}):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def instrument(self, client):
+        """Record a span per API call on a boto3 client (DynamoDB calls report capacity)"""
+        if self.collector is None:
+            return client
+        instrument_client(client)
+        return client
+
+
+@contextmanager
+def _span(name: str, kind: str, attributes: Dict) -> Iterator[Span]:
+    span = _current_trace.get().start_span(name, kind, attributes)
+    token = _current_span.set(span.span_id)
+    try:
+        yield span
+    except BaseException as exc:
+        span.finish(exc)
+        raise
+    else:
+        span.finish()
+    finally:
+        _current_span.reset(token)
+
+
+# -- botocore instrumentation --------------------------------------------
+
+_SPAN_KEY = "fitgenius_span"
+_ATTRIBUTES_KEY = "fitgenius_span_attributes"
+
+
+def _capacity_units(consumed) -> Optional[float]:
+    if consumed is None:
+        return None
+    if isinstance(consumed, dict):
+        consumed = [consumed]
+    return sum(float(c.get("CapacityUnits", 0)) for c in consumed)
+
+
+def _provide_params(params, model, context, **kwargs):
+    # Sees the caller's API parameters, before serialization
+    if _current_trace.get() is None:
+        return
+    if model.name in CAPACITY_OPERATIONS:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    context[_ATTRIBUTES_KEY] = {
+        key[0].lower() + key[1:]: params[key] for key in ("TableName", "Bucket", "modelId") if key in params
+    }
+
+
+def _before_call(model, context, **kwargs):
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    service = model.service_model.service_name
+    attributes = {"service": service, "operation": model.name, **context.pop(_ATTRIBUTES_KEY, {})}
+    span = trace.start_span(f"{service}.{model.name}", SERVICE_KINDS.get(service, "aws"), attributes)
+    context[_SPAN_KEY] = span
+
+
+def _after_call(http_response, parsed, model, context, **kwargs):
+    span = context.pop(_SPAN_KEY, None)
+    if span is None:
+        return
+    metadata = parsed.get("ResponseMetadata", {})
+    span.attributes["status"] = metadata.get("HTTPStatusCode")
+    span.attributes["retries"] = metadata.get("RetryAttempts", 0)
+    error = parsed.get("Error", {}).get("Code")
+    if error:
+        span.error = error
+    capacity = _capacity_units(parsed.get("ConsumedCapacity"))
+    if capacity is not None:
+        span.attributes["consumed_capacity"] = capacity
+    span.finish()
+
+
+def _after_call_error(context, exception, **kwargs):
+    span = context.pop(_SPAN_KEY, None)
+    if span is not None:
+        span.finish(exception)
+
+
+def instrument_client(client):
+    """Register tracing hooks on a boto3 client or resource (idempotent)"""
+    client = getattr(getattr(client, "meta", None), "client", client)
+    events = getattr(getattr(client, "meta", None), "events", None)
+    if events is None:
+        return  # not a botocore client (e.g. a test stub)
+    service = client.meta.service_model.service_name
+    events.register(f"provide-client-params.{service}.*", _provide_params, unique_id="fitgenius-params")
+    events.register(f"before-call.{service}.*", _before_call, unique_id="fitgenius-before-call")
+    events.register(f"after-call.{service}.*", _after_call, unique_id="fitgenius-after-call")
+    events.register(f"after-call-error.{service}.*", _after_call_error, unique_id="fitgenius-after-call-error")
+
+
+def create_tracer(settings: Optional[Dict] = None) -> Tracer:
+    """Tracer from the tracing config section (disabled unless enabled: true)"""
+    settings = settings or {}
+    if not settings.get("enabled", False):
+        return Tracer()
+    kind = settings.get("collector", "structlog")
+    if kind not in COLLECTORS:
+        raise ValueError(f"Unknown tracing collector {kind!r}; expected one of {sorted(COLLECTORS)}")
+    if kind == "json":
+        return Tracer(JSONCollector(path=settings.get("json_path")))
+    return Tracer(COLLECTORS[kind]())
@@ -0,0 +1,411 @@
+"""
+FitGenius workout template catalog
+
+The workout templates and per-exercise attributes are built once at import
+into an immutable catalog. Plans are looked up by
+(fitness_level, goal, equipment set, focus area); equipment and focus
+filtering use sets precomputed for every template day, so the planner does
+no template construction per call. Exercises the equipment rules out are
+replaced by their nearest available neighbour in exercise_similarity's
+attribute embeddings (or dropped when none is similar enough), also at
+build time.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from exercise_similarity import DEFAULT_MIN_SIMILARITY, ExerciseEmbeddings
+
+# Equipment the catalog knows about. Bodyweight exercises need none of it.
+EQUIPMENT = ("barbell", "bench", "cable", "dumbbells", "machine", "pull_up_bar")
+FULL_GYM = frozenset(EQUIPMENT)
+
+# Focus areas a plan can be biased towards
+FOCUS_AREAS = ("arms", "back", "cardio", "chest", "core", "full_body", "glutes", "legs", "shoulders")
+
+EQUIPMENT_ALIASES = {
+    "dumbbell": ("dumbbells",),
+    "barbells": ("barbell",),
+    "bench_press": ("barbell", "bench"),
+    "cables": ("cable",),
+    "cable_machine": ("cable",),
+    "lat_pulldown": ("cable",),
+    "machines": ("machine",),
+    "leg_press": ("machine",),
+    "pull-up_bar": ("pull_up_bar",),
+    "pullup_bar": ("pull_up_bar",),
+    "pull_up": ("pull_up_bar",),
+    "full_gym": EQUIPMENT,
+    "gym": EQUIPMENT,
+    "basic_gym_equipment": ("barbell", "bench", "dumbbells", "machine"),
+    "home_gym": ("bench", "dumbbells", "pull_up_bar"),
+    "bodyweight": (),
+    "none": (),
+}
+
+FOCUS_ALIASES = {
+    "upper_body": ("arms", "back", "chest", "shoulders"),
+    "lower_body": ("glutes", "legs"),
+    "abs": ("core",),
+    "biceps": ("arms",),
+    "triceps": ("arms",),
+    "lats": ("back",),
+    "quads": ("legs",),
+    "hamstrings": ("legs",),
+    "calves": ("legs",),
+    "conditioning": ("cardio",),
+}
+
+
+class Exercise(NamedTuple):
+    """Static attributes of a catalog exercise"""
+    name: str
+    muscle_groups: FrozenSet[str]
+    movement_pattern: str
+    # Each option is a set of equipment that must all be present; the
+    # exercise is available if any option is. An empty option means bodyweight.
+    equipment_options: Tuple[FrozenSet[str], ...]
+    difficulty: int  # 1 (beginner) to 3 (advanced)
+
+
+class TemplateDay(NamedTuple):
+    """One day of a workout template with its precomputed sets"""
+    position: int
+    day: str
+    focus: str
+    exercises: Tuple[Tuple[str, str], ...]  # (exercise name, full prescription)
+    muscle_groups: FrozenSet[str]
+    lines: Tuple[str, ...]
+
+
+class CatalogEntry(NamedTuple):
+    """Days for one catalog key, ranked by focus, plus the plan for every length"""
+    days: Tuple[TemplateDay, ...]
+    # plans[n] holds the top-n ranked days back in weekday order
+    plans: Tuple[Tuple[TemplateDay, ...], ...]
+
+
+def _exercise(name, muscles, pattern, equipment=((),), difficulty=1) -> Exercise:
+    return Exercise(
+        name=name,
+        muscle_groups=frozenset(muscles),
+        movement_pattern=pattern,
+        equipment_options=tuple(frozenset(option) for option in equipment),
+        difficulty=difficulty,
+    )
+
+
+EXERCISES: Mapping[str, Exercise] = MappingProxyType({e.name: e for e in (
+    _exercise("Bodyweight Squats", ("legs", "glutes"), "squat"),
+    _exercise("Push-ups (modified)", ("chest", "arms", "shoulders"), "horizontal_push"),
+    _exercise("Lunges", ("legs", "glutes"), "lunge"),
+    _exercise("Plank", ("core",), "core_stability"),
+    _exercise("Planks", ("core",), "core_stability"),
+    _exercise("Side Plank", ("core",), "core_stability"),
+    _exercise("Jumping Jacks", ("cardio", "full_body"), "cardio"),
+    _exercise("Brisk Walking", ("cardio", "legs"), "cardio"),
+    _exercise("Mountain Climbers", ("cardio", "core"), "cardio"),
+    _exercise("High Knees", ("cardio", "legs"), "cardio"),
+    _exercise("Burpees", ("cardio", "full_body"), "cardio", difficulty=2),
+    _exercise("Bicycle Crunches", ("core",), "core_flexion"),
+    _exercise("Leg Raises", ("core",), "core_flexion"),
+    _exercise("Incline Push-ups", ("chest", "arms", "shoulders"), "horizontal_push"),
+    _exercise("Push-ups", ("chest", "arms", "shoulders"), "horizontal_push"),
+    _exercise("Step-ups", ("legs", "glutes"), "lunge"),
+    _exercise("Glute Bridges", ("glutes", "legs"), "hinge"),
+    _exercise("Calf Raises", ("legs",), "ankle_extension"),
+    _exercise("Squats", ("legs", "glutes"), "squat"),
+    _exercise("Goblet Squats", ("legs", "glutes", "core"), "squat", (("dumbbells",),)),
+    _exercise("Back Squats", ("legs", "glutes", "core"), "squat", (("barbell",),), 3),
+    _exercise("Leg Press", ("legs", "glutes"), "squat", (("machine",),)),
+    _exercise("Romanian Deadlifts", ("legs", "glutes", "back"), "hinge", (("barbell",), ("dumbbells",)), 2),
+    _exercise("Leg Curls", ("legs",), "knee_flexion", (("machine",),)),
+    _exercise("Leg Extensions", ("legs",), "knee_extension", (("machine",),)),
+    _exercise("Dumbbell Rows", ("back", "arms"), "horizontal_pull", (("dumbbells",),)),
+    _exercise("Bent Over Rows", ("back", "arms"), "horizontal_pull", (("barbell",), ("dumbbells",)), 2),
+    _exercise("Barbell Rows", ("back", "arms"), "horizontal_pull", (("barbell",),), 2),
+    _exercise("Face Pulls", ("shoulders", "back"), "horizontal_pull", (("cable",),)),
+    _exercise("Pull-ups", ("back", "arms"), "vertical_pull", (("pull_up_bar",),), 3),
+    _exercise("Lat Pulldowns", ("back", "arms"), "vertical_pull", (("cable",),)),
+    _exercise("Shoulder Press", ("shoulders", "arms"), "vertical_push", (("dumbbells",),)),
+    _exercise("Overhead Press", ("shoulders", "arms"), "vertical_push", (("barbell",), ("dumbbells",)), 2),
+    _exercise("Military Press", ("shoulders", "arms"), "vertical_push", (("barbell",),), 2),
+    _exercise("Lateral Raises", ("shoulders",), "shoulder_abduction", (("dumbbells",), ("cable",))),
+    _exercise("Barbell Bench Press", ("chest", "arms", "shoulders"), "horizontal_push", (("barbell", "bench"),), 2),
+    _exercise("Incline Dumbbell Press", ("chest", "shoulders", "arms"), "horizontal_push",
+              (("dumbbells", "bench"),), 2),
+    _exercise("Close-Grip Bench", ("arms", "chest"), "horizontal_push", (("barbell", "bench"),), 2),
+    _exercise("Cable Flyes", ("chest",), "chest_fly", (("cable",),), 2),
+    _exercise("Bicep Curls", ("arms",), "elbow_flexion", (("dumbbells",), ("barbell",), ("cable",))),
+    _exercise("Barbell Curls", ("arms",), "elbow_flexion", (("barbell",),)),
+    _exercise("Hammer Curls", ("arms",), "elbow_flexion", (("dumbbells",),)),
+    _exercise("Tricep Dips", ("arms", "chest"), "vertical_push", (("bench",),)),
+    _exercise("Tricep Pushdowns", ("arms",), "elbow_extension", (("cable",),)),
+    _exercise("Overhead Tricep Extension", ("arms",), "elbow_extension", (("dumbbells",), ("cable",))),
+    # Bodyweight alternatives; not in any template, used as substitutes
+    _exercise("Towel Rows", ("back", "arms"), "horizontal_pull"),
+    _exercise("Superman Holds", ("back", "glutes", "core"), "hinge"),
+    _exercise("Single-Leg Romanian Deadlifts", ("legs", "glutes", "back"), "hinge", difficulty=2),
+    _exercise("Bulgarian Split Squats", ("legs", "glutes"), "lunge", ((), ("dumbbells",)), 2),
+    _exercise("Pike Push-ups", ("shoulders", "arms"), "vertical_push", difficulty=2),
+    _exercise("Diamond Push-ups", ("arms", "chest"), "horizontal_push", difficulty=2),
+    _exercise("Bodyweight Tricep Extensions", ("arms",), "elbow_extension", difficulty=2),
+)})
+
+
+# Attribute embeddings used to swap in substitutes for exercises the equipment rules out
+EMBEDDINGS = ExerciseEmbeddings(EXERCISES)
+
+
+def _raw_templates() -> Dict:
+    """The workout template literal the planner used to rebuild on every call"""
+    return {
+        "beginner": {
+            "weight_loss": [
+                {"day": "Monday", "focus": "Full Body", "exercises": [
+                    "Bodyweight Squats: 3x12",
+                    "Push-ups (modified): 3x8-10",
+                    "Lunges: 3x10 each leg",
+                    "Plank: 3x30 seconds",
+                    "Jumping Jacks: 3x20"
+                ]},
+                {"day": "Wednesday", "focus": "Cardio & Core", "exercises": [
+                    "Brisk Walking: 20 minutes",
+                    "Mountain Climbers: 3x15",
+                    "Bicycle Crunches: 3x15",
+                    "Burpees: 3x8",
+                    "Leg Raises: 3x12"
+                ]},
+                {"day": "Friday", "focus": "Full Body", "exercises": [
+                    "Bodyweight Squats: 3x15",
+                    "Incline Push-ups: 3x10",
+                    "Step-ups: 3x12 each leg",
+                    "Side Plank: 3x20s each side",
+                    "High Knees: 3x30 seconds"
+                ]}
+            ],
+            "muscle_gain": [
+                {"day": "Monday", "focus": "Upper Body", "exercises": [
+                    "Push-ups: 4x8-12",
+                    "Dumbbell Rows: 4x10",
+                    "Shoulder Press: 3x10",
+                    "Bicep Curls: 3x12",
+                    "Tricep Dips: 3x10"
+                ]},
+                {"day": "Wednesday", "focus": "Lower Body", "exercises": [
+                    "Goblet Squats: 4x10",
+                    "Romanian Deadlifts: 4x10",
+                    "Lunges: 3x12 each",
+                    "Calf Raises: 4x15",
+                    "Glute Bridges: 3x15"
+                ]},
+                {"day": "Friday", "focus": "Full Body", "exercises": [
+                    "Squats: 4x10",
+                    "Push-ups: 4x10",
+                    "Bent Over Rows: 4x10",
+                    "Overhead Press: 3x10",
+                    "Planks: 3x45s"
+                ]}
+            ]
+        },
+        "intermediate": {
+            "muscle_gain": [
+                {"day": "Monday", "focus": "Chest & Triceps", "exercises": [
+                    "Barbell Bench Press: 4x8-10",
+                    "Incline Dumbbell Press: 3x10",
+                    "Cable Flyes: 3x12",
+                    "Tricep Pushdowns: 4x12",
+                    "Overhead Tricep Extension: 3x12"
+                ]},
+                {"day": "Tuesday", "focus": "Back & Biceps", "exercises": [
+                    "Pull-ups: 4x6-8",
+                    "Barbell Rows: 4x8",
+                    "Lat Pulldowns: 3x10",
+                    "Barbell Curls: 4x10",
+                    "Hammer Curls: 3x12"
+                ]},
+                {"day": "Thursday", "focus": "Legs", "exercises": [
+                    "Back Squats: 4x8",
+                    "Leg Press: 4x12",
+                    "Romanian Deadlifts: 3x10",
+                    "Leg Curls: 3x12",
+                    "Leg Extensions: 3x15"
+                ]},
+                {"day": "Friday", "focus": "Shoulders & Arms", "exercises": [
+                    "Military Press: 4x8",
+                    "Lateral Raises: 4x12",
+                    "Face Pulls: 3x15",
+                    "Barbell Curls: 3x10",
+                    "Close-Grip Bench: 3x10"
+                ]}
+            ]
+        }
+    }
+
+
+def exercise_name(prescription: str) -> str:
+    """Extract the exercise name from a template line such as 'Lunges: 3x10'"""
+    return prescription.split(":", 1)[0].strip()
+
+
+def is_available(exercise: Exercise, equipment: FrozenSet[str]) -> bool:
+    """Whether an exercise can be performed with the given equipment"""
+    return any(option <= equipment for option in exercise.equipment_options)
+
+
+def _normalize_token(value: str) -> str:
+    return value.strip().lower().replace(" ", "_").replace("-", "_")
+
+
+@lru_cache(maxsize=1024)
+def _normalize_equipment(equipment: Tuple[str, ...]) -> FrozenSet[str]:
+    if not equipment:
+        # No equipment listed keeps the historical behaviour of a full gym
+        return FULL_GYM
+    normalized = set()
+    for item in equipment:
+        token = _normalize_token(item)
+        if token in FULL_GYM:
+            normalized.add(token)
+        else:
+            normalized.update(EQUIPMENT_ALIASES.get(token, ()))
+    return frozenset(normalized)
+
+
+def normalize_equipment(equipment: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """Map free-form equipment names onto the catalog's equipment vocabulary"""
+    return _normalize_equipment(tuple(equipment or ()))
+
+
+@lru_cache(maxsize=1024)
+def _normalize_focus_areas(focus_areas: Tuple[str, ...]) -> Tuple[str, ...]:
+    normalized: List[str] = []
+    for area in focus_areas:
+        token = _normalize_token(area)
+        for mapped in FOCUS_ALIASES.get(token, (token,)):
+            if mapped in FOCUS_AREAS and mapped not in normalized:
+                normalized.append(mapped)
+    return tuple(normalized)
+
+
+def normalize_focus_areas(focus_areas: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """Map free-form focus areas onto FOCUS_AREAS, preserving order"""
+    return _normalize_focus_areas(tuple(focus_areas or ()))
+
+
+def _build_days(days: List[Dict]) -> Tuple[TemplateDay, ...]:
+    built = []
+    for position, day in enumerate(days):
+        exercises = tuple((exercise_name(line), line) for line in day["exercises"])
+        muscles = frozenset().union(*(EXERCISES[name].muscle_groups for name, _ in exercises))
+        lines = tuple(line for _, line in exercises)
+        built.append(TemplateDay(position, day["day"], day["focus"], exercises, muscles, lines))
+    return tuple(built)
+
+
+def substitute_line(line: str, substitute: str) -> str:
+    """A template line with its exercise replaced, keeping the prescription"""
+    name, _, prescription = line.partition(":")
+    return f"{substitute}:{prescription} (instead of {name.strip()})"
+
+
+def _filter_days(days: Tuple[TemplateDay, ...], equipment: FrozenSet[str]) -> Tuple[TemplateDay, ...]:
+    filtered = []
+    for day in days:
+        missing = [name for name, _ in day.exercises if not is_available(EXERCISES[name], equipment)]
+        substitutes = dict(zip(missing, EMBEDDINGS.best_substitutes(
+            missing, equipment, exclude=[name for name, _ in day.exercises],
+            min_similarity=DEFAULT_MIN_SIMILARITY
+        )))
+        exercises = []
+        for name, line in day.exercises:
+            if name not in substitutes:
+                exercises.append((name, line))
+            elif substitutes[name] is not None:
+                # Swap in the most similar available exercise; drop it when nothing is close enough
+                substitute = substitutes[name][0]
+                exercises.append((substitute, substitute_line(line, substitute)))
+        exercises = tuple(exercises)
+        if exercises:
+            muscles = frozenset().union(*(EXERCISES[name].muscle_groups for name, _ in exercises))
+            lines = tuple(line for _, line in exercises)
+            filtered.append(day._replace(exercises=exercises, muscle_groups=muscles, lines=lines))
+    return tuple(filtered)
+
+
+def _rank_days(days: Tuple[TemplateDay, ...], focus: FrozenSet[str]) -> Tuple[TemplateDay, ...]:
+    # Stable sort: days hitting more focus areas first, template order otherwise
+    return tuple(sorted(days, key=lambda d: -len(d.muscle_groups & focus)))
+
+
+def _entry(days: Tuple[TemplateDay, ...]) -> CatalogEntry:
+    plans = tuple(tuple(sorted(days[:n], key=lambda d: d.position)) for n in range(len(days) + 1))
+    return CatalogEntry(days, plans)
+
+
+def _equipment_subsets() -> List[FrozenSet[str]]:
+    return [frozenset(c) for size in range(len(EQUIPMENT) + 1) for c in combinations(EQUIPMENT, size)]
+
+
+def _build_index() -> Mapping[Tuple, CatalogEntry]:
+    index = {}
+    for level, goals in _raw_templates().items():
+        for goal, days in goals.items():
+            template = _build_days(days)
+            for equipment in _equipment_subsets():
+                available = _filter_days(template, equipment)
+                index[(level, goal, equipment, None)] = _entry(available)
+                for area in FOCUS_AREAS:
+                    index[(level, goal, equipment, area)] = _entry(_rank_days(available, frozenset((area,))))
+    return MappingProxyType(index)
+
+
+# (fitness_level, goal, equipment frozenset, focus area or None) -> entry
+CATALOG: Mapping[Tuple, CatalogEntry] = _build_index()
+_EMPTY_ENTRY = _entry(())
+
+
+@lru_cache(maxsize=4096)
+def _multi_focus_entry(level: str, goal: str, equipment: FrozenSet[str], focus: FrozenSet[str]) -> CatalogEntry:
+    # Multi-area requests are ranked from the unfocused entry's precomputed sets
+    days = CATALOG.get((level, goal, equipment, None), _EMPTY_ENTRY).days
+    return _entry(_rank_days(days, focus))
+
+
+def _lookup_entry(fitness_level, goal, available_equipment, focus_areas) -> CatalogEntry:
+    equipment = normalize_equipment(available_equipment)
+    focus = normalize_focus_areas(focus_areas)
+    level = fitness_level.strip().lower()
+    goal = goal.strip().lower()
+
+    if len(focus) <= 1:
+        return CATALOG.get((level, goal, equipment, focus[0] if focus else None), _EMPTY_ENTRY)
+    return _multi_focus_entry(level, goal, equipment, frozenset(focus))
+
+
+def lookup_days(
+    fitness_level: str,
+    goal: str,
+    available_equipment: Optional[Iterable[str]] = None,
+    focus_areas: Optional[Iterable[str]] = None,
+) -> Tuple[TemplateDay, ...]:
+    """
+    Return the template days usable with the given equipment, ordered so days
+    covering the requested focus areas come first
+    """
+    return _lookup_entry(fitness_level, goal, available_equipment, focus_areas).days
+
+
+def get_workout_plan(
+    fitness_level: str,
+    goal: str,
+    available_equipment: Optional[Iterable[str]] = None,
+    focus_areas: Optional[Iterable[str]] = None,
+    days_per_week: Optional[int] = None,
+) -> List[Dict]:
+    """Build the plan days returned by the workout planner tool"""
+    entry = _lookup_entry(fitness_level, goal, available_equipment, focus_areas)
+    n = len(entry.days) if days_per_week is None else min(max(days_per_week, 0), len(entry.days))
+    return [{"day": d.day, "focus": d.focus, "exercises": list(d.lines)} for d in entry.plans[n]]
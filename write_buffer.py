@@ -0,0 +1,208 @@
+"""
+FitGenius write-behind buffer
+
+Buffered ingestion for high-volume progress sources such as wearables.
+add() only appends to an in-memory buffer, so callers return in
+microseconds; a background thread writes the buffer with BatchWriteItem
+(25 items per request) when it reaches flush_size entries or every
+flush_interval seconds, then folds the written entries into each user's
+summary with one UpdateItem per user. The entries a flush overwrites are
+read first with BatchGetItem, so a re-sent date replaces its contribution
+to the summary instead of counting again. Unprocessed items are retried, a
+failed flush puts its unwritten entries back, and close() (also run at
+interpreter exit) flushes whatever is left. If folding fails, the affected
+users' summaries are rebuilt from history at the next flush.
+"""
+
+import atexit
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import structlog
+
+from progress_store import BATCH_GET_SIZE, BATCH_SIZE, ProgressStore
+
+logger = structlog.get_logger("fitgenius.write_buffer")
+
+
+class WriteBehindBuffer:
+    """Coalescing in-memory buffer in front of ProgressStore"""
+
+    def __init__(self, store: ProgressStore, flush_size: int = 500, flush_interval: float = 1.0,
+                 max_buffered: int = 5000, update_summaries: bool = True):
+        self.store = store
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max(max_buffered, flush_size)
+        self.update_summaries = update_summaries
+
+        # Keyed by (userId, date): a re-sent entry replaces the buffered one
+        self._pending: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._repairs: Set[str] = set()  # users whose summary must be rebuilt from history
+
+        self.entries_added = 0
+        self.coalesced = 0
+        self.entries_written = 0
+        self.batch_requests = 0
+        self.batch_retries = 0
+        self.batch_gets = 0
+        self.summary_updates = 0
+        self.summary_failures = 0
+        self.summary_repairs = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_error: Optional[BaseException] = None
+
+    def add(self, entry: Dict):
+        """Queue an entry for writing; flushes inline only if the buffer is over max_buffered"""
+        if self._closed:
+            raise RuntimeError("WriteBehindBuffer is closed")
+        key = (entry["userId"], entry["date"])
+        with self._lock:
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = entry
+            self.entries_added += 1
+            pending = len(self._pending)
+        if self._thread is None:
+            self._start()
+        if pending >= self.max_buffered:
+            # Backpressure: the writer has fallen behind, so this caller waits
+            self.flush()
+        elif pending >= self.flush_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="fitgenius-write-behind", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:  # keep the writer alive; entries were re-queued
+                self.last_error = exc
+
+    def flush(self) -> int:
+        """Write every buffered entry now; returns the number written"""
+        with self._flush_lock:
+            self._repair_summaries()
+            with self._lock:
+                entries = list(self._pending.values())
+                self._pending.clear()
+            if not entries:
+                return 0
+
+            written: List[Dict] = []
+            replaced: Dict[Tuple[str, str], Dict] = {}
+            try:
+                if self.update_summaries:
+                    replaced = self.store.existing_entries(entries)
+                    self.batch_gets += -(-len(entries) // BATCH_GET_SIZE)
+                for start in range(0, len(entries), BATCH_SIZE):
+                    chunk = entries[start:start + BATCH_SIZE]
+                    retries = self.store.batch_put(chunk)
+                    self.batch_requests += 1 + retries
+                    self.batch_retries += retries
+                    written.extend(chunk)
+            except Exception:
+                self.failed_flushes += 1
+                self._requeue(entries[len(written):])
+                raise
+            finally:
+                self.entries_written += len(written)
+                self.flushes += 1
+                if written and self.update_summaries:
+                    self._fold(written, replaced)
+            return len(written)
+
+    def _fold(self, written: List[Dict], replaced: Dict[Tuple[str, str], Dict]):
+        try:
+            self.summary_updates += len(self.store.fold_entries(written, replaced))
+        except Exception as exc:
+            # The entries are stored, but some summaries may have missed them
+            users = {entry["userId"] for entry in written}
+            logger.exception("summary fold failed; rebuilding at next flush", users=len(users))
+            self.summary_failures += 1
+            self.last_error = exc
+            with self._lock:
+                self._repairs.update(users)
+
+    def _repair_summaries(self):
+        with self._lock:
+            users = sorted(self._repairs)
+            self._repairs.clear()
+        for done, user_id in enumerate(users):
+            try:
+                self.store.rebuild_summary(user_id)
+            except Exception as exc:
+                logger.exception("summary repair failed; retrying at next flush", user_id=user_id)
+                self.last_error = exc
+                with self._lock:
+                    self._repairs.update(users[done:])
+                return
+            self.summary_repairs += 1
+
+    def _requeue(self, entries: List[Dict]):
+        with self._lock:
+            for entry in entries:
+                # Don't overwrite a newer entry that arrived during the flush
+                self._pending.setdefault((entry["userId"], entry["date"]), entry)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Stop the background writer and flush what is left"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+        self.flush()
+
+    def __enter__(self) -> "WriteBehindBuffer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def stats(self) -> Dict:
+        written = self.entries_written
+        requests = self.batch_requests + self.batch_gets + self.summary_updates
+        return {
+            "entries_added": self.entries_added,
+            "coalesced": self.coalesced,
+            "entries_written": written,
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "batch_requests": self.batch_requests,
+            "batch_retries": self.batch_retries,
+            "batch_gets": self.batch_gets,
+            "summary_updates": self.summary_updates,
+            "summary_failures": self.summary_failures,
+            "summary_repairs": self.summary_repairs,
+            "repairs_pending": len(self._repairs),
+            "entries_per_request": round(written / requests, 2) if requests else 0.0,
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }